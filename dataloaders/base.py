@@ -1,6 +1,8 @@
+import numpy as np
 import torch
 from torch.utils.data import Dataset
 from pm4py.objects.conversion.log import converter as log_converter
+from dataloaders.store import EventLogStore
 
 
 def _build_vocabs(log, attributes=None):
@@ -52,6 +54,8 @@ class BaseEventLogDataset(Dataset):
         vocab_fn=_build_vocabs,
         max_len=None,
         padding_value=0,
+        store_dir=None,
+        array_feature_fn=None,
         **kwargs,
     ):
         """
@@ -66,29 +70,97 @@ class BaseEventLogDataset(Dataset):
             vocab_fn (Callable): Function that takes a log and returns a vocabulary dictionary.
             max_len (int): Optional maximum sequence length.
             padding_value (int): Value for sequence padding.
+            store_dir (str): Optional directory of pre-tokenised stores (see dataloaders.store). If given, the
+                                log is tokenised once into a memory-mapped store, the pm4py log is only loaded
+                                when self.log is accessed, and traces are encoded on access by array_feature_fn.
+            array_feature_fn (Callable -> Callable): Store mode only. Function that takes the vocabulary dict and
+                                returns f(activity_ids: np.ndarray, timestamps: np.ndarray) -> Tensor
+                                (default: make_array_feature_fn).
             **kwargs: Passed to subclass loader.
         """
         self.source_path = source_path
         self.max_len = max_len
         self.padding_value = padding_value
         self.feature_fn_fac = feature_fn
-
-        # Let subclass load the pm4py log
-        self.log = self._load_log(source_path, **kwargs)
-        self.log = log_converter.apply(
-            self.log, variant=log_converter.Variants.TO_EVENT_LOG
-        )
-
         self.vocab_fn = vocab_fn
+        self.loader_kwargs = kwargs
+        self._log = None
+        self.store = None
+
+        if store_dir is not None:
+            keys = self._store_keys(**kwargs)
+            self.store = EventLogStore.open_or_build(
+                store_dir,
+                source_path,
+                lambda path, meta: self._build_store(path, meta, **kwargs),
+                **keys,
+            )
+            self.vocab = {
+                "concept:name": self.store.vocab,
+                keys["activity_key"]: self.store.vocab,
+            }
+            self.feature_fn = (array_feature_fn or make_array_feature_fn)(
+                self.vocab
+            )
+            return
+
         self.vocab = self.vocab_fn(self.log)
         self.feature_fn = self.feature_fn_fac(self.vocab)
 
         # Encode traces via user-supplied function
         self.encoded_traces = [self._encode_trace(trace) for trace in self.log]
 
+    @property
+    def log(self):
+        """The pm4py EventLog (loaded on first access in store mode)."""
+        if self._log is None:
+            # Let subclass load the pm4py log
+            self._log = log_converter.apply(
+                self._load_log(self.source_path, **self.loader_kwargs),
+                variant=log_converter.Variants.TO_EVENT_LOG,
+            )
+        return self._log
+
+    @log.setter
+    def log(self, value):
+        self._log = value
+
     def _load_log(self, source_path, **kwargs):
         raise NotImplementedError
 
+    def _store_keys(self, **kwargs):
+        """Options of the source that determine the content of the store."""
+        return {
+            "activity_key": "concept:name",
+            "timestamp_key": "time:timestamp",
+        }
+
+    def _build_store(self, path, meta, **kwargs):
+        """Builds the store of the source file (default: from _iter_traces)."""
+        return EventLogStore.build(
+            path, self._iter_traces(self.source_path, **kwargs), meta
+        )
+
+    def _iter_traces(self, source_path, **kwargs):
+        """
+        Yields (case_id, activities, timestamps) per trace, timestamps in
+        seconds since the epoch, to build the store. Subclasses override it to
+        stream the source instead of loading the pm4py log.
+        """
+        for trace in self.log:
+            yield (
+                trace.attributes.get("concept:name"),
+                [e["concept:name"] for e in trace],
+                [
+                    (
+                        e["time:timestamp"].timestamp()
+                        if "time:timestamp" in e
+                        else None
+                    )
+                    for e in trace
+                ],
+            )
+
     def _encode_trace(self, trace):
         """Use the user-provided feature_fn to encode a trace."""
         result = self.feature_fn(trace)
@@ -103,9 +175,16 @@ class BaseEventLogDataset(Dataset):
         return result
 
     def __len__(self):
+        if self.store is not None:
+            return len(self.store)
         return len(self.encoded_traces)
 
     def __getitem__(self, idx):
+        if self.store is not None:
+            result = self.feature_fn(*self.store[idx])
+            if self.max_len is not None:
+                result = result[: self.max_len]
+            return result
         return self.encoded_traces[idx]
 
     def collate_fn(self, batch):
@@ -117,20 +196,46 @@ class BaseEventLogDataset(Dataset):
 """ ============= Example Usage ============= """
 
 
+def _activity_time_features(activity_ids, timestamps):
+    """[T, 2] tensor of activity ids and hours since the first event."""
+    delta_h = (timestamps - timestamps[:1]) / 3600.0
+    return torch.from_numpy(
+        np.stack(
+            [
+                np.asarray(activity_ids, dtype=np.float32),
+                delta_h.astype(np.float32),
+            ],
+            axis=1,
+        )
+    )
+
+
 # Example feature function
 def make_feature_fn(vocab):
+    activity_ids = vocab["concept:name"]
+
     def feature_fn(trace):
-        start_time = trace[0]["time:timestamp"]
-        vectors = []
-        for e in trace:
-            activity_id = vocab["concept:name"][e["concept:name"]]
-            delta_h = (
-                e["time:timestamp"] - start_time
-            ).total_seconds() / 3600.0
-            vectors.append(
-                torch.tensor([activity_id, delta_h], dtype=torch.float)
-            )
-        return vectors  # list of tensors
+        n = len(trace)
+        ids = np.fromiter(
+            (activity_ids[e["concept:name"]] for e in trace),
+            dtype=np.float32,
+            count=n,
+        )
+        timestamps = np.fromiter(
+            (e["time:timestamp"].timestamp() for e in trace),
+            dtype=np.float64,
+            count=n,
+        )
+        # one [T, 2] tensor per trace instead of one tensor per event
+        return _activity_time_features(ids, timestamps)
+
+    return feature_fn
+
+
+# Same features, from the arrays of a pre-tokenised store
+def make_array_feature_fn(vocab):
+    def feature_fn(activity_ids, timestamps):
+        return _activity_time_features(activity_ids, timestamps)
 
     return feature_fn
 
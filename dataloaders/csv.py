@@ -1,9 +1,83 @@
+import importlib.util
 import torch
 from pm4py.objects.conversion.log import converter as log_converter
+from pm4py.util import constants, pandas_utils
 from pm4py.utils import format_dataframe
 import pandas as pd
 from dataloaders.base import BaseEventLogDataset, make_feature_fn
-from charset_normalizer import from_path
+from dataloaders.store import EventLogStore
+from charset_normalizer import from_bytes
+
+# bytes of the head of the file used to detect its encoding
+ENCODING_SAMPLE_BYTES = 1 << 20
+
+
+def _detect_encoding(source_path):
+    """Encoding of a file, detected on its head only."""
+    with open(source_path, "rb") as f:
+        head = f.read(ENCODING_SAMPLE_BYTES)
+    result = from_bytes(head).best()
+    return (result.encoding if result else None) or 'utf-8-sig'
+
+
+def _read_columns(source_path, columns, sep, encoding):
+    """
+    Reads only the given columns of a CSV file as strings, with pyarrow or
+    polars when installed (multi-threaded, columnar), pandas otherwise.
+    """
+    if importlib.util.find_spec("pyarrow") is not None:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+
+        table = pa_csv.read_csv(
+            source_path,
+            read_options=pa_csv.ReadOptions(encoding=encoding),
+            parse_options=pa_csv.ParseOptions(delimiter=sep),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=columns,
+                column_types={c: pa.string() for c in columns},
+            ),
+        )
+        return [table.column(c).to_pandas() for c in columns]
+    # polars only reads UTF-8
+    utf8 = encoding.lower().replace("-", "").replace("_", "") in (
+        "utf8",
+        "utf8sig",
+        "ascii",
+    )
+    if importlib.util.find_spec("polars") is not None and utf8:
+        import polars as pl
+
+        df = pl.read_csv(
+            source_path,
+            separator=sep,
+            columns=columns,
+            infer_schema=False,
+            encoding="utf8-lossy",
+        )
+        return [df[c].to_pandas() for c in columns]
+    df = pd.read_csv(
+        source_path,
+        sep=sep,
+        usecols=columns,
+        dtype=str,
+        encoding=encoding,
+        encoding_errors='replace',
+        index_col=False,
+    )
+    return [df[c] for c in columns]
+
+
+def _to_seconds(timestamps):
+    """
+    Parses a column of timestamps as pm4py does (UTC), returning seconds since
+    the epoch (NaN when missing or not parsable).
+    """
+    timest_format = constants.DEFAULT_TIMESTAMP_PARSE_FORMAT or "mixed"
+    parsed = pandas_utils.dataframe_column_string_to_datetime(
+        timestamps, format=timest_format, utc=True, errors="coerce"
+    )
+    return (parsed - pd.Timestamp(0, tz="UTC")).dt.total_seconds().to_numpy()
 
 
 class CSVEventLogDataset(BaseEventLogDataset):
@@ -17,8 +91,7 @@ class CSVEventLogDataset(BaseEventLogDataset):
         **_,
     ):
         # determine encoding
-        result = from_path(source_path).best()
-        encoding = result.encoding or 'utf-8-sig'
+        encoding = _detect_encoding(source_path)
         # read CSV
         with open(source_path, encoding=encoding, errors='replace') as f:
             df = pd.read_csv(f, sep=sep, index_col=False)
@@ -40,6 +113,55 @@ class CSVEventLogDataset(BaseEventLogDataset):
         )
         return event_log
 
+    def _store_keys(
+        self,
+        case_id_col="case:concept:name",
+        activity_col="concept:name",
+        timestamp_col="time:timestamp",
+        sep=",",
+        **_,
+    ):
+        # as in _load_log, which is not called in store mode
+        self.case_id_col = case_id_col
+        self.activity_col = activity_col
+        self.timestamp_col = timestamp_col
+        return {
+            "case_id_key": case_id_col,
+            "activity_key": activity_col,
+            "timestamp_key": timestamp_col,
+            "sep": sep,
+        }
+
+    def _build_store(
+        self,
+        path,
+        meta,
+        case_id_col="case:concept:name",
+        activity_col="concept:name",
+        timestamp_col="time:timestamp",
+        sep=",",
+        **_,
+    ):
+        # columnar ingestion: only the three needed columns are read, and the
+        # store is built from them without Trace/Event objects
+        names = [case_id_col, activity_col, timestamp_col]
+        unique_names = list(dict.fromkeys(names))
+        columns = dict(
+            zip(
+                unique_names,
+                _read_columns(
+                    self.source_path,
+                    unique_names,
+                    sep,
+                    _detect_encoding(self.source_path),
+                ),
+            )
+        )
+        case_ids, activities, timestamps = (columns[c] for c in names)
+        return EventLogStore.build_from_columns(
+            path, case_ids, activities, _to_seconds(timestamps), meta
+        )
+
 
 # Example usage
 if __name__ == "__main__":
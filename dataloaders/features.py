@@ -0,0 +1,248 @@
+"""
+Features of (model, trace) pairs for the heuristic recommender (see
+documents/Feature Engineering).
+
+Model features are computed once per net and cached by its canonical hash; the
+trace and interaction features of a whole log are computed at once with numpy
+over the integer-encoded events, so that their cost stays negligible with
+respect to the alignments.
+"""
+
+import math
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+from pm4py.objects.petri_net.obj import Marking, PetriNet
+
+from dataloaders.model_cache import canonical_net_hash
+
+MODEL_FEATURES = [
+    "places",
+    "transitions",
+    "arcs",
+    "silent_transitions",
+    "labels",
+    "duplicate_labels",
+    "avg_in_degree",
+    "avg_out_degree",
+    "xor_splits",
+    "and_splits",
+    "density",
+    "depth",
+    "log_reachability_estimate",
+]
+TRACE_FEATURES = [
+    "trace_length",
+    "distinct_activities",
+    "max_repetitions",
+    "repetition_ratio",
+    "unmatched_events_ratio",
+]
+INTERACTION_FEATURES = [
+    "length_ratio",
+    "activity_coverage",
+    "log_search_space_estimate",
+]
+FEATURE_NAMES = MODEL_FEATURES + TRACE_FEATURES + INTERACTION_FEATURES
+
+# number of nets whose features are kept by get_model_features
+MODEL_CACHE_SIZE = 1024
+_MODEL_CACHE = OrderedDict()
+
+
+class ModelFeatures:
+    """
+    Features of a Petri net, with the visible labels needed by the trace
+    features.
+    """
+
+    def __init__(self, pn: PetriNet, im: Marking, fm: Marking):
+        transitions = list(pn.transitions)
+        label_counts = {}
+        for t in transitions:
+            if t.label is not None:
+                label_counts[t.label] = label_counts.get(t.label, 0) + 1
+        self.labels = sorted(label_counts)
+
+        n_places, n_trans = len(pn.places), len(transitions)
+        in_degrees = [len(t.in_arcs) for t in transitions]
+        out_degrees = [len(t.out_arcs) for t in transitions]
+        and_branches = [d for d in out_degrees if d > 1]
+        # every AND-split multiplies the interleavings of its branches, every
+        # place is a state of a sequential net
+        log_reachability = math.log2(max(1, n_places)) + sum(
+            math.log2(d) for d in and_branches
+        )
+        self.vector = np.array(
+            [
+                n_places,
+                n_trans,
+                len(pn.arcs),
+                sum(1 for t in transitions if t.label is None),
+                len(label_counts),
+                sum(c - 1 for c in label_counts.values()),
+                np.mean(in_degrees) if transitions else 0.0,
+                np.mean(out_degrees) if transitions else 0.0,
+                sum(1 for p in pn.places if len(p.out_arcs) > 1),
+                len(and_branches),
+                len(pn.arcs) / max(1, n_places + n_trans),
+                _depth(im),
+                log_reachability,
+            ],
+            dtype=np.float64,
+        )
+
+    @property
+    def transitions(self) -> int:
+        return int(self.vector[MODEL_FEATURES.index("transitions")])
+
+    @property
+    def log_reachability_estimate(self) -> float:
+        return float(
+            self.vector[MODEL_FEATURES.index("log_reachability_estimate")]
+        )
+
+
+def _depth(im):
+    """
+    Number of transitions on the longest shortest path from the places of the
+    initial marking (a cheap stand-in for the longest path to the final
+    marking, which is hard on cyclic nets).
+    """
+    depth = {p: 0 for p in im}
+    queue = deque(im)
+    while queue:
+        p = queue.popleft()
+        for arc in p.out_arcs:
+            for out_arc in arc.target.out_arcs:
+                if out_arc.target not in depth:
+                    depth[out_arc.target] = depth[p] + 1
+                    queue.append(out_arc.target)
+    return max(depth.values(), default=0)
+
+
+def get_model_features(
+    pn: PetriNet, im: Marking, fm: Marking, h: str | None = None
+) -> ModelFeatures:
+    """
+    Model features of a Petri net, cached by its canonical hash (the
+    MODEL_CACHE_SIZE most recently used nets are kept).
+
+    Args:
+        pn, im, fm: Petri net with its initial and final markings.
+        h (str): Canonical hash of the net (see canonical_net_hash), when
+            already known.
+    """
+    if h is None:
+        h = canonical_net_hash(pn, im, fm)
+    if h in _MODEL_CACHE:
+        _MODEL_CACHE.move_to_end(h)
+        return _MODEL_CACHE[h]
+    features = ModelFeatures(pn, im, fm)
+    _MODEL_CACHE[h] = features
+    if len(_MODEL_CACHE) > MODEL_CACHE_SIZE:
+        _MODEL_CACHE.popitem(last=False)
+    return features
+
+
+def _flatten(log, activity_key, case_id_key):
+    """
+    Activities of all the events of the log, with the index of their trace.
+    """
+    if isinstance(log, pd.DataFrame):
+        trace_index, cases = pd.factorize(log[case_id_key])
+        return log[activity_key].to_numpy(), trace_index, len(cases)
+    activities = []
+    lengths = []
+    for trace in log:
+        activities.extend(
+            e if isinstance(e, str) else e[activity_key] for e in trace
+        )
+        lengths.append(len(trace))
+    trace_index = np.repeat(np.arange(len(lengths)), lengths)
+    return np.asarray(activities, dtype=object), trace_index, len(lengths)
+
+
+def extract_features(
+    pn: PetriNet,
+    im: Marking,
+    fm: Marking,
+    log,
+    activity_key: str = "concept:name",
+    case_id_key: str = "case:concept:name",
+) -> np.ndarray:
+    """
+    Features (FEATURE_NAMES) of every trace of a log against a Petri net.
+
+    Args:
+        pn, im, fm: Petri net with its initial and final markings.
+        log: EventLog, list of traces (lists of events or activities), or
+            pandas DataFrame with one row per event.
+        activity_key (str): Attribute of the activity.
+        case_id_key (str): Column of the case identifier (DataFrame only).
+
+    Returns:
+        np.ndarray of shape [n_traces, len(FEATURE_NAMES)].
+    """
+    model = get_model_features(pn, im, fm)
+    activities, trace_index, n_traces = _flatten(
+        log, activity_key, case_id_key
+    )
+
+    codes, uniques = pd.factorize(activities)
+    n_codes = max(1, len(uniques))
+    in_model = np.isin(uniques, model.labels)
+
+    lengths = np.bincount(trace_index, minlength=n_traces).astype(np.float64)
+    # one entry per distinct (trace, activity) pair, with its multiplicity
+    pairs, counts = np.unique(
+        trace_index.astype(np.int64) * n_codes + codes, return_counts=True
+    )
+    pair_trace = pairs // n_codes
+    pair_in_model = in_model[pairs % n_codes]
+
+    distinct = np.bincount(pair_trace, minlength=n_traces)
+    max_repetitions = np.zeros(n_traces, dtype=np.int64)
+    np.maximum.at(max_repetitions, pair_trace, counts)
+    unmatched = np.bincount(
+        pair_trace, weights=counts * ~pair_in_model, minlength=n_traces
+    )
+    covered = np.bincount(
+        pair_trace[pair_in_model], minlength=n_traces
+    ).astype(np.float64)
+
+    nonempty = np.maximum(lengths, 1.0)
+    trace_features = np.column_stack(
+        [
+            lengths,
+            distinct,
+            max_repetitions,
+            np.where(lengths > 0, 1.0 - distinct / nonempty, 0.0),
+            unmatched / nonempty,
+        ]
+    )
+    interaction_features = np.column_stack(
+        [
+            lengths / max(1, model.transitions),
+            covered / max(1, len(model.labels)),
+            np.log2(lengths + 1.0) + model.log_reachability_estimate,
+        ]
+    )
+    return np.hstack(
+        [
+            np.broadcast_to(model.vector, (n_traces, len(MODEL_FEATURES))),
+            trace_features,
+            interaction_features,
+        ]
+    )
+
+
+if __name__ == "__main__":
+    import pm4py
+
+    log = pm4py.read_xes("pm4py/tests/input_data/running-example.xes")
+    pn, im, fm = pm4py.discover_petri_net_inductive(log)
+
+    features = extract_features(pn, im, fm, log)
+    print(pd.DataFrame(features, columns=FEATURE_NAMES))
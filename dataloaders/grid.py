@@ -0,0 +1,145 @@
+"""
+Expansion of the parameter grids of the discovery methods.
+
+A grid maps parameter names to the list of their values. It is restricted to
+the parameters of the method before its product is taken, and its
+configurations are yielded lazily by index in the mixed-radix product space,
+so that large grids are never materialised: either all of them in order, or a
+sample of them (uniformly at random, or by Latin hypercube sampling, which
+spreads the sample over the values of every parameter).
+"""
+
+import inspect
+import math
+import random
+
+STRATEGIES = ("grid", "random", "lhs")
+
+
+def method_param_grid(fn, grid):
+    """
+    Restriction of a grid to the keyword arguments of a function, with the
+    duplicate values of every parameter removed (first occurrence kept).
+
+    Args:
+        fn (Callable): Discovery function.
+        grid (dict[str, list]): Parameter names to the values to sweep.
+    """
+    sig_params = set(inspect.signature(fn).parameters.keys())
+    restricted = {}
+    for key, values in grid.items():
+        if key not in sig_params:
+            continue
+        distinct = []
+        for v in values:
+            if v not in distinct:
+                distinct.append(v)
+        restricted[key] = distinct
+    return restricted
+
+
+def grid_size(grid):
+    """Number of configurations of a grid."""
+    return math.prod(len(values) for values in grid.values())
+
+
+def split_budget(sizes, max_models=None):
+    """
+    Number of configurations to draw from every grid so that max_models are
+    drawn in total, as evenly as the sizes of the grids allow.
+
+    Args:
+        sizes (dict[str, int]): Size of the grid of every method.
+        max_models (int): Total budget (no limit when None).
+    """
+    if max_models is None or sum(sizes.values()) <= max_models:
+        return dict(sizes)
+    budgets = {name: 0 for name in sizes}
+    remaining = max_models
+    open_names = [name for name, size in sizes.items() if size > 0]
+    # water-filling: small grids are taken whole, the rest is shared
+    while remaining > 0 and open_names:
+        share = max(1, remaining // len(open_names))
+        for name in list(open_names):
+            take = min(share, sizes[name] - budgets[name], remaining)
+            budgets[name] += take
+            remaining -= take
+            if budgets[name] == sizes[name]:
+                open_names.remove(name)
+            if remaining == 0:
+                break
+    return budgets
+
+
+def _config(grid, keys, indices):
+    return {k: grid[k][i] for k, i in zip(keys, indices)}
+
+
+def _unravel(index, radices):
+    indices = []
+    for radix in reversed(radices):
+        index, i = divmod(index, radix)
+        indices.append(i)
+    return indices[::-1]
+
+
+def _lhs_indices(radices, n, rng):
+    """
+    n distinct points of the product space by Latin hypercube sampling: for
+    every parameter, the n samples fall in n different strata of its values.
+    """
+    strata = []
+    for radix in radices:
+        perm = list(range(n))
+        rng.shuffle(perm)
+        strata.append(
+            [min(radix - 1, int((s + rng.random()) * radix / n)) for s in perm]
+        )
+    points = list(dict.fromkeys(zip(*strata)))
+    return [list(p) for p in points]
+
+
+def iter_grid(grid, n=None, strategy="grid", rng=None):
+    """
+    Lazily yields distinct configurations (dicts) of a grid.
+
+    Args:
+        grid (dict[str, list]): Parameter names to their (distinct) values.
+        n (int): Number of configurations (all of them when None or larger
+            than the grid).
+        strategy (str): With a limit, "grid" yields the first n
+            configurations, "random" a uniform sample of them and "lhs" a
+            Latin hypercube sample.
+        rng (random.Random): Source of randomness of the sampling.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(
+            f"strategy must be one of {STRATEGIES}, got {strategy!r}"
+        )
+    keys = list(grid)
+    radices = [len(grid[k]) for k in keys]
+    size = grid_size(grid)
+    if n is None or n >= size or strategy == "grid":
+        for index in range(size if n is None else min(n, size)):
+            yield _config(grid, keys, _unravel(index, radices))
+        return
+
+    rng = rng or random.Random()
+    if strategy == "random":
+        # sampling a range does not materialise it
+        for index in rng.sample(range(size), n):
+            yield _config(grid, keys, _unravel(index, radices))
+        return
+
+    points = _lhs_indices(radices, n, rng)
+    seen = set()
+    for indices in points:
+        seen.add(tuple(indices))
+        yield _config(grid, keys, indices)
+    # strata collide on parameters with fewer values than n: the sample is
+    # completed uniformly at random
+    while len(seen) < n:
+        indices = _unravel(rng.randrange(size), radices)
+        if tuple(indices) not in seen:
+            seen.add(tuple(indices))
+            yield _config(grid, keys, indices)
@@ -0,0 +1,205 @@
+"""
+Content-addressed cache of discovered process models.
+
+All the models are kept in a single SQLite file with two tables:
+
+    nets         net_hash -> compact encoding of the net (zlib-compressed JSON)
+    discoveries  config_key (method, parameters, sub-log hash) -> net_hash
+
+where net_hash is a canonical hash of the net (see canonical_net_hash) and
+the sub-log hash is a hash of its variants (see sublog_hash),
+so that a discovery configuration is never run twice for the same sub-log
+(whatever sampler produced it), and nets discovered by many configurations
+are stored once.
+"""
+
+import hashlib
+import json
+import sqlite3
+import zlib
+from collections import Counter
+
+import pandas as pd
+from pm4py.objects.petri_net.obj import Marking, PetriNet
+from pm4py.objects.petri_net.utils.check_soundness import net_content_hash
+from pm4py.objects.petri_net.utils.petri_utils import add_arc_from_to
+
+
+def sublog_hash(
+    log, activity_key="concept:name", case_id_key="case:concept:name"
+):
+    """
+    Content hash of a (sub-)log: the multiset of its trace variants, which is
+    what the discovery algorithms depend on (order of the traces excluded).
+
+    Args:
+        log: EventLog, list of traces, or pandas DataFrame with one row per
+            event.
+    """
+    if isinstance(log, pd.DataFrame):
+        variants = Counter(
+            log.groupby(case_id_key, sort=False)[activity_key].agg(tuple)
+        )
+    else:
+        variants = Counter(
+            tuple(e[activity_key] for e in trace) for trace in log
+        )
+    content = sorted([list(v), n] for v, n in variants.items())
+    return hashlib.sha1(json.dumps(content).encode("utf-8")).hexdigest()
+
+
+def config_key(method_name, params, log_hash):
+    """Key of a discovery configuration on a sub-log with the given hash."""
+    base = {"method": method_name, "params": params, "sublog": log_hash}
+    return hashlib.sha1(
+        json.dumps(base, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def canonical_net_hash(net, im, fm):
+    """
+    Hash of an accepting Petri net that does not depend on the names of its
+    places and transitions (which some discovery algorithms draw at random),
+    only on its structure, labels and markings.
+
+    Computed by pm4py's check_soundness.net_content_hash: nodes are ordered by
+    color refinement, remaining ties are broken by individualising a node of
+    the first tied class. Isomorphic nets whose tied nodes are not automorphic
+    may get different hashes (a missed deduplication), different nets never
+    get the same one.
+    """
+    return net_content_hash(net, im, fm)
+
+
+def encode_net(net, im, fm):
+    """Compact, self-contained encoding of an accepting Petri net."""
+    places = sorted(net.places, key=lambda p: p.name)
+    transitions = sorted(net.transitions, key=lambda t: t.name)
+    p_index = {p: i for i, p in enumerate(places)}
+    t_index = {t: i for i, t in enumerate(transitions)}
+    content = {
+        "name": net.name,
+        "places": [p.name for p in places],
+        "transitions": [[t.name, t.label] for t in transitions],
+        # arcs place -> transition and transition -> place, by index
+        "pt": sorted(
+            [p_index[a.source], t_index[a.target], a.weight]
+            for a in net.arcs
+            if a.source in p_index
+        ),
+        "tp": sorted(
+            [t_index[a.source], p_index[a.target], a.weight]
+            for a in net.arcs
+            if a.source in t_index
+        ),
+        "im": sorted([p_index[p], n] for p, n in im.items()),
+        "fm": sorted([p_index[p], n] for p, n in fm.items()),
+    }
+    return zlib.compress(json.dumps(content).encode("utf-8"))
+
+
+def decode_net(blob):
+    """Inverse of encode_net: (net, im, fm)."""
+    content = json.loads(zlib.decompress(blob).decode("utf-8"))
+    net = PetriNet(content["name"])
+    places = [PetriNet.Place(name) for name in content["places"]]
+    transitions = [
+        PetriNet.Transition(name, label)
+        for name, label in content["transitions"]
+    ]
+    net.places.update(places)
+    net.transitions.update(transitions)
+    for p, t, w in content["pt"]:
+        add_arc_from_to(places[p], transitions[t], net, weight=w)
+    for t, p, w in content["tp"]:
+        add_arc_from_to(transitions[t], places[p], net, weight=w)
+    im, fm = Marking(), Marking()
+    for p, n in content["im"]:
+        im[places[p]] = n
+    for p, n in content["fm"]:
+        fm[places[p]] = n
+    return net, im, fm
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS nets (
+    net_hash TEXT PRIMARY KEY,
+    encoding BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS discoveries (
+    config_key TEXT PRIMARY KEY,
+    method TEXT NOT NULL,
+    params TEXT NOT NULL,
+    sublog_hash TEXT NOT NULL,
+    net_hash TEXT REFERENCES nets(net_hash)
+);
+"""
+
+
+class ModelCache:
+    """
+    SQLite archive of discovered models (see the module description). The
+    connection is opened lazily, so that the cache can be pickled (e.g. to
+    DataLoader workers).
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._conn = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        return state
+
+    def __contains__(self, key):
+        return (
+            self.conn.execute(
+                "SELECT 1 FROM discoveries WHERE config_key = ?", (key,)
+            ).fetchone()
+            is not None
+        )
+
+    def put(self, key, method_name, params, log_hash, net_hash, encoding):
+        """Stores a discovery (the net only if not already stored)."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO nets VALUES (?, ?)",
+                (net_hash, encoding),
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO discoveries VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    method_name,
+                    json.dumps(params, sort_keys=True, default=str),
+                    log_hash,
+                    net_hash,
+                ),
+            )
+
+    def get(self, key):
+        """(net_hash, net, im, fm) of a discovery, None if not cached."""
+        row = self.conn.execute(
+            "SELECT n.net_hash, n.encoding FROM discoveries d "
+            "JOIN nets n ON d.net_hash = n.net_hash WHERE d.config_key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        return (row[0], *decode_net(row[1]))
+
+    def stats(self):
+        """Number of cached discoveries and of distinct nets."""
+        (discoveries,) = self.conn.execute(
+            "SELECT COUNT(*) FROM discoveries"
+        ).fetchone()
+        (nets,) = self.conn.execute("SELECT COUNT(*) FROM nets").fetchone()
+        return {"discoveries": discoveries, "nets": nets}
@@ -2,6 +2,14 @@ import torch
 from torch.utils.data import Dataset
 from dataloaders.base import BaseEventLogDataset
 from dataloaders.util import _normalize_log_input
+from dataloaders.model_cache import (
+    ModelCache,
+    canonical_net_hash,
+    config_key,
+    decode_net,
+    encode_net,
+    sublog_hash,
+)
 from pm4py.discovery import (
     discover_petri_net_alpha,
     discover_petri_net_alpha_plus,
@@ -9,12 +17,14 @@ from pm4py.discovery import (
     discover_petri_net_ilp,
     discover_petri_net_inductive,
 )
-from itertools import product
+from dataloaders.grid import (
+    grid_size,
+    iter_grid,
+    method_param_grid,
+    split_budget,
+)
 from pathlib import Path
 from concurrent.futures import ProcessPoolExecutor, as_completed
-import pickle
-import hashlib
-import json
 import inspect
 import random
 import os
@@ -40,6 +50,8 @@ class ProcessModelDataset(Dataset):
         param_grid: dict[str, list],
         sampler_fn=None,
         max_models=None,
+        sampling="lhs",
+        seed=None,
         cached=False,
         cache_dir=None,
         num_workers=None,
@@ -54,6 +66,10 @@ class ProcessModelDataset(Dataset):
                 e.g. {"noise_threshold": [0.0, 0.2, 0.5]}
             sampler_fn (Callable): Optional function controlling how to sample subsets of traces.
             max_models (int): Optional limit on total number of discovered models.
+            sampling (str): How the configurations are chosen when there are
+                more than max_models: "grid" (first ones), "random" or "lhs"
+                (Latin hypercube, spread over the values of every parameter).
+            seed (int): Seed of the sampling of the configurations.
         """
         self.log = getattr(log_dataset, "log", log_dataset)
 
@@ -65,6 +81,8 @@ class ProcessModelDataset(Dataset):
         self.param_grid = param_grid
         self.sampler_fn = sampler_fn or self._default_sampler
         self.max_models = max_models
+        self.sampling = sampling
+        self._rng = random.Random(seed)
 
         self.configurations = self._generate_configurations()
         self.cached = cached
@@ -75,65 +93,59 @@ class ProcessModelDataset(Dataset):
             / Path(".cache_process_models")
         )
         self.num_workers = num_workers or os.cpu_count()
-
-        self.configurations = self._generate_configurations()
+        self._sublog_hashes = {}
+        self.cache = ModelCache(self.cache_dir / "models.sqlite")
 
         if self.cached:
             self.cache_dir.mkdir(parents=True, exist_ok=True)
             self._populate_cache_parallel()
 
-    # --- helper: deterministic key per configuration ---
+    # --- helper: content-addressed key per configuration ---
     def _config_hash(self, method_name, params, subset):
-        # The subset might be large; only hash indices if available
-        base = {
-            "method": method_name,
-            "params": params,
-            "indices": getattr(subset, "indices", None),
-        }
-        return hashlib.sha1(
-            json.dumps(base, sort_keys=True).encode()
-        ).hexdigest()
-
-    def _cache_path(self, key):
-        return self.cache_dir / f"{key}.pkl"
+        # the sub-log is identified by its content, so that different random
+        # subsets do not collide and identical ones share the discovery
+        log_hash = self._sublog_hashes.get(id(subset))
+        if log_hash is None:
+            log_hash = sublog_hash(subset)
+            self._sublog_hashes[id(subset)] = log_hash
+        return config_key(method_name, params, log_hash), log_hash
 
     # --- caching logic ---
     def _populate_cache_parallel(self):
         logging.info("Populating process model cache...")
 
-        tasks = []
-        with ProcessPoolExecutor(max_workers=self.num_workers) as pool:
-            futures = {}
-            # Add tqdm for submission step (optional, fast anyway)
-            for cfg in self.configurations:
-                method_name, fn, params, subset = cfg
-                key = self._config_hash(method_name, params, subset)
-                path = self._cache_path(key)
-                if not path.exists():
-                    futures[pool.submit(self._discover_and_save, cfg, key)] = (
-                        key
-                    )
+        # identical (method, params, sub-log) configurations are discovered
+        # once
+        pending = {}
+        for method_name, fn, params, subset in self.configurations:
+            key, log_hash = self._config_hash(method_name, params, subset)
+            if key not in pending and key not in self.cache:
+                pending[key] = (method_name, fn, params, subset, log_hash)
 
-            # Add tqdm for actual completion
+        # workers only discover; this process is the only writer of the cache
+        with ProcessPoolExecutor(max_workers=self.num_workers) as pool:
+            futures = {
+                pool.submit(_discover_encoded, fn, subset, params): key
+                for key, (_, fn, params, subset, _) in pending.items()
+            }
             for f in tqdm(
                 as_completed(futures),
                 total=len(futures),
                 desc="Caching discovered models",
             ):
                 key = futures[f]
+                method_name, _, params, _, log_hash = pending[key]
                 try:
-                    f.result()
+                    self.cache.put(
+                        key, method_name, params, log_hash, *f.result()
+                    )
                     logging.debug(f"Cached model {key}")
                 except Exception as e:
                     logging.error(f"Failed to cache {key}: {e}")
 
-        logging.info(
-            f"Cache population done ({len(os.listdir(self.cache_dir))} models)."
-        )
+        logging.info(f"Cache population done ({self.cache.stats()}).")
 
     def _generate_configurations(self):
-        configs = []
-
         # Resolve Enum -> dict
         if hasattr(self.param_grid, "value"):
             param_grid = self.param_grid.value
@@ -145,11 +157,10 @@ class ProcessModelDataset(Dataset):
                 f"param_grid must be dict or Enum[dict], got {type(param_grid)}"
             )
 
+        # grids restricted to the parameters of each method, so that keys
+        # ignored by a method do not multiply its configurations
+        grids = {}
         for method_name, fn in self.discovery_methods.items():
-            logging.debug(
-                f"Generating configurations for method: {method_name}"
-            )
-
             # Case 1: Per-method grid defined explicitly
             if method_name in param_grid and isinstance(
                 param_grid[method_name], dict
@@ -158,29 +169,26 @@ class ProcessModelDataset(Dataset):
             # Case 2: Global grid (same for all)
             else:
                 method_grid = param_grid
+            grids[method_name] = method_param_grid(fn, method_grid)
+            logging.debug(
+                f"Grid of method {method_name}: "
+                f"{grid_size(grids[method_name])} configurations"
+            )
 
-            if not method_grid:
-                method_param_combos = [{}]
-            else:
-                keys, values = zip(*method_grid.items())
-                method_param_combos = [
-                    dict(zip(keys, combo)) for combo in product(*values)
-                ]
-
-            # Filter parameters by discovery function signature
-            sig_params = set(inspect.signature(fn).parameters.keys())
-
-            for params in method_param_combos:
-                # Drop unknown keys for this method
-                filtered_params = {
-                    k: v for k, v in params.items() if k in sig_params
-                }
-
+        budgets = split_budget(
+            {name: grid_size(grid) for name, grid in grids.items()},
+            self.max_models,
+        )
+        configs = []
+        for method_name, fn in self.discovery_methods.items():
+            for params in iter_grid(
+                grids[method_name],
+                n=budgets[method_name],
+                strategy=self.sampling,
+                rng=self._rng,
+            ):
                 subset = self.sampler_fn(self.log)
-                configs.append((method_name, fn, filtered_params, subset))
-
-        if self.max_models:
-            configs = configs[: self.max_models]
+                configs.append((method_name, fn, params, subset))
 
         logging.info(
             f"Total discovery configurations generated: {len(configs)}"
@@ -195,51 +203,50 @@ class ProcessModelDataset(Dataset):
         """
         Call a pm4py discovery function with only the supported keyword arguments.
         """
-        sig = inspect.signature(fn)
-        valid_keys = sig.parameters.keys()
-        filtered = {k: v for k, v in params.items() if k in valid_keys}
-        return fn(log, **filtered)
-
-    def _discover_and_save(self, cfg, key):
-        method_name, fn, params, subset = cfg
-        subset = _normalize_log_input(subset)
-        net, im, fm = self._safe_discover(fn, subset, params)
-        data = {
-            "pm": net,
-            "im": im,
-            "fm": fm,
-            "variant": method_name,
-            "parameters": params,
-        }
-        with open(self._cache_path(key), "wb") as f:
-            pickle.dump(data, f)
+        return _safe_discover(fn, log, params)
 
     def __len__(self):
         return len(self.configurations)
 
     def __getitem__(self, idx):
         method_name, fn, params, subset = self.configurations[idx]
-        key = self._config_hash(method_name, params, subset)
-        path = self._cache_path(key)
-
-        if self.cached and path.exists():
-            with open(path, "rb") as f:
-                return pickle.load(f)
+        key, log_hash = self._config_hash(method_name, params, subset)
 
-        subset = _normalize_log_input(subset)
-        net, im, fm = self._safe_discover(fn, subset, params)
-        data = {
+        cached = self.cache.get(key) if self.cached else None
+        if cached is not None:
+            net_hash, net, im, fm = cached
+        else:
+            net_hash, encoding = _discover_encoded(fn, subset, params)
+            if self.cached:
+                self.cache.put(
+                    key, method_name, params, log_hash, net_hash, encoding
+                )
+            net, im, fm = decode_net(encoding)
+        return {
             "pm": net,
             "im": im,
             "fm": fm,
             "variant": method_name,
             "parameters": params,
             "trace_indices": getattr(subset, "indices", None),
+            "net_hash": net_hash,
         }
-        if self.cached:
-            with open(path, "wb") as f:
-                pickle.dump(data, f)
-        return data
+
+
+def _safe_discover(fn, log, params):
+    sig = inspect.signature(fn)
+    valid_keys = sig.parameters.keys()
+    filtered = {k: v for k, v in params.items() if k in valid_keys}
+    return fn(log, **filtered)
+
+
+def _discover_encoded(fn, subset, params):
+    """
+    Discovery task of the worker processes: returns (net_hash, encoding), so
+    that only compact bytes travel back to the process writing the cache.
+    """
+    net, im, fm = _safe_discover(fn, _normalize_log_input(subset), params)
+    return canonical_net_hash(net, im, fm), encode_net(net, im, fm)
 
 
 class DISCOVERY_METHODS(Enum):
@@ -0,0 +1,369 @@
+"""
+On-disk, pre-tokenised store of an event log.
+
+The store keeps, for a source file, the activities of all the events as int32
+ids (0 is reserved for padding, as in the vocabularies of
+BaseEventLogDataset), their timestamps as float64 seconds since the epoch
+(NaN when missing) and the offsets of the traces, in flat binary files that
+are memory-mapped on first access:
+
+    <store>/offsets.bin     int64, n_traces + 1
+    <store>/activities.bin  int32, n_events
+    <store>/timestamps.bin  float64, n_events
+    <store>/cases.txt       one case identifier per line
+    <store>/vocab.json      {activity: id}
+    <store>/meta.json       source file (path, size, mtime) and keys
+
+The store is built once per source file, streaming the traces, so that logs
+that do not fit in RAM as pm4py objects can be tokenised.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+from lxml import etree
+from pm4py.util.dt_parsing import parser as dt_parser
+
+STORE_VERSION = 1
+# events buffered in memory before being appended to the store files
+FLUSH_EVENTS = 1_000_000
+
+
+class EventLogStore:
+    """
+    Memory-mapped, pre-tokenised event log (see the module description).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        with open(os.path.join(path, "vocab.json")) as f:
+            self.vocab = json.load(f)
+        self._arrays = None
+        self._cases = None
+
+    @staticmethod
+    def location(store_dir, source_path):
+        """Directory of the store of a source file inside store_dir."""
+        digest = hashlib.sha1(
+            os.path.abspath(source_path).encode("utf-8")
+        ).hexdigest()[:12]
+        return os.path.join(
+            store_dir, f"{os.path.basename(source_path)}-{digest}"
+        )
+
+    @staticmethod
+    def source_meta(source_path, **keys):
+        stat = os.stat(source_path)
+        return {
+            "version": STORE_VERSION,
+            "source_path": os.path.abspath(source_path),
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+            **keys,
+        }
+
+    @classmethod
+    def open_or_build(cls, store_dir, source_path, build_fn, **keys):
+        """
+        Opens the store of a source file, (re)building it when missing or
+        outdated.
+
+        Args:
+            store_dir (str): Directory containing the stores.
+            source_path (str): Source event log file.
+            build_fn (Callable): Function taking the path and the metadata of
+                the store and building it (e.g. with EventLogStore.build or
+                EventLogStore.build_from_columns).
+            **keys: Options of the source that determine the content of the
+                store (e.g. activity_key); part of the validity check.
+        """
+        path = cls.location(store_dir, source_path)
+        meta = cls.source_meta(source_path, **keys)
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                current = json.load(f)
+            if current == meta:
+                return cls(path)
+        return build_fn(path, meta)
+
+    @classmethod
+    def build(cls, path, traces, meta):
+        """
+        Builds a store from an iterable of (case_id, activities, timestamps)
+        tuples, streaming them to disk.
+        """
+        tmp = path + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        vocab = {}
+        n_events = 0
+        activities, timestamps, offsets = [], [], [0]
+        files = {
+            name: open(os.path.join(tmp, name), "wb")
+            for name in ["offsets.bin", "activities.bin", "timestamps.bin"]
+        }
+        cases = open(os.path.join(tmp, "cases.txt"), "w", encoding="utf-8")
+
+        def flush():
+            np.asarray(offsets, dtype=np.int64).tofile(files["offsets.bin"])
+            np.asarray(activities, dtype=np.int32).tofile(
+                files["activities.bin"]
+            )
+            np.asarray(timestamps, dtype=np.float64).tofile(
+                files["timestamps.bin"]
+            )
+            offsets.clear()
+            activities.clear()
+            timestamps.clear()
+
+        try:
+            for case_id, trace_activities, trace_timestamps in traces:
+                for a in trace_activities:
+                    a = str(a)
+                    activities.append(vocab.setdefault(a, len(vocab) + 1))
+                timestamps.extend(
+                    np.nan if t is None else t for t in trace_timestamps
+                )
+                n_events += len(trace_activities)
+                offsets.append(n_events)
+                # case identifiers are single lines
+                cases.write(str(case_id).replace("\n", " ") + "\n")
+                if len(activities) >= FLUSH_EVENTS:
+                    flush()
+            flush()
+        finally:
+            for f in files.values():
+                f.close()
+            cases.close()
+
+        # ids in the sorted order of the activities, as in the vocabularies
+        # built by BaseEventLogDataset from pm4py logs
+        order = sorted(vocab)
+        remap = np.zeros(len(vocab) + 1, dtype=np.int32)
+        remap[[vocab[a] for a in order]] = np.arange(1, len(order) + 1)
+        activities_path = os.path.join(tmp, "activities.bin")
+        if os.path.getsize(activities_path):
+            ids = np.memmap(activities_path, dtype=np.int32, mode="r+")
+            for start in range(0, len(ids), FLUSH_EVENTS):
+                end = start + FLUSH_EVENTS
+                chunk = ids[start:end]
+                chunk[:] = remap[chunk]
+            ids.flush()
+            del ids
+        vocab = {a: i + 1 for i, a in enumerate(order)}
+
+        return cls._finalize(tmp, path, vocab, meta)
+
+    @classmethod
+    def build_from_columns(cls, path, case_ids, activities, timestamps, meta):
+        """
+        Builds a store from the columns of a flat event table, without
+        per-event Python objects. As in pm4py's format_dataframe, events with
+        a missing case, activity or timestamp are dropped, and the traces are
+        sorted by case identifier, with their events sorted by timestamp
+        (ties in their original order).
+
+        Args:
+            path (str): Directory of the store.
+            case_ids, activities (array-like): Case identifiers and
+                activities, one per event.
+            timestamps (array-like): Timestamps as seconds since the epoch
+                (NaN when missing).
+            meta (dict): Metadata of the store.
+        """
+        case_ids = pd.Series(case_ids, copy=False)
+        activities = pd.Series(activities, copy=False)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        valid = (
+            case_ids.notna().to_numpy()
+            & activities.notna().to_numpy()
+            & ~np.isnan(timestamps)
+        )
+        case_codes, cases = pd.factorize(
+            case_ids[valid].astype(str), sort=True
+        )
+        activity_codes, vocab = pd.factorize(
+            activities[valid].astype(str), sort=True
+        )
+        timestamps = timestamps[valid]
+        order = np.lexsort(
+            (np.arange(len(timestamps)), timestamps, case_codes)
+        )
+
+        tmp = path + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        offsets = np.zeros(len(cases) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(case_codes, minlength=len(cases)), out=offsets[1:]
+        )
+        offsets.tofile(os.path.join(tmp, "offsets.bin"))
+        (activity_codes[order] + 1).astype(np.int32).tofile(
+            os.path.join(tmp, "activities.bin")
+        )
+        timestamps[order].tofile(os.path.join(tmp, "timestamps.bin"))
+        with open(os.path.join(tmp, "cases.txt"), "w", encoding="utf-8") as f:
+            for case_id in cases:
+                f.write(case_id.replace("\n", " ") + "\n")
+        vocab = {a: i + 1 for i, a in enumerate(vocab)}
+        return cls._finalize(tmp, path, vocab, meta)
+
+    @classmethod
+    def build_from_tokens(
+        cls, path, tokens, lengths, vocab, meta, timestamps=None
+    ):
+        """
+        Builds a store from a padded matrix of activity ids (e.g. the output
+        of a batched simulation), the case identifiers being the row indexes.
+
+        Args:
+            path (str): Directory of the store.
+            tokens (np.ndarray): Activity ids, [n_traces, max_length], where
+                id i >= 1 is the activity vocab[i - 1] (sorted) and the
+                entries after the length of each row are ignored.
+            lengths (np.ndarray): Length of every trace, [n_traces].
+            vocab (list[str]): Sorted activities.
+            meta (dict): Metadata of the store.
+            timestamps (np.ndarray): Timestamps as seconds since the epoch,
+                with the shape of tokens (NaN when None).
+        """
+        tokens = np.asarray(tokens)
+        lengths = np.asarray(lengths, dtype=np.int64)
+        mask = np.arange(tokens.shape[1]) < lengths[:, None]
+
+        tmp = path + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        offsets.tofile(os.path.join(tmp, "offsets.bin"))
+        tokens[mask].astype(np.int32).tofile(
+            os.path.join(tmp, "activities.bin")
+        )
+        if timestamps is None:
+            flat_timestamps = np.full(int(offsets[-1]), np.nan)
+        else:
+            flat_timestamps = np.asarray(timestamps, dtype=np.float64)[mask]
+        flat_timestamps.tofile(os.path.join(tmp, "timestamps.bin"))
+        with open(os.path.join(tmp, "cases.txt"), "w", encoding="utf-8") as f:
+            f.writelines(f"{i}\n" for i in range(len(lengths)))
+        vocab = {a: i + 1 for i, a in enumerate(vocab)}
+        return cls._finalize(tmp, path, vocab, meta)
+
+    @classmethod
+    def _finalize(cls, tmp, path, vocab, meta):
+        with open(os.path.join(tmp, "vocab.json"), "w") as f:
+            json.dump(vocab, f)
+        # the metadata is written last: a store with metadata is complete
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+        return cls(path)
+
+    def _open(self):
+        if self._arrays is None:
+            self._arrays = {}
+            for name, dtype in [
+                ("offsets", np.int64),
+                ("activities", np.int32),
+                ("timestamps", np.float64),
+            ]:
+                path = os.path.join(self.path, f"{name}.bin")
+                # empty files cannot be memory-mapped
+                self._arrays[name] = (
+                    np.memmap(path, dtype=dtype, mode="r")
+                    if os.path.getsize(path)
+                    else np.zeros(0, dtype=dtype)
+                )
+        return self._arrays
+
+    @property
+    def offsets(self):
+        return self._open()["offsets"]
+
+    @property
+    def activities(self):
+        return self._open()["activities"]
+
+    @property
+    def timestamps(self):
+        return self._open()["timestamps"]
+
+    @property
+    def cases(self):
+        """Case identifiers (loaded on first access)."""
+        if self._cases is None:
+            path = os.path.join(self.path, "cases.txt")
+            with open(path, encoding="utf-8") as f:
+                self._cases = f.read().splitlines()
+        return self._cases
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx):
+        """Activity ids and timestamps of a trace (views of the memmaps)."""
+        start, end = self.offsets[idx], self.offsets[idx + 1]
+        return self.activities[start:end], self.timestamps[start:end]
+
+    def __getstate__(self):
+        # memmaps would be pickled as full arrays (e.g. when sent to the
+        # workers of a DataLoader): they are re-opened lazily instead
+        state = self.__dict__.copy()
+        state["_arrays"] = None
+        state["_cases"] = None
+        return state
+
+
+def iter_xes_traces(
+    source_path, activity_key="concept:name", timestamp_key="time:timestamp"
+):
+    """
+    Streams the traces of a XES file (optionally gzipped) as
+    (case_id, activities, timestamps) tuples, without building pm4py objects.
+    """
+    date_parser = dt_parser.get()
+    opener = gzip.open if source_path.lower().endswith(".gz") else open
+    with opener(source_path, "rb") as f:
+        case_id, activities, timestamps = None, [], []
+        activity, timestamp = None, None
+        for _, elem in etree.iterparse(f, events=("end",)):
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if tag == "event":
+                activities.append(activity)
+                timestamps.append(timestamp)
+                activity, timestamp = None, None
+                elem.clear()
+            elif tag == "trace":
+                yield case_id, activities, timestamps
+                case_id, activities, timestamps = None, [], []
+                # drops the parsed traces from the tree
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+            else:
+                parent = elem.getparent()
+                parent_tag = (
+                    parent.tag.rsplit("}", 1)[-1]
+                    if parent is not None
+                    else None
+                )
+                key = elem.get("key")
+                if parent_tag == "event":
+                    if key == activity_key:
+                        activity = elem.get("value")
+                    elif key == timestamp_key and tag == "date":
+                        timestamp = date_parser.apply(
+                            elem.get("value")
+                        ).timestamp()
+                elif parent_tag == "trace" and key == "concept:name":
+                    case_id = elem.get("value")
@@ -1,13 +1,21 @@
 import torch
 from pm4py.objects.log.importer.xes import importer as xes_importer
 from dataloaders.base import BaseEventLogDataset, make_feature_fn
+from dataloaders.store import iter_xes_traces
 
 
 class XESEventLogDataset(BaseEventLogDataset):
     """Dataset for XES files."""
 
     def _load_log(self, source_path, **_):
-        return xes_importer.apply(source_path)
+        # split among the available cores (sequential on a single one)
+        return xes_importer.apply(
+            source_path, variant=xes_importer.Variants.ITERPARSE_PARALLEL
+        )
+
+    def _iter_traces(self, source_path, **_):
+        # streamed, without building the pm4py log
+        return iter_xes_traces(source_path)
 
 
 # Example usage
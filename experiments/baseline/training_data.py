@@ -0,0 +1,514 @@
+# %%
+"""
+Streaming, resumable and sharded generation of the training data of the
+heuristic recommender: one row per (model, trace variant, heuristic) with the
+runtime of the alignment of the trace with the state equation A* and the
+heuristic.
+
+Models (and their noisy logs) are generated one at a time and saved, together
+with the rows, in a partition of the output directory named after the
+canonical hash of the model (see dataloaders.model_cache.canonical_net_hash):
+
+    <output>/model_hash=<hash>/model.pnml
+    <output>/model_hash=<hash>/log-<model index>.xes
+    <output>/model_hash=<hash>/part-<model index>-<part>.parquet
+    <output>/_manifest-<shard>.jsonl
+
+The rows are appended in parts (Parquet if pyarrow is installed, CSV
+otherwise) while the traces are aligned by a pool of processes. When the
+pipeline is restarted, the models in the manifest are loaded from their
+partition, and only the (trace, heuristic) pairs without a row are aligned.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from dataloaders.model_cache import canonical_net_hash
+from pm4py.algo.conformance.alignments.petri_net.utils import heuristics
+from pm4py.algo.conformance.alignments.petri_net.variants import (
+    state_equation_a_star,
+)
+from pm4py.objects.log.exporter.xes import exporter as xes_exporter
+from pm4py.objects.log.importer.xes import importer as xes_importer
+from pm4py.objects.log.obj import Event, EventLog, Trace
+from pm4py.objects.petri_net.exporter import exporter as pnml_exporter
+from pm4py.objects.petri_net.importer import importer as pnml_importer
+from pm4py.objects.petri_net.obj import Marking, PetriNet
+
+PART_FORMAT = (
+    "parquet" if importlib.util.find_spec("pyarrow") is not None else "csv"
+)
+COLUMNS = [
+    "model_hash",
+    "model_index",
+    "trace_index",
+    "trace_count",
+    "trace_length",
+    "heuristic",
+    "status",
+    "runtime_sec",
+    "cost",
+    "visited_states",
+    "queued_states",
+    "traversed_arcs",
+    "lp_solved",
+    "error",
+]
+
+# admissible heuristics whose costs are the optimal ones, against which the
+# costs of the other heuristics are validated (see mark_cost_mismatches)
+REFERENCE_HEURISTICS = ["lp", "zero"]
+
+Model = Tuple[PetriNet, Marking, Marking, EventLog]
+
+
+def simulated_model(index: int, seed: int, no_traces: int) -> Model:
+    """
+    Default model source: the index-th model of generate_dataset (seeded).
+    """
+    import torch
+    from experiments.simulation.driver import generate_dataset
+
+    random.seed(f"{seed}-{index}")
+    torch.manual_seed(seed * 1000003 + index)
+    return next(
+        generate_dataset(n_models=1, parameters={"no_traces": no_traces})
+    )
+
+
+def trace_variants(log: EventLog) -> List[Tuple[int, List[str], int]]:
+    """
+    Distinct traces of the log as (index of the first occurrence, activities,
+    number of occurrences).
+    """
+    variants: Dict[Tuple[str, ...], List[int]] = {}
+    for i, trace in enumerate(log):
+        key = tuple(e["concept:name"] for e in trace)
+        if key in variants:
+            variants[key][1] += 1
+        else:
+            variants[key] = [i, 1]
+    return [(i, list(key), n) for key, (i, n) in variants.items()]
+
+
+# compiled model of the last model aligned by the worker process
+__worker_cache: Dict[str, Any] = {}
+
+
+def align_traces(
+    h: str,
+    model_index: int,
+    pn: PetriNet,
+    im: Marking,
+    fm: Marking,
+    traces: List[Tuple[int, List[str], int, List[str]]],
+    timeout: float,
+) -> List[Dict[str, Any]]:
+    """
+    Aligns every (trace index, activities, count, heuristics) entry with the
+    given heuristics, returning the rows.
+    """
+    if __worker_cache.get("hash") != h:
+        __worker_cache["hash"] = h
+        __worker_cache["compiled"] = state_equation_a_star.compile_model(
+            pn, im, fm
+        )
+    compiled = __worker_cache["compiled"]
+
+    rows = []
+    for trace_index, activities, count, names in traces:
+        trace = Trace([Event({"concept:name": a}) for a in activities])
+        for name in names:
+            row = {c: None for c in COLUMNS}
+            row.update(
+                model_hash=h,
+                model_index=model_index,
+                trace_index=trace_index,
+                trace_count=count,
+                trace_length=len(activities),
+                heuristic=name,
+            )
+            start = time.perf_counter()
+            try:
+                ali = state_equation_a_star.apply(
+                    trace,
+                    pn,
+                    im,
+                    fm,
+                    parameters={
+                        "heuristic": name,
+                        "compiled_model": compiled,
+                        "max_align_time_trace": timeout,
+                    },
+                )
+                row["runtime_sec"] = time.perf_counter() - start
+                if ali is None:
+                    row["status"] = "timeout"
+                else:
+                    row["status"] = "ok"
+                    for key in [
+                        "cost",
+                        "visited_states",
+                        "queued_states",
+                        "traversed_arcs",
+                        "lp_solved",
+                    ]:
+                        row[key] = ali[key]
+            except Exception as e:
+                row["runtime_sec"] = time.perf_counter() - start
+                row["status"] = "error"
+                row["error"] = repr(e)
+            rows.append(row)
+    return rows
+
+
+class TrainingDataWriter(object):
+    """
+    Output directory of the pipeline: partitions, parts and manifest.
+    """
+
+    def __init__(self, output: str, shard: int = 0):
+        self.output = output
+        self.manifest = os.path.join(output, f"_manifest-{shard}.jsonl")
+        os.makedirs(output, exist_ok=True)
+
+    def partition(self, h: str) -> str:
+        return os.path.join(self.output, f"model_hash={h}")
+
+    def read_manifest(self) -> Dict[int, Dict[str, Any]]:
+        entries = {}
+        if os.path.exists(self.manifest):
+            with open(self.manifest) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        entries[entry["model_index"]] = entry
+        return entries
+
+    def write_manifest(self, model_index: int, h: str, complete: bool):
+        with open(self.manifest, "a") as f:
+            f.write(
+                json.dumps(
+                    {
+                        "model_index": model_index,
+                        "model_hash": h,
+                        "complete": complete,
+                    }
+                )
+                + "\n"
+            )
+
+    def save_model(self, i: int, h: str, model: Model):
+        pn, im, fm, log = model
+        path = self.partition(h)
+        os.makedirs(path, exist_ok=True)
+        # several model indexes can share a (small) model, with own logs
+        log_path = os.path.join(path, f"log-{i:06d}.xes")
+        xes_exporter.apply(log, log_path + ".tmp")
+        os.replace(log_path + ".tmp", log_path)
+        model_path = os.path.join(path, "model.pnml")
+        if not os.path.exists(model_path):
+            pnml_exporter.apply(pn, im, model_path + ".tmp", fm)
+            os.replace(model_path + ".tmp", model_path)
+
+    def load_model(self, i: int, h: str) -> Optional[Model]:
+        path = self.partition(h)
+        log_path = os.path.join(path, f"log-{i:06d}.xes")
+        model_path = os.path.join(path, "model.pnml")
+        if not (os.path.exists(log_path) and os.path.exists(model_path)):
+            return None
+        pn, im, fm = pnml_importer.apply(model_path)
+        log = xes_importer.apply(
+            log_path, parameters={"show_progress_bar": False}
+        )
+        return pn, im, fm, log
+
+    def parts(self, h: str, i: Optional[int] = None) -> List[str]:
+        path = self.partition(h)
+        if not os.path.isdir(path):
+            return []
+        prefix = "part-" if i is None else f"part-{i:06d}-"
+        return sorted(
+            os.path.join(path, f)
+            for f in os.listdir(path)
+            if f.startswith(prefix) and f.endswith("." + PART_FORMAT)
+        )
+
+    def read_rows(self, h: str, i: Optional[int] = None) -> pd.DataFrame:
+        frames = [
+            (
+                pd.read_parquet(p)
+                if PART_FORMAT == "parquet"
+                else pd.read_csv(p)
+            )
+            for p in self.parts(h, i)
+        ]
+        if not frames:
+            return pd.DataFrame(columns=COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def append_rows(self, i: int, h: str, rows: List[Dict[str, Any]]):
+        if not rows:
+            return
+        path = self.partition(h)
+        os.makedirs(path, exist_ok=True)
+        part = os.path.join(
+            path, f"part-{i:06d}-{len(self.parts(h, i)):05d}.{PART_FORMAT}"
+        )
+        df = pd.DataFrame(rows, columns=COLUMNS)
+        if PART_FORMAT == "parquet":
+            df.to_parquet(part + ".tmp", index=False)
+        else:
+            df.to_csv(part + ".tmp", index=False)
+        # a part is either complete or absent
+        os.replace(part + ".tmp", part)
+
+
+def mark_cost_mismatches(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds the column cost_mismatch: whether the cost of the alignment of a row
+    differs from the optimal one, i.e. the cost of the same trace of the same
+    model with the first of REFERENCE_HEURISTICS (admissible) that aligned
+    it. A heuristic overestimating the remaining cost can return a
+    non-optimal alignment, whose runtime is not comparable with the others.
+    The column is missing (NA) for the rows without an alignment and for the
+    traces without a reference cost.
+    """
+    keys = ["model_index", "trace_index"]
+    ok = df[df["status"] == "ok"]
+    reference = None
+    for name in REFERENCE_HEURISTICS:
+        costs = ok[ok["heuristic"] == name].groupby(keys)["cost"].first()
+        reference = (
+            costs if reference is None else reference.combine_first(costs)
+        )
+    optimal = (
+        reference.reindex(pd.MultiIndex.from_frame(df[keys])).to_numpy(
+            dtype=float
+        )
+        if len(df)
+        else []
+    )
+    cost = pd.to_numeric(df["cost"], errors="coerce").to_numpy(dtype=float)
+    mismatch = pd.array(abs(cost - optimal) > 1e-6, dtype="boolean")
+    mismatch[(df["status"] != "ok").to_numpy() | pd.isna(optimal)] = pd.NA
+    df["cost_mismatch"] = mismatch
+    return df
+
+
+def read_dataset(output: str) -> pd.DataFrame:
+    """
+    Reads all the rows produced by the pipeline (of all the shards), with the
+    column cost_mismatch (see mark_cost_mismatches).
+    """
+    writer = TrainingDataWriter(output)
+    hashes = [
+        d.split("=", 1)[1]
+        for d in sorted(os.listdir(output))
+        if d.startswith("model_hash=")
+    ]
+    frames = [writer.read_rows(h) for h in hashes]
+    if not frames:
+        return mark_cost_mismatches(pd.DataFrame(columns=COLUMNS))
+    return mark_cost_mismatches(pd.concat(frames, ignore_index=True))
+
+
+def generate_training_data(
+    output: str,
+    n_models: int,
+    model_fn: Optional[Callable[[int], Model]] = None,
+    heuristic_names: Optional[List[str]] = None,
+    timeout: float = 10.0,
+    workers: Optional[int] = None,
+    traces_per_task: int = 16,
+    rows_per_part: int = 10000,
+    shard: int = 0,
+    num_shards: int = 1,
+    seed: int = 0,
+    no_traces: int = 1000,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Generates (or resumes the generation of) the training data, yielding a
+    progress record after every completed model.
+
+    Parameters
+    --------------
+    output
+        Output directory
+    n_models
+        Number of models (over all the shards)
+    model_fn
+        Function returning the (net, im, fm, log) of a model index (default:
+        seeded generate_dataset)
+    heuristic_names
+        Heuristics to time (default: all the registered heuristics); the
+        costs are validated against the ones of REFERENCE_HEURISTICS, one of
+        which should be included (see mark_cost_mismatches)
+    timeout
+        Maximum time for the alignment of a trace with a heuristic
+    workers
+        Number of worker processes (0: align in this process)
+    traces_per_task
+        Number of traces sent to a worker at once
+    rows_per_part
+        Number of rows of a model buffered before being written as a part
+    shard, num_shards
+        The pipeline only handles the model indexes i with
+        i % num_shards == shard (one manifest per shard)
+    seed, no_traces
+        Parameters of the default model source
+    """
+    if model_fn is None:
+
+        def model_fn(i):
+            return simulated_model(i, seed, no_traces)
+
+    if heuristic_names is None:
+        heuristic_names = list(heuristics.HEURISTICS)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    writer = TrainingDataWriter(output, shard=shard)
+    manifest = writer.read_manifest()
+
+    def tasks():
+        for i in range(shard, n_models, num_shards):
+            entry = manifest.get(i)
+            if entry is not None and entry["complete"]:
+                continue
+            model = None
+            if entry is not None:
+                model = writer.load_model(i, entry["model_hash"])
+            if model is None:
+                model = model_fn(i)
+                h = canonical_net_hash(*model[:3])
+                writer.save_model(i, h, model)
+                writer.write_manifest(i, h, False)
+            else:
+                h = entry["model_hash"]
+            pn, im, fm, log = model
+            rows = writer.read_rows(h, i)
+            done = set(zip(rows["trace_index"].astype(int), rows["heuristic"]))
+            todo = []
+            for trace_index, activities, count in trace_variants(log):
+                # the order of the heuristics rotates with the traces, so
+                # that no heuristic is systematically timed first
+                k = trace_index % len(heuristic_names)
+                names = [
+                    name
+                    for name in heuristic_names[k:] + heuristic_names[:k]
+                    if (trace_index, name) not in done
+                ]
+                if names:
+                    todo.append((trace_index, activities, count, names))
+            chunks = []
+            for start in range(0, len(todo), traces_per_task):
+                end = start + traces_per_task
+                chunks.append(todo[start:end])
+            yield i, h, len(chunks), [
+                (h, i, pn, im, fm, chunk, timeout) for chunk in chunks
+            ]
+
+    # rows, number of unfinished tasks and start time of the models in
+    # progress (by model index)
+    buffers: Dict[int, List[Dict[str, Any]]] = {}
+    remaining: Dict[int, int] = {}
+    started: Dict[int, float] = {}
+
+    def collect(i, h, rows):
+        buffers[i].extend(rows)
+        remaining[i] -= 1
+        if len(buffers[i]) >= rows_per_part or remaining[i] == 0:
+            writer.append_rows(i, h, buffers[i])
+            buffers[i] = []
+        if remaining[i] == 0:
+            writer.write_manifest(i, h, True)
+            del buffers[i], remaining[i]
+            return {
+                "model_index": i,
+                "model_hash": h,
+                "time": time.time() - started.pop(i),
+            }
+        return None
+
+    def register(i, h, n):
+        buffers[i], remaining[i], started[i] = [], n, time.time()
+        if n == 0:
+            remaining[i] = 1
+            return collect(i, h, [])
+        return None
+
+    if workers == 0:
+        for i, h, n, model_tasks in tasks():
+            record = register(i, h, n)
+            if record is not None:
+                yield record
+            for args in model_tasks:
+                record = collect(i, h, align_traces(*args))
+                if record is not None:
+                    yield record
+        return
+
+    # a bounded number of tasks is in flight, so that models and traces are
+    # streamed through the pool instead of being held in memory
+    max_pending = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        for i, h, n, model_tasks in tasks():
+            record = register(i, h, n)
+            if record is not None:
+                yield record
+            for args in model_tasks:
+                while len(pending) >= max_pending:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        record = collect(*pending.pop(future), future.result())
+                        if record is not None:
+                            yield record
+                pending[executor.submit(align_traces, *args)] = (i, h)
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                record = collect(*pending.pop(future), future.result())
+                if record is not None:
+                    yield record
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("output", help="Output directory")
+    parser.add_argument("--n-models", type=int, default=100)
+    parser.add_argument("--no-traces", type=int, default=1000)
+    parser.add_argument(
+        "--heuristics",
+        nargs="+",
+        default=None,
+        help="Heuristics to time (default: all the registered ones)",
+    )
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard", type=int, default=0)
+    parser.add_argument("--num-shards", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for record in generate_training_data(
+        args.output,
+        args.n_models,
+        heuristic_names=args.heuristics,
+        timeout=args.timeout,
+        workers=args.workers,
+        shard=args.shard,
+        num_shards=args.num_shards,
+        seed=args.seed,
+        no_traces=args.no_traces,
+    ):
+        print(json.dumps(record))
+# %%
@@ -4,15 +4,33 @@ from experiments.simulation.models import sample_net
 from pm4py.vis import view_petri_net
 from pm4py.objects.log.obj import EventLog
 from pm4py.objects.petri_net.obj import Marking, PetriNet
-from pm4py.algo.simulation.playout.petri_net import algorithm as pn_sim
-from experiments.simulation.noise import inject_noise
+from experiments.simulation.noise import inject_noise_tokens
+from experiments.simulation.simulate import playout, to_event_log
 from typing import Any, Dict, Generator, Optional
 
 
 def generate_dataset(
     n_models: int = 3,
     parameters: Optional[Dict[Any, Any]] = None,
+    seed: Optional[int] = None,
 ) -> Generator[Any, tuple[PetriNet, Marking, Marking, EventLog], None]:
+    """
+    Yields random block-structured nets with a noisy log played out on each.
+
+    Args:
+        n_models: Number of models.
+        parameters: Options of the playout: "no_traces" (number of traces,
+            default 1000), "max_trace_length" (maximum number of events per
+            trace, default 100, as the basic playout of pm4py), "max_steps"
+            (maximum number of firings, visible or silent, per trace, default
+            1000) and "batch_size" (default 1024).
+        seed: Seed of the playouts (the nets are drawn from torch's default
+            generator).
+    """
+    parameters = parameters or {}
+    generator = (
+        torch.Generator().manual_seed(seed) if seed is not None else None
+    )
     for _ in range(n_models):
         dist_params = {
             "op": lambda: torch.distributions.Categorical(
@@ -25,17 +43,25 @@ def generate_dataset(
         }
         stnet = sample_net(dist_params)
         pn, im, fm = stnet.net, stnet.im, stnet.fm
-        log = pn_sim.apply(
-            pn,
-            im,
-            fm,
-            parameters=parameters,
-            variant=pn_sim.Variants.BASIC_PLAYOUT,
+        # the playouts that do not reach the final marking are kept as well
+        tokens, lengths, vocab, _ = playout(
+            stnet.to_tensor(),
+            parameters.get("no_traces", 1000),
+            steps=parameters.get("max_steps", 1000),
+            max_trace_length=parameters.get("max_trace_length", 100),
+            batch_size=parameters.get("batch_size", 1024),
+            generator=generator,
         )
-        labels = [t.label for t in pn.transitions if t.label]
-        noisy_log = inject_noise(
-            log, p_insert=0.1, p_delete=0.05, p_swap=0.05, labels=labels
+        tokens, lengths = inject_noise_tokens(
+            tokens,
+            lengths,
+            len(vocab),
+            p_insert=0.1,
+            p_delete=0.05,
+            p_swap=0.05,
+            generator=generator,
         )
+        noisy_log = to_event_log(tokens, lengths, vocab)
         yield (pn, im, fm, noisy_log)
 
 
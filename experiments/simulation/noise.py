@@ -1,5 +1,7 @@
 import random
+import torch
 from copy import deepcopy
+from typing import Optional
 from pm4py.objects.log.obj import EventLog, Trace
 
 
@@ -48,8 +50,193 @@ def inject_noise(
     return noisy_log
 
 
-"""
-TODO:
-- Structured noise (burst loops, reorder concurrent segments)
-- Label confusion models (replace labels with near-synonyms)
-"""
+def _permute(tokens, lengths, p_swap, p_reorder, reorder_len, u, generator):
+    """
+    Swaps and window shuffles as one permutation of every row: each event
+    gets a sort key, its position, moved past the next one for a swap, or
+    drawn at random inside a shuffled window.
+
+    The swapped pairs are disjoint: in a run of consecutive events drawn for
+    a swap, only every other one (from the first) swaps, the next event being
+    taken by its swap (with p_swap = 1, [1, 2, 3, 4] becomes [2, 1, 4, 3]).
+
+    Returns:
+        The order of the events of every row (indexes of the original
+        positions, padding last), [B, L].
+    """
+    batch_size, width = tokens.shape
+    device = tokens.device
+    positions = torch.arange(width, device=device).expand(batch_size, -1)
+    valid = positions < lengths.unsqueeze(1)
+    keys = positions.float()
+
+    drawn = (u < p_swap) & (positions < lengths.unsqueeze(1) - 1)
+    # start of the run of drawn events of every drawn event
+    run_start = drawn & ~torch.nn.functional.pad(drawn[:, :-1], (1, 0))
+    last_start = torch.where(
+        run_start, positions, torch.full_like(positions, -1)
+    ).cummax(dim=1)[0]
+    swap = drawn & ((positions - last_start) % 2 == 0)
+    keys = torch.where(swap, keys + 1.5, keys)
+
+    if p_reorder > 0:
+        starts = valid & (
+            torch.rand((batch_size, width), generator=generator, device=device)
+            < p_reorder
+        )
+        # start of the last window beginning at or before every position
+        last_start = torch.where(
+            starts, positions, torch.full_like(positions, -1)
+        ).cummax(dim=1)[0]
+        in_window = (last_start >= 0) & (positions - last_start < reorder_len)
+        jitter = torch.rand(
+            (batch_size, width), generator=generator, device=device
+        )
+        keys = torch.where(in_window, last_start + jitter * reorder_len, keys)
+
+    # padding stays at the end
+    keys = torch.where(valid, keys, torch.full_like(keys, float("inf")))
+    return keys.argsort(dim=1, stable=True)
+
+
+def inject_noise_tokens(
+    tokens: torch.Tensor,
+    lengths: torch.Tensor,
+    vocab_size: int,
+    p_insert: float = 0.05,
+    p_delete: float = 0.05,
+    p_swap: float = 0.02,
+    p_burst: float = 0.0,
+    max_burst_len: int = 3,
+    max_burst_repeats: int = 2,
+    p_reorder: float = 0.0,
+    reorder_len: int = 3,
+    p_confuse: float = 0.0,
+    confusion: Optional[torch.Tensor] = None,
+    generator: Optional[torch.Generator] = None,
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """
+    Batched counterpart of inject_noise on tokenised traces (e.g. the output
+    of simulate.playout), with vectorised masks instead of per-event edits.
+
+    Every event is, as in inject_noise, deleted (p_delete), preceded by a
+    random activity (p_insert) or swapped with the next one (p_swap), these
+    three being exclusive. Independently of them:
+      - burst loops: the segment of 1..max_burst_len events ending at the
+        event is repeated 1..max_burst_repeats more times (p_burst),
+      - concurrent reordering: the window of reorder_len events starting at
+        the event is shuffled (p_reorder),
+      - label confusion: the activity is replaced by one drawn from its row
+        of the confusion matrix (uniform if None) (p_confuse).
+
+    Unlike in inject_noise, consecutive swaps do not move an event further
+    than the next position: the swapped pairs are disjoint (see _permute).
+
+    Args:
+        tokens: Activity ids in 1..vocab_size, [B, L], padded with 0.
+        lengths: Length of every trace, [B].
+        vocab_size: Number of activities.
+        confusion: Row-stochastic matrix, [vocab_size + 1, vocab_size + 1],
+            whose row i is the distribution of the replacements of i.
+        generator: Source of randomness (torch's default one if None).
+
+    Returns:
+        The noisy tokens, padded with 0, and their lengths.
+    """
+    device = tokens.device
+    batch_size, width = tokens.shape
+    if tokens.numel() == 0:
+        return tokens, lengths
+
+    u = torch.rand((batch_size, width), generator=generator, device=device)
+    positions = torch.arange(width, device=device).expand(batch_size, -1)
+    valid = positions < lengths.unsqueeze(1)
+    delete = valid & (u < p_delete)
+    insert = valid & (u >= p_delete) & (u < p_delete + p_insert)
+    swap_u = torch.where(
+        valid & (u >= p_delete + p_insert), u - p_delete - p_insert, 1.0
+    )
+    order = _permute(
+        tokens, lengths, p_swap, p_reorder, reorder_len, swap_u, generator
+    )
+    # the masks are drawn per event: they move with the events
+    tokens = tokens.gather(1, order)
+    delete = delete.gather(1, order)
+    insert = insert.gather(1, order)
+
+    if p_confuse > 0:
+        confuse = valid & (
+            torch.rand((batch_size, width), generator=generator, device=device)
+            < p_confuse
+        )
+        if confusion is None:
+            replacements = torch.randint(
+                1,
+                vocab_size + 1,
+                (int(confuse.sum()),),
+                generator=generator,
+                device=device,
+            )
+        else:
+            replacements = torch.multinomial(
+                confusion[tokens[confuse]], 1, generator=generator
+            ).squeeze(1)
+        tokens = tokens.masked_scatter(confuse, replacements)
+
+    # every event expands to: [inserted event] [event] [burst copies]
+    n_insert = insert.long()
+    n_self = (valid & ~delete).long()
+    burst_len = torch.zeros_like(tokens)
+    n_burst = torch.zeros_like(tokens)
+    if p_burst > 0:
+        burst = valid & (
+            torch.rand((batch_size, width), generator=generator, device=device)
+            < p_burst
+        )
+        burst_len = torch.minimum(
+            torch.randint(
+                1,
+                max_burst_len + 1,
+                (batch_size, width),
+                generator=generator,
+                device=device,
+            ),
+            positions + 1,
+        )
+        repeats = torch.randint(
+            1,
+            max_burst_repeats + 1,
+            (batch_size, width),
+            generator=generator,
+            device=device,
+        )
+        n_burst = torch.where(burst, burst_len * repeats, 0)
+    counts = (n_insert + n_self + n_burst).flatten()
+
+    total = int(counts.sum())
+    source = torch.repeat_interleave(
+        torch.arange(batch_size * width, device=device), counts
+    )
+    block_start = counts.cumsum(0) - counts
+    offset = torch.arange(total, device=device) - block_start[source]
+    ins, own = n_insert.flatten()[source], n_self.flatten()[source]
+    seg = burst_len.flatten()[source].clamp(min=1)
+    # the burst copies cycle over the segment ending at the event
+    burst_source = source - seg + 1 + (offset - ins - own) % seg
+    source = torch.where(offset < ins + own, source, burst_source)
+
+    values = tokens.flatten()[source]
+    random_values = torch.randint(
+        1, vocab_size + 1, (total,), generator=generator, device=device
+    )
+    values = torch.where(offset < ins, random_values, values)
+
+    rows = source // width
+    new_lengths = (n_insert + n_self + n_burst).sum(dim=1)
+    row_start = new_lengths.cumsum(0) - new_lengths
+    columns = torch.arange(total, device=device) - row_start[rows]
+    noisy = torch.zeros(
+        (batch_size, int(new_lengths.max())), dtype=tokens.dtype, device=device
+    )
+    noisy[rows, columns] = values
+    return noisy, new_lengths
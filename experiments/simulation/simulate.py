@@ -17,12 +17,28 @@ When it fires, the new marking is
 $$M_{t+1}=M_t - W_t^- + W_t^+$$
 
 The entire token game is essentially two lines of vector math.
+
+`playout` plays a whole batch of traces at once on the tensors of
+StructuredNet.to_tensor: rows stop when they reach the final marking or a
+dead marking, and the batch stops when all of its rows have. The traces are
+returned as a padded matrix of activity ids (0 is padding, id i is the i-th
+activity in sorted order, as in the tokenised logs of dataloaders), which
+can be exported as an EventLog (`to_event_log`) or directly as an
+EventLogStore (`to_store`).
 """
 
 # %%
+import datetime
+import numpy as np
 import torch
 from typing import Optional
-from pm4py.pm4py.objects.log.obj import EventLog, Trace
+from dataloaders.store import EventLogStore
+from pm4py.objects.log.obj import Event, EventLog, Trace
+from pm4py.util import xes_constants
+from pm4py.util.dt_parsing.variants import strpfromiso
+
+# first timestamp of the exported logs (as in pm4py's basic playout)
+START_TIMESTAMP = 10000000
 
 
 def simulate(
@@ -43,7 +59,6 @@ def simulate(
     for _ in range(steps):
         enabled = (M >= pre).all(dim=1)
         idx = enabled.nonzero(as_tuple=False).flatten()
-        print(idx)
         if len(idx) == 0:
             break
         probs = weights[idx].clone()
@@ -58,6 +73,116 @@ def simulate(
     return log
 
 
+def fire_batch(
+    pre: torch.Tensor,
+    post: torch.Tensor,
+    M0: torch.Tensor,
+    Mf: torch.Tensor,
+    weights: Optional[torch.Tensor] = None,
+    steps: int = 100,
+    batch_size: int = 128,
+    generator: Optional[torch.Generator] = None,
+    visible: Optional[torch.Tensor] = None,
+    max_visible: Optional[int] = None,
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """
+    Plays the token game on batch_size copies of the net at once.
+
+    Args:
+        pre, post: Consumption and production matrices, [T, P].
+        M0, Mf: Initial and final markings, [P].
+        weights: Relative weights of the transitions (uniform if None).
+        steps: Maximum number of firings per row.
+        generator: Source of randomness (torch's default one if None).
+        visible: Whether every transition is visible, [T] (all of them if
+            None).
+        max_visible: Maximum number of visible firings per row (no limit if
+            None): a row stops once it has fired as many.
+
+    Returns:
+        fired: Index of the transition fired by every row at every step,
+            -1 once the row has stopped, [B, steps actually played].
+        reached: Whether every row ended in the final marking, [B].
+    """
+    n_trans, n_places = pre.shape
+    device = pre.device
+    if weights is None:
+        weights = torch.ones(n_trans, device=device, dtype=torch.float)
+    delta = post - pre
+    # on ordinary nets (arcs of weight 1), t is enabled iff all the places of
+    # its preset are marked: a matrix product instead of a [B, T, P] test
+    ordinary = bool((pre <= 1).all())
+    pre_t = pre.T.float()
+    preset_sizes = pre.sum(dim=1).float()
+
+    if max_visible is not None:
+        if visible is None:
+            visible = torch.ones(n_trans, dtype=torch.bool, device=device)
+        n_visible = torch.zeros(batch_size, dtype=torch.long, device=device)
+    M = M0.expand(batch_size, n_places).clone()
+    fired = torch.full(
+        (batch_size, steps), -1, dtype=torch.long, device=device
+    )
+    # only the rows still playing are stepped: the others are in the final
+    # marking or in a dead marking
+    rows = (~(M == Mf).all(dim=1)).nonzero(as_tuple=True)[0]
+    for step in range(steps):
+        M_rows = M[rows]
+        if ordinary:
+            enabled = ((M_rows > 0).float() @ pre_t) == preset_sizes
+        else:
+            # enabled[b,t] = (M[b] >= pre[t]).all(p)
+            enabled = (M_rows.unsqueeze(1) >= pre).all(dim=2)  # [B, T]
+        cumulative = (enabled.float() * weights).cumsum(dim=1)
+        live = cumulative[:, -1] > 0
+        if not live.all():
+            rows, M_rows = rows[live], M_rows[live]
+            cumulative = cumulative[live]
+        if len(rows) == 0:
+            fired = fired[:, :step]
+            break
+        # inverse transform sampling of one enabled transition per row
+        u = torch.rand(len(rows), generator=generator, device=device)
+        t_idx = (
+            torch.searchsorted(
+                cumulative, (u * cumulative[:, -1]).unsqueeze(1), right=True
+            )
+            .squeeze(1)
+            .clamp(max=n_trans - 1)
+        )
+
+        M_rows = M_rows + delta[t_idx]
+        M[rows] = M_rows
+        fired[rows, step] = t_idx
+        playing = ~(M_rows == Mf).all(dim=1)
+        if max_visible is not None:
+            n_visible[rows] += visible[t_idx].long()
+            playing &= n_visible[rows] < max_visible
+        rows = rows[playing]
+    return fired, (M == Mf).all(dim=1)
+
+
+def compact_tokens(
+    tokens: torch.Tensor, keep: torch.Tensor, pad: int
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """
+    Moves the kept entries of every row to its front, in order.
+
+    Returns:
+        compacted: [B, max number of kept entries of a row], padded with pad.
+        lengths: Number of kept entries of every row, [B].
+    """
+    lengths = keep.sum(dim=1)
+    width = int(lengths.max()) if len(lengths) else 0
+    compacted = torch.full(
+        (tokens.size(0), width), pad, dtype=tokens.dtype, device=tokens.device
+    )
+    rows, _ = keep.nonzero(as_tuple=True)
+    cols = (keep.cumsum(dim=1) - 1)[keep]
+    compacted[rows, cols] = tokens[keep]
+    return compacted, lengths
+
+
 def simulate_batch(
     net_tensors,
     M0,
@@ -67,66 +192,170 @@ def simulate_batch(
     steps: int = 100,
     batch_size: int = 128,
     compact: bool = True,
+    generator: Optional[torch.Generator] = None,
 ):
+    """
+    Fired transitions of batch_size playouts: with compact, only the visible
+    ones, moved to the front of the rows (padded with -1); otherwise, one
+    column per step, with -1 for the silent ones and after the end.
+    """
     pre, post = net_tensors
-    n_trans, n_places = pre.shape
-    device = pre.device
-
-    labels_t = torch.tensor(list(range(len(labels))), device=device)
-    print(f"labels_t: {labels_t}")
-
     silent_mask = torch.tensor(
-        [label == "" for label in labels], dtype=torch.bool, device=device
+        [label == "" for label in labels], dtype=torch.bool, device=pre.device
+    )
+    fired, _ = fire_batch(
+        pre, post, M0, Mf, weights, steps, batch_size, generator
     )
-    print(f"silent_mask: {silent_mask}")
+    visible = (fired >= 0) & ~silent_mask[fired.clamp(min=0)]
+    if compact:
+        return compact_tokens(fired, visible, -1)[0]
+    return torch.where(visible, fired, torch.full_like(fired, -1))
 
-    # broadcast initial marking
-    M = M0.expand(batch_size, n_places).clone()
 
-    # default uniform weights per transition
-    if weights is None:
-        weights = torch.ones(n_trans, device=device, dtype=torch.float)
+def playout(
+    net_tensors: dict,
+    n_traces: int,
+    steps: int = 1000,
+    max_trace_length: Optional[int] = 100,
+    batch_size: int = 1024,
+    weights: Optional[torch.Tensor] = None,
+    seed: Optional[int] = None,
+    generator: Optional[torch.Generator] = None,
+) -> tuple[torch.Tensor, torch.Tensor, list[str], torch.Tensor]:
+    """
+    Plays out n_traces traces of a net, batch_size at a time.
 
-    logs = -torch.ones((batch_size, steps), dtype=torch.long, device=device)
-    done = torch.zeros(batch_size, dtype=torch.bool, device=device)
+    As in pm4py's basic playout, a trace stops once it has max_trace_length
+    (visible) events. The playouts that do not reach the final marking
+    (stopped in a dead marking, after max_trace_length events or after steps
+    firings) are kept, as traces of the activities fired until then: reached
+    tells them apart.
 
-    for step in range(steps):
-        # enabled[b,t] = (M[b] >= pre[t]).all(p)
-        enabled = (M.unsqueeze(1) >= pre).all(dim=2)  # [B, T]
-
-        # zero out probs where not enabled
-        probs = enabled.float() * weights  # [B, T]
-        probs = torch.nn.functional.normalize(probs, dim=1)
-        # sample one transition per batch row
-        # torch.multinomial expects non-negative rows that sum to 1
-        t_idx = torch.multinomial(probs, 1).squeeze(1)  # [B]
-
-        # build delta = post - pre
-        delta = post[t_idx] - pre[t_idx]
-        M = M + delta  # broadcast add per row
-
-        # record label if visible
-        visible = ~silent_mask[t_idx]
-        logs[torch.arange(batch_size, device=device), step] = (
-            labels_t[t_idx] + 1
-        ) * visible.long() - 1
-
-        # check completion
-        done |= torch.all(M == Mf, dim=1)
-        if done.all():
-            break
+    Args:
+        net_tensors: Output of StructuredNet.to_tensor.
+        n_traces: Number of traces.
+        steps: Maximum number of firings (visible or silent) per trace.
+        max_trace_length: Maximum number of events per trace (no limit if
+            None).
+        weights: Relative weights of the transitions (uniform if None).
+        seed: Seed of the playout (reproducible independently of torch's
+            default generator).
+        generator: Source of randomness, when seed is None (torch's default
+            one if None too).
 
-    if compact:
-        # logs: [B, steps] tensor of label IDs, 0 for silent, pad_id for beyond max_steps
-        visible = logs != -1  # mask non-silent transitions
-        compacted = -torch.ones_like(logs)
-        lengths = visible.sum(dim=1)
+    Returns:
+        tokens: Activity ids, [n_traces, max length], padded with 0.
+        lengths: Length of every trace, [n_traces].
+        vocab: Sorted activities, vocab[i - 1] being the activity of id i.
+        reached: Whether every trace ended in the final marking, [n_traces].
+    """
+    pre, post = net_tensors["pre"], net_tensors["post"]
+    labels = net_tensors["labels"]
+    device = pre.device
+    if seed is not None:
+        generator = torch.Generator(device=device).manual_seed(seed)
+
+    vocab = sorted({label for label in labels if label != ""})
+    ids = {label: i + 1 for i, label in enumerate(vocab)}
+    # activity id of every transition, 0 for the silent ones
+    label_ids = torch.tensor(
+        [ids.get(label, 0) for label in labels],
+        dtype=torch.long,
+        device=device,
+    )
+
+    batches, lengths, reached = [], [], []
+    for start in range(0, n_traces, batch_size):
+        fired, batch_reached = fire_batch(
+            pre,
+            post,
+            net_tensors["M0"],
+            net_tensors["Mf"],
+            weights,
+            steps,
+            min(batch_size, n_traces - start),
+            generator,
+            visible=label_ids > 0,
+            max_visible=max_trace_length,
+        )
+        tokens = torch.where(
+            fired >= 0,
+            label_ids[fired.clamp(min=0)],
+            torch.zeros_like(fired),
+        )
+        batch, batch_lengths = compact_tokens(tokens, tokens > 0, 0)
+        batches.append(batch)
+        lengths.append(batch_lengths)
+        reached.append(batch_reached)
 
-        for b in range(logs.size(0)):
-            compacted[b, : lengths[b]] = logs[b, visible[b]]
+    width = max((b.size(1) for b in batches), default=0)
+    tokens = torch.zeros((n_traces, width), dtype=torch.long, device=device)
+    start = 0
+    for batch in batches:
+        end = start + batch.size(0)
+        tokens[start:end, : batch.size(1)] = batch
+        start = end
+    if lengths:
+        lengths = torch.cat(lengths)
+        reached = torch.cat(reached)
+    else:
+        lengths = torch.zeros(0, dtype=torch.long, device=device)
+        reached = torch.zeros(0, dtype=torch.bool, device=device)
+    return tokens, lengths, vocab, reached
 
-        return compacted
-    return logs
+
+def to_event_log(
+    tokens: torch.Tensor,
+    lengths: torch.Tensor,
+    vocab: list[str],
+    activity_key: str = xes_constants.DEFAULT_NAME_KEY,
+    timestamp_key: str = xes_constants.DEFAULT_TIMESTAMP_KEY,
+    case_id_key: str = xes_constants.DEFAULT_TRACEID_KEY,
+) -> EventLog:
+    """
+    EventLog of the output of playout, in the format of pm4py's basic playout
+    (case identifiers are the row indexes, the events are one second apart).
+    """
+    tokens = tokens.cpu().tolist()
+    lengths = lengths.cpu().tolist()
+    log = EventLog()
+    curr_timestamp = START_TIMESTAMP
+    for index, (row, length) in enumerate(zip(tokens, lengths)):
+        trace = Trace(attributes={case_id_key: str(index)})
+        for tok in row[:length]:
+            trace.append(
+                Event(
+                    {
+                        activity_key: vocab[tok - 1],
+                        timestamp_key: strpfromiso.fix_naivety(
+                            datetime.datetime.fromtimestamp(curr_timestamp)
+                        ),
+                    }
+                )
+            )
+            curr_timestamp += 1
+        log.append(trace)
+    return log
+
+
+def to_store(
+    path: str,
+    tokens: torch.Tensor,
+    lengths: torch.Tensor,
+    vocab: list[str],
+    meta: Optional[dict] = None,
+) -> EventLogStore:
+    """
+    Writes the output of playout as an EventLogStore (with the timestamps of
+    to_event_log), without building any event object.
+    """
+    tokens = tokens.cpu().numpy()
+    lengths = lengths.cpu().numpy()
+    first = START_TIMESTAMP + lengths.cumsum() - lengths
+    timestamps = first[:, None] + np.arange(tokens.shape[1])
+    return EventLogStore.build_from_tokens(
+        path, tokens, lengths, vocab, meta or {}, timestamps=timestamps
+    )
 
 
 def apply_labels(log: torch.Tensor, labels: list[str]) -> EventLog:
@@ -22,6 +22,7 @@ Contact: info@processintelligence.solutions
 from copy import copy
 
 from pm4py.algo.conformance.alignments.petri_net import variants
+from pm4py.algo.conformance.alignments.petri_net.utils import portfolio
 from pm4py.objects.petri_net.utils import align_utils, check_soundness
 from pm4py.objects.conversion.log import converter as log_converter
 from pm4py.util.xes_constants import DEFAULT_NAME_KEY, DEFAULT_TRACEID_KEY
@@ -49,6 +50,10 @@ class Variants(Enum):
     VERSION_DIJKSTRA_NO_HEURISTICS = variants.dijkstra_no_heuristics
     VERSION_DIJKSTRA_LESS_MEMORY = variants.dijkstra_less_memory
     VERSION_DISCOUNTED_A_STAR = variants.discounted_a_star
+    VERSION_DIJKSTRA_PREFIX_SHARING = variants.dijkstra_prefix_sharing
+    VERSION_MEMORY_BOUNDED_A_STAR = variants.memory_bounded_a_star
+    VERSION_BIDIRECTIONAL_DIJKSTRA = variants.bidirectional_dijkstra
+    VERSION_DISPATCHER = variants.dispatcher
 
 class Parameters(Enum):
     PARAM_TRACE_COST_FUNCTION = "trace_cost_function"
@@ -73,6 +78,9 @@ class Parameters(Enum):
     SYNCHRONOUS = "synchronous_dijkstra"
     EXPONENT="theta"
     ENABLE_BEST_WORST_COST = "enable_best_worst_cost"
+    COMPILED_MODEL = "compiled_model"
+    CHUNK_SIZE = "chunk_size"
+    PORTFOLIO = "portfolio"
 
 
 def __variant_mapper(variant):
@@ -83,6 +91,14 @@ def __variant_mapper(variant):
             variant = Variants.VERSION_DIJKSTRA_NO_HEURISTICS
         elif variant == "Variants.VERSION_DIJKSTRA_LESS_MEMORY":
             variant = Variants.VERSION_DIJKSTRA_LESS_MEMORY
+        elif variant == "Variants.VERSION_DIJKSTRA_PREFIX_SHARING":
+            variant = Variants.VERSION_DIJKSTRA_PREFIX_SHARING
+        elif variant == "Variants.VERSION_MEMORY_BOUNDED_A_STAR":
+            variant = Variants.VERSION_MEMORY_BOUNDED_A_STAR
+        elif variant == "Variants.VERSION_BIDIRECTIONAL_DIJKSTRA":
+            variant = Variants.VERSION_BIDIRECTIONAL_DIJKSTRA
+        elif variant == "Variants.VERSION_DISPATCHER":
+            variant = Variants.VERSION_DISPATCHER
 
     return variant
 
@@ -94,13 +110,25 @@ if solver.DEFAULT_LP_SOLVER_VARIANT is not None:
 VERSION_STATE_EQUATION_A_STAR = Variants.VERSION_STATE_EQUATION_A_STAR
 VERSION_DIJKSTRA_NO_HEURISTICS = Variants.VERSION_DIJKSTRA_NO_HEURISTICS
 VERSION_DIJKSTRA_LESS_MEMORY = Variants.VERSION_DIJKSTRA_LESS_MEMORY
+VERSION_DIJKSTRA_PREFIX_SHARING = Variants.VERSION_DIJKSTRA_PREFIX_SHARING
+VERSION_MEMORY_BOUNDED_A_STAR = Variants.VERSION_MEMORY_BOUNDED_A_STAR
+VERSION_BIDIRECTIONAL_DIJKSTRA = Variants.VERSION_BIDIRECTIONAL_DIJKSTRA
+VERSION_DISPATCHER = Variants.VERSION_DISPATCHER
 
 VERSIONS = {
     Variants.VERSION_DIJKSTRA_NO_HEURISTICS,
     Variants.VERSION_DIJKSTRA_NO_HEURISTICS,
     Variants.VERSION_DIJKSTRA_LESS_MEMORY,
+    Variants.VERSION_DIJKSTRA_PREFIX_SHARING,
+    Variants.VERSION_MEMORY_BOUNDED_A_STAR,
+    Variants.VERSION_BIDIRECTIONAL_DIJKSTRA,
+    Variants.VERSION_DISPATCHER,
 }
 
+# number of chunks per worker process in apply_multiprocessing (more chunks
+# balance better the load among the workers, at the price of more messages)
+CHUNKS_PER_CORE = 4
+
 
 def apply(
     obj: Union[EventLog, EventStream, pd.DataFrame, Trace],
@@ -163,11 +191,16 @@ def apply_trace(
             mapping of each transition in the model to corresponding model cost
             Parameters.PARAM_TRACE_COST_FUNCTION ->
             mapping of each index of the trace to a positive cost value
+            Parameters.PORTFOLIO ->
+            if provided, list of variants (or tuples (variant, parameters)) raced in parallel processes on the
+            trace; the variant argument is then ignored, and the alignment of the first contender completing it
+            is returned (see :func:`pm4py.algo.conformance.alignments.petri_net.utils.portfolio.race`)
     Returns
     -----------
     alignment
         :class:`dict` with keys **alignment**, **cost**, **visited_states**, **queued_states** and
-        **traversed_arcs**
+        **traversed_arcs** (and **portfolio**, describing the outcome of the race of every contender, when
+        Parameters.PORTFOLIO is provided)
         The alignment is a sequence of labels of the form (a,t), (a,>>), or (>>,t)
         representing synchronous/log/model-moves.
     """
@@ -181,6 +214,40 @@ def apply_trace(
         Parameters.ENABLE_BEST_WORST_COST, parameters, True
     )
 
+    contenders = exec_utils.get_param_value(
+        Parameters.PORTFOLIO, parameters, None
+    )
+    if contenders is not None:
+        parameters.pop(Parameters.PORTFOLIO, None)
+        parameters.pop(Parameters.PORTFOLIO.value, None)
+        if (
+            enable_best_worst_cost
+            and exec_utils.get_param_value(
+                Parameters.BEST_WORST_COST_INTERNAL, parameters, None
+            )
+            is None
+        ):
+            # the same for all the (optimal) contenders: computed once
+            parameters[Parameters.BEST_WORST_COST_INTERNAL] = (
+                __get_best_worst_cost(
+                    petri_net,
+                    initial_marking,
+                    final_marking,
+                    __variant_mapper(
+                        portfolio.get_contender_variant(contenders[0])
+                    ),
+                    parameters,
+                )
+            )
+        return portfolio.race(
+            trace,
+            petri_net,
+            initial_marking,
+            final_marking,
+            portfolio=contenders,
+            parameters=parameters,
+        )
+
     ali = exec_utils.get_variant(variant).apply(
         trace, petri_net, initial_marking, final_marking, parameters=parameters
     )
@@ -194,25 +261,28 @@ def apply_trace(
 
     if enable_best_worst_cost:
         best_worst_cost = exec_utils.get_param_value(
-            Parameters.BEST_WORST_COST_INTERNAL,
-            parameters,
-            __get_best_worst_cost(
-                petri_net, initial_marking, final_marking, variant, parameters
-            ),
+            Parameters.BEST_WORST_COST_INTERNAL, parameters, None
         )
+        if best_worst_cost is None:
+            best_worst_cost = __get_best_worst_cost(
+                petri_net, initial_marking, final_marking, variant, parameters
+            )
+        __add_fitness(ali, trace_cost_function_sum, best_worst_cost)
 
-        if ali is not None and best_worst_cost is not None:
-            ltrace_bwc = trace_cost_function_sum + best_worst_cost
+    return ali
 
-            fitness_num = ali["cost"] // align_utils.STD_MODEL_LOG_MOVE_COST
-            fitness_den = ltrace_bwc // align_utils.STD_MODEL_LOG_MOVE_COST
-            fitness = 1 - fitness_num / fitness_den if fitness_den > 0 else 0
 
-            ali["fitness"] = fitness
-            # returning also the best worst cost, for log fitness computation
-            ali["bwc"] = ltrace_bwc
+def __add_fitness(ali, trace_cost_function_sum, best_worst_cost):
+    if ali is not None and best_worst_cost is not None:
+        ltrace_bwc = trace_cost_function_sum + best_worst_cost
 
-    return ali
+        fitness_num = ali["cost"] // align_utils.STD_MODEL_LOG_MOVE_COST
+        fitness_den = ltrace_bwc // align_utils.STD_MODEL_LOG_MOVE_COST
+        fitness = 1 - fitness_num / fitness_den if fitness_den > 0 else 0
+
+        ali["fitness"] = fitness
+        # returning also the best worst cost, for log fitness computation
+        ali["bwc"] = ltrace_bwc
 
 
 def apply_log(
@@ -238,7 +308,10 @@ def apply_log(
     variant
         selected variant of the algorithm, possible values: {\'Variants.VERSION_STATE_EQUATION_A_STAR, Variants.VERSION_DIJKSTRA_NO_HEURISTICS \'}
     parameters
-        :class:`dict` parameters of the algorithm,
+        :class:`dict` parameters of the algorithm, including:
+            Parameters.COMPILED_MODEL -> model-side precomputation of the variant (its compile_model method),
+            shared by the alignments of all the traces. If not provided, it is computed once here
+            (for the variants supporting it).
 
     Returns
     -----------
@@ -250,9 +323,10 @@ def apply_log(
     """
     if parameters is None:
         parameters = dict()
+    parameters = copy(parameters)
 
     if solver.DEFAULT_LP_SOLVER_VARIANT is not None:
-        if not check_soundness.check_easy_soundness_net_in_fin_marking(
+        if not check_soundness.check_easy_soundness_net_in_fin_marking_cached(
             petri_net, initial_marking, final_marking
         ):
             raise Exception(
@@ -276,12 +350,58 @@ def apply_log(
     variants_idxs, one_tr_per_var = __get_variants_structure(log, parameters)
     progress = __get_progress_bar(len(one_tr_per_var), parameters)
 
+    # the model-side part of the synchronous product is computed once and
+    # stitched to every trace
+    variant_module = exec_utils.get_variant(variant)
+    if (
+        exec_utils.get_param_value(
+            Parameters.COMPILED_MODEL, parameters, None
+        )
+        is None
+        and hasattr(variant_module, "compile_model")
+    ):
+        parameters[Parameters.COMPILED_MODEL] = variant_module.compile_model(
+            petri_net, initial_marking, final_marking, parameters=parameters
+        )
+
     if enable_best_worst_cost:
         best_worst_cost = __get_best_worst_cost(
             petri_net, initial_marking, final_marking, variant, parameters
         )
         parameters[Parameters.BEST_WORST_COST_INTERNAL] = best_worst_cost
 
+    if hasattr(variant_module, "apply_batch"):
+        # the variant aligns all the traces at once (e.g., sharing the search
+        # among traces with a common prefix)
+        trace_cost_function = exec_utils.get_param_value(
+            Parameters.PARAM_TRACE_COST_FUNCTION, parameters, None
+        )
+        all_alignments = [None] * len(one_tr_per_var)
+        for index, ali in variant_module.apply_batch(
+            one_tr_per_var,
+            petri_net,
+            initial_marking,
+            final_marking,
+            parameters=parameters,
+        ):
+            if enable_best_worst_cost:
+                if trace_cost_function is not None:
+                    trace_cost_function_sum = sum(trace_cost_function)
+                else:
+                    trace_cost_function_sum = (
+                        align_utils.STD_MODEL_LOG_MOVE_COST
+                        * len(one_tr_per_var[index])
+                    )
+                __add_fitness(ali, trace_cost_function_sum, best_worst_cost)
+            all_alignments[index] = ali
+            if progress is not None:
+                progress.update()
+
+        alignments = __form_alignments(variants_idxs, all_alignments)
+        __close_progress_bar(progress)
+
+        return alignments
+
     all_alignments = []
     for trace in one_tr_per_var:
         this_max_align_time = min(
@@ -317,7 +437,12 @@ def apply_multiprocessing(
     variant=DEFAULT_VARIANT,
 ):
     """
-    Applies the alignments using a process pool (multiprocessing)
+    Applies the alignments using a process pool (multiprocessing).
+
+    The model (and its compiled form, for the variants supporting it) is sent once to every worker, when the worker
+    is started; then, the variants of the log are dispatched in chunks (longest variants first, so that the
+    slowest alignments do not end up at the tail of the computation), and the results are collected as soon as
+    every chunk is completed.
 
     Parameters
     ---------------
@@ -330,7 +455,13 @@ def apply_multiprocessing(
     final_marking
         Final marking
     parameters
-        Parameters of the algorithm
+        Parameters of the algorithm, including:
+            Parameters.CORES -> number of worker processes (default: number of cores - 2)
+            Parameters.CHUNK_SIZE -> (approximate) number of events of the variants dispatched together to a worker
+            (default: the events of the log divided by CHUNKS_PER_CORE times the number of workers)
+            Parameters.PARAM_MAX_ALIGN_TIME_TRACE -> maximum time (in seconds) spent aligning a single variant
+            (the alignment of the variant is then None, and the worker moves to the next one)
+            Parameters.PARAM_MAX_ALIGN_TIME -> maximum time (in seconds) spent aligning the log
 
     Returns
     ----------------
@@ -339,18 +470,25 @@ def apply_multiprocessing(
     """
     if parameters is None:
         parameters = {}
+    parameters = copy(parameters)
 
     import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
 
     variant = __variant_mapper(variant)
 
     num_cores = exec_utils.get_param_value(
         Parameters.CORES, parameters, multiprocessing.cpu_count() - 2
     )
+    num_cores = max(1, num_cores)
 
     enable_best_worst_cost = exec_utils.get_param_value(
         Parameters.ENABLE_BEST_WORST_COST, parameters, True
     )
+    max_align_time = exec_utils.get_param_value(
+        Parameters.PARAM_MAX_ALIGN_TIME, parameters, sys.maxsize
+    )
+    deadline = time.time() + max_align_time
 
     variants_idxs, one_tr_per_var = __get_variants_structure(log, parameters)
 
@@ -360,44 +498,133 @@ def apply_multiprocessing(
         )
         parameters[Parameters.BEST_WORST_COST_INTERNAL] = best_worst_cost
 
-    all_alignments = []
+    chunk_size = exec_utils.get_param_value(
+        Parameters.CHUNK_SIZE,
+        parameters,
+        -(
+            -sum(len(trace) for trace in one_tr_per_var)
+            // (num_cores * CHUNKS_PER_CORE)
+        ),
+    )
+    chunks = __get_chunks(one_tr_per_var, chunk_size)
 
-    from concurrent.futures import ProcessPoolExecutor
+    all_alignments = [None] * len(one_tr_per_var)
+    progress = __get_progress_bar(len(one_tr_per_var), parameters)
 
-    with ProcessPoolExecutor(max_workers=num_cores) as executor:
-        futures = []
-        for trace in one_tr_per_var:
-            futures.append(
-                executor.submit(
-                    apply_trace,
-                    trace,
-                    petri_net,
-                    initial_marking,
-                    final_marking,
-                    parameters,
-                    str(variant),
-                )
+    with ProcessPoolExecutor(
+        max_workers=min(num_cores, max(1, len(chunks))),
+        initializer=__init_worker,
+        initargs=(
+            petri_net,
+            initial_marking,
+            final_marking,
+            parameters,
+            str(variant),
+        ),
+    ) as executor:
+        futures = [
+            executor.submit(
+                __align_chunk,
+                [one_tr_per_var[index] for index in chunk],
+                deadline,
             )
-        progress = __get_progress_bar(len(one_tr_per_var), parameters)
-        if progress is not None:
-            alignments_ready = 0
-            while alignments_ready != len(futures):
-                current = 0
-                for index, variant in enumerate(futures):
-                    current = current + 1 if futures[index].done() else current
-                if current > alignments_ready:
-                    for i in range(0, current - alignments_ready):
-                        progress.update()
-                alignments_ready = current
-        for index, variant in enumerate(futures):
-            all_alignments.append(futures[index].result())
-        __close_progress_bar(progress)
+            for chunk in chunks
+        ]
+        chunk_of_future = dict(zip(futures, chunks))
+        for future in as_completed(futures):
+            chunk = chunk_of_future[future]
+            for index, ali in zip(chunk, future.result()):
+                all_alignments[index] = ali
+            if progress is not None:
+                progress.update(len(chunk))
+
+    __close_progress_bar(progress)
 
     alignments = __form_alignments(variants_idxs, all_alignments)
 
     return alignments
 
 
+# state of a worker process of apply_multiprocessing (set by __init_worker)
+__worker_state = {}
+
+
+def __get_chunks(traces, chunk_size):
+    """
+    Splits the (indexes of the) traces into chunks of approximately chunk_size events, from the longest traces
+    to the shortest ones
+    """
+    order = sorted(range(len(traces)), key=lambda i: -len(traces[i]))
+    chunks = []
+    chunk = []
+    chunk_events = 0
+    for index in order:
+        chunk.append(index)
+        chunk_events += len(traces[index])
+        if chunk_events >= chunk_size:
+            chunks.append(chunk)
+            chunk = []
+            chunk_events = 0
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def __init_worker(
+    petri_net, initial_marking, final_marking, parameters, variant
+):
+    """
+    Initializes a worker process of apply_multiprocessing, keeping the model (and its compiled form) for all the
+    chunks aligned by the worker
+    """
+    variant = __variant_mapper(variant)
+    parameters = copy(parameters)
+    variant_module = exec_utils.get_variant(variant)
+    if (
+        exec_utils.get_param_value(
+            Parameters.COMPILED_MODEL, parameters, None
+        )
+        is None
+        and hasattr(variant_module, "compile_model")
+    ):
+        parameters[Parameters.COMPILED_MODEL] = variant_module.compile_model(
+            petri_net, initial_marking, final_marking, parameters=parameters
+        )
+    __worker_state["model"] = (petri_net, initial_marking, final_marking)
+    __worker_state["parameters"] = parameters
+    __worker_state["variant"] = variant
+
+
+def __align_chunk(traces, deadline):
+    """
+    Aligns a chunk of traces in a worker process of apply_multiprocessing
+    """
+    petri_net, initial_marking, final_marking = __worker_state["model"]
+    parameters = __worker_state["parameters"]
+    variant = __worker_state["variant"]
+    max_align_time_case = exec_utils.get_param_value(
+        Parameters.PARAM_MAX_ALIGN_TIME_TRACE, parameters, sys.maxsize
+    )
+
+    alignments = []
+    for trace in traces:
+        this_parameters = copy(parameters)
+        this_parameters[Parameters.PARAM_MAX_ALIGN_TIME_TRACE] = min(
+            max_align_time_case, (deadline - time.time()) * 0.5
+        )
+        alignments.append(
+            apply_trace(
+                trace,
+                petri_net,
+                initial_marking,
+                final_marking,
+                parameters=this_parameters,
+                variant=variant,
+            )
+        )
+    return alignments
+
+
 def __get_best_worst_cost(
     petri_net, initial_marking, final_marking, variant, parameters
 ):
@@ -19,4 +19,9 @@ visit <https://www.gnu.org/licenses/>.
 Website: https://processintelligence.solutions
 Contact: info@processintelligence.solutions
 '''
-from pm4py.algo.conformance.alignments.petri_net.utils import log_enrichment
+from pm4py.algo.conformance.alignments.petri_net.utils import (
+    log_enrichment,
+    instrumentation,
+    heuristics,
+    portfolio,
+)
@@ -0,0 +1,513 @@
+'''
+    PM4Py – A Process Mining Library for Python
+Copyright (C) 2024 Process Intelligence Solutions UG (haftungsbeschränkt)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see this software project's root or
+visit <https://www.gnu.org/licenses/>.
+
+Website: https://processintelligence.solutions
+Contact: info@processintelligence.solutions
+'''
+"""
+Heuristics of the A* alignment search (see
+:mod:`pm4py.algo.conformance.alignments.petri_net.variants.state_equation_a_star`).
+
+A heuristic is a subclass of :class:`AlignmentHeuristic`, instantiated once per search on the compiled synchronous
+product net. It provides:
+
+- the estimate of the initial state (:meth:`AlignmentHeuristic.initial`);
+- the exact estimate of a state (:meth:`AlignmentHeuristic.exact`), computed when a state is popped from the open
+  set with an untrusted estimate;
+- the estimate of a successor, derived from the one of its predecessor (:meth:`AlignmentHeuristic.derive`);
+- whether a derived estimate can be trusted (:meth:`AlignmentHeuristic.trust`).
+
+The heuristic is chosen by the "heuristic" parameter of the A* variant, either by name (see :data:`HEURISTICS`) or
+by passing the class itself; since no global state is involved, different heuristics can be compared side by side
+(also in the same process pool).
+"""
+import sys
+import time
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+import numpy as np
+from scipy import sparse
+
+from pm4py.objects.petri_net.utils import align_utils as utils
+from pm4py.util import exec_utils
+from pm4py.util.lp import solver as lp_solver
+
+
+# bound outside of the class bodies, where the name would be mangled
+_compute_exact_heuristic_marking_vector = (
+    utils.__compute_exact_heuristic_marking_vector
+)
+
+
+class Parameters(Enum):
+    WARM_START_LP = "warm_start_lp"
+
+
+class AlignmentHeuristic(object):
+    """
+    Base class of the heuristics: the zero (Dijkstra) heuristic, whose estimates are always trusted
+    """
+
+    def __init__(
+        self,
+        compiled,
+        cost_vec: List[float],
+        a_matrix: Union[np.ndarray, sparse.spmatrix],
+        parameters: Optional[Dict[Any, Any]] = None,
+    ):
+        """
+        Parameters
+        --------------
+        compiled
+            Compiled synchronous product net (with initial and final marking)
+        cost_vec
+            Cost of each transition, indexed by transition identifier
+        a_matrix
+            Incidence matrix of the compiled net (dense, or sparse as returned by
+            :meth:`pm4py.objects.petri_net.utils.compiled_net.CompiledPetriNet.sparse_incidence_matrix`)
+        parameters
+            Parameters of the heuristic
+        """
+        self.compiled = compiled
+        self.cost_vec = [x * 1.0 for x in cost_vec]
+        self.a_matrix = a_matrix
+        self.solve_times = []
+
+    def initial(self) -> Tuple[float, Any]:
+        """
+        Estimates the initial state
+
+        Returns
+        --------------
+        h
+            Estimate
+        x
+            Solution vector backing the estimate (None if not applicable)
+        """
+        return self.exact(self.compiled.ini)
+
+    def exact(self, marking: Tuple[int, ...]) -> Tuple[float, Any]:
+        """
+        Computes the estimate of a state from scratch
+
+        Parameters
+        --------------
+        marking
+            Compiled marking of the state
+
+        Returns
+        --------------
+        h
+            Estimate
+        x
+            Solution vector backing the estimate (None if not applicable)
+        """
+        return 0, None
+
+    def derive(
+        self, t: int, marking: Tuple[int, ...], h: float, x: Any
+    ) -> Tuple[float, Any]:
+        """
+        Derives the estimate of the state reached by firing a transition from the estimate of its predecessor
+
+        Parameters
+        --------------
+        t
+            Identifier of the fired transition
+        marking
+            Compiled marking of the reached state
+        h
+            Estimate of the predecessor
+        x
+            Solution vector of the predecessor
+
+        Returns
+        --------------
+        h
+            Estimate
+        x
+            Solution vector backing the estimate
+        """
+        return 0, None
+
+    def trust(self, x: Any) -> bool:
+        """
+        Checks if a derived estimate is trustable (an untrusted estimate is recomputed with :meth:`exact` before
+        expanding the state)
+        """
+        return True
+
+
+class ZeroHeuristic(AlignmentHeuristic):
+    """
+    Zero heuristic (the search reduces to Dijkstra's algorithm)
+    """
+    pass
+
+
+class LpHeuristic(AlignmentHeuristic):
+    """
+    State-equation heuristic [1]_: minimal cost of a solution vector x >= 0 of the marking equation towards the final
+    marking. A derived estimate is trusted as long as the solution vector of the predecessor contained the fired
+    transition.
+
+    By default the LP is kept alive for the whole search and warm-started from the previous optimal basis; with
+    Parameters.WARM_START_LP set to False (or when the default solver is an ILP one), every estimate is computed by
+    the default solver of pm4py. The constraint matrix is handed to the solvers in sparse form whenever they
+    support it (cvxopt/GLPK, scipy/HiGHS and the warm-started LP).
+
+    References
+    ----------
+    .. [1] Sebastiaan J. van Zelst et al., "Tuning Alignment Computation: An Experimental Evaluation",
+          ATAED@Petri Nets/ACSD 2017: 6-20.
+    """
+
+    def __init__(self, compiled, cost_vec, a_matrix, parameters=None):
+        if parameters is None:
+            parameters = {}
+        AlignmentHeuristic.__init__(
+            self, compiled, cost_vec, a_matrix, parameters=parameters
+        )
+        warm_start_lp = exec_utils.get_param_value(
+            Parameters.WARM_START_LP, parameters, True
+        )
+
+        self.fin_vec = list(compiled.fin)
+        self.incremental = None
+        if (
+            warm_start_lp
+            and lp_solver.DEFAULT_LP_SOLVER_VARIANT
+            != lp_solver.CVXOPT_SOLVER_CUSTOM_ALIGN_ILP
+        ):
+            # the constraint matrix is set up once, then only the right-hand
+            # side changes between two solves
+            self.incremental = utils.IncrementalLpHeuristic(
+                sparse.csc_matrix(a_matrix, dtype=np.float64),
+                self.cost_vec,
+                self.fin_vec,
+            )
+            self.solve_times = self.incremental.solve_times
+        else:
+            self.setup_solver(lp_solver.DEFAULT_LP_SOLVER_VARIANT)
+
+    def setup_solver(self, variant):
+        """
+        Sets up the matrices for the solution of every estimate from scratch with the given solver variant
+        """
+        n = len(self.cost_vec)
+        self.variant = variant
+        self.use_cvxopt = variant in (
+            lp_solver.CVXOPT_SOLVER_CUSTOM_ALIGN,
+            lp_solver.CVXOPT_SOLVER_CUSTOM_ALIGN_ILP,
+        )
+        a_matrix = sparse.coo_matrix(self.a_matrix, dtype=np.float64)
+        self.h_cvx = np.matrix(np.zeros(n)).transpose()
+        self.lp_cost_vec = self.cost_vec
+        if self.use_cvxopt:
+            # not available in the latest version of PM4Py
+            from cvxopt import matrix, spmatrix
+
+            self.lp_a_matrix = spmatrix(
+                a_matrix.data.tolist(),
+                a_matrix.row.tolist(),
+                a_matrix.col.tolist(),
+                size=a_matrix.shape,
+                tc="d",
+            )
+            self.g_matrix = spmatrix(-1.0, range(n), range(n), tc="d")
+            self.h_cvx = matrix(self.h_cvx)
+            self.lp_cost_vec = matrix(self.cost_vec)
+        elif variant == lp_solver.SCIPY:
+            self.lp_a_matrix = a_matrix.tocsr()
+            self.g_matrix = -sparse.eye(n, format="csr")
+        else:
+            self.lp_a_matrix = np.asmatrix(a_matrix.toarray())
+            self.g_matrix = -np.eye(n)
+
+    def exact(self, marking):
+        if self.incremental is not None:
+            return self.incremental.compute(marking)
+        lp_start = time.perf_counter()
+        ret = _compute_exact_heuristic_marking_vector(
+            self.compiled,
+            self.lp_a_matrix,
+            self.h_cvx,
+            self.g_matrix,
+            self.lp_cost_vec,
+            marking,
+            self.fin_vec,
+            self.variant,
+            use_cvxopt=self.use_cvxopt,
+        )
+        self.solve_times.append(time.perf_counter() - lp_start)
+        return ret
+
+    def derive(self, t, marking, h, x):
+        x_prime = list(x)
+        x_prime[t] -= 1
+        return max(0, h - self.cost_vec[t]), x_prime
+
+    def trust(self, x):
+        for v in x:
+            if v < -0.001:
+                return False
+        return True
+
+
+class IlpHeuristic(LpHeuristic):
+    """
+    State-equation heuristic with integral solution vectors: tighter than :class:`LpHeuristic`, but every estimate
+    is the solution of an ILP (solved by scipy/HiGHS when available, otherwise by the cvxopt/GLPK ILP solver)
+    """
+
+    def __init__(self, compiled, cost_vec, a_matrix, parameters=None):
+        AlignmentHeuristic.__init__(
+            self, compiled, cost_vec, a_matrix, parameters=parameters
+        )
+        self.fin_vec = list(compiled.fin)
+        self.incremental = None
+        if lp_solver.SCIPY in lp_solver.VERSIONS_APPLY:
+            self.variant = lp_solver.SCIPY
+            self.lp_a_matrix = sparse.csr_matrix(a_matrix, dtype=np.float64)
+        else:
+            self.setup_solver(lp_solver.CVXOPT_SOLVER_CUSTOM_ALIGN_ILP)
+
+    def exact(self, marking):
+        if self.variant != lp_solver.SCIPY:
+            return LpHeuristic.exact(self, marking)
+        lp_start = time.perf_counter()
+        b_term = np.asarray(self.fin_vec, dtype=np.float64) - np.asarray(
+            marking, dtype=np.float64
+        )
+        sol = lp_solver.apply(
+            self.cost_vec,
+            None,
+            None,
+            self.lp_a_matrix,
+            b_term,
+            parameters={
+                "integrality": np.ones(len(self.cost_vec)),
+                "bounds": (0, None),
+            },
+            variant=lp_solver.SCIPY,
+        )
+        prim_obj = lp_solver.get_prim_obj_from_sol(sol, variant=lp_solver.SCIPY)
+        points = lp_solver.get_points_from_sol(sol, variant=lp_solver.SCIPY)
+        self.solve_times.append(time.perf_counter() - lp_start)
+        prim_obj = prim_obj if prim_obj is not None else sys.maxsize
+        points = points if points is not None else [0.0] * len(self.cost_vec)
+        return prim_obj, points
+
+
+class EditDistanceHeuristic(AlignmentHeuristic):
+    """
+    Lower bound of the edit distance (without substitutions, as in
+    :func:`pm4py.objects.petri_net.utils.align_utils.levenshtein`) between the remaining suffix of the trace and
+    the runs of the model from the current marking: every remaining event whose activity cannot be synchronised
+    anymore (no transition with that label is structurally reachable from the current model marking) costs at least
+    its log move, every other event at least its cheapest move.
+
+    The bound is cheap, as it does not involve any LP. Each synchronous move is matched with the model move having
+    the same arcs on the model places of the compiled net, so that transitions sharing a name are told apart. The
+    bound requires the trace side of the synchronous product to be a sequence (as built by the standard trace net
+    constructors), otherwise it reduces to the zero heuristic.
+    """
+
+    def __init__(self, compiled, cost_vec, a_matrix, parameters=None):
+        AlignmentHeuristic.__init__(
+            self, compiled, cost_vec, a_matrix, parameters=parameters
+        )
+        skip = utils.SKIP
+        places = [getattr(p, "name", p) for p in compiled.ordered_places]
+        is_trace_place = [p[1] == skip for p in places]
+        self.model_places = [
+            i for i, x in enumerate(is_trace_place) if not x
+        ]
+        self.trace_places = [i for i, x in enumerate(is_trace_place) if x]
+        self.events = None
+        self.cache = {}
+        self.markable_cache = {}
+
+        # model moves: number of input places and consumers of each place
+        self.model_moves_pre_count = []
+        self.place_consumers = {}
+        self.model_moves_post = []
+        model_move_index = {}
+        log_moves = {}
+        sync_moves = {}
+        for j, t in enumerate(compiled.ordered_transitions):
+            pre = compiled.pre[j]
+            if t.label[0] == skip:
+                k = len(self.model_moves_post)
+                # the model move is identified by its arcs, since the names
+                # of the transitions are not unique
+                model_move_index.setdefault((pre, compiled.post[j]), k)
+                self.model_moves_pre_count.append(len(pre))
+                for p, w in pre:
+                    self.place_consumers.setdefault(p, []).append(k)
+                self.model_moves_post.append(
+                    tuple(p for p, w in compiled.post[j])
+                )
+                continue
+            trace_pre = [p for p, w in pre if is_trace_place[p]]
+            if len(trace_pre) != 1:
+                return
+            if t.label[1] == skip:
+                trace_post = [
+                    p for p, w in compiled.post[j] if is_trace_place[p]
+                ]
+                log_moves.setdefault(trace_pre[0], []).append(
+                    (j, trace_post)
+                )
+            else:
+                model_arcs = (
+                    tuple((p, w) for p, w in pre if not is_trace_place[p]),
+                    tuple(
+                        (p, w)
+                        for p, w in compiled.post[j]
+                        if not is_trace_place[p]
+                    ),
+                )
+                sync_moves.setdefault(trace_pre[0], []).append(
+                    (model_arcs, self.cost_vec[j])
+                )
+        self.initially_enabled = [
+            k for k, n in enumerate(self.model_moves_pre_count) if n == 0
+        ]
+
+        if not all(
+            len(v) == 1 and len(v[0][1]) == 1 for v in log_moves.values()
+        ):
+            return
+        # events of the trace, following the sequence of trace places: for
+        # each trace place, the remaining events as (cost of the log move,
+        # synchronous moves as (model move, cost))
+        events = {p: () for p in self.trace_places if p not in log_moves}
+        pending = [p for p in self.trace_places if p in log_moves]
+        while pending:
+            remaining = []
+            for p in pending:
+                j, trace_post = log_moves[p][0]
+                if trace_post[0] in events:
+                    syncs = tuple(
+                        (model_move_index[arcs], cost)
+                        for arcs, cost in sync_moves.get(p, ())
+                        if arcs in model_move_index
+                        and cost < self.cost_vec[j]
+                    )
+                    events[p] = (
+                        (self.cost_vec[j], syncs),
+                    ) + events[trace_post[0]]
+                else:
+                    remaining.append(p)
+            if len(remaining) == len(pending):
+                # cyclic trace side
+                return
+            pending = remaining
+        self.events = events
+
+    def __enabled_moves(self, model_marking):
+        # model moves that are enabled in some marking reachable from the
+        # given one, ignoring the number of tokens (over-approximation)
+        if model_marking in self.markable_cache:
+            return self.markable_cache[model_marking]
+        missing = list(self.model_moves_pre_count)
+        enabled = bytearray(len(missing))
+        marked = set()
+        queue = [
+            p for p, n in zip(self.model_places, model_marking) if n
+        ]
+        for k in self.initially_enabled:
+            enabled[k] = 1
+            queue.extend(self.model_moves_post[k])
+        while queue:
+            p = queue.pop()
+            if p in marked:
+                continue
+            marked.add(p)
+            for k in self.place_consumers.get(p, ()):
+                missing[k] -= 1
+                if missing[k] == 0:
+                    enabled[k] = 1
+                    queue.extend(self.model_moves_post[k])
+        self.markable_cache[model_marking] = enabled
+        return enabled
+
+    def exact(self, marking):
+        if self.events is None:
+            return 0, None
+        if marking in self.cache:
+            return self.cache[marking], None
+        trace_marked = [p for p in self.trace_places if marking[p]]
+        if len(trace_marked) != 1:
+            return 0, None
+        enabled = self.__enabled_moves(
+            tuple(marking[p] for p in self.model_places)
+        )
+        h = 0
+        for log_cost, syncs in self.events[trace_marked[0]]:
+            cost = log_cost
+            for k, sync_cost in syncs:
+                if sync_cost < cost and enabled[k]:
+                    cost = sync_cost
+            h += cost
+        self.cache[marking] = h
+        return h, None
+
+    def derive(self, t, marking, h, x):
+        return self.exact(marking)
+
+
+HEURISTICS: Dict[str, Type[AlignmentHeuristic]] = {
+    "zero": ZeroHeuristic,
+    "lp": LpHeuristic,
+    "ilp": IlpHeuristic,
+    "edit_distance": EditDistanceHeuristic,
+}
+
+DEFAULT_HEURISTIC = "lp"
+
+
+def get_heuristic(
+    heuristic: Union[str, Type[AlignmentHeuristic]],
+) -> Type[AlignmentHeuristic]:
+    """
+    Gets the class of a heuristic
+
+    Parameters
+    --------------
+    heuristic
+        Name of a heuristic among the ones in HEURISTICS, or a subclass of AlignmentHeuristic
+
+    Returns
+    --------------
+    heuristic_class
+        Class of the heuristic
+    """
+    if isinstance(heuristic, str):
+        if heuristic not in HEURISTICS:
+            raise Exception(
+                "unknown heuristic: "
+                + heuristic
+                + " (available: "
+                + ", ".join(HEURISTICS)
+                + ")"
+            )
+        return HEURISTICS[heuristic]
+    return heuristic
@@ -0,0 +1,150 @@
+'''
+    PM4Py – A Process Mining Library for Python
+Copyright (C) 2024 Process Intelligence Solutions UG (haftungsbeschränkt)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see this software project's root or
+visit <https://www.gnu.org/licenses/>.
+
+Website: https://processintelligence.solutions
+Contact: info@processintelligence.solutions
+'''
+"""
+Optional instrumentation of the search loops of the alignment variants.
+
+When requested (parameter "search_statistics" of the variants supporting it), the search records how its time is
+split among the computation of the heuristics, the generation of the successors, the operations on the open set
+(heap) and the lookups/insertions in the closed set; the size of the open set along the search; and, at the goal,
+the gap between the true remaining cost and the heuristic value of the states on the optimal path.
+When not requested, the search loops only pay a comparison with None per instrumented operation.
+The parameter also accepts an instance of :class:`SearchInstrumentation` (or of a subclass), that is then used by
+the search (e.g., to observe a search while it is running).
+"""
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_OPEN_SET_SAMPLING = 100
+
+
+class SearchInstrumentation(object):
+
+    def __init__(self, open_set_sampling: int = DEFAULT_OPEN_SET_SAMPLING):
+        """
+        Parameters
+        --------------
+        open_set_sampling
+            The size of the open set is recorded every open_set_sampling expanded states
+        """
+        self.open_set_sampling = max(1, int(open_set_sampling))
+        self.heuristic_time = 0.0
+        self.successors_time = 0.0
+        self.heap_time = 0.0
+        self.closed_time = 0.0
+        self.open_set_sizes: List[Tuple[int, float, int]] = []
+        self.initial_heuristic: Optional[float] = None
+        self.path_heuristic_gaps: List[float] = []
+        self.start_time = time.perf_counter()
+        self.total_time = None
+
+    def sample_open_set(self, expanded: int, open_set_size: int):
+        """
+        Records the size of the open set (if the number of expanded states is a multiple of the sampling)
+
+        Parameters
+        --------------
+        expanded
+            Number of states expanded so far
+        open_set_size
+            Current size of the open set
+        """
+        if expanded % self.open_set_sampling == 0:
+            self.open_set_sizes.append(
+                (
+                    expanded,
+                    time.perf_counter() - self.start_time,
+                    open_set_size,
+                )
+            )
+
+    def record_goal(self, state):
+        """
+        Records the gap between the true remaining cost and the heuristic value for every state on the path that
+        reaches the goal (states without a heuristic value count as having a zero heuristic)
+
+        Parameters
+        --------------
+        state
+            Search state of the goal (a search tuple with g, p and possibly h)
+        """
+        cost = state.g
+        gaps = []
+        while state is not None:
+            gaps.append(cost - state.g - getattr(state, "h", 0))
+            state = state.p
+        gaps.reverse()
+        self.path_heuristic_gaps = gaps
+        self.initial_heuristic = cost - gaps[0]
+
+    def stop(self):
+        """
+        Stops the measurement of the total time of the search
+        """
+        self.total_time = time.perf_counter() - self.start_time
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the recorded statistics as a dictionary (stored under the "search_statistics" key of the alignment)
+        """
+        if self.total_time is None:
+            self.stop()
+        return {
+            "total_time": self.total_time,
+            "heuristic_time": self.heuristic_time,
+            "successors_time": self.successors_time,
+            "heap_time": self.heap_time,
+            "closed_time": self.closed_time,
+            "open_set_sizes": self.open_set_sizes,
+            "initial_heuristic": self.initial_heuristic,
+            "heuristic_gap": (
+                self.path_heuristic_gaps[0]
+                if self.path_heuristic_gaps
+                else None
+            ),
+            "path_heuristic_gaps": self.path_heuristic_gaps,
+        }
+
+
+def get_instrumentation(
+    search_statistics: Any,
+    open_set_sampling: int = DEFAULT_OPEN_SET_SAMPLING,
+) -> Optional[SearchInstrumentation]:
+    """
+    Gets the instrumentation of a search from the value of the "search_statistics" parameter
+
+    Parameters
+    --------------
+    search_statistics
+        Boolean (instrument the search or not), or the instrumentation to use
+    open_set_sampling
+        Sampling of the size of the open set (for a new instrumentation)
+
+    Returns
+    --------------
+    instrumentation
+        Instrumentation of the search (None if the search is not instrumented)
+    """
+    if isinstance(search_statistics, SearchInstrumentation):
+        return search_statistics
+    if search_statistics:
+        return SearchInstrumentation(open_set_sampling)
+    return None
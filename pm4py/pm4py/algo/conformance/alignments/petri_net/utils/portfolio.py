@@ -0,0 +1,338 @@
+'''
+    PM4Py – A Process Mining Library for Python
+Copyright (C) 2024 Process Intelligence Solutions UG (haftungsbeschränkt)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see this software project's root or
+visit <https://www.gnu.org/licenses/>.
+
+Website: https://processintelligence.solutions
+Contact: info@processintelligence.solutions
+'''
+"""
+Racing of a portfolio of alignment variants (and heuristics) on the same trace.
+
+Every contender, i.e. a variant of :mod:`pm4py.algo.conformance.alignments.petri_net.algorithm` together with its own
+parameters (e.g. the heuristic of the A* variants), aligns the trace in its own process. The first contender
+returning an alignment wins and its alignment is returned, while the other contenders are cancelled; hence, the
+portfolio should contain only optimal variants (i.e., all of them except the discounted A*).
+
+The searches of the contenders are instrumented (see :mod:`instrumentation`) by :class:`RaceInstrumentation`, that
+checks for the cancellation while the search is running: a cancelled contender stops its search and reports its
+progress at that point (expanded states, size of the open set and time split of the search). The contenders whose
+search is not instrumented cannot be stopped cooperatively, and are terminated after a grace period (reporting
+only that they were still running).
+"""
+import multiprocessing
+import time
+from copy import copy
+from enum import Enum
+from queue import Empty
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from pm4py.algo.conformance.alignments.petri_net.utils import instrumentation
+from pm4py.objects.log.obj import Trace
+from pm4py.objects.petri_net.obj import PetriNet, Marking
+from pm4py.util import exec_utils
+
+# contenders of the default portfolio (variant, parameters of the variant)
+DEFAULT_PORTFOLIO = [
+    ("Variants.VERSION_STATE_EQUATION_A_STAR", {"heuristic": "lp"}),
+    ("Variants.VERSION_STATE_EQUATION_A_STAR", {"heuristic": "edit_distance"}),
+    ("Variants.VERSION_DIJKSTRA_NO_HEURISTICS", {}),
+]
+# number of expanded states between two checks of the cancellation
+CANCELLATION_CHECK = 64
+# seconds given to the cancelled contenders to report their progress
+CANCELLATION_GRACE = 1.0
+# seconds between two checks of the liveness of the contenders
+POLLING_INTERVAL = 0.5
+
+SEARCH_STATISTICS = "search_statistics"
+
+
+class Parameters(Enum):
+    CANCELLATION_GRACE = "cancellation_grace"
+
+
+class SearchCancelled(Exception):
+    """
+    Raised inside the search of a contender when the race has been decided
+    """
+    pass
+
+
+class RaceInstrumentation(instrumentation.SearchInstrumentation):
+    """
+    Instrumentation of the search of a contender, stopping the search when the race is decided
+    """
+
+    def __init__(
+        self,
+        cancel,
+        open_set_sampling: int = instrumentation.DEFAULT_OPEN_SET_SAMPLING,
+    ):
+        """
+        Parameters
+        --------------
+        cancel
+            Event (shared among the contenders) set when the race is decided
+        open_set_sampling
+            The size of the open set is recorded every open_set_sampling expanded states
+        """
+        instrumentation.SearchInstrumentation.__init__(self, open_set_sampling)
+        self.cancel = cancel
+        self.expanded = 0
+        self.open_set_size = 0
+
+    def sample_open_set(self, expanded: int, open_set_size: int):
+        instrumentation.SearchInstrumentation.sample_open_set(
+            self, expanded, open_set_size
+        )
+        self.expanded = expanded
+        self.open_set_size = open_set_size
+        if expanded % CANCELLATION_CHECK == 0 and self.cancel.is_set():
+            raise SearchCancelled()
+
+    def progress(self) -> Dict[str, Any]:
+        """
+        Returns the progress of the search so far
+        """
+        statistics = self.to_dict()
+        return {
+            "expanded_states": self.expanded,
+            "open_set_size": self.open_set_size,
+            "heuristic_time": statistics["heuristic_time"],
+            "successors_time": statistics["successors_time"],
+            "heap_time": statistics["heap_time"],
+            "closed_time": statistics["closed_time"],
+            "open_set_sizes": statistics["open_set_sizes"],
+        }
+
+
+def get_contender_name(contender: Any) -> str:
+    """
+    Gets a readable name for a contender of the portfolio (e.g., VERSION_STATE_EQUATION_A_STAR[heuristic=lp])
+    """
+    variant, parameters = __unpack_contender(contender)
+    name = str(variant).split(".")[-1]
+    if parameters:
+        name += (
+            "["
+            + ",".join(
+                str(getattr(k, "value", k))
+                + "="
+                + str(getattr(v, "__name__", v))
+                for k, v in parameters.items()
+            )
+            + "]"
+        )
+    return name
+
+
+def get_contender_variant(contender: Any) -> Any:
+    """
+    Gets the variant of a contender of the portfolio
+    """
+    return __unpack_contender(contender)[0]
+
+
+def __unpack_contender(contender):
+    if isinstance(contender, tuple):
+        variant, parameters = contender
+        return variant, parameters if parameters is not None else {}
+    return contender, {}
+
+
+def __run_contender(
+    index,
+    trace,
+    petri_net,
+    initial_marking,
+    final_marking,
+    variant,
+    parameters,
+    cancel,
+    results,
+):
+    from pm4py.algo.conformance.alignments.petri_net import algorithm
+
+    keep_statistics = bool(parameters.get(SEARCH_STATISTICS, False))
+    stats = RaceInstrumentation(cancel)
+    parameters = copy(parameters)
+    parameters[SEARCH_STATISTICS] = stats
+    start = time.perf_counter()
+    try:
+        ali = algorithm.apply_trace(
+            trace,
+            petri_net,
+            initial_marking,
+            final_marking,
+            parameters=parameters,
+            variant=variant,
+        )
+        if ali is not None and not keep_statistics:
+            ali.pop(SEARCH_STATISTICS, None)
+        status = "solved"
+    except SearchCancelled:
+        ali = None
+        status = "cancelled"
+    except Exception as e:
+        results.put(
+            (index, "failed", repr(e), time.perf_counter() - start, None)
+        )
+        return
+    # a search that is not instrumented never samples the open set
+    progress = stats.progress() if stats.expanded > 0 else None
+    results.put((index, status, ali, time.perf_counter() - start, progress))
+
+
+def race(
+    trace: Trace,
+    petri_net: PetriNet,
+    initial_marking: Marking,
+    final_marking: Marking,
+    portfolio: Optional[List[Union[Any, Tuple[Any, Dict[Any, Any]]]]] = None,
+    parameters: Optional[Dict[Any, Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Races the contenders of a portfolio on the alignment of a trace, returning the alignment of the first contender
+    to complete it
+
+    Parameters
+    --------------
+    trace
+        Trace
+    petri_net
+        Petri net
+    initial_marking
+        Initial marking
+    final_marking
+        Final marking
+    portfolio
+        Contenders, each one either a variant of the alignments or a tuple (variant, parameters), where the
+        parameters are added to (and override) the common ones (default: DEFAULT_PORTFOLIO)
+    parameters
+        Parameters common to all the contenders, including:
+        - Parameters.CANCELLATION_GRACE => seconds given to the cancelled contenders to report their progress,
+          before being terminated (default: CANCELLATION_GRACE)
+
+    Returns
+    --------------
+    alignment
+        Alignment of the winner (None if no contender aligned the trace), with the additional key **portfolio**:
+        a list (following the order of the portfolio) of dictionaries with keys **contender**, **status** (one of
+        "winner", "solved" (after the winner), "unsolved" (e.g., for the timeout of the variant), "cancelled",
+        "terminated" and "failed"), **time** (seconds spent by the contender, None if terminated) and **progress**
+        (progress of the search, see :meth:`RaceInstrumentation.progress`, when available)
+    """
+    if parameters is None:
+        parameters = {}
+    if portfolio is None:
+        portfolio = DEFAULT_PORTFOLIO
+
+    cancellation_grace = exec_utils.get_param_value(
+        Parameters.CANCELLATION_GRACE, parameters, CANCELLATION_GRACE
+    )
+
+    context = multiprocessing.get_context()
+    cancel = context.Event()
+    results = context.Queue()
+    processes = []
+    for index, contender in enumerate(portfolio):
+        variant, contender_parameters = __unpack_contender(contender)
+        this_parameters = copy(parameters)
+        this_parameters.update(contender_parameters)
+        process = context.Process(
+            target=__run_contender,
+            args=(
+                index,
+                trace,
+                petri_net,
+                initial_marking,
+                final_marking,
+                str(variant),
+                this_parameters,
+                cancel,
+                results,
+            ),
+            daemon=True,
+        )
+        process.start()
+        processes.append(process)
+
+    records = [
+        {
+            "contender": get_contender_name(contender),
+            "status": None,
+            "time": None,
+            "progress": None,
+        }
+        for contender in portfolio
+    ]
+    winner = None
+    deadline = None
+    pending = len(portfolio)
+
+    while pending > 0:
+        timeout = POLLING_INTERVAL
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.time())
+            if timeout <= 0:
+                break
+        try:
+            index, status, ali, elapsed, progress = results.get(
+                timeout=timeout
+            )
+        except Empty:
+            # contenders that died without reporting
+            for index, process in enumerate(processes):
+                if (
+                    records[index]["status"] is None
+                    and not process.is_alive()
+                    and process.exitcode != 0
+                ):
+                    records[index]["status"] = "failed"
+                    pending -= 1
+            continue
+
+        pending -= 1
+        record = records[index]
+        record["time"] = elapsed
+        record["progress"] = progress
+        if status == "solved":
+            if ali is None:
+                record["status"] = "unsolved"
+            elif winner is None:
+                record["status"] = "winner"
+                winner = ali
+                cancel.set()
+                deadline = time.time() + cancellation_grace
+            else:
+                record["status"] = "solved"
+        else:
+            record["status"] = status
+            if status == "failed":
+                record["error"] = ali
+
+    for index, process in enumerate(processes):
+        if process.is_alive():
+            process.terminate()
+            if records[index]["status"] is None:
+                records[index]["status"] = "terminated"
+        process.join()
+    results.close()
+
+    if winner is not None:
+        winner["portfolio"] = records
+    return winner
@@ -23,5 +23,9 @@ from pm4py.algo.conformance.alignments.petri_net.variants import (
     dijkstra_less_memory,
     dijkstra_no_heuristics,
     state_equation_a_star,
-    discounted_a_star
+    discounted_a_star,
+    dijkstra_prefix_sharing,
+    memory_bounded_a_star,
+    bidirectional_dijkstra,
+    dispatcher,
 )
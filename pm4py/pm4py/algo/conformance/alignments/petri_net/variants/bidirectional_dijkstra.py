@@ -0,0 +1,687 @@
+'''
+    PM4Py – A Process Mining Library for Python
+Copyright (C) 2024 Process Intelligence Solutions UG (haftungsbeschränkt)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see this software project's root or
+visit <https://www.gnu.org/licenses/>.
+
+Website: https://processintelligence.solutions
+Contact: info@processintelligence.solutions
+'''
+"""
+Bidirectional variant of the Dijkstra alignments (:mod:`dijkstra_no_heuristics`).
+
+A forward search from the initial marking and a backward search from the final marking (i.e., a forward search
+on the reversed synchronous product net, obtained by swapping the pre- and post-sets of the transitions) are
+interleaved, always expanding the direction with the smaller open set. Every time the two searches reach the
+same marking, the cost of the best alignment found so far is updated; the search stops when the sum of the costs
+at the top of the two open sets reaches it, which guarantees the optimality of the alignment.
+On long traces, each direction explores (roughly) the states within half of the optimal cost from its start,
+instead of the states within the whole optimal cost explored by the unidirectional search.
+"""
+import heapq
+import time
+
+from pm4py.objects.log import obj as log_implementation
+from pm4py.util.xes_constants import DEFAULT_NAME_KEY
+from pm4py.objects.petri_net.utils.synchronous_product import (
+    construct_cost_aware,
+    construct,
+    construct_sync_costs,
+)
+from pm4py.objects.petri_net.utils.petri_utils import (
+    construct_trace_net_cost_aware,
+)
+from pm4py.objects.petri_net.utils import align_utils as utils
+from pm4py.objects.petri_net.utils import compiled_net
+from pm4py.util import exec_utils
+from enum import Enum
+import sys
+from pm4py.util.constants import PARAMETER_CONSTANT_ACTIVITY_KEY
+from pm4py.util import variants_util
+from typing import Optional, Dict, Any, Union
+from pm4py.objects.log.obj import Trace
+from pm4py.objects.petri_net.obj import PetriNet, Marking
+from pm4py.util import typing
+
+
+class Parameters(Enum):
+    PARAM_TRACE_COST_FUNCTION = "trace_cost_function"
+    PARAM_MODEL_COST_FUNCTION = "model_cost_function"
+    PARAM_SYNC_COST_FUNCTION = "sync_cost_function"
+    PARAM_ALIGNMENT_RESULT_IS_SYNC_PROD_AWARE = "ret_tuple_as_trans_desc"
+    PARAM_TRACE_NET_COSTS = "trace_net_costs"
+    TRACE_NET_CONSTR_FUNCTION = "trace_net_constr_function"
+    TRACE_NET_COST_AWARE_CONSTR_FUNCTION = (
+        "trace_net_cost_aware_constr_function"
+    )
+    PARAM_MAX_ALIGN_TIME_TRACE = "max_align_time_trace"
+    PARAM_MAX_ALIGN_TIME = "max_align_time"
+    PARAMETER_VARIANT_DELIMITER = "variant_delimiter"
+    ACTIVITY_KEY = PARAMETER_CONSTANT_ACTIVITY_KEY
+    VARIANTS_IDX = "variants_idx"
+    COMPILED_MODEL = "compiled_model"
+
+
+def get_best_worst_cost(
+    petri_net, initial_marking, final_marking, parameters=None
+):
+    """
+    Gets the best worst cost of an alignment
+
+    Parameters
+    -----------
+    petri_net
+        Petri net
+    initial_marking
+        Initial marking
+    final_marking
+        Final marking
+
+    Returns
+    -----------
+    best_worst_cost
+        Best worst cost of alignment
+    """
+    if parameters is None:
+        parameters = {}
+    trace = log_implementation.Trace()
+
+    best_worst = apply(
+        trace, petri_net, initial_marking, final_marking, parameters=parameters
+    )
+
+    if best_worst is not None:
+        return best_worst["cost"]
+
+    return None
+
+
+def compile_model(
+    petri_net: PetriNet,
+    initial_marking: Marking,
+    final_marking: Marking,
+    parameters: Optional[Dict[Union[str, Parameters], Any]] = None,
+) -> compiled_net.CompiledModel:
+    """
+    Pre-computes the model-side part of the synchronous product, to be shared by the alignments of several traces
+    against the same model (passing it as Parameters.COMPILED_MODEL)
+
+    Parameters
+    -------------
+    petri_net
+        Petri net
+    initial_marking
+        Initial marking
+    final_marking
+        Final marking
+    parameters
+        Parameters of the algorithm, including:
+        - Parameters.PARAM_MODEL_COST_FUNCTION => model cost function
+        - Parameters.PARAM_SYNC_COST_FUNCTION => synchronous cost function
+
+    Returns
+    -------------
+    compiled_model
+        Compiled model
+    """
+    if parameters is None:
+        parameters = {}
+
+    model_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_MODEL_COST_FUNCTION, parameters, None
+    )
+    sync_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_SYNC_COST_FUNCTION, parameters, None
+    )
+
+    return compiled_net.CompiledModel(
+        petri_net,
+        initial_marking,
+        final_marking,
+        model_cost_function=model_cost_function,
+        sync_cost_function=sync_cost_function,
+        skip=utils.SKIP,
+    )
+
+
+def apply(
+    trace: Trace,
+    petri_net: PetriNet,
+    initial_marking: Marking,
+    final_marking: Marking,
+    parameters: Optional[Dict[Union[str, Parameters], Any]] = None,
+) -> typing.AlignmentResult:
+    """
+    Performs the basic alignment search, given a trace and a net.
+
+    Parameters
+    ----------
+    trace: :class:`list` input trace, assumed to be a list of events (i.e. the code will use the activity key
+    to get the attributes)
+    petri_net: :class:`pm4py.objects.petri.net.PetriNet` the Petri net to use in the alignment
+    initial_marking: :class:`pm4py.objects.petri.net.Marking` initial marking in the Petri net
+    final_marking: :class:`pm4py.objects.petri.net.Marking` final marking in the Petri net
+    parameters: :class:`dict` (optional) dictionary containing one of the following:
+        Parameters.PARAM_TRACE_COST_FUNCTION: :class:`list` (parameter) mapping of each index of the trace to a positive cost value
+        Parameters.PARAM_MODEL_COST_FUNCTION: :class:`dict` (parameter) mapping of each transition in the model to corresponding
+        model cost
+        Parameters.PARAM_SYNC_COST_FUNCTION: :class:`dict` (parameter) mapping of each transition in the model to corresponding
+        synchronous costs
+        Parameters.ACTIVITY_KEY: :class:`str` (parameter) key to use to identify the activity described by the events
+        Parameters.COMPILED_MODEL: :class:`pm4py.objects.petri_net.utils.compiled_net.CompiledModel` (parameter)
+        model-side part of the synchronous product (see :func:`compile_model`), stitched to the trace instead of
+        building the synchronous product from scratch
+
+    Returns
+    -------
+    dictionary: `dict` with keys **alignment**, **cost**, **visited_states**, **queued_states** and **traversed_arcs**
+    """
+    if parameters is None:
+        parameters = {}
+
+    activity_key = exec_utils.get_param_value(
+        Parameters.ACTIVITY_KEY, parameters, DEFAULT_NAME_KEY
+    )
+    compiled_model = exec_utils.get_param_value(
+        Parameters.COMPILED_MODEL, parameters, None
+    )
+    trace_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_TRACE_COST_FUNCTION, parameters, None
+    )
+    model_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_MODEL_COST_FUNCTION, parameters, None
+    )
+    trace_net_constr_function = exec_utils.get_param_value(
+        Parameters.TRACE_NET_CONSTR_FUNCTION, parameters, None
+    )
+    trace_net_cost_aware_constr_function = exec_utils.get_param_value(
+        Parameters.TRACE_NET_COST_AWARE_CONSTR_FUNCTION,
+        parameters,
+        construct_trace_net_cost_aware,
+    )
+
+    if trace_cost_function is None:
+        trace_cost_function = list(
+            map(lambda e: utils.STD_MODEL_LOG_MOVE_COST, trace)
+        )
+        parameters[Parameters.PARAM_TRACE_COST_FUNCTION] = trace_cost_function
+
+    if model_cost_function is None:
+        # reset variables value
+        model_cost_function = dict()
+        sync_cost_function = dict()
+        for t in petri_net.transitions:
+            if t.label is not None:
+                model_cost_function[t] = utils.STD_MODEL_LOG_MOVE_COST
+                sync_cost_function[t] = utils.STD_SYNC_COST
+            else:
+                model_cost_function[t] = utils.STD_TAU_COST
+        parameters[Parameters.PARAM_MODEL_COST_FUNCTION] = model_cost_function
+        parameters[Parameters.PARAM_SYNC_COST_FUNCTION] = sync_cost_function
+
+    if (
+        compiled_model is not None
+        and trace_net_constr_function is None
+        and trace_net_cost_aware_constr_function
+        is construct_trace_net_cost_aware
+    ):
+        sync_prod, cost_vec = compiled_model.stitch(
+            [e[activity_key] for e in trace], trace_cost_function
+        )
+        ret_tuple_as_trans_desc = exec_utils.get_param_value(
+            Parameters.PARAM_ALIGNMENT_RESULT_IS_SYNC_PROD_AWARE,
+            parameters,
+            False,
+        )
+        max_align_time_trace = exec_utils.get_param_value(
+            Parameters.PARAM_MAX_ALIGN_TIME_TRACE, parameters, sys.maxsize
+        )
+        return __search_compiled(
+            sync_prod,
+            cost_vec,
+            ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
+            max_align_time_trace=max_align_time_trace,
+        )
+
+    if trace_net_constr_function is not None:
+        # keep the possibility to pass TRACE_NET_CONSTR_FUNCTION in this old
+        # version
+        trace_net, trace_im, trace_fm = trace_net_constr_function(
+            trace, activity_key=activity_key
+        )
+    else:
+        (
+            trace_net,
+            trace_im,
+            trace_fm,
+            parameters[Parameters.PARAM_TRACE_NET_COSTS],
+        ) = trace_net_cost_aware_constr_function(
+            trace, trace_cost_function, activity_key=activity_key
+        )
+
+    alignment = apply_trace_net(
+        petri_net,
+        initial_marking,
+        final_marking,
+        trace_net,
+        trace_im,
+        trace_fm,
+        parameters,
+    )
+    return alignment
+
+
+def apply_from_variant(
+    variant, petri_net, initial_marking, final_marking, parameters=None
+):
+    """
+    Apply the alignments from the specification of a single variant
+
+    Parameters
+    -------------
+    variant
+        Variant (as string delimited by the "variant_delimiter" parameter)
+    petri_net
+        Petri net
+    initial_marking
+        Initial marking
+    final_marking
+        Final marking
+    parameters
+        Parameters of the algorithm (same as 'apply' method, plus 'variant_delimiter' that is , by default)
+
+    Returns
+    ------------
+    dictionary: `dict` with keys **alignment**, **cost**, **visited_states**, **queued_states** and **traversed_arcs**
+    """
+    if parameters is None:
+        parameters = {}
+    trace = variants_util.variant_to_trace(variant, parameters=parameters)
+
+    return apply(
+        trace, petri_net, initial_marking, final_marking, parameters=parameters
+    )
+
+
+def apply_from_variants_dictionary(
+    var_dictio, petri_net, initial_marking, final_marking, parameters=None
+):
+    if parameters is None:
+        parameters = {}
+    dictio_alignments = {}
+    for variant in var_dictio:
+        dictio_alignments[variant] = apply_from_variant(
+            variant,
+            petri_net,
+            initial_marking,
+            final_marking,
+            parameters=parameters,
+        )
+    return dictio_alignments
+
+
+def apply_from_variants_list(
+    var_list, petri_net, initial_marking, final_marking, parameters=None
+):
+    """
+    Apply the alignments from the specification of a list of variants in the log
+
+    Parameters
+    -------------
+    var_list
+        List of variants (for each item, the first entry is the variant itself, the second entry may be the number of cases)
+    petri_net
+        Petri net
+    initial_marking
+        Initial marking
+    final_marking
+        Final marking
+    parameters
+        Parameters of the algorithm (same as 'apply' method, plus 'variant_delimiter' that is , by default)
+
+    Returns
+    --------------
+    dictio_alignments
+        Dictionary that assigns to each variant its alignment
+    """
+    if parameters is None:
+        parameters = {}
+    start_time = time.time()
+    max_align_time = exec_utils.get_param_value(
+        Parameters.PARAM_MAX_ALIGN_TIME, parameters, sys.maxsize
+    )
+    max_align_time_trace = exec_utils.get_param_value(
+        Parameters.PARAM_MAX_ALIGN_TIME_TRACE, parameters, sys.maxsize
+    )
+    dictio_alignments = {}
+    for varitem in var_list:
+        this_max_align_time = min(
+            max_align_time_trace,
+            (max_align_time - (time.time() - start_time)) * 0.5,
+        )
+        variant = varitem[0]
+        parameters[Parameters.PARAM_MAX_ALIGN_TIME_TRACE] = this_max_align_time
+        dictio_alignments[variant] = apply_from_variant(
+            variant,
+            petri_net,
+            initial_marking,
+            final_marking,
+            parameters=parameters,
+        )
+    return dictio_alignments
+
+
+def apply_from_variants_list_petri_string(
+    var_list, petri_net_string, parameters=None
+):
+    if parameters is None:
+        parameters = {}
+
+    from pm4py.objects.petri_net.importer.variants import (
+        pnml as petri_importer,
+    )
+
+    petri_net, initial_marking, final_marking = (
+        petri_importer.import_petri_from_string(petri_net_string)
+    )
+
+    res = apply_from_variants_list(
+        var_list,
+        petri_net,
+        initial_marking,
+        final_marking,
+        parameters=parameters,
+    )
+    return res
+
+
+def apply_from_variants_list_petri_string_mprocessing(
+    mp_output, var_list, petri_net_string, parameters=None
+):
+    if parameters is None:
+        parameters = {}
+
+    res = apply_from_variants_list_petri_string(
+        var_list, petri_net_string, parameters=parameters
+    )
+    mp_output.put(res)
+
+
+def apply_trace_net(
+    petri_net,
+    initial_marking,
+    final_marking,
+    trace_net,
+    trace_im,
+    trace_fm,
+    parameters=None,
+):
+    """
+    Performs the basic alignment search, given a trace net and a net.
+
+    Parameters
+    ----------
+    trace: :class:`list` input trace, assumed to be a list of events (i.e. the code will use the activity key
+    to get the attributes)
+    petri_net: :class:`pm4py.objects.petri.net.PetriNet` the Petri net to use in the alignment
+    initial_marking: :class:`pm4py.objects.petri.net.Marking` initial marking in the Petri net
+    final_marking: :class:`pm4py.objects.petri.net.Marking` final marking in the Petri net
+    parameters: :class:`dict` (optional) dictionary containing one of the following:
+        Parameters.PARAM_TRACE_COST_FUNCTION: :class:`list` (parameter) mapping of each index of the trace to a positive cost value
+        Parameters.PARAM_MODEL_COST_FUNCTION: :class:`dict` (parameter) mapping of each transition in the model to corresponding
+        model cost
+        Parameters.PARAM_SYNC_COST_FUNCTION: :class:`dict` (parameter) mapping of each transition in the model to corresponding
+        synchronous costs
+        Parameters.ACTIVITY_KEY: :class:`str` (parameter) key to use to identify the activity described by the events
+        Parameters.PARAM_TRACE_NET_COSTS: :class:`dict` (parameter) mapping between transitions and costs
+
+    Returns
+    -------
+    dictionary: `dict` with keys **alignment**, **cost**, **visited_states**, **queued_states** and **traversed_arcs**
+    """
+    if parameters is None:
+        parameters = {}
+
+    ret_tuple_as_trans_desc = exec_utils.get_param_value(
+        Parameters.PARAM_ALIGNMENT_RESULT_IS_SYNC_PROD_AWARE, parameters, False
+    )
+
+    trace_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_TRACE_COST_FUNCTION, parameters, None
+    )
+    model_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_MODEL_COST_FUNCTION, parameters, None
+    )
+    sync_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_SYNC_COST_FUNCTION, parameters, None
+    )
+    trace_net_costs = exec_utils.get_param_value(
+        Parameters.PARAM_TRACE_NET_COSTS, parameters, None
+    )
+
+    if (
+        trace_cost_function is None
+        or model_cost_function is None
+        or sync_cost_function is None
+    ):
+        sync_prod, sync_initial_marking, sync_final_marking = construct(
+            trace_net,
+            trace_im,
+            trace_fm,
+            petri_net,
+            initial_marking,
+            final_marking,
+            utils.SKIP,
+        )
+        cost_function = utils.construct_standard_cost_function(
+            sync_prod, utils.SKIP
+        )
+    else:
+        revised_sync = construct_sync_costs(
+            trace_net, petri_net, sync_cost_function
+        )
+
+        sync_prod, sync_initial_marking, sync_final_marking, cost_function = (
+            construct_cost_aware(
+                trace_net,
+                trace_im,
+                trace_fm,
+                petri_net,
+                initial_marking,
+                final_marking,
+                utils.SKIP,
+                trace_net_costs,
+                model_cost_function,
+                revised_sync,
+            )
+        )
+
+    max_align_time_trace = exec_utils.get_param_value(
+        Parameters.PARAM_MAX_ALIGN_TIME_TRACE, parameters, sys.maxsize
+    )
+
+    return apply_sync_prod(
+        sync_prod,
+        sync_initial_marking,
+        sync_final_marking,
+        cost_function,
+        utils.SKIP,
+        ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
+        max_align_time_trace=max_align_time_trace,
+    )
+
+
+def apply_sync_prod(
+    sync_prod,
+    initial_marking,
+    final_marking,
+    cost_function,
+    skip,
+    ret_tuple_as_trans_desc=False,
+    max_align_time_trace=sys.maxsize,
+):
+    return __search(
+        sync_prod,
+        initial_marking,
+        final_marking,
+        cost_function,
+        skip,
+        ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
+        max_align_time_trace=max_align_time_trace,
+    )
+
+
+def __search(
+    sync_net,
+    ini,
+    fin,
+    cost_function,
+    skip,
+    ret_tuple_as_trans_desc=False,
+    max_align_time_trace=sys.maxsize,
+):
+    compiled = compiled_net.construct(sync_net, ini, fin)
+
+    return __search_compiled(
+        compiled,
+        compiled.cost_vector(cost_function),
+        ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
+        max_align_time_trace=max_align_time_trace,
+    )
+
+
+def reverse(compiled):
+    """
+    Reverses a compiled net (swapping the pre- and post-sets of its transitions, and the initial and final
+    markings), so that the markings reachable in the reversed net are the ones from which the final marking is
+    reachable in the original net
+
+    Parameters
+    --------------
+    compiled
+        Compiled net
+
+    Returns
+    --------------
+    reversed_net
+        Reversed compiled net (sharing the place and transition identifiers of the original one)
+    """
+    return compiled_net.CompiledPetriNet(
+        compiled.ordered_places,
+        compiled.ordered_transitions,
+        compiled.post,
+        compiled.pre,
+        ini=compiled.fin,
+        fin=compiled.ini,
+    )
+
+
+def __search_compiled(
+    compiled,
+    trans_costs,
+    ret_tuple_as_trans_desc=False,
+    max_align_time_trace=sys.maxsize,
+):
+    start_time = time.time()
+
+    ordered_transitions = compiled.ordered_transitions
+    nets = (compiled, reverse(compiled))
+
+    # per direction: open set, closed set, and best (tentative) state per
+    # marking
+    open_sets = (
+        [utils.DijkstraSearchTuple(0, compiled.ini, None, None, 0)],
+        [utils.DijkstraSearchTuple(0, compiled.fin, None, None, 0)],
+    )
+    closed = (set(), set())
+    best = (
+        {compiled.ini: open_sets[0][0]},
+        {compiled.fin: open_sets[1][0]},
+    )
+    visited = 0
+    queued = 0
+    traversed = 0
+
+    # cost of the best alignment found so far, with the forward and backward
+    # states meeting in the same marking
+    mu = float("inf")
+    meeting = None
+    if compiled.ini == compiled.fin:
+        mu, meeting = 0, (open_sets[0][0], open_sets[1][0])
+
+    while open_sets[0] and open_sets[1]:
+        if (time.time() - start_time) > max_align_time_trace:
+            return None
+
+        if open_sets[0][0].g + open_sets[1][0].g >= mu:
+            break
+
+        d = 0 if len(open_sets[0]) <= len(open_sets[1]) else 1
+        open_set = open_sets[d]
+        curr = heapq.heappop(open_set)
+        current_marking = curr.m
+        if current_marking in closed[d]:
+            continue
+        closed[d].add(current_marking)
+        visited += 1
+
+        net = nets[d]
+        best_d = best[d]
+        best_other = best[1 - d]
+        for t_idx in net.enabled_transitions(current_marking):
+            traversed += 1
+            new_marking = net.fire(t_idx, current_marking)
+            if new_marking in closed[d]:
+                continue
+            g = curr.g + trans_costs[t_idx]
+            prev = best_d.get(new_marking)
+            if prev is not None and prev.g <= g:
+                continue
+
+            queued += 1
+            tp = utils.DijkstraSearchTuple(
+                g, new_marking, curr, ordered_transitions[t_idx], curr.l + 1
+            )
+            best_d[new_marking] = tp
+            heapq.heappush(open_set, tp)
+
+            other = best_other.get(new_marking)
+            if other is not None and g + other.g < mu:
+                mu = g + other.g
+                meeting = (tp, other) if d == 0 else (other, tp)
+
+    if meeting is None:
+        return None
+
+    # the forward state is extended with the transitions of the backward
+    # path (that, read from the meeting marking, lead to the final marking)
+    state, backward = meeting
+    while backward.p is not None:
+        state = utils.DijkstraSearchTuple(
+            state.g + trans_costs[compiled.transitions[backward.t]],
+            backward.p.m,
+            state,
+            backward.t,
+            state.l + 1,
+        )
+        backward = backward.p
+
+    return utils.__reconstruct_alignment(
+        state,
+        visited,
+        queued,
+        traversed,
+        ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
+    )
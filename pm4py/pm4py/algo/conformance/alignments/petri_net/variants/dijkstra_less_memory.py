@@ -46,6 +46,7 @@ class Parameters(Enum):
     PARAMETER_VARIANT_DELIMITER = "variant_delimiter"
     PARAM_ALIGNMENT_RESULT_IS_SYNC_PROD_AWARE = "ret_tuple_as_trans_desc"
     ACTIVITY_KEY = PARAMETER_CONSTANT_ACTIVITY_KEY
+    COMPILED_MODEL = "compiled_model"
 
 
 PLACES_DICT = "places_dict"
@@ -57,6 +58,7 @@ TRANS_POST_DICT = "trans_post_dict"
 TRANSF_IM = "transf_im"
 TRANSF_FM = "transf_fm"
 TRANSF_MODEL_COST_FUNCTION = "transf_model_cost_function"
+TAU_ENABLED_LABELS = "tau_enabled_labels"
 TRANSF_TRACE = "transf_trace"
 TRACE_COST_FUNCTION = "trace_cost_function"
 INV_TRACE_LABELS_DICT = "inv_trace_labels_dict"
@@ -215,11 +217,10 @@ def apply_from_variant(
     )
 
 
-def __transform_model_to_mem_efficient_structure(
-    net, im, fm, trace, parameters=None
-):
+def compile_model(net, im, fm, parameters=None):
     """
-    Transform the Petri net model to a memory efficient structure
+    Transform the Petri net model to a memory efficient structure, that does not depend on the trace and can be
+    shared by the alignments of several traces against the same model (passing it as Parameters.COMPILED_MODEL)
 
     Parameters
     --------------
@@ -229,8 +230,6 @@ def __transform_model_to_mem_efficient_structure(
         Initial marking
     fm
         Final marking
-    trace
-        Trace
     parameters
         Parameters
 
@@ -246,45 +245,17 @@ def __transform_model_to_mem_efficient_structure(
             TRANS_POST_DICT: postset of a transition, expressed as in this data structure
             TRANSF_IM: transformed initial marking
             TRANSF_FM: transformed final marking
-            TRANSF_MODEL_COST_FUNCTION: transformed model cost function
+            TRANSF_MODEL_COST_FUNCTION: transformed model cost function (None if it depends on the trace)
+            TAU_ENABLED_LABELS: associates each invisible transition to the labels of the visible transitions
+            enabled in its activation marking (used to derive the trace-dependent model cost function)
     """
     if parameters is None:
         parameters = {}
 
-    activity_key = exec_utils.get_param_value(
-        Parameters.ACTIVITY_KEY, parameters, DEFAULT_NAME_KEY
-    )
-    labels = sorted(list(set(x[activity_key] for x in trace)))
-
     model_cost_function = exec_utils.get_param_value(
         Parameters.PARAM_MODEL_COST_FUNCTION, parameters, None
     )
 
-    if model_cost_function is None:
-        model_cost_function = {}
-        for t in net.transitions:
-            if t.label is not None:
-                model_cost_function[t] = align_utils.STD_MODEL_LOG_MOVE_COST
-            else:
-                preset_t = Marking()
-                for a in t.in_arcs:
-                    preset_t[a.source] = a.weight
-                # optimization 12/08/2020
-                #
-                # instead of giving undiscriminately weight 1 to
-                # invisible transitions, assign weight 0 to the ones
-                # for which no 'sync' transition is enabled in their
-                # activation markings.
-                #
-                # this requires to modify the state of the alignment, keeping track
-                # of the length of the alignment, to avoid loops.
-                en_t = enabled_transitions(net, preset_t)
-                vis_t_trace = [t for t in en_t if t.label in labels]
-                if len(vis_t_trace) == 0:
-                    model_cost_function[t] = 0
-                else:
-                    model_cost_function[t] = align_utils.STD_TAU_COST
-
     places_dict = {place: index for index, place in enumerate(net.places)}
     trans_dict = {trans: index for index, trans in enumerate(net.transitions)}
 
@@ -311,9 +282,22 @@ def __transform_model_to_mem_efficient_structure(
     transf_im = {places_dict[p]: im[p] for p in im}
     transf_fm = {places_dict[p]: fm[p] for p in fm}
 
-    transf_model_cost_function = {
-        trans_dict[t]: model_cost_function[t] for t in net.transitions
-    }
+    transf_model_cost_function = None
+    tau_enabled_labels = {}
+    if model_cost_function is not None:
+        transf_model_cost_function = {
+            trans_dict[t]: model_cost_function[t] for t in net.transitions
+        }
+    else:
+        for t in net.transitions:
+            if t.label is None:
+                preset_t = Marking()
+                for a in t.in_arcs:
+                    preset_t[a.source] = a.weight
+                en_t = enabled_transitions(net, preset_t)
+                tau_enabled_labels[trans_dict[t]] = frozenset(
+                    x.label for x in en_t if x.label is not None
+                )
 
     inv_trans_dict = {y: x for x, y in trans_dict.items()}
 
@@ -327,9 +311,75 @@ def __transform_model_to_mem_efficient_structure(
         TRANSF_IM: transf_im,
         TRANSF_FM: transf_fm,
         TRANSF_MODEL_COST_FUNCTION: transf_model_cost_function,
+        TAU_ENABLED_LABELS: tau_enabled_labels,
     }
 
 
+def __transform_model_to_mem_efficient_structure(
+    net, im, fm, trace, parameters=None
+):
+    """
+    Transform the Petri net model to a memory efficient structure
+
+    Parameters
+    --------------
+    net
+        Petri net
+    im
+        Initial marking
+    fm
+        Final marking
+    trace
+        Trace
+    parameters
+        Parameters (if Parameters.COMPILED_MODEL is provided, the model part is not computed again)
+
+    Returns
+    --------------
+    model_struct
+        Model data structure (see :func:`compile_model`), in which TRANSF_MODEL_COST_FUNCTION is set
+    """
+    if parameters is None:
+        parameters = {}
+
+    activity_key = exec_utils.get_param_value(
+        Parameters.ACTIVITY_KEY, parameters, DEFAULT_NAME_KEY
+    )
+    model_struct = exec_utils.get_param_value(
+        Parameters.COMPILED_MODEL, parameters, None
+    )
+    if model_struct is None:
+        model_struct = compile_model(net, im, fm, parameters=parameters)
+
+    if model_struct[TRANSF_MODEL_COST_FUNCTION] is not None:
+        return model_struct
+
+    labels = set(x[activity_key] for x in trace)
+    tau_enabled_labels = model_struct[TAU_ENABLED_LABELS]
+
+    # optimization 12/08/2020
+    #
+    # instead of giving undiscriminately weight 1 to
+    # invisible transitions, assign weight 0 to the ones
+    # for which no 'sync' transition is enabled in their
+    # activation markings.
+    #
+    # this requires to modify the state of the alignment, keeping track
+    # of the length of the alignment, to avoid loops.
+    transf_model_cost_function = {}
+    for t, l in model_struct[TRANS_LABELS_DICT].items():
+        if l is not None:
+            transf_model_cost_function[t] = align_utils.STD_MODEL_LOG_MOVE_COST
+        elif tau_enabled_labels[t].isdisjoint(labels):
+            transf_model_cost_function[t] = 0
+        else:
+            transf_model_cost_function[t] = align_utils.STD_TAU_COST
+
+    model_struct = copy(model_struct)
+    model_struct[TRANSF_MODEL_COST_FUNCTION] = transf_model_cost_function
+    return model_struct
+
+
 def __transform_trace_to_mem_efficient_structure(
     trace, model_struct, parameters=None
 ):
@@ -407,6 +457,8 @@ def apply(
         Parameters.PARAM_MODEL_COST_FUNCTION: :class:`dict` (parameter) mapping of each transition in the model to corresponding
         model cost
         Parameters.ACTIVITY_KEY: :class:`str` (parameter) key to use to identify the activity described by the events
+        Parameters.COMPILED_MODEL: :class:`dict` (parameter) memory efficient structure of the model (see
+        :func:`compile_model`), reused instead of transforming the model again
 
     Returns
     -------
@@ -22,20 +22,20 @@ Contact: info@processintelligence.solutions
 import heapq
 import time
 
+from pm4py.algo.conformance.alignments.petri_net.utils import instrumentation
 from pm4py.objects.log import obj as log_implementation
 from pm4py.util.xes_constants import DEFAULT_NAME_KEY
 from pm4py.objects.petri_net.utils.synchronous_product import (
     construct_cost_aware,
     construct,
+    construct_sync_costs,
 )
 from pm4py.objects.petri_net.utils.petri_utils import (
     construct_trace_net_cost_aware,
-    decorate_places_preset_trans,
-    decorate_transitions_prepostset,
 )
 from pm4py.objects.petri_net.utils import align_utils as utils
+from pm4py.objects.petri_net.utils import compiled_net
 from pm4py.util import exec_utils
-from copy import copy
 from enum import Enum
 import sys
 from pm4py.util.constants import PARAMETER_CONSTANT_ACTIVITY_KEY
@@ -61,6 +61,9 @@ class Parameters(Enum):
     PARAMETER_VARIANT_DELIMITER = "variant_delimiter"
     ACTIVITY_KEY = PARAMETER_CONSTANT_ACTIVITY_KEY
     VARIANTS_IDX = "variants_idx"
+    COMPILED_MODEL = "compiled_model"
+    SEARCH_STATISTICS = "search_statistics"
+    OPEN_SET_SAMPLING = "open_set_sampling"
 
 
 def get_best_worst_cost(
@@ -97,6 +100,54 @@ def get_best_worst_cost(
     return None
 
 
+def compile_model(
+    petri_net: PetriNet,
+    initial_marking: Marking,
+    final_marking: Marking,
+    parameters: Optional[Dict[Union[str, Parameters], Any]] = None,
+) -> compiled_net.CompiledModel:
+    """
+    Pre-computes the model-side part of the synchronous product, to be shared by the alignments of several traces
+    against the same model (passing it as Parameters.COMPILED_MODEL)
+
+    Parameters
+    -------------
+    petri_net
+        Petri net
+    initial_marking
+        Initial marking
+    final_marking
+        Final marking
+    parameters
+        Parameters of the algorithm, including:
+        - Parameters.PARAM_MODEL_COST_FUNCTION => model cost function
+        - Parameters.PARAM_SYNC_COST_FUNCTION => synchronous cost function
+
+    Returns
+    -------------
+    compiled_model
+        Compiled model
+    """
+    if parameters is None:
+        parameters = {}
+
+    model_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_MODEL_COST_FUNCTION, parameters, None
+    )
+    sync_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_SYNC_COST_FUNCTION, parameters, None
+    )
+
+    return compiled_net.CompiledModel(
+        petri_net,
+        initial_marking,
+        final_marking,
+        model_cost_function=model_cost_function,
+        sync_cost_function=sync_cost_function,
+        skip=utils.SKIP,
+    )
+
+
 def apply(
     trace: Trace,
     petri_net: PetriNet,
@@ -121,6 +172,13 @@ def apply(
         Parameters.PARAM_SYNC_COST_FUNCTION: :class:`dict` (parameter) mapping of each transition in the model to corresponding
         synchronous costs
         Parameters.ACTIVITY_KEY: :class:`str` (parameter) key to use to identify the activity described by the events
+        Parameters.COMPILED_MODEL: :class:`pm4py.objects.petri_net.utils.compiled_net.CompiledModel` (parameter)
+        model-side part of the synchronous product (see :func:`compile_model`), stitched to the trace instead of
+        building the synchronous product from scratch
+        Parameters.SEARCH_STATISTICS: :class:`bool` (parameter) instrument the search, returning the recorded
+        statistics under the **search_statistics** key
+        Parameters.OPEN_SET_SAMPLING: :class:`int` (parameter) number of expanded states between two records of
+        the size of the open set
 
     Returns
     -------
@@ -132,6 +190,9 @@ def apply(
     activity_key = exec_utils.get_param_value(
         Parameters.ACTIVITY_KEY, parameters, DEFAULT_NAME_KEY
     )
+    compiled_model = exec_utils.get_param_value(
+        Parameters.COMPILED_MODEL, parameters, None
+    )
     trace_cost_function = exec_utils.get_param_value(
         Parameters.PARAM_TRACE_COST_FUNCTION, parameters, None
     )
@@ -166,6 +227,41 @@ def apply(
         parameters[Parameters.PARAM_MODEL_COST_FUNCTION] = model_cost_function
         parameters[Parameters.PARAM_SYNC_COST_FUNCTION] = sync_cost_function
 
+    if (
+        compiled_model is not None
+        and trace_net_constr_function is None
+        and trace_net_cost_aware_constr_function
+        is construct_trace_net_cost_aware
+    ):
+        sync_prod, cost_vec = compiled_model.stitch(
+            [e[activity_key] for e in trace], trace_cost_function
+        )
+        ret_tuple_as_trans_desc = exec_utils.get_param_value(
+            Parameters.PARAM_ALIGNMENT_RESULT_IS_SYNC_PROD_AWARE,
+            parameters,
+            False,
+        )
+        max_align_time_trace = exec_utils.get_param_value(
+            Parameters.PARAM_MAX_ALIGN_TIME_TRACE, parameters, sys.maxsize
+        )
+        search_statistics = exec_utils.get_param_value(
+            Parameters.SEARCH_STATISTICS, parameters, False
+        )
+        open_set_sampling = exec_utils.get_param_value(
+            Parameters.OPEN_SET_SAMPLING,
+            parameters,
+            instrumentation.DEFAULT_OPEN_SET_SAMPLING,
+        )
+        return __search_compiled(
+            sync_prod,
+            cost_vec,
+            ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
+            max_align_time_trace=max_align_time_trace,
+            instrumentation=instrumentation.get_instrumentation(
+                search_statistics, open_set_sampling
+            ),
+        )
+
     if trace_net_constr_function is not None:
         # keep the possibility to pass TRACE_NET_CONSTR_FUNCTION in this old
         # version
@@ -400,13 +496,9 @@ def apply_trace_net(
             sync_prod, utils.SKIP
         )
     else:
-        revised_sync = dict()
-        for t_trace in trace_net.transitions:
-            for t_model in petri_net.transitions:
-                if t_trace.label == t_model.label:
-                    revised_sync[(t_trace, t_model)] = sync_cost_function[
-                        t_model
-                    ]
+        revised_sync = construct_sync_costs(
+            trace_net, petri_net, sync_cost_function
+        )
 
         sync_prod, sync_initial_marking, sync_final_marking, cost_function = (
             construct_cost_aware(
@@ -426,6 +518,14 @@ def apply_trace_net(
     max_align_time_trace = exec_utils.get_param_value(
         Parameters.PARAM_MAX_ALIGN_TIME_TRACE, parameters, sys.maxsize
     )
+    search_statistics = exec_utils.get_param_value(
+        Parameters.SEARCH_STATISTICS, parameters, False
+    )
+    open_set_sampling = exec_utils.get_param_value(
+        Parameters.OPEN_SET_SAMPLING,
+        parameters,
+        instrumentation.DEFAULT_OPEN_SET_SAMPLING,
+    )
 
     return apply_sync_prod(
         sync_prod,
@@ -435,6 +535,8 @@ def apply_trace_net(
         utils.SKIP,
         ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
         max_align_time_trace=max_align_time_trace,
+        search_statistics=search_statistics,
+        open_set_sampling=open_set_sampling,
     )
 
 
@@ -446,6 +548,8 @@ def apply_sync_prod(
     skip,
     ret_tuple_as_trans_desc=False,
     max_align_time_trace=sys.maxsize,
+    search_statistics=False,
+    open_set_sampling=instrumentation.DEFAULT_OPEN_SET_SAMPLING,
 ):
     return __search(
         sync_prod,
@@ -455,6 +559,9 @@ def apply_sync_prod(
         skip,
         ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
         max_align_time_trace=max_align_time_trace,
+        instrumentation=instrumentation.get_instrumentation(
+            search_statistics, open_set_sampling
+        ),
     )
 
 
@@ -466,78 +573,116 @@ def __search(
     skip,
     ret_tuple_as_trans_desc=False,
     max_align_time_trace=sys.maxsize,
+    instrumentation=None,
+):
+    compiled = compiled_net.construct(sync_net, ini, fin)
+
+    return __search_compiled(
+        compiled,
+        compiled.cost_vector(cost_function),
+        ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
+        max_align_time_trace=max_align_time_trace,
+        instrumentation=instrumentation,
+    )
+
+
+def __search_compiled(
+    compiled,
+    trans_costs,
+    ret_tuple_as_trans_desc=False,
+    max_align_time_trace=sys.maxsize,
+    instrumentation=None,
 ):
     start_time = time.time()
+    # instrumentation (when enabled): every measured operation is
+    # guarded by a single check
+    stats = instrumentation
+    perf_counter = time.perf_counter
 
-    decorate_transitions_prepostset(sync_net)
-    decorate_places_preset_trans(sync_net)
+    ordered_transitions = compiled.ordered_transitions
+    fin_m = compiled.fin
 
     closed = set()
 
-    ini_state = utils.DijkstraSearchTuple(0, ini, None, None, 0)
+    ini_state = utils.DijkstraSearchTuple(0, compiled.ini, None, None, 0)
     open_set = [ini_state]
     heapq.heapify(open_set)
     visited = 0
     queued = 0
     traversed = 0
 
-    trans_empty_preset = set(
-        t for t in sync_net.transitions if len(t.in_arcs) == 0
-    )
-
     while not len(open_set) == 0:
         if (time.time() - start_time) > max_align_time_trace:
             return None
 
+        if stats is not None:
+            t0 = perf_counter()
         curr = heapq.heappop(open_set)
+        if stats is not None:
+            t1 = perf_counter()
+            stats.heap_time += t1 - t0
 
         current_marking = curr.m
         already_closed = current_marking in closed
+        if stats is not None:
+            stats.closed_time += perf_counter() - t1
         if already_closed:
             continue
 
-        if current_marking == fin:
+        if current_marking == fin_m:
             # from pympler.asizeof import asizeof
             # from pm4py.util import measurements
             # measurements.Measurements.ALIGN_TIME.append(asizeof(open_set))
-            return utils.__reconstruct_alignment(
+            alignment = utils.__reconstruct_alignment(
                 curr,
                 visited,
                 queued,
                 traversed,
                 ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
             )
+            if stats is not None:
+                stats.record_goal(curr)
+                alignment["search_statistics"] = stats.to_dict()
+            return alignment
 
+        if stats is not None:
+            t0 = perf_counter()
         closed.add(current_marking)
         visited += 1
-
-        enabled_trans = copy(trans_empty_preset)
-        for p in current_marking:
-            for t in p.ass_trans:
-                if t.sub_marking <= current_marking:
-                    enabled_trans.add(t)
-
-        trans_to_visit_with_cost = [
-            (t, cost_function[t])
-            for t in enabled_trans
-            if not (
-                t is not None
-                and utils.__is_log_move(t, skip)
-                and utils.__is_model_move(t, skip)
-            )
-        ]
-
-        for t, cost in trans_to_visit_with_cost:
+        if stats is not None:
+            stats.closed_time += perf_counter() - t0
+            stats.sample_open_set(visited, len(open_set))
+            t0 = perf_counter()
+            enabled = compiled.enabled_transitions(current_marking)
+            stats.successors_time += perf_counter() - t0
+        else:
+            enabled = compiled.enabled_transitions(current_marking)
+
+        for t_idx in enabled:
             traversed += 1
-            new_marking = utils.add_markings(current_marking, t.add_marking)
+            if stats is not None:
+                t0 = perf_counter()
+                new_marking = compiled.fire(t_idx, current_marking)
+                t1 = perf_counter()
+                already_closed = new_marking in closed
+                stats.successors_time += t1 - t0
+                stats.closed_time += perf_counter() - t1
+            else:
+                new_marking = compiled.fire(t_idx, current_marking)
+                already_closed = new_marking in closed
 
-            if new_marking in closed:
+            if already_closed:
                 continue
 
             queued += 1
 
+            t = ordered_transitions[t_idx]
             tp = utils.DijkstraSearchTuple(
-                curr.g + cost, new_marking, curr, t, curr.l + 1
+                curr.g + trans_costs[t_idx], new_marking, curr, t, curr.l + 1
             )
 
+            if stats is not None:
+                t0 = perf_counter()
             heapq.heappush(open_set, tp)
+            if stats is not None:
+                stats.heap_time += perf_counter() - t0
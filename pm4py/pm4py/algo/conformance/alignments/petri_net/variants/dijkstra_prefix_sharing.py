@@ -0,0 +1,490 @@
+'''
+    PM4Py – A Process Mining Library for Python
+Copyright (C) 2024 Process Intelligence Solutions UG (haftungsbeschränkt)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see this software project's root or
+visit <https://www.gnu.org/licenses/>.
+
+Website: https://processintelligence.solutions
+Contact: info@processintelligence.solutions
+'''
+"""
+Batched alignment of several traces against the same model, sharing the search effort among the traces having a
+common prefix.
+
+The search is a Dijkstra search on the states (marking of the model, position in the trace) of the synchronous
+product. A state whose position is at most k can only be reached through the first k events of the trace, hence
+its optimal cost is the same for every trace starting with those k events. The traces are visited depth-first on
+their prefix trie (i.e. in lexicographic order of their activities), and the search of every trace starts from the
+closed set and the frontier left by the previous one, restricted to the states lying in the prefix that the two
+traces share. Since all the closed states have their optimal cost and all their arcs have been relaxed, this is a
+valid intermediate state of the Dijkstra search on the new trace, and the costs of the alignments are the same
+obtained by aligning each trace on its own.
+"""
+import heapq
+import sys
+import time
+from enum import Enum
+from typing import Optional, Dict, Any, Union, List, Iterator, Tuple
+
+from pm4py.algo.conformance.alignments.petri_net.utils import instrumentation
+from pm4py.objects.log import obj as log_implementation
+from pm4py.objects.log.obj import Trace
+from pm4py.objects.petri_net.obj import PetriNet, Marking
+from pm4py.objects.petri_net.utils import align_utils as utils
+from pm4py.objects.petri_net.utils import compiled_net
+from pm4py.util import exec_utils
+from pm4py.util import typing
+from pm4py.util.constants import PARAMETER_CONSTANT_ACTIVITY_KEY
+from pm4py.util.xes_constants import DEFAULT_NAME_KEY
+
+
+class Parameters(Enum):
+    PARAM_TRACE_COST_FUNCTION = "trace_cost_function"
+    PARAM_MODEL_COST_FUNCTION = "model_cost_function"
+    PARAM_SYNC_COST_FUNCTION = "sync_cost_function"
+    PARAM_ALIGNMENT_RESULT_IS_SYNC_PROD_AWARE = "ret_tuple_as_trans_desc"
+    PARAM_MAX_ALIGN_TIME_TRACE = "max_align_time_trace"
+    PARAM_MAX_ALIGN_TIME = "max_align_time"
+    ACTIVITY_KEY = PARAMETER_CONSTANT_ACTIVITY_KEY
+    COMPILED_MODEL = "compiled_model"
+    SEARCH_STATISTICS = "search_statistics"
+    OPEN_SET_SAMPLING = "open_set_sampling"
+
+
+def get_best_worst_cost(
+    petri_net, initial_marking, final_marking, parameters=None
+):
+    """
+    Gets the best worst cost of an alignment
+
+    Parameters
+    -----------
+    petri_net
+        Petri net
+    initial_marking
+        Initial marking
+    final_marking
+        Final marking
+
+    Returns
+    -----------
+    best_worst_cost
+        Best worst cost of alignment
+    """
+    if parameters is None:
+        parameters = {}
+    trace = log_implementation.Trace()
+
+    best_worst = apply(
+        trace, petri_net, initial_marking, final_marking, parameters=parameters
+    )
+
+    if best_worst is not None:
+        return best_worst["cost"]
+
+    return None
+
+
+def compile_model(
+    petri_net: PetriNet,
+    initial_marking: Marking,
+    final_marking: Marking,
+    parameters: Optional[Dict[Union[str, Parameters], Any]] = None,
+) -> compiled_net.CompiledModel:
+    """
+    Pre-computes the model-side part of the synchronous product, to be shared by the alignments of several traces
+    against the same model (passing it as Parameters.COMPILED_MODEL)
+
+    Parameters
+    -------------
+    petri_net
+        Petri net
+    initial_marking
+        Initial marking
+    final_marking
+        Final marking
+    parameters
+        Parameters of the algorithm, including:
+        - Parameters.PARAM_MODEL_COST_FUNCTION => model cost function
+        - Parameters.PARAM_SYNC_COST_FUNCTION => synchronous cost function
+
+    Returns
+    -------------
+    compiled_model
+        Compiled model
+    """
+    if parameters is None:
+        parameters = {}
+
+    model_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_MODEL_COST_FUNCTION, parameters, None
+    )
+    sync_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_SYNC_COST_FUNCTION, parameters, None
+    )
+
+    return compiled_net.CompiledModel(
+        petri_net,
+        initial_marking,
+        final_marking,
+        model_cost_function=model_cost_function,
+        sync_cost_function=sync_cost_function,
+        skip=utils.SKIP,
+    )
+
+
+def apply(
+    trace: Trace,
+    petri_net: PetriNet,
+    initial_marking: Marking,
+    final_marking: Marking,
+    parameters: Optional[Dict[Union[str, Parameters], Any]] = None,
+) -> typing.AlignmentResult:
+    """
+    Performs the alignment of a single trace (no sharing is possible).
+
+    Parameters
+    ----------
+    trace: :class:`list` input trace, assumed to be a list of events (i.e. the code will use the activity key
+    to get the attributes)
+    petri_net: :class:`pm4py.objects.petri.net.PetriNet` the Petri net to use in the alignment
+    initial_marking: :class:`pm4py.objects.petri.net.Marking` initial marking in the Petri net
+    final_marking: :class:`pm4py.objects.petri.net.Marking` final marking in the Petri net
+    parameters: :class:`dict` (optional) dictionary containing the same parameters of :func:`apply_batch`
+
+    Returns
+    -------
+    dictionary: `dict` with keys **alignment**, **cost**, **visited_states**, **queued_states** and **traversed_arcs**
+    """
+    if parameters is None:
+        parameters = {}
+
+    trace_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_TRACE_COST_FUNCTION, parameters, None
+    )
+    if trace_cost_function is None:
+        parameters[Parameters.PARAM_TRACE_COST_FUNCTION] = list(
+            map(lambda e: utils.STD_MODEL_LOG_MOVE_COST, trace)
+        )
+
+    for index, alignment in apply_batch(
+        [trace],
+        petri_net,
+        initial_marking,
+        final_marking,
+        parameters=parameters,
+    ):
+        return alignment
+
+
+def apply_batch(
+    traces: List[Trace],
+    petri_net: PetriNet,
+    initial_marking: Marking,
+    final_marking: Marking,
+    parameters: Optional[Dict[Union[str, Parameters], Any]] = None,
+) -> Iterator[Tuple[int, typing.AlignmentResult]]:
+    """
+    Aligns a batch of traces against the same model, sharing the search on their common prefixes.
+
+    Parameters
+    ----------
+    traces
+        Traces to align (typically, one per variant)
+    petri_net
+        Petri net
+    initial_marking
+        Initial marking
+    final_marking
+        Final marking
+    parameters
+        Parameters of the algorithm, including:
+        - Parameters.ACTIVITY_KEY => attribute of the events to use as activity
+        - Parameters.PARAM_TRACE_COST_FUNCTION => cost of the log move of each index of the traces
+        - Parameters.PARAM_MODEL_COST_FUNCTION => model cost function
+        - Parameters.PARAM_SYNC_COST_FUNCTION => synchronous cost function
+        - Parameters.PARAM_ALIGNMENT_RESULT_IS_SYNC_PROD_AWARE => return the names and labels of the transitions
+        - Parameters.PARAM_MAX_ALIGN_TIME_TRACE => maximum time (in seconds) to align a trace
+        - Parameters.PARAM_MAX_ALIGN_TIME => maximum time (in seconds) to align the batch
+        - Parameters.COMPILED_MODEL => compiled model (see :func:`compile_model`)
+        - Parameters.SEARCH_STATISTICS => instrument the searches, returning the recorded statistics under the
+        "search_statistics" key of the alignments
+        - Parameters.OPEN_SET_SAMPLING => number of expanded states between two records of the size of the open set
+
+    Returns
+    -------
+    alignments
+        Generator of couples (index of the trace in the batch, alignment), in the order in which the alignments are
+        computed. An alignment is None if its search exceeded the time limit.
+    """
+    if parameters is None:
+        parameters = {}
+
+    activity_key = exec_utils.get_param_value(
+        Parameters.ACTIVITY_KEY, parameters, DEFAULT_NAME_KEY
+    )
+    trace_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_TRACE_COST_FUNCTION, parameters, None
+    )
+    ret_tuple_as_trans_desc = exec_utils.get_param_value(
+        Parameters.PARAM_ALIGNMENT_RESULT_IS_SYNC_PROD_AWARE, parameters, False
+    )
+    max_align_time = exec_utils.get_param_value(
+        Parameters.PARAM_MAX_ALIGN_TIME, parameters, sys.maxsize
+    )
+    max_align_time_trace = exec_utils.get_param_value(
+        Parameters.PARAM_MAX_ALIGN_TIME_TRACE, parameters, sys.maxsize
+    )
+    compiled_model = exec_utils.get_param_value(
+        Parameters.COMPILED_MODEL, parameters, None
+    )
+    if compiled_model is None:
+        compiled_model = compile_model(
+            petri_net, initial_marking, final_marking, parameters=parameters
+        )
+    search_statistics = exec_utils.get_param_value(
+        Parameters.SEARCH_STATISTICS, parameters, False
+    )
+    open_set_sampling = exec_utils.get_param_value(
+        Parameters.OPEN_SET_SAMPLING,
+        parameters,
+        instrumentation.DEFAULT_OPEN_SET_SAMPLING,
+    )
+
+    sequences = [tuple(e[activity_key] for e in trace) for trace in traces]
+    # depth-first visit of the prefix trie
+    order = sorted(range(len(sequences)), key=lambda i: sequences[i])
+
+    start_time = time.time()
+    closed = {}
+    open_set = []
+    previous = None
+
+    for index in order:
+        labels = sequences[index]
+        if trace_cost_function is not None:
+            costs = trace_cost_function
+        else:
+            costs = [utils.STD_MODEL_LOG_MOVE_COST] * len(labels)
+
+        shared = -1
+        if previous is not None:
+            shared = 0
+            while (
+                shared < len(labels)
+                and shared < len(previous)
+                and labels[shared] == previous[shared]
+            ):
+                shared += 1
+        closed, open_set = __restrict(closed, open_set, shared)
+        previous = labels
+
+        this_max_align_time = min(
+            max_align_time_trace,
+            (max_align_time - (time.time() - start_time)) * 0.5,
+        )
+        alignment = __search(
+            compiled_model,
+            labels,
+            costs,
+            closed,
+            open_set,
+            shared,
+            ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
+            max_align_time_trace=this_max_align_time,
+            instrumentation=instrumentation.get_instrumentation(
+                search_statistics, open_set_sampling
+            ),
+        )
+        yield index, alignment
+
+
+def __restrict(closed, open_set, shared):
+    """
+    Keeps the part of the search lying in the first 'shared' events (all of it is discarded when shared is -1)
+    """
+    if shared < 0:
+        return {}, []
+    closed = {s: n for s, n in closed.items() if s[1] <= shared}
+    open_set = [n for n in open_set if n.m[1] <= shared]
+    heapq.heapify(open_set)
+    return closed, open_set
+
+
+def __search(
+    compiled_model,
+    labels,
+    costs,
+    closed,
+    open_set,
+    shared,
+    ret_tuple_as_trans_desc=False,
+    max_align_time_trace=sys.maxsize,
+    instrumentation=None,
+):
+    start_time = time.time()
+    # instrumentation (when enabled): every measured operation is
+    # guarded by a single check
+    stats = instrumentation
+    perf_counter = time.perf_counter
+
+    model = compiled_model.net
+    skip = compiled_model.skip
+    model_moves = compiled_model.model_moves
+    model_move_costs = compiled_model.model_move_costs
+    sync_costs = compiled_model.sync_costs
+    model_transitions = model.ordered_transitions
+    n_events = len(labels)
+
+    # log move and synchronous moves (model transition, transition of the
+    # synchronous product) available for each event of the trace
+    log_moves = []
+    sync_moves = []
+    for i, label in enumerate(labels):
+        trace_name = "t_" + label + "_" + str(i)
+        log_moves.append(
+            compiled_net.CompiledTransition((trace_name, skip), (label, skip))
+        )
+        sync_moves.append(
+            [
+                (
+                    j,
+                    compiled_net.CompiledTransition(
+                        (trace_name, model_transitions[j].name),
+                        (label, model_transitions[j].label),
+                    ),
+                )
+                for j in compiled_model.label_index.get(label, ())
+            ]
+        )
+
+    visited = 0
+    queued = 0
+    traversed = 0
+
+    def expand_trace(curr):
+        nonlocal queued, traversed
+        m, i = curr.m
+        successors = [(curr.g + costs[i], (m, i + 1), log_moves[i])]
+        for j, t in sync_moves[i]:
+            if model.is_enabled(j, m):
+                successors.append(
+                    (curr.g + sync_costs[j], (model.fire(j, m), i + 1), t)
+                )
+        for g, new_state, t in successors:
+            traversed += 1
+            if new_state in closed:
+                continue
+            queued += 1
+            if stats is not None:
+                t1 = perf_counter()
+            heapq.heappush(
+                open_set,
+                utils.DijkstraSearchTuple(g, new_state, curr, t, curr.l + 1),
+            )
+            if stats is not None:
+                stats.heap_time += perf_counter() - t1
+
+    if shared < 0:
+        heapq.heappush(
+            open_set,
+            utils.DijkstraSearchTuple(0, (model.ini, 0), None, None, 0),
+        )
+    elif shared < n_events:
+        # the closed states at the end of the shared prefix have not been
+        # expanded with the next event of this trace yet
+        for state, node in list(closed.items()):
+            if state[1] == shared:
+                expand_trace(node)
+
+    def reconstruct(curr):
+        alignment = utils.__reconstruct_alignment(
+            curr,
+            visited,
+            queued,
+            traversed,
+            ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
+        )
+        if stats is not None:
+            stats.record_goal(curr)
+            alignment["search_statistics"] = stats.to_dict()
+        return alignment
+
+    goal = (model.fin, n_events)
+    if goal in closed:
+        return reconstruct(closed[goal])
+
+    while not len(open_set) == 0:
+        if (time.time() - start_time) > max_align_time_trace:
+            return None
+
+        if stats is not None:
+            t0 = perf_counter()
+        curr = heapq.heappop(open_set)
+        if stats is not None:
+            t1 = perf_counter()
+            stats.heap_time += t1 - t0
+
+        state = curr.m
+        already_closed = state in closed
+        if not already_closed:
+            closed[state] = curr
+        if stats is not None:
+            stats.closed_time += perf_counter() - t1
+        if already_closed:
+            continue
+        visited += 1
+
+        if state == goal:
+            return reconstruct(curr)
+
+        if stats is not None:
+            stats.sample_open_set(visited, len(open_set))
+            t0 = perf_counter()
+            heap_time = stats.heap_time
+
+        m, i = state
+        for j in model.enabled_transitions(m):
+            traversed += 1
+            new_state = (model.fire(j, m), i)
+            if new_state in closed:
+                continue
+            queued += 1
+            if stats is not None:
+                t1 = perf_counter()
+            heapq.heappush(
+                open_set,
+                utils.DijkstraSearchTuple(
+                    curr.g + model_move_costs[j],
+                    new_state,
+                    curr,
+                    model_moves[j],
+                    curr.l + 1,
+                ),
+            )
+            if stats is not None:
+                stats.heap_time += perf_counter() - t1
+
+        if i < n_events:
+            expand_trace(curr)
+
+        if stats is not None:
+            # successor generation, including the lookups in the closed set
+            # of the new states
+            stats.successors_time += (
+                perf_counter() - t0 - (stats.heap_time - heap_time)
+            )
+
+    return None
@@ -25,10 +25,11 @@ from pm4py import util as pm4pyutil
 from pm4py.objects import petri_net
 from pm4py.objects.log import obj as log_implementation
 from pm4py.util.xes_constants import DEFAULT_NAME_KEY
-from pm4py.objects.petri_net.utils.synchronous_product import construct, construct_cost_aware
+from pm4py.objects.petri_net.utils.synchronous_product import construct, construct_cost_aware, construct_sync_costs
 from pm4py.objects.petri_net.utils.petri_utils import construct_trace_net_cost_aware, decorate_places_preset_trans, \
     decorate_transitions_prepostset
 from pm4py.objects.petri_net.utils import align_utils as utils
+from pm4py.objects.petri_net.utils import compiled_net
 from pm4py.util import exec_utils
 from copy import copy
 from enum import Enum
@@ -58,6 +59,7 @@ class Parameters(Enum):
     VARIANTS_IDX = "variants_idx"
     SYNCHRONOUS = "synchronous_dijkstra"
     EXPONENT="exponent"
+    COMPILED_MODEL = "compiled_model"
 
 
 def get_best_worst_cost(petri_net, initial_marking, final_marking, parameters=None):
@@ -89,6 +91,30 @@ def get_best_worst_cost(petri_net, initial_marking, final_marking, parameters=No
     return 0
 
 
+def compile_model(petri_net, initial_marking, final_marking, parameters=None):
+    """
+    Pre-computes the model-side part of the synchronous product, to be shared by the alignments of several traces
+    against the same model (passing it as Parameters.COMPILED_MODEL). Used only by the synchronous version.
+
+    Parameters
+    -------------
+    petri_net
+        Petri net
+    initial_marking
+        Initial marking
+    final_marking
+        Final marking
+    parameters
+        Parameters of the algorithm
+
+    Returns
+    -------------
+    compiled_model
+        Compiled model
+    """
+    return compiled_net.CompiledModel(petri_net, initial_marking, final_marking, skip=utils.SKIP)
+
+
 def apply(trace, petri_net, initial_marking, final_marking, parameters=None):
     """
     Performs the basic alignment search, given a trace and a net.
@@ -107,6 +133,9 @@ def apply(trace, petri_net, initial_marking, final_marking, parameters=None):
         Parameters.PARAM_SYNC_COST_FUNCTION: :class:`dict` (parameter) mapping of each transition in the model to corresponding
         synchronous costs
         Parameters.ACTIVITY_KEY: :class:`str` (parameter) key to use to identify the activity described by the events
+        Parameters.COMPILED_MODEL: :class:`pm4py.objects.petri_net.utils.compiled_net.CompiledModel` (parameter)
+        model-side part of the synchronous product (see :func:`compile_model`), stitched to the trace instead of
+        building the synchronous product from scratch
 
     Returns
     -------
@@ -144,6 +173,20 @@ def apply(trace, petri_net, initial_marking, final_marking, parameters=None):
             parameters[Parameters.PARAM_MODEL_COST_FUNCTION] = model_cost_function
             parameters[Parameters.PARAM_SYNC_COST_FUNCTION] = sync_cost_function
 
+        compiled_model = exec_utils.get_param_value(Parameters.COMPILED_MODEL, parameters, None)
+        if compiled_model is not None and trace_net_constr_function is None and \
+                trace_net_cost_aware_constr_function is construct_trace_net_cost_aware:
+            sync_prod, _ = compiled_model.stitch([e[activity_key] for e in trace], trace_cost_function)
+            ret_tuple_as_trans_desc = exec_utils.get_param_value(Parameters.PARAM_ALIGNMENT_RESULT_IS_SYNC_PROD_AWARE,
+                                                                 parameters, False)
+            max_align_time_trace = exec_utils.get_param_value(Parameters.PARAM_MAX_ALIGN_TIME_TRACE, parameters,
+                                                              sys.maxsize)
+            expo = exec_utils.get_param_value(Parameters.EXPONENT, parameters, None)
+            if expo is None:
+                expo = 2
+            return __search_compiled_with_synchr(sync_prod, ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
+                                                 max_align_time_trace=max_align_time_trace, expo=expo)
+
         if trace_net_constr_function is not None:
             # keep the possibility to pass TRACE_NET_CONSTR_FUNCTION in this old version
             trace_net, trace_im, trace_fm = trace_net_constr_function(trace, activity_key=activity_key)
@@ -311,11 +354,9 @@ def apply_trace_net(petri_net, initial_marking, final_marking, trace_net, trace_
                                                                         utils.SKIP)
         cost_function = utils.construct_standard_cost_function(sync_prod, utils.SKIP)
     else:
-        revised_sync = dict()
-        for t_trace in trace_net.transitions:
-            for t_model in petri_net.transitions:
-                if t_trace.label == t_model.label:
-                    revised_sync[(t_trace, t_model)] = sync_cost_function[t_model]
+        revised_sync = construct_sync_costs(
+            trace_net, petri_net, sync_cost_function
+        )
 
         sync_prod, sync_initial_marking, sync_final_marking, cost_function = construct_cost_aware(
             trace_net, trace_im, trace_fm, petri_net, initial_marking, final_marking, utils.SKIP,
@@ -346,13 +387,19 @@ def __search_with_synchr(sync_net, ini, fin, skip, ret_tuple_as_trans_desc=False
     Other parameters:
     ali.Parameters.EXPONENT:2 (change the base of the log)
     '''
+    compiled = compiled_net.construct(sync_net, ini, fin)
+    return __search_compiled_with_synchr(compiled, ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
+                                         max_align_time_trace=max_align_time_trace, expo=expo)
+
+
+def __search_compiled_with_synchr(compiled, ret_tuple_as_trans_desc=False, max_align_time_trace=sys.maxsize, expo=2):
     start_time = time.time()
-    decorate_transitions_prepostset(sync_net)
-    decorate_places_preset_trans(sync_net)
+    ordered_transitions = compiled.ordered_transitions
+    fin_m = compiled.fin
     closed = {}
 
 
-    ini_state = utils.DijkstraSearchTuple(0, ini, None, None, 0)
+    ini_state = utils.DijkstraSearchTuple(0, compiled.ini, None, None, 0)
     open_set = [ini_state]
     heapq.heapify(open_set)
     visited = 0
@@ -367,8 +414,6 @@ def __search_with_synchr(sync_net, ini, fin, skip, ret_tuple_as_trans_desc=False
         else :
             return 0
 
-    trans_empty_preset = set(t for t in sync_net.transitions if len(t.in_arcs) == 0)
-
     while not len(open_set) == 0:
         if (time.time() - start_time) > max_align_time_trace:
             return None
@@ -376,37 +421,30 @@ def __search_with_synchr(sync_net, ini, fin, skip, ret_tuple_as_trans_desc=False
         curr = heapq.heappop(open_set)
 
         current_marking = curr.m
-        already_closed = current_marking in closed.keys()
+        already_closed = current_marking in closed
 
         if already_closed  :
             continue
 
-        if current_marking == fin:
+        if current_marking == fin_m:
             return utils.__reconstruct_alignment(curr, visited, queued, traversed,
                                                  ret_tuple_as_trans_desc=ret_tuple_as_trans_desc)
 
         closed[current_marking]=curr.l
         visited += 1
 
-        possible_enabling_transitions = copy(trans_empty_preset)
-        for p in current_marking:
-            for t in p.ass_trans:
-                possible_enabling_transitions.add(t)
-
-        enabled_trans = [t for t in possible_enabling_transitions if t.sub_marking <= current_marking]
-        trans_to_visit_with_cost = [(t, cost_function(t,curr.l,expo)) for t in enabled_trans if  t is not None ]
-
-        for t, cost in trans_to_visit_with_cost:
+        for t_idx in compiled.enabled_transitions(current_marking):
             traversed += 1
-            new_marking = utils.add_markings(current_marking, t.add_marking)
+            new_marking = compiled.fire(t_idx, current_marking)
 
-            already_closed = new_marking in closed.keys()
+            already_closed = new_marking in closed
             if already_closed:
                 continue
 
             queued += 1
 
-            tp = utils.DijkstraSearchTuple(curr.g + cost, new_marking, curr, t, curr.l + 1)
+            t = ordered_transitions[t_idx]
+            tp = utils.DijkstraSearchTuple(curr.g + cost_function(t, curr.l, expo), new_marking, curr, t, curr.l + 1)
 
             heapq.heappush(open_set, tp)
 
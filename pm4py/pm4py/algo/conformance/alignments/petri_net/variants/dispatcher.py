@@ -0,0 +1,538 @@
+'''
+    PM4Py – A Process Mining Library for Python
+Copyright (C) 2024 Process Intelligence Solutions UG (haftungsbeschränkt)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see this software project's root or
+visit <https://www.gnu.org/licenses/>.
+
+Website: https://processintelligence.solutions
+Contact: info@processintelligence.solutions
+'''
+"""
+Dispatcher variant of the alignments: for every trace, a (learned) selector chooses which alignment variant (and
+heuristic) among a set of candidates is used.
+
+For every trace, a feature vector is extracted (cheap model features, computed once per model, and trace features,
+see :func:`get_features`) and handed to the classifier, which ranks the candidates. The trace is aligned by the
+first candidate of the ranking; when a fallback timeout is set and the first candidate exceeds it, the trace is
+aligned by the second one.
+The classifier can be:
+
+- an object exposing predict_proba (e.g. a scikit-learn classifier), whose classes are indexes or names
+  (see :func:`pm4py.algo.conformance.alignments.petri_net.utils.portfolio.get_contender_name`) of the candidates;
+- an object exposing predict (e.g. a scikit-learn regressor/classifier), a torch module or a callable, returning
+  either a candidate (index or name) or a score per candidate (the higher the better, or, with
+  Parameters.CLASSIFIER_OUTPUT set to "runtimes", a predicted runtime per candidate, the lower the better);
+- the path of a pickled object of the previous kinds (or of a torch module saved by torch.save).
+
+Every alignment carries a **dispatch** record (features, ranking, chosen candidate, predicted and actual runtime,
+fallback), that is also sent to the sink given by Parameters.DISPATCH_LOG, so that the regret of the selection can
+be measured.
+"""
+import json
+import os
+import pickle
+import sys
+import time
+from collections import Counter
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from pm4py.algo.conformance.alignments.petri_net.utils import portfolio
+from pm4py.objects.log.obj import Trace
+from pm4py.objects.petri_net.obj import PetriNet, Marking
+from pm4py.util import exec_utils
+from pm4py.util.constants import PARAMETER_CONSTANT_ACTIVITY_KEY
+from pm4py.util.xes_constants import DEFAULT_NAME_KEY
+
+# candidates used when no candidate is provided
+DEFAULT_CANDIDATES = portfolio.DEFAULT_PORTFOLIO
+
+MODEL_FEATURES = [
+    "places",
+    "transitions",
+    "silent_transitions",
+    "labels",
+    "duplicate_labels",
+    "arcs",
+    "xor_splits",
+    "and_splits",
+]
+TRACE_FEATURES = [
+    "trace_length",
+    "distinct_activities",
+    "unmatched_events_ratio",
+    "repetition_ratio",
+    "max_activity_occurrences",
+]
+FEATURE_NAMES = MODEL_FEATURES + TRACE_FEATURES
+
+
+class Parameters(Enum):
+    CANDIDATES = "candidates"
+    CLASSIFIER = "classifier"
+    CLASSIFIER_OUTPUT = "classifier_output"
+    FEATURE_FUNCTION = "feature_function"
+    FALLBACK_TIMEOUT = "fallback_timeout"
+    DISPATCH_LOG = "dispatch_log"
+    COMPILED_MODEL = "compiled_model"
+    PARAM_MAX_ALIGN_TIME_TRACE = "max_align_time_trace"
+    PARAM_TRACE_COST_FUNCTION = "trace_cost_function"
+    ACTIVITY_KEY = PARAMETER_CONSTANT_ACTIVITY_KEY
+
+
+__DISPATCHER_PARAMETERS = {
+    p.value
+    for p in Parameters
+    if p
+    not in (
+        Parameters.ACTIVITY_KEY,
+        Parameters.PARAM_MAX_ALIGN_TIME_TRACE,
+        Parameters.PARAM_TRACE_COST_FUNCTION,
+    )
+}
+
+
+class DispatchModel(object):
+    """
+    Model-side part of the dispatcher: model features, classifier and candidates (whose own model-side
+    precomputations are computed when a candidate is chosen for the first time)
+    """
+
+    def __init__(
+        self,
+        net: PetriNet,
+        im: Marking,
+        fm: Marking,
+        parameters: Optional[Dict[Any, Any]] = None,
+    ):
+        if parameters is None:
+            parameters = {}
+        self.net = net
+        self.im = im
+        self.fm = fm
+        self.candidates = exec_utils.get_param_value(
+            Parameters.CANDIDATES, parameters, DEFAULT_CANDIDATES
+        )
+        self.candidate_names = [
+            portfolio.get_contender_name(c) for c in self.candidates
+        ]
+        self.classifier = load_classifier(
+            exec_utils.get_param_value(Parameters.CLASSIFIER, parameters, None)
+        )
+        self.model_features = get_model_features(net)
+        self.labels = {t.label for t in net.transitions if t.label is not None}
+        self.compiled_models = {}
+
+
+def load_classifier(classifier: Any) -> Any:
+    """
+    Loads a classifier given as the path of a pickled object (or of a torch module); any other object is returned
+    as it is
+    """
+    if isinstance(classifier, (str, os.PathLike)):
+        if str(classifier).endswith((".pt", ".pth")):
+            import torch
+
+            return torch.load(classifier, weights_only=False)
+        with open(classifier, "rb") as f:
+            return pickle.load(f)
+    return classifier
+
+
+def get_model_features(net: PetriNet) -> List[float]:
+    """
+    Computes the features of the model (see MODEL_FEATURES)
+    """
+    labels = Counter(t.label for t in net.transitions if t.label is not None)
+    return [
+        len(net.places),
+        len(net.transitions),
+        sum(1 for t in net.transitions if t.label is None),
+        len(labels),
+        sum(c - 1 for c in labels.values()),
+        len(net.arcs),
+        sum(1 for p in net.places if len(p.out_arcs) > 1),
+        sum(1 for t in net.transitions if len(t.out_arcs) > 1),
+    ]
+
+
+def get_features(
+    activities: List[str], dispatch_model: DispatchModel
+) -> List[float]:
+    """
+    Default feature function: model features followed by the features of the trace (see FEATURE_NAMES)
+
+    Parameters
+    --------------
+    activities
+        Activities of the trace
+    dispatch_model
+        Model-side part of the dispatcher
+
+    Returns
+    --------------
+    features
+        Feature vector
+    """
+    n = len(activities)
+    occurrences = Counter(activities)
+    unmatched = sum(
+        c for a, c in occurrences.items() if a not in dispatch_model.labels
+    )
+    return dispatch_model.model_features + [
+        n,
+        len(occurrences),
+        unmatched / n if n else 0.0,
+        1.0 - len(occurrences) / n if n else 0.0,
+        max(occurrences.values()) if n else 0,
+    ]
+
+
+def rank_candidates(
+    classifier: Any,
+    features: List[float],
+    candidate_names: List[str],
+    output: str = "scores",
+) -> Tuple[List[int], Optional[List[float]]]:
+    """
+    Ranks the candidates with the classifier
+
+    Parameters
+    --------------
+    classifier
+        Classifier (see the description of the module); if None, the candidates are ranked in their order
+    features
+        Feature vector
+    candidate_names
+        Names of the candidates
+    output
+        Meaning of the per-candidate outputs of the classifier: "scores" (the higher the better) or "runtimes"
+        (predicted runtimes, the lower the better)
+
+    Returns
+    --------------
+    ranking
+        Indexes of all the candidates, from the most to the least promising
+    predicted_runtimes
+        Predicted runtime of every candidate (if the classifier predicts runtimes, None otherwise)
+    """
+    n = len(candidate_names)
+    if classifier is None:
+        return list(range(n)), None
+
+    x = np.asarray(features, dtype=np.float64).reshape(1, -1)
+    predicted_runtimes = None
+    torch = sys.modules.get("torch")
+    if hasattr(classifier, "predict_proba"):
+        proba = np.asarray(classifier.predict_proba(x))[0]
+        classes = list(getattr(classifier, "classes_", range(len(proba))))
+        ranking = [
+            __candidate_index(classes[i], candidate_names)
+            for i in np.argsort(-proba, kind="stable")
+        ]
+    else:
+        if torch is not None and isinstance(classifier, torch.nn.Module):
+            with torch.no_grad():
+                out = classifier(torch.as_tensor(x, dtype=torch.float32))
+            out = out.detach().cpu().numpy()
+        elif hasattr(classifier, "predict"):
+            out = classifier.predict(x)
+        else:
+            out = classifier(x)
+        out = np.asarray(out).reshape(-1)
+        if out.size == n and n > 1:
+            if output == "runtimes":
+                predicted_runtimes = out.astype(np.float64).tolist()
+                ranking = np.argsort(out, kind="stable").tolist()
+            else:
+                ranking = np.argsort(-out, kind="stable").tolist()
+        else:
+            ranking = [__candidate_index(out[0], candidate_names)]
+
+    # the candidates that the classifier does not rank follow, in their order
+    ranking = [i for i in dict.fromkeys(ranking) if i is not None]
+    ranking += [i for i in range(n) if i not in ranking]
+    return ranking, predicted_runtimes
+
+
+def __candidate_index(label, candidate_names):
+    if isinstance(label, (str, np.str_)):
+        name = str(label)
+        return (
+            candidate_names.index(name) if name in candidate_names else None
+        )
+    index = int(label)
+    return index if 0 <= index < len(candidate_names) else None
+
+
+def __resolve_variant(variant):
+    # imported here, since the algorithm module imports the variants
+    from pm4py.algo.conformance.alignments.petri_net import algorithm
+
+    return exec_utils.get_variant(algorithm.__variant_mapper(variant))
+
+
+def __write_dispatch_log(sink, record):
+    if sink is None:
+        return
+    if callable(sink):
+        sink(record)
+    else:
+        with open(sink, "a") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+
+def compile_model(
+    net: PetriNet,
+    im: Marking,
+    fm: Marking,
+    parameters: Optional[Dict[Any, Any]] = None,
+) -> DispatchModel:
+    """
+    Performs the model-side part of the dispatcher once (model features, loading of the classifier), so that it
+    can be shared (through Parameters.COMPILED_MODEL) by the alignments of many traces
+
+    Parameters
+    ----------------
+    net
+        Petri net
+    im
+        Initial marking
+    fm
+        Final marking
+    parameters
+        Parameters of the algorithm (candidates and classifier)
+
+    Returns
+    ----------------
+    dispatch_model
+        Model-side part of the dispatcher
+    """
+    return DispatchModel(net, im, fm, parameters=parameters)
+
+
+def get_best_worst_cost(
+    petri_net: PetriNet,
+    initial_marking: Marking,
+    final_marking: Marking,
+    parameters: Optional[Dict[Any, Any]] = None,
+) -> int:
+    """
+    Gets the best worst cost of an alignment (computed by the first candidate)
+    """
+    if parameters is None:
+        parameters = {}
+    candidates = exec_utils.get_param_value(
+        Parameters.CANDIDATES, parameters, DEFAULT_CANDIDATES
+    )
+    variant, candidate_parameters = __unpack(candidates[0], parameters)
+    return __resolve_variant(variant).get_best_worst_cost(
+        petri_net,
+        initial_marking,
+        final_marking,
+        parameters=candidate_parameters,
+    )
+
+
+def __unpack(candidate, parameters):
+    variant = portfolio.get_contender_variant(candidate)
+    # the parameters of the dispatcher (also when given as members of other
+    # enumerations, e.g. the compiled model set by apply_log) are not passed
+    candidate_parameters = {
+        key: value
+        for key, value in parameters.items()
+        if getattr(key, "value", key) not in __DISPATCHER_PARAMETERS
+    }
+    if isinstance(candidate, tuple) and candidate[1]:
+        candidate_parameters.update(candidate[1])
+    return variant, candidate_parameters
+
+
+def __align_with_candidate(
+    dispatch_model, index, trace, parameters, max_align_time_trace
+):
+    variant, candidate_parameters = __unpack(
+        dispatch_model.candidates[index], parameters
+    )
+    variant_module = __resolve_variant(variant)
+    if hasattr(variant_module, "compile_model"):
+        if index not in dispatch_model.compiled_models:
+            dispatch_model.compiled_models[index] = (
+                variant_module.compile_model(
+                    dispatch_model.net,
+                    dispatch_model.im,
+                    dispatch_model.fm,
+                    parameters=candidate_parameters,
+                )
+            )
+        candidate_parameters[Parameters.COMPILED_MODEL.value] = (
+            dispatch_model.compiled_models[index]
+        )
+    candidate_parameters[Parameters.PARAM_MAX_ALIGN_TIME_TRACE.value] = (
+        max_align_time_trace
+    )
+    start = time.perf_counter()
+    ali = variant_module.apply(
+        trace,
+        dispatch_model.net,
+        dispatch_model.im,
+        dispatch_model.fm,
+        parameters=candidate_parameters,
+    )
+    # the candidate sets the (default) trace cost function in its copy of the
+    # parameters: it is reported back to the caller, which uses it to compute
+    # the fitness
+    trace_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_TRACE_COST_FUNCTION, candidate_parameters, None
+    )
+    if trace_cost_function is not None:
+        parameters[Parameters.PARAM_TRACE_COST_FUNCTION] = trace_cost_function
+    return ali, time.perf_counter() - start
+
+
+def apply(
+    trace: Trace,
+    petri_net: PetriNet,
+    initial_marking: Marking,
+    final_marking: Marking,
+    parameters: Optional[Dict[Any, Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Aligns a trace with the candidate chosen by the classifier
+
+    Parameters
+    ----------------
+    trace
+        Trace
+    petri_net
+        Petri net
+    initial_marking
+        Initial marking
+    final_marking
+        Final marking
+    parameters
+        Parameters of the algorithm (also passed to the candidates), including:
+        - Parameters.CANDIDATES => variants (or tuples (variant, parameters)) among which the classifier chooses
+          (default: DEFAULT_CANDIDATES)
+        - Parameters.CLASSIFIER => classifier (see the description of the module; default: None, i.e., the first
+          candidate is always chosen)
+        - Parameters.CLASSIFIER_OUTPUT => "scores" (default) or "runtimes" (see :func:`rank_candidates`)
+        - Parameters.FEATURE_FUNCTION => function computing the features from the activities of the trace and the
+          :class:`DispatchModel` (default: :func:`get_features`)
+        - Parameters.FALLBACK_TIMEOUT => seconds after which the first candidate is abandoned in favour of the second
+          one (default: no fallback)
+        - Parameters.DISPATCH_LOG => sink of the dispatch records: a callable, or the path of a JSON-lines file
+        - Parameters.COMPILED_MODEL => model-side part of the dispatcher (see :func:`compile_model`)
+        - Parameters.PARAM_MAX_ALIGN_TIME_TRACE => maximum time for the alignment of the trace (overall)
+        - Parameters.PARAM_TRACE_COST_FUNCTION => cost of the log move of each event of the trace; when not provided,
+          the one set by the chosen candidate is stored in the parameters (as the variants do)
+
+    Returns
+    ----------------
+    dictionary
+        Alignment of the chosen candidate, with the additional key **dispatch**: a dictionary with keys
+        **features**, **ranking** (names of the candidates), **chosen**, **predicted_runtime**, **runtime**,
+        **feature_time**, **fallback** and **fallback_runtime**
+    """
+    if parameters is None:
+        parameters = {}
+
+    activity_key = exec_utils.get_param_value(
+        Parameters.ACTIVITY_KEY, parameters, DEFAULT_NAME_KEY
+    )
+    max_align_time_trace = exec_utils.get_param_value(
+        Parameters.PARAM_MAX_ALIGN_TIME_TRACE, parameters, sys.maxsize
+    )
+    fallback_timeout = exec_utils.get_param_value(
+        Parameters.FALLBACK_TIMEOUT, parameters, None
+    )
+    feature_function = exec_utils.get_param_value(
+        Parameters.FEATURE_FUNCTION, parameters, get_features
+    )
+    classifier_output = exec_utils.get_param_value(
+        Parameters.CLASSIFIER_OUTPUT, parameters, "scores"
+    )
+    dispatch_log = exec_utils.get_param_value(
+        Parameters.DISPATCH_LOG, parameters, None
+    )
+    dispatch_model = exec_utils.get_param_value(
+        Parameters.COMPILED_MODEL, parameters, None
+    )
+    if not isinstance(dispatch_model, DispatchModel):
+        dispatch_model = compile_model(
+            petri_net, initial_marking, final_marking, parameters=parameters
+        )
+
+    start = time.perf_counter()
+    features = feature_function(
+        [e[activity_key] for e in trace], dispatch_model
+    )
+    ranking, predicted_runtimes = rank_candidates(
+        dispatch_model.classifier,
+        features,
+        dispatch_model.candidate_names,
+        output=classifier_output,
+    )
+    feature_time = time.perf_counter() - start
+
+    first = ranking[0]
+    second = ranking[1] if len(ranking) > 1 else None
+    budget = max_align_time_trace
+    if fallback_timeout is not None and second is not None:
+        budget = min(budget, fallback_timeout)
+    ali, runtime = __align_with_candidate(
+        dispatch_model, first, trace, parameters, budget
+    )
+
+    fallback = None
+    fallback_runtime = None
+    if ali is None and budget < max_align_time_trace:
+        fallback = second
+        ali, fallback_runtime = __align_with_candidate(
+            dispatch_model,
+            second,
+            trace,
+            parameters,
+            max_align_time_trace - runtime,
+        )
+
+    names = dispatch_model.candidate_names
+    record = {
+        "features": features,
+        "ranking": [names[i] for i in ranking],
+        "chosen": names[first],
+        "predicted_runtime": (
+            predicted_runtimes[first]
+            if predicted_runtimes is not None
+            else None
+        ),
+        "runtime": runtime,
+        "feature_time": feature_time,
+        "fallback": names[fallback] if fallback is not None else None,
+        "fallback_runtime": fallback_runtime,
+    }
+    __write_dispatch_log(
+        dispatch_log,
+        {
+            **record,
+            "trace_length": len(trace),
+            "cost": ali["cost"] if ali is not None else None,
+        },
+    )
+    if ali is not None:
+        ali["dispatch"] = record
+    return ali
@@ -29,6 +29,7 @@ from pm4py.util.xes_constants import DEFAULT_NAME_KEY
 from pm4py.objects.petri_net.utils.synchronous_product import (
     construct_cost_aware,
     construct,
+    construct_sync_costs,
 )
 from pm4py.objects.petri_net.utils.petri_utils import (
     construct_trace_net_cost_aware,
@@ -270,13 +271,9 @@ def apply_trace_net(
             sync_prod, utils.SKIP
         )
     else:
-        revised_sync = dict()
-        for t_trace in trace_net.transitions:
-            for t_model in petri_net.transitions:
-                if t_trace.label == t_model.label:
-                    revised_sync[(t_trace, t_model)] = sync_cost_function[
-                        t_model
-                    ]
+        revised_sync = construct_sync_costs(
+            trace_net, petri_net, sync_cost_function
+        )
 
         sync_prod, sync_initial_marking, sync_final_marking, cost_function = (
             construct_cost_aware(
@@ -0,0 +1,805 @@
+'''
+    PM4Py – A Process Mining Library for Python
+Copyright (C) 2024 Process Intelligence Solutions UG (haftungsbeschränkt)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see this software project's root or
+visit <https://www.gnu.org/licenses/>.
+
+Website: https://processintelligence.solutions
+Contact: info@processintelligence.solutions
+'''
+"""
+Memory-bounded variant of the A* alignments (:mod:`state_equation_a_star`), meant for long (and noisy) traces
+on which the open set of the plain A* grows beyond the available memory.
+
+The search keeps at most max_states states in the open set: when the budget is exceeded, the states with the
+highest f-value are forgotten, and (as in SMA*) their f-value is backed up in their parent, which is re-opened
+with the backed-up f-value so that the forgotten part of the search space is regenerated when (and only if)
+it becomes promising again. Moreover, the solution vector of the heuristic is dropped from a state as soon as
+the state is expanded (and recomputed if the state is re-opened), so that only the open states keep one.
+With a consistent heuristic (as all the ones of
+:mod:`pm4py.algo.conformance.alignments.petri_net.utils.heuristics`), the returned alignments are optimal;
+a smaller budget trades memory for re-expansions.
+"""
+import heapq
+import time
+
+from pm4py.algo.conformance.alignments.petri_net.utils import heuristics
+from pm4py.objects.log import obj as log_implementation
+from pm4py.util.xes_constants import DEFAULT_NAME_KEY
+from pm4py.objects.petri_net.utils.synchronous_product import (
+    construct_cost_aware,
+    construct,
+    construct_sync_costs,
+)
+from pm4py.objects.petri_net.utils.petri_utils import (
+    construct_trace_net_cost_aware,
+)
+from pm4py.objects.petri_net.utils import align_utils as utils
+from pm4py.objects.petri_net.utils import compiled_net
+from pm4py.util import exec_utils
+from pm4py.util.lp import solver as lp_solver
+from enum import Enum
+import sys
+from pm4py.util.constants import PARAMETER_CONSTANT_ACTIVITY_KEY
+from pm4py.util import variants_util
+from typing import Optional, Dict, Any, Union
+from pm4py.objects.log.obj import Trace
+from pm4py.objects.petri_net.obj import PetriNet, Marking
+from pm4py.util import typing
+
+DEFAULT_MAX_STATES = 100000
+# when the budget is exceeded, the open set is reduced to this fraction of
+# the budget (to avoid pruning at every expansion)
+PRUNING_RATIO = 0.75
+
+
+class Parameters(Enum):
+    PARAM_TRACE_COST_FUNCTION = "trace_cost_function"
+    PARAM_MODEL_COST_FUNCTION = "model_cost_function"
+    PARAM_SYNC_COST_FUNCTION = "sync_cost_function"
+    PARAM_ALIGNMENT_RESULT_IS_SYNC_PROD_AWARE = "ret_tuple_as_trans_desc"
+    PARAM_TRACE_NET_COSTS = "trace_net_costs"
+    TRACE_NET_CONSTR_FUNCTION = "trace_net_constr_function"
+    TRACE_NET_COST_AWARE_CONSTR_FUNCTION = (
+        "trace_net_cost_aware_constr_function"
+    )
+    PARAM_MAX_ALIGN_TIME_TRACE = "max_align_time_trace"
+    PARAM_MAX_ALIGN_TIME = "max_align_time"
+    PARAMETER_VARIANT_DELIMITER = "variant_delimiter"
+    ACTIVITY_KEY = PARAMETER_CONSTANT_ACTIVITY_KEY
+    VARIANTS_IDX = "variants_idx"
+    COMPILED_MODEL = "compiled_model"
+    MAX_STATES = "max_states"
+    HEURISTIC = "heuristic"
+    WARM_START_LP = "warm_start_lp"
+
+
+def get_best_worst_cost(
+    petri_net, initial_marking, final_marking, parameters=None
+):
+    """
+    Gets the best worst cost of an alignment
+
+    Parameters
+    -----------
+    petri_net
+        Petri net
+    initial_marking
+        Initial marking
+    final_marking
+        Final marking
+
+    Returns
+    -----------
+    best_worst_cost
+        Best worst cost of alignment
+    """
+    if parameters is None:
+        parameters = {}
+    trace = log_implementation.Trace()
+
+    best_worst = apply(
+        trace, petri_net, initial_marking, final_marking, parameters=parameters
+    )
+
+    if best_worst is not None:
+        return best_worst["cost"]
+
+    return None
+
+
+def compile_model(
+    petri_net: PetriNet,
+    initial_marking: Marking,
+    final_marking: Marking,
+    parameters: Optional[Dict[Union[str, Parameters], Any]] = None,
+) -> compiled_net.CompiledModel:
+    """
+    Pre-computes the model-side part of the synchronous product, to be shared by the alignments of several traces
+    against the same model (passing it as Parameters.COMPILED_MODEL)
+
+    Parameters
+    -------------
+    petri_net
+        Petri net
+    initial_marking
+        Initial marking
+    final_marking
+        Final marking
+    parameters
+        Parameters of the algorithm, including:
+        - Parameters.PARAM_MODEL_COST_FUNCTION => model cost function
+        - Parameters.PARAM_SYNC_COST_FUNCTION => synchronous cost function
+
+    Returns
+    -------------
+    compiled_model
+        Compiled model
+    """
+    if parameters is None:
+        parameters = {}
+
+    model_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_MODEL_COST_FUNCTION, parameters, None
+    )
+    sync_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_SYNC_COST_FUNCTION, parameters, None
+    )
+
+    return compiled_net.CompiledModel(
+        petri_net,
+        initial_marking,
+        final_marking,
+        model_cost_function=model_cost_function,
+        sync_cost_function=sync_cost_function,
+        skip=utils.SKIP,
+    )
+
+
+def apply(
+    trace: Trace,
+    petri_net: PetriNet,
+    initial_marking: Marking,
+    final_marking: Marking,
+    parameters: Optional[Dict[Union[str, Parameters], Any]] = None,
+) -> typing.AlignmentResult:
+    """
+    Performs the basic alignment search, given a trace and a net.
+
+    Parameters
+    ----------
+    trace: :class:`list` input trace, assumed to be a list of events (i.e. the code will use the activity key
+    to get the attributes)
+    petri_net: :class:`pm4py.objects.petri.net.PetriNet` the Petri net to use in the alignment
+    initial_marking: :class:`pm4py.objects.petri.net.Marking` initial marking in the Petri net
+    final_marking: :class:`pm4py.objects.petri.net.Marking` final marking in the Petri net
+    parameters: :class:`dict` (optional) dictionary containing one of the following:
+        Parameters.PARAM_TRACE_COST_FUNCTION: :class:`list` (parameter) mapping of each index of the trace to a positive cost value
+        Parameters.PARAM_MODEL_COST_FUNCTION: :class:`dict` (parameter) mapping of each transition in the model to corresponding
+        model cost
+        Parameters.PARAM_SYNC_COST_FUNCTION: :class:`dict` (parameter) mapping of each transition in the model to corresponding
+        synchronous costs
+        Parameters.ACTIVITY_KEY: :class:`str` (parameter) key to use to identify the activity described by the events
+        Parameters.COMPILED_MODEL: :class:`pm4py.objects.petri_net.utils.compiled_net.CompiledModel` (parameter)
+        model-side part of the synchronous product (see :func:`compile_model`), stitched to the trace instead of
+        building the synchronous product from scratch
+        Parameters.MAX_STATES: :class:`int` (parameter) maximum number of states in the open set (default:
+        DEFAULT_MAX_STATES)
+        Parameters.HEURISTIC: :class:`str` (parameter) heuristic guiding the search (see
+        :data:`pm4py.algo.conformance.alignments.petri_net.utils.heuristics.HEURISTICS`, default: "lp")
+
+    Returns
+    -------
+    dictionary: `dict` with keys **alignment**, **cost**, **visited_states**, **queued_states**, **traversed_arcs**,
+    **lp_solved**, **pruned_states** and **reopened_states**
+    """
+    if parameters is None:
+        parameters = {}
+
+    activity_key = exec_utils.get_param_value(
+        Parameters.ACTIVITY_KEY, parameters, DEFAULT_NAME_KEY
+    )
+    compiled_model = exec_utils.get_param_value(
+        Parameters.COMPILED_MODEL, parameters, None
+    )
+    trace_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_TRACE_COST_FUNCTION, parameters, None
+    )
+    model_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_MODEL_COST_FUNCTION, parameters, None
+    )
+    trace_net_constr_function = exec_utils.get_param_value(
+        Parameters.TRACE_NET_CONSTR_FUNCTION, parameters, None
+    )
+    trace_net_cost_aware_constr_function = exec_utils.get_param_value(
+        Parameters.TRACE_NET_COST_AWARE_CONSTR_FUNCTION,
+        parameters,
+        construct_trace_net_cost_aware,
+    )
+
+    if trace_cost_function is None:
+        trace_cost_function = list(
+            map(lambda e: utils.STD_MODEL_LOG_MOVE_COST, trace)
+        )
+        parameters[Parameters.PARAM_TRACE_COST_FUNCTION] = trace_cost_function
+
+    if model_cost_function is None:
+        # reset variables value
+        model_cost_function = dict()
+        sync_cost_function = dict()
+        for t in petri_net.transitions:
+            if t.label is not None:
+                model_cost_function[t] = utils.STD_MODEL_LOG_MOVE_COST
+                sync_cost_function[t] = utils.STD_SYNC_COST
+            else:
+                model_cost_function[t] = utils.STD_TAU_COST
+        parameters[Parameters.PARAM_MODEL_COST_FUNCTION] = model_cost_function
+        parameters[Parameters.PARAM_SYNC_COST_FUNCTION] = sync_cost_function
+
+    if (
+        compiled_model is not None
+        and trace_net_constr_function is None
+        and trace_net_cost_aware_constr_function
+        is construct_trace_net_cost_aware
+    ):
+        sync_prod, cost_vec = compiled_model.stitch(
+            [e[activity_key] for e in trace], trace_cost_function
+        )
+        ret_tuple_as_trans_desc = exec_utils.get_param_value(
+            Parameters.PARAM_ALIGNMENT_RESULT_IS_SYNC_PROD_AWARE,
+            parameters,
+            False,
+        )
+        max_align_time_trace = exec_utils.get_param_value(
+            Parameters.PARAM_MAX_ALIGN_TIME_TRACE, parameters, sys.maxsize
+        )
+        max_states = exec_utils.get_param_value(
+            Parameters.MAX_STATES, parameters, DEFAULT_MAX_STATES
+        )
+        heuristic = exec_utils.get_param_value(
+            Parameters.HEURISTIC, parameters, heuristics.DEFAULT_HEURISTIC
+        )
+        warm_start_lp = exec_utils.get_param_value(
+            Parameters.WARM_START_LP, parameters, True
+        )
+        return __search_compiled(
+            sync_prod,
+            cost_vec,
+            ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
+            max_align_time_trace=max_align_time_trace,
+            max_states=max_states,
+            heuristic=heuristic,
+            warm_start_lp=warm_start_lp,
+        )
+
+    if trace_net_constr_function is not None:
+        # keep the possibility to pass TRACE_NET_CONSTR_FUNCTION in this old
+        # version
+        trace_net, trace_im, trace_fm = trace_net_constr_function(
+            trace, activity_key=activity_key
+        )
+    else:
+        (
+            trace_net,
+            trace_im,
+            trace_fm,
+            parameters[Parameters.PARAM_TRACE_NET_COSTS],
+        ) = trace_net_cost_aware_constr_function(
+            trace, trace_cost_function, activity_key=activity_key
+        )
+
+    alignment = apply_trace_net(
+        petri_net,
+        initial_marking,
+        final_marking,
+        trace_net,
+        trace_im,
+        trace_fm,
+        parameters,
+    )
+    return alignment
+
+
+def apply_from_variant(
+    variant, petri_net, initial_marking, final_marking, parameters=None
+):
+    """
+    Apply the alignments from the specification of a single variant
+
+    Parameters
+    -------------
+    variant
+        Variant (as string delimited by the "variant_delimiter" parameter)
+    petri_net
+        Petri net
+    initial_marking
+        Initial marking
+    final_marking
+        Final marking
+    parameters
+        Parameters of the algorithm (same as 'apply' method, plus 'variant_delimiter' that is , by default)
+
+    Returns
+    ------------
+    dictionary: `dict` with keys **alignment**, **cost**, **visited_states**, **queued_states** and **traversed_arcs**
+    """
+    if parameters is None:
+        parameters = {}
+    trace = variants_util.variant_to_trace(variant, parameters=parameters)
+
+    return apply(
+        trace, petri_net, initial_marking, final_marking, parameters=parameters
+    )
+
+
+def apply_from_variants_dictionary(
+    var_dictio, petri_net, initial_marking, final_marking, parameters=None
+):
+    if parameters is None:
+        parameters = {}
+    dictio_alignments = {}
+    for variant in var_dictio:
+        dictio_alignments[variant] = apply_from_variant(
+            variant,
+            petri_net,
+            initial_marking,
+            final_marking,
+            parameters=parameters,
+        )
+    return dictio_alignments
+
+
+def apply_from_variants_list(
+    var_list, petri_net, initial_marking, final_marking, parameters=None
+):
+    """
+    Apply the alignments from the specification of a list of variants in the log
+
+    Parameters
+    -------------
+    var_list
+        List of variants (for each item, the first entry is the variant itself, the second entry may be the number of cases)
+    petri_net
+        Petri net
+    initial_marking
+        Initial marking
+    final_marking
+        Final marking
+    parameters
+        Parameters of the algorithm (same as 'apply' method, plus 'variant_delimiter' that is , by default)
+
+    Returns
+    --------------
+    dictio_alignments
+        Dictionary that assigns to each variant its alignment
+    """
+    if parameters is None:
+        parameters = {}
+    start_time = time.time()
+    max_align_time = exec_utils.get_param_value(
+        Parameters.PARAM_MAX_ALIGN_TIME, parameters, sys.maxsize
+    )
+    max_align_time_trace = exec_utils.get_param_value(
+        Parameters.PARAM_MAX_ALIGN_TIME_TRACE, parameters, sys.maxsize
+    )
+    dictio_alignments = {}
+    for varitem in var_list:
+        this_max_align_time = min(
+            max_align_time_trace,
+            (max_align_time - (time.time() - start_time)) * 0.5,
+        )
+        variant = varitem[0]
+        parameters[Parameters.PARAM_MAX_ALIGN_TIME_TRACE] = this_max_align_time
+        dictio_alignments[variant] = apply_from_variant(
+            variant,
+            petri_net,
+            initial_marking,
+            final_marking,
+            parameters=parameters,
+        )
+    return dictio_alignments
+
+
+def apply_from_variants_list_petri_string(
+    var_list, petri_net_string, parameters=None
+):
+    if parameters is None:
+        parameters = {}
+
+    from pm4py.objects.petri_net.importer.variants import (
+        pnml as petri_importer,
+    )
+
+    petri_net, initial_marking, final_marking = (
+        petri_importer.import_petri_from_string(petri_net_string)
+    )
+
+    res = apply_from_variants_list(
+        var_list,
+        petri_net,
+        initial_marking,
+        final_marking,
+        parameters=parameters,
+    )
+    return res
+
+
+def apply_from_variants_list_petri_string_mprocessing(
+    mp_output, var_list, petri_net_string, parameters=None
+):
+    if parameters is None:
+        parameters = {}
+
+    res = apply_from_variants_list_petri_string(
+        var_list, petri_net_string, parameters=parameters
+    )
+    mp_output.put(res)
+
+
+def apply_trace_net(
+    petri_net,
+    initial_marking,
+    final_marking,
+    trace_net,
+    trace_im,
+    trace_fm,
+    parameters=None,
+):
+    """
+    Performs the basic alignment search, given a trace net and a net.
+
+    Parameters
+    ----------
+    trace: :class:`list` input trace, assumed to be a list of events (i.e. the code will use the activity key
+    to get the attributes)
+    petri_net: :class:`pm4py.objects.petri.net.PetriNet` the Petri net to use in the alignment
+    initial_marking: :class:`pm4py.objects.petri.net.Marking` initial marking in the Petri net
+    final_marking: :class:`pm4py.objects.petri.net.Marking` final marking in the Petri net
+    parameters: :class:`dict` (optional) dictionary containing one of the following:
+        Parameters.PARAM_TRACE_COST_FUNCTION: :class:`list` (parameter) mapping of each index of the trace to a positive cost value
+        Parameters.PARAM_MODEL_COST_FUNCTION: :class:`dict` (parameter) mapping of each transition in the model to corresponding
+        model cost
+        Parameters.PARAM_SYNC_COST_FUNCTION: :class:`dict` (parameter) mapping of each transition in the model to corresponding
+        synchronous costs
+        Parameters.ACTIVITY_KEY: :class:`str` (parameter) key to use to identify the activity described by the events
+        Parameters.PARAM_TRACE_NET_COSTS: :class:`dict` (parameter) mapping between transitions and costs
+
+    Returns
+    -------
+    dictionary: `dict` with keys **alignment**, **cost**, **visited_states**, **queued_states** and **traversed_arcs**
+    """
+    if parameters is None:
+        parameters = {}
+
+    ret_tuple_as_trans_desc = exec_utils.get_param_value(
+        Parameters.PARAM_ALIGNMENT_RESULT_IS_SYNC_PROD_AWARE, parameters, False
+    )
+
+    trace_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_TRACE_COST_FUNCTION, parameters, None
+    )
+    model_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_MODEL_COST_FUNCTION, parameters, None
+    )
+    sync_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_SYNC_COST_FUNCTION, parameters, None
+    )
+    trace_net_costs = exec_utils.get_param_value(
+        Parameters.PARAM_TRACE_NET_COSTS, parameters, None
+    )
+
+    if (
+        trace_cost_function is None
+        or model_cost_function is None
+        or sync_cost_function is None
+    ):
+        sync_prod, sync_initial_marking, sync_final_marking = construct(
+            trace_net,
+            trace_im,
+            trace_fm,
+            petri_net,
+            initial_marking,
+            final_marking,
+            utils.SKIP,
+        )
+        cost_function = utils.construct_standard_cost_function(
+            sync_prod, utils.SKIP
+        )
+    else:
+        revised_sync = construct_sync_costs(
+            trace_net, petri_net, sync_cost_function
+        )
+
+        sync_prod, sync_initial_marking, sync_final_marking, cost_function = (
+            construct_cost_aware(
+                trace_net,
+                trace_im,
+                trace_fm,
+                petri_net,
+                initial_marking,
+                final_marking,
+                utils.SKIP,
+                trace_net_costs,
+                model_cost_function,
+                revised_sync,
+            )
+        )
+
+    max_align_time_trace = exec_utils.get_param_value(
+        Parameters.PARAM_MAX_ALIGN_TIME_TRACE, parameters, sys.maxsize
+    )
+    max_states = exec_utils.get_param_value(
+        Parameters.MAX_STATES, parameters, DEFAULT_MAX_STATES
+    )
+    heuristic = exec_utils.get_param_value(
+        Parameters.HEURISTIC, parameters, heuristics.DEFAULT_HEURISTIC
+    )
+    warm_start_lp = exec_utils.get_param_value(
+        Parameters.WARM_START_LP, parameters, True
+    )
+
+    return apply_sync_prod(
+        sync_prod,
+        sync_initial_marking,
+        sync_final_marking,
+        cost_function,
+        utils.SKIP,
+        ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
+        max_align_time_trace=max_align_time_trace,
+        max_states=max_states,
+        heuristic=heuristic,
+        warm_start_lp=warm_start_lp,
+    )
+
+
+def apply_sync_prod(
+    sync_prod,
+    initial_marking,
+    final_marking,
+    cost_function,
+    skip,
+    ret_tuple_as_trans_desc=False,
+    max_align_time_trace=sys.maxsize,
+    max_states=None,
+    heuristic=heuristics.DEFAULT_HEURISTIC,
+    warm_start_lp=True,
+):
+    """
+    Performs the memory-bounded A* search on top of the synchronous product net, given a cost function and
+    skip-symbol
+
+    Parameters
+    ----------
+    sync_prod: :class:`pm4py.objects.petri.net.PetriNet` synchronous product net
+    initial_marking: :class:`pm4py.objects.petri.net.Marking` initial marking in the synchronous product net
+    final_marking: :class:`pm4py.objects.petri.net.Marking` final marking in the synchronous product net
+    cost_function: :class:`dict` cost function mapping transitions to the synchronous product net
+    skip: :class:`Any` symbol to use for skips in the alignment
+    max_states: :class:`int` maximum number of states in the open set (default: DEFAULT_MAX_STATES)
+    heuristic: name of the heuristic (see :data:`pm4py.algo.conformance.alignments.petri_net.utils.heuristics.HEURISTICS`)
+    or subclass of :class:`pm4py.algo.conformance.alignments.petri_net.utils.heuristics.AlignmentHeuristic`
+    warm_start_lp: :class:`bool` re-solve the LP of the heuristic with a warm start from the previous basis
+
+    Returns
+    -------
+    dictionary : :class:`dict` with keys **alignment**, **cost**, **visited_states**, **queued_states**,
+    **traversed_arcs**, **lp_solved**, **pruned_states** and **reopened_states**
+    """
+    return __search(
+        sync_prod,
+        initial_marking,
+        final_marking,
+        cost_function,
+        skip,
+        ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
+        max_align_time_trace=max_align_time_trace,
+        max_states=max_states,
+        heuristic=heuristic,
+        warm_start_lp=warm_start_lp,
+    )
+
+
+def __search(
+    sync_net,
+    ini,
+    fin,
+    cost_function,
+    skip,
+    ret_tuple_as_trans_desc=False,
+    max_align_time_trace=sys.maxsize,
+    max_states=None,
+    heuristic=heuristics.DEFAULT_HEURISTIC,
+    warm_start_lp=True,
+):
+    compiled = compiled_net.construct(sync_net, ini, fin)
+
+    return __search_compiled(
+        compiled,
+        compiled.cost_vector(cost_function),
+        ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
+        max_align_time_trace=max_align_time_trace,
+        max_states=max_states,
+        heuristic=heuristic,
+        warm_start_lp=warm_start_lp,
+    )
+
+
+def __prune(open_set, closed, max_states):
+    """
+    Forgets the worst states of the open set (keeping PRUNING_RATIO * max_states states), backing up their
+    f-value in their parents, that are re-opened (if expanded) with the backed-up f-value
+
+    Returns
+    --------------
+    open_set
+        Pruned open set (as a heap)
+    pruned
+        Number of forgotten states
+    reopened
+        Number of re-opened parents
+    """
+    open_set.sort()
+    keep = max(1, int(max_states * PRUNING_RATIO))
+    forgotten = open_set[keep:]
+    open_set = open_set[:keep]
+
+    backed_up = {}
+    for state in forgotten:
+        parent = state.p
+        if parent is None:
+            open_set.append(state)
+            continue
+        if id(parent) not in backed_up or state.f < backed_up[id(parent)][0]:
+            backed_up[id(parent)] = (state.f, parent)
+
+    reopened = 0
+    for f, parent in backed_up.values():
+        # a parent that is not closed is already (re-)opened, or it has been
+        # forgotten as well (and its own parent has been re-opened)
+        if parent.m in closed:
+            closed.discard(parent.m)
+            open_set.append(
+                utils.SearchTuple(
+                    f, parent.g, parent.h, parent.m, parent.p, parent.t, None,
+                    False,
+                )
+            )
+            reopened += 1
+
+    heapq.heapify(open_set)
+    return open_set, len(forgotten), reopened
+
+
+def __search_compiled(
+    compiled,
+    trans_costs,
+    ret_tuple_as_trans_desc=False,
+    max_align_time_trace=sys.maxsize,
+    max_states=None,
+    heuristic=heuristics.DEFAULT_HEURISTIC,
+    warm_start_lp=True,
+):
+    start_time = time.time()
+
+    if max_states is None:
+        max_states = DEFAULT_MAX_STATES
+    # the budget has to accommodate the successors of a state
+    max_states = max(max_states, 2 * len(compiled.ordered_transitions))
+
+    ordered_transitions = compiled.ordered_transitions
+    fin_m = compiled.fin
+
+    closed = set()
+
+    heuristic = heuristics.get_heuristic(heuristic)(
+        compiled,
+        trans_costs,
+        compiled.sparse_incidence_matrix(),
+        parameters={heuristics.Parameters.WARM_START_LP: warm_start_lp},
+    )
+
+    h, x = heuristic.initial()
+    ini_state = utils.SearchTuple(
+        0 + h, 0, h, compiled.ini, None, None, x, True
+    )
+    open_set = [ini_state]
+    heapq.heapify(open_set)
+    visited = 0
+    queued = 0
+    traversed = 0
+    lp_solved = 1
+    pruned = 0
+    reopened = 0
+
+    while not len(open_set) == 0:
+        if (time.time() - start_time) > max_align_time_trace:
+            return None
+
+        curr = heapq.heappop(open_set)
+        current_marking = curr.m
+
+        while not curr.trust:
+            if (time.time() - start_time) > max_align_time_trace:
+                return None
+
+            if current_marking in closed:
+                curr = heapq.heappop(open_set)
+                current_marking = curr.m
+                continue
+
+            h, x = heuristic.exact(curr.m)
+            lp_solved += 1
+
+            # a re-opened state keeps its backed-up f-value
+            tp = utils.SearchTuple(
+                max(curr.f, curr.g + h), curr.g, h, curr.m, curr.p, curr.t,
+                x, True,
+            )
+            curr = heapq.heappushpop(open_set, tp)
+            current_marking = curr.m
+
+        # max allowed heuristics value (due to the numerical instability of
+        # some of our solvers)
+        if curr.h > lp_solver.MAX_ALLOWED_HEURISTICS:
+            continue
+
+        if current_marking in closed:
+            continue
+
+        if curr.h < 0.01:
+            if current_marking == fin_m:
+                alignment = utils.__reconstruct_alignment(
+                    curr,
+                    visited,
+                    queued,
+                    traversed,
+                    ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
+                    lp_solved=lp_solved,
+                )
+                alignment["lp_time"] = sum(heuristic.solve_times)
+                alignment["pruned_states"] = pruned
+                alignment["reopened_states"] = reopened
+                return alignment
+
+        closed.add(current_marking)
+        visited += 1
+
+        for t_idx in compiled.enabled_transitions(current_marking):
+            traversed += 1
+            new_marking = compiled.fire(t_idx, current_marking)
+            if new_marking in closed:
+                continue
+            t = ordered_transitions[t_idx]
+            g = curr.g + trans_costs[t_idx]
+
+            queued += 1
+            h, x = heuristic.derive(t_idx, new_marking, curr.h, curr.x)
+            trustable = heuristic.trust(x)
+            # the f-value of a child is not lower than the (possibly backed
+            # up) f-value of the parent
+            tp = utils.SearchTuple(
+                max(g + h, curr.f), g, h, new_marking, curr, t, x, trustable
+            )
+            heapq.heappush(open_set, tp)
+
+        # the successors have their own solution vector
+        curr.x = None
+
+        if len(open_set) > max_states:
+            open_set, n_pruned, n_reopened = __prune(
+                open_set, closed, max_states
+            )
+            pruned += n_pruned
+            reopened += n_reopened
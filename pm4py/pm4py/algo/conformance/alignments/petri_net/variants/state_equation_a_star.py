@@ -37,24 +37,23 @@ References
 import heapq
 import sys
 import time
-from copy import copy
 from enum import Enum
 
-import numpy as np
 
+from pm4py.algo.conformance.alignments.petri_net.utils import (
+    heuristics,
+    instrumentation,
+)
 from pm4py.objects.log import obj as log_implementation
 from pm4py.objects.petri_net.utils import align_utils as utils
-from pm4py.objects.petri_net.utils.incidence_matrix import (
-    construct as inc_mat_construct,
-)
+from pm4py.objects.petri_net.utils import compiled_net
 from pm4py.objects.petri_net.utils.synchronous_product import (
     construct_cost_aware,
     construct,
+    construct_sync_costs,
 )
 from pm4py.objects.petri_net.utils.petri_utils import (
     construct_trace_net_cost_aware,
-    decorate_places_preset_trans,
-    decorate_transitions_prepostset,
 )
 from pm4py.util import exec_utils
 from pm4py.util.constants import PARAMETER_CONSTANT_ACTIVITY_KEY
@@ -83,6 +82,12 @@ class Parameters(Enum):
     ACTIVITY_KEY = PARAMETER_CONSTANT_ACTIVITY_KEY
     VARIANTS_IDX = "variants_idx"
     RETURN_SYNC_COST_FUNCTION = "return_sync_cost_function"
+    WARM_START_LP = "warm_start_lp"
+    RETURN_LP_SOLVE_TIMES = "return_lp_solve_times"
+    COMPILED_MODEL = "compiled_model"
+    SEARCH_STATISTICS = "search_statistics"
+    OPEN_SET_SAMPLING = "open_set_sampling"
+    HEURISTIC = "heuristic"
 
 
 PARAM_TRACE_COST_FUNCTION = Parameters.PARAM_TRACE_COST_FUNCTION.value
@@ -124,6 +129,54 @@ def get_best_worst_cost(
     return None
 
 
+def compile_model(
+    petri_net: PetriNet,
+    initial_marking: Marking,
+    final_marking: Marking,
+    parameters: Optional[Dict[Union[str, Parameters], Any]] = None,
+) -> compiled_net.CompiledModel:
+    """
+    Pre-computes the model-side part of the synchronous product, to be shared by the alignments of several traces
+    against the same model (passing it as Parameters.COMPILED_MODEL)
+
+    Parameters
+    -------------
+    petri_net
+        Petri net
+    initial_marking
+        Initial marking
+    final_marking
+        Final marking
+    parameters
+        Parameters of the algorithm, including:
+        - Parameters.PARAM_MODEL_COST_FUNCTION => model cost function
+        - Parameters.PARAM_SYNC_COST_FUNCTION => synchronous cost function
+
+    Returns
+    -------------
+    compiled_model
+        Compiled model
+    """
+    if parameters is None:
+        parameters = {}
+
+    model_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_MODEL_COST_FUNCTION, parameters, None
+    )
+    sync_cost_function = exec_utils.get_param_value(
+        Parameters.PARAM_SYNC_COST_FUNCTION, parameters, None
+    )
+
+    return compiled_net.CompiledModel(
+        petri_net,
+        initial_marking,
+        final_marking,
+        model_cost_function=model_cost_function,
+        sync_cost_function=sync_cost_function,
+        skip=utils.SKIP,
+    )
+
+
 def apply(
     trace: Trace,
     petri_net: PetriNet,
@@ -148,6 +201,17 @@ def apply(
         Parameters.PARAM_SYNC_COST_FUNCTION: :class:`dict` (parameter) mapping of each transition in the model to corresponding
         synchronous costs
         Parameters.ACTIVITY_KEY: :class:`str` (parameter) key to use to identify the activity described by the events
+        Parameters.COMPILED_MODEL: :class:`pm4py.objects.petri_net.utils.compiled_net.CompiledModel` (parameter)
+        model-side part of the synchronous product (see :func:`compile_model`), stitched to the trace instead of
+        building the synchronous product from scratch
+        Parameters.SEARCH_STATISTICS: :class:`bool` (parameter) instrument the search, returning the recorded
+        statistics under the **search_statistics** key
+        Parameters.OPEN_SET_SAMPLING: :class:`int` (parameter) number of expanded states between two records of
+        the size of the open set
+        Parameters.HEURISTIC: :class:`str` (parameter) heuristic guiding the search, either the name of one of
+        the heuristics in :data:`pm4py.algo.conformance.alignments.petri_net.utils.heuristics.HEURISTICS`
+        (default: "lp") or a subclass of
+        :class:`pm4py.algo.conformance.alignments.petri_net.utils.heuristics.AlignmentHeuristic`
 
     Returns
     -------
@@ -159,6 +223,9 @@ def apply(
     activity_key = exec_utils.get_param_value(
         Parameters.ACTIVITY_KEY, parameters, DEFAULT_NAME_KEY
     )
+    compiled_model = exec_utils.get_param_value(
+        Parameters.COMPILED_MODEL, parameters, None
+    )
     trace_cost_function = exec_utils.get_param_value(
         Parameters.PARAM_TRACE_COST_FUNCTION, parameters, None
     )
@@ -193,6 +260,17 @@ def apply(
         parameters[Parameters.PARAM_MODEL_COST_FUNCTION] = model_cost_function
         parameters[Parameters.PARAM_SYNC_COST_FUNCTION] = sync_cost_function
 
+    if (
+        compiled_model is not None
+        and trace_net_constr_function is None
+        and trace_net_cost_aware_constr_function
+        is construct_trace_net_cost_aware
+    ):
+        sync_prod, cost_vec = compiled_model.stitch(
+            [e[activity_key] for e in trace], trace_cost_function
+        )
+        return __apply_compiled_sync_prod(sync_prod, cost_vec, parameters)
+
     if trace_net_constr_function is not None:
         # keep the possibility to pass TRACE_NET_CONSTR_FUNCTION in this old
         # version
@@ -481,13 +559,9 @@ def apply_trace_net(
             sync_prod, utils.SKIP
         )
     else:
-        revised_sync = dict()
-        for t_trace in trace_net.transitions:
-            for t_model in petri_net.transitions:
-                if t_trace.label == t_model.label:
-                    revised_sync[(t_trace, t_model)] = sync_cost_function[
-                        t_model
-                    ]
+        revised_sync = construct_sync_costs(
+            trace_net, petri_net, sync_cost_function
+        )
 
         sync_prod, sync_initial_marking, sync_final_marking, cost_function = (
             construct_cost_aware(
@@ -507,6 +581,23 @@ def apply_trace_net(
     max_align_time_trace = exec_utils.get_param_value(
         Parameters.PARAM_MAX_ALIGN_TIME_TRACE, parameters, sys.maxsize
     )
+    warm_start_lp = exec_utils.get_param_value(
+        Parameters.WARM_START_LP, parameters, True
+    )
+    return_lp_solve_times = exec_utils.get_param_value(
+        Parameters.RETURN_LP_SOLVE_TIMES, parameters, False
+    )
+    search_statistics = exec_utils.get_param_value(
+        Parameters.SEARCH_STATISTICS, parameters, False
+    )
+    open_set_sampling = exec_utils.get_param_value(
+        Parameters.OPEN_SET_SAMPLING,
+        parameters,
+        instrumentation.DEFAULT_OPEN_SET_SAMPLING,
+    )
+    heuristic = exec_utils.get_param_value(
+        Parameters.HEURISTIC, parameters, heuristics.DEFAULT_HEURISTIC
+    )
 
     alignment = apply_sync_prod(
         sync_prod,
@@ -516,6 +607,11 @@ def apply_trace_net(
         utils.SKIP,
         ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
         max_align_time_trace=max_align_time_trace,
+        warm_start_lp=warm_start_lp,
+        return_lp_solve_times=return_lp_solve_times,
+        search_statistics=search_statistics,
+        open_set_sampling=open_set_sampling,
+        heuristic=heuristic,
     )
 
     return_sync_cost = exec_utils.get_param_value(
@@ -529,6 +625,57 @@ def apply_trace_net(
     return alignment
 
 
+def __apply_compiled_sync_prod(sync_prod, cost_vec, parameters):
+    ret_tuple_as_trans_desc = exec_utils.get_param_value(
+        Parameters.PARAM_ALIGNMENT_RESULT_IS_SYNC_PROD_AWARE, parameters, False
+    )
+    max_align_time_trace = exec_utils.get_param_value(
+        Parameters.PARAM_MAX_ALIGN_TIME_TRACE, parameters, sys.maxsize
+    )
+    warm_start_lp = exec_utils.get_param_value(
+        Parameters.WARM_START_LP, parameters, True
+    )
+    return_lp_solve_times = exec_utils.get_param_value(
+        Parameters.RETURN_LP_SOLVE_TIMES, parameters, False
+    )
+    return_sync_cost = exec_utils.get_param_value(
+        Parameters.RETURN_SYNC_COST_FUNCTION, parameters, False
+    )
+    search_statistics = exec_utils.get_param_value(
+        Parameters.SEARCH_STATISTICS, parameters, False
+    )
+    open_set_sampling = exec_utils.get_param_value(
+        Parameters.OPEN_SET_SAMPLING,
+        parameters,
+        instrumentation.DEFAULT_OPEN_SET_SAMPLING,
+    )
+    heuristic = exec_utils.get_param_value(
+        Parameters.HEURISTIC, parameters, heuristics.DEFAULT_HEURISTIC
+    )
+
+    alignment = __search_compiled(
+        sync_prod,
+        cost_vec,
+        sync_prod.sparse_incidence_matrix(),
+        ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
+        max_align_time_trace=max_align_time_trace,
+        warm_start_lp=warm_start_lp,
+        return_lp_solve_times=return_lp_solve_times,
+        instrumentation=instrumentation.get_instrumentation(
+            search_statistics, open_set_sampling
+        ),
+        heuristic=heuristic,
+    )
+
+    if return_sync_cost:
+        cost_function = {
+            t: c for t, c in zip(sync_prod.ordered_transitions, cost_vec)
+        }
+        return alignment, cost_function
+
+    return alignment
+
+
 def apply_sync_prod(
     sync_prod,
     initial_marking,
@@ -537,6 +684,11 @@ def apply_sync_prod(
     skip,
     ret_tuple_as_trans_desc=False,
     max_align_time_trace=sys.maxsize,
+    warm_start_lp=True,
+    return_lp_solve_times=False,
+    search_statistics=False,
+    open_set_sampling=instrumentation.DEFAULT_OPEN_SET_SAMPLING,
+    heuristic=heuristics.DEFAULT_HEURISTIC,
 ):
     """
     Performs the basic alignment search on top of the synchronous product net, given a cost function and skip-symbol
@@ -548,11 +700,19 @@ def apply_sync_prod(
     final_marking: :class:`pm4py.objects.petri.net.Marking` final marking in the synchronous product net
     cost_function: :class:`dict` cost function mapping transitions to the synchronous product net
     skip: :class:`Any` symbol to use for skips in the alignment
+    warm_start_lp: :class:`bool` re-solve the LP of the heuristic with a warm start from the previous basis
+    (not applicable when the default solver is an ILP one)
+    return_lp_solve_times: :class:`bool` include the time of every LP solve in the result (**lp_solve_times**)
+    search_statistics: :class:`bool` instrument the search, including the recorded statistics in the result
+    (**search_statistics**, see :class:`pm4py.algo.conformance.alignments.petri_net.utils.instrumentation.SearchInstrumentation`)
+    open_set_sampling: :class:`int` number of expanded states between two records of the size of the open set
+    heuristic: name of the heuristic (see :data:`pm4py.algo.conformance.alignments.petri_net.utils.heuristics.HEURISTICS`)
+    or subclass of :class:`pm4py.algo.conformance.alignments.petri_net.utils.heuristics.AlignmentHeuristic`
 
     Returns
     -------
-    dictionary : :class:`dict` with keys **alignment**, **cost**, **visited_states**, **queued_states**
-    and **traversed_arcs**
+    dictionary : :class:`dict` with keys **alignment**, **cost**, **visited_states**, **queued_states**,
+    **traversed_arcs**, **lp_solved** and **lp_time**
     """
     return __search(
         sync_prod,
@@ -562,6 +722,12 @@ def apply_sync_prod(
         skip,
         ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
         max_align_time_trace=max_align_time_trace,
+        warm_start_lp=warm_start_lp,
+        return_lp_solve_times=return_lp_solve_times,
+        instrumentation=instrumentation.get_instrumentation(
+            search_statistics, open_set_sampling
+        ),
+        heuristic=heuristic,
     )
 
 
@@ -573,55 +739,67 @@ def __search(
     skip,
     ret_tuple_as_trans_desc=False,
     max_align_time_trace=sys.maxsize,
+    warm_start_lp=True,
+    return_lp_solve_times=False,
+    instrumentation=None,
+    heuristic=heuristics.DEFAULT_HEURISTIC,
 ):
-    start_time = time.time()
-
-    decorate_transitions_prepostset(sync_net)
-    decorate_places_preset_trans(sync_net)
-
-    incidence_matrix = inc_mat_construct(sync_net)
-    ini_vec, fin_vec, cost_vec = utils.__vectorize_initial_final_cost(
-        incidence_matrix, ini, fin, cost_function
+    # the search runs on the compiled (integer-indexed) version of the sync net; the places are ordered as in the
+    # incidence matrix, so a compiled marking is already the marking vector needed by the LP
+    compiled = compiled_net.construct(sync_net, ini, fin)
+
+    return __search_compiled(
+        compiled,
+        compiled.cost_vector(cost_function),
+        compiled.sparse_incidence_matrix(),
+        ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
+        max_align_time_trace=max_align_time_trace,
+        warm_start_lp=warm_start_lp,
+        return_lp_solve_times=return_lp_solve_times,
+        instrumentation=instrumentation,
+        heuristic=heuristic,
     )
 
-    closed = set()
 
-    a_matrix = np.asmatrix(incidence_matrix.a_matrix).astype(np.float64)
-    g_matrix = -np.eye(len(sync_net.transitions))
-    h_cvx = np.matrix(np.zeros(len(sync_net.transitions))).transpose()
-    cost_vec = [x * 1.0 for x in cost_vec]
-
-    use_cvxopt = False
-    if (
-        lp_solver.DEFAULT_LP_SOLVER_VARIANT
-        == lp_solver.CVXOPT_SOLVER_CUSTOM_ALIGN
-        or lp_solver.DEFAULT_LP_SOLVER_VARIANT
-        == lp_solver.CVXOPT_SOLVER_CUSTOM_ALIGN_ILP
-    ):
-        use_cvxopt = True
+def __search_compiled(
+    compiled,
+    trans_costs,
+    a_matrix,
+    ret_tuple_as_trans_desc=False,
+    max_align_time_trace=sys.maxsize,
+    warm_start_lp=True,
+    return_lp_solve_times=False,
+    instrumentation=None,
+    heuristic=heuristics.DEFAULT_HEURISTIC,
+):
+    start_time = time.time()
 
-    if use_cvxopt:
-        # not available in the latest version of PM4Py
-        from cvxopt import matrix
+    ordered_transitions = compiled.ordered_transitions
+    fin_m = compiled.fin
 
-        a_matrix = matrix(a_matrix)
-        g_matrix = matrix(g_matrix)
-        h_cvx = matrix(h_cvx)
-        cost_vec = matrix(cost_vec)
+    closed = set()
 
-    h, x = utils.__compute_exact_heuristic_new_version(
-        sync_net,
+    heuristic = heuristics.get_heuristic(heuristic)(
+        compiled,
+        trans_costs,
         a_matrix,
-        h_cvx,
-        g_matrix,
-        cost_vec,
-        incidence_matrix,
-        ini,
-        fin_vec,
-        lp_solver.DEFAULT_LP_SOLVER_VARIANT,
-        use_cvxopt=use_cvxopt,
+        parameters={heuristics.Parameters.WARM_START_LP: warm_start_lp},
+    )
+    lp_solve_times = heuristic.solve_times
+
+    # instrumentation (when enabled): every measured operation is
+    # guarded by a single check
+    stats = instrumentation
+    perf_counter = time.perf_counter
+
+    if stats is not None:
+        t0 = perf_counter()
+    h, x = heuristic.initial()
+    if stats is not None:
+        stats.heuristic_time += perf_counter() - t0
+    ini_state = utils.SearchTuple(
+        0 + h, 0, h, compiled.ini, None, None, x, True
     )
-    ini_state = utils.SearchTuple(0 + h, 0, h, ini, None, None, x, True)
     open_set = [ini_state]
     heapq.heapify(open_set)
     visited = 0
@@ -629,15 +807,15 @@ def __search(
     traversed = 0
     lp_solved = 1
 
-    trans_empty_preset = set(
-        t for t in sync_net.transitions if len(t.in_arcs) == 0
-    )
-
     while not len(open_set) == 0:
         if (time.time() - start_time) > max_align_time_trace:
             return None
 
+        if stats is not None:
+            t0 = perf_counter()
         curr = heapq.heappop(open_set)
+        if stats is not None:
+            stats.heap_time += perf_counter() - t0
 
         current_marking = curr.m
 
@@ -645,24 +823,29 @@ def __search(
             if (time.time() - start_time) > max_align_time_trace:
                 return None
 
+            if stats is not None:
+                t0 = perf_counter()
             already_closed = current_marking in closed
+            if stats is not None:
+                stats.closed_time += perf_counter() - t0
             if already_closed:
+                # every remaining state was already closed: the final
+                # marking is not reachable
+                if not open_set:
+                    return None
+                if stats is not None:
+                    t0 = perf_counter()
                 curr = heapq.heappop(open_set)
+                if stats is not None:
+                    stats.heap_time += perf_counter() - t0
                 current_marking = curr.m
                 continue
 
-            h, x = utils.__compute_exact_heuristic_new_version(
-                sync_net,
-                a_matrix,
-                h_cvx,
-                g_matrix,
-                cost_vec,
-                incidence_matrix,
-                curr.m,
-                fin_vec,
-                lp_solver.DEFAULT_LP_SOLVER_VARIANT,
-                use_cvxopt=use_cvxopt,
-            )
+            if stats is not None:
+                t0 = perf_counter()
+            h, x = heuristic.exact(curr.m)
+            if stats is not None:
+                stats.heuristic_time += perf_counter() - t0
             lp_solved += 1
 
             # 11/10/19: shall not a state for which we compute the exact heuristics be
@@ -672,7 +855,11 @@ def __search(
             )
             # 11/10/2019 (optimization ZA) heappushpop is slightly more efficient than pushing
             # and popping separately
+            if stats is not None:
+                t0 = perf_counter()
             curr = heapq.heappushpop(open_set, tp)
+            if stats is not None:
+                stats.heap_time += perf_counter() - t0
             current_marking = curr.m
 
         # max allowed heuristics value (27/10/2019, due to the numerical
@@ -681,15 +868,19 @@ def __search(
             continue
 
         # 12/10/2019: do it again, since the marking could be changed
+        if stats is not None:
+            t0 = perf_counter()
         already_closed = current_marking in closed
+        if stats is not None:
+            stats.closed_time += perf_counter() - t0
         if already_closed:
             continue
 
         # 12/10/2019: the current marking can be equal to the final marking only if the heuristics
         # (underestimation of the remaining cost) is 0. Low-hanging fruits
         if curr.h < 0.01:
-            if current_marking == fin:
-                return utils.__reconstruct_alignment(
+            if current_marking == fin_m:
+                alignment = utils.__reconstruct_alignment(
                     curr,
                     visited,
                     queued,
@@ -697,42 +888,62 @@ def __search(
                     ret_tuple_as_trans_desc=ret_tuple_as_trans_desc,
                     lp_solved=lp_solved,
                 )
-
+                alignment["lp_time"] = sum(lp_solve_times)
+                if return_lp_solve_times:
+                    alignment["lp_solve_times"] = list(lp_solve_times)
+                if stats is not None:
+                    stats.record_goal(curr)
+                    alignment["search_statistics"] = stats.to_dict()
+                return alignment
+
+        if stats is not None:
+            t0 = perf_counter()
         closed.add(current_marking)
+        if stats is not None:
+            stats.closed_time += perf_counter() - t0
         visited += 1
+        if stats is not None:
+            stats.sample_open_set(visited, len(open_set))
 
-        enabled_trans = copy(trans_empty_preset)
-        for p in current_marking:
-            for t in p.ass_trans:
-                if t.sub_marking <= current_marking:
-                    enabled_trans.add(t)
-
-        trans_to_visit_with_cost = [
-            (t, cost_function[t])
-            for t in enabled_trans
-            if not (
-                t is not None
-                and utils.__is_log_move(t, skip)
-                and utils.__is_model_move(t, skip)
-            )
-        ]
+        if stats is not None:
+            t0 = perf_counter()
+            enabled = compiled.enabled_transitions(current_marking)
+            stats.successors_time += perf_counter() - t0
+        else:
+            enabled = compiled.enabled_transitions(current_marking)
 
-        for t, cost in trans_to_visit_with_cost:
+        for t_idx in enabled:
             traversed += 1
-            new_marking = utils.add_markings(current_marking, t.add_marking)
+            if stats is not None:
+                t0 = perf_counter()
+                new_marking = compiled.fire(t_idx, current_marking)
+                t1 = perf_counter()
+                already_closed = new_marking in closed
+                stats.successors_time += t1 - t0
+                stats.closed_time += perf_counter() - t1
+            else:
+                new_marking = compiled.fire(t_idx, current_marking)
+                already_closed = new_marking in closed
 
-            if new_marking in closed:
+            if already_closed:
                 continue
-            g = curr.g + cost
+            t = ordered_transitions[t_idx]
+            g = curr.g + trans_costs[t_idx]
 
             queued += 1
-            h, x = utils.__derive_heuristic(
-                incidence_matrix, cost_vec, curr.x, t, curr.h
-            )
-            trustable = utils.__trust_solution(x)
+            if stats is not None:
+                t0 = perf_counter()
+            h, x = heuristic.derive(t_idx, new_marking, curr.h, curr.x)
+            trustable = heuristic.trust(x)
+            if stats is not None:
+                stats.heuristic_time += perf_counter() - t0
             new_f = g + h
 
             tp = utils.SearchTuple(
                 new_f, g, h, new_marking, curr, t, x, trustable
             )
+            if stats is not None:
+                t0 = perf_counter()
             heapq.heappush(open_set, tp)
+            if stats is not None:
+                stats.heap_time += perf_counter() - t0
@@ -22,7 +22,7 @@ Contact: info@processintelligence.solutions
 import heapq
 import time
 
-from pm4py.objects.petri_net.utils.align_utils import levenshtein, discountedEditDistance
+from pm4py.objects.petri_net.utils.align_utils import levenshtein_batch, discounted_edit_distance_batch
 from pm4py.objects.petri_net.utils.petri_utils import decorate_places_preset_trans, decorate_transitions_prepostset
 from pm4py.objects.petri_net.utils import align_utils as utils
 from pm4py.util import exec_utils
@@ -117,9 +117,12 @@ def __search(net, ini, fin, variants,  exponent=2, marking_limit=1000, epsilon =
             str_aa = [a.label for a in curr_aa] + [t.label]
 
         all= []
+        missing = [v for v in variants if str(v+str_aa) not in mymemory.keys() or not withFrac]
+        # distances of the prefix to all the (not memorized) variants at once
+        distances = dict(zip(map(str, missing), discounted_edit_distance_batch([str_aa], missing, exponent))) if missing else {}
         for v in variants:
             if str(v+str_aa) not in mymemory.keys() or not withFrac:
-                size_of_alignment, distance = discountedEditDistance(str_aa,v, exponent)
+                size_of_alignment, distance = len(str_aa) + len(v), float(distances[str(v)])
                 if withFrac:
                     mymemory[str(v+str_aa)] = distance + exponent**(-size_of_alignment)/(exponent-1)
                 else :
@@ -184,8 +187,9 @@ def getPrecision(run, variants, epsilon):
     '''
     run = [a.label for a in run]
     all= []
-    for v in variants:
-        all.append((levenshtein(run,v)/(len(v)+len(run))/(1+epsilon)**(len(run))))
+    distances = levenshtein_batch([run], variants)
+    for v, distance in zip(variants, distances):
+        all.append((float(distance)/(len(v)+len(run))/(1+epsilon)**(len(run))))
     index_of_min = all.index(min(all))
     precision = 1 - all[index_of_min]
     return precision
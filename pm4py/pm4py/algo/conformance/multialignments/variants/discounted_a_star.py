@@ -20,7 +20,7 @@ Website: https://processintelligence.solutions
 Contact: info@processintelligence.solutions
 '''
 import heapq
-from pm4py.objects.petri_net.utils.align_utils import  levenshtein, discountedEditDistance
+from pm4py.objects.petri_net.utils.align_utils import levenshtein_batch, discounted_edit_distance_batch
 from pm4py.objects.petri_net.utils.petri_utils import  decorate_places_preset_trans,  decorate_transitions_prepostset
 from pm4py.objects.petri_net.utils import align_utils as utils
 from pm4py.util import exec_utils
@@ -102,9 +102,12 @@ def __search(net, ini, fin, variants, exponent=2, marking_limit=1000):
             str_aa = [a.label for a in curr_ma] + [t.label]
 
         all= []
+        missing = [v for v in variants if str(v+str_aa) not in mymemory.keys() or not withFrac]
+        # distances of the prefix to all the (not memorized) variants at once
+        distances = dict(zip(map(str, missing), discounted_edit_distance_batch([str_aa], missing, exponent))) if missing else {}
         for v in variants:
             if str(v+str_aa) not in mymemory.keys() or not withFrac:
-                size_of_alignment, distance = discountedEditDistance(str_aa,v, exponent)
+                size_of_alignment, distance = len(str_aa) + len(v), float(distances[str(v)])
                 if withFrac:
                     mymemory[str(v+str_aa)] = distance - (exponent**(-len(str_aa)+1)-exponent**(-(len(str_aa)+len(v))))/(exponent-1)
                 else :
@@ -162,7 +165,4 @@ def getMaxDist(run, variants):
     We give the maximal levenshtein edit distance to the variants
     '''
     run = [a.label for a in run]
-    all= []
-    for v in variants:
-        all.append(levenshtein(run,v))
-    return max(all)
\ No newline at end of file
+    return float(max(levenshtein_batch([run], variants)))
\ No newline at end of file
@@ -29,6 +29,7 @@ from pm4py.objects.log.importer.xes.variants import (
     iterparse_20,
     chunk_regex,
     rustxes,
+    iterparse_parallel,
 )
 
 
@@ -39,6 +40,7 @@ class Variants(Enum):
     ITERPARSE_20 = iterparse_20
     CHUNK_REGEX = chunk_regex
     RUSTXES = rustxes
+    ITERPARSE_PARALLEL = iterparse_parallel
 
 
 def __get_variant(variant_str: str):
@@ -60,6 +62,8 @@ def __get_variant(variant_str: str):
         variant = Variants.ITERPARSE_MEM_COMPRESSED
     elif variant_str == "rustxes":
         variant = Variants.RUSTXES
+    elif variant_str == "iterparse_parallel":
+        variant = Variants.ITERPARSE_PARALLEL
 
     return variant
 
@@ -83,6 +87,7 @@ def apply(path, parameters=None, variant=constants.DEFAULT_XES_PARSER):
         Variant of the algorithm to use, including:
             - Variants.ITERPARSE
             - Variants.LINE_BY_LINE
+            - Variants.ITERPARSE_PARALLEL
 
     Returns
     -----------
@@ -24,4 +24,5 @@ from pm4py.objects.log.importer.xes.variants import (
     line_by_line,
     iterparse_mem_compressed,
     chunk_regex,
+    iterparse_parallel,
 )
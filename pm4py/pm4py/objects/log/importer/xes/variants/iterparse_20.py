@@ -22,9 +22,11 @@ Contact: info@processintelligence.solutions
 import gzip
 import logging
 import importlib.util
+import os
 import sys
 from enum import Enum
 from io import BytesIO
+from typing import Iterator
 
 from pm4py.objects.log.obj import EventLog, Trace, Event
 from pm4py.objects.log.util import sorting
@@ -74,23 +76,27 @@ def count_traces(context):
     return num_traces
 
 
-def import_from_context(context, num_traces, parameters=None):
+def iterate_from_context(context, log, parameters=None) -> Iterator[Trace]:
     """
-    Import a XES log from an iterparse context
+    Iterates over the traces of a XES log from an iterparse context.
+    The XML elements are released as soon as they are parsed, so that the
+    memory needed does not grow with the size of the log.
 
     Parameters
     --------------
     context
         Iterparse context
-    num_traces
-        Number of traces of the XES log
+    log
+        Event log receiving the attributes, the extensions, the globals and
+        the classifiers of the XES log (but not its traces)
     parameters
-        Parameters of the algorithm
+        Parameters of the algorithm, including:
+            Parameters.MAX_TRACES -> Specify the maximum number of traces to import from the log (read in order in the XML file)
 
     Returns
     --------------
-    log
-        Event log
+    traces
+        Iterator over the traces of the XES log
     """
     if parameters is None:
         parameters = {}
@@ -98,31 +104,10 @@ def import_from_context(context, num_traces, parameters=None):
     max_no_traces_to_import = exec_utils.get_param_value(
         Parameters.MAX_TRACES, parameters, sys.maxsize
     )
-    timestamp_sort = exec_utils.get_param_value(
-        Parameters.TIMESTAMP_SORT, parameters, False
-    )
-    timestamp_key = exec_utils.get_param_value(
-        Parameters.TIMESTAMP_KEY,
-        parameters,
-        xes_constants.DEFAULT_TIMESTAMP_KEY,
-    )
-    reverse_sort = exec_utils.get_param_value(
-        Parameters.REVERSE_SORT, parameters, False
-    )
-    show_progress_bar = exec_utils.get_param_value(
-        Parameters.SHOW_PROGRESS_BAR, parameters, constants.SHOW_PROGRESS_BAR
-    )
-
     date_parser = dt_parser.get()
-    progress = None
-    if importlib.util.find_spec("tqdm") and show_progress_bar:
-        from tqdm.auto import tqdm
-
-        progress = tqdm(
-            total=num_traces, desc="parsing log, completed traces :: "
-        )
 
-    log = None
+    log_opened = False
+    n_traces = 0
     trace = None
     event = None
 
@@ -173,7 +158,7 @@ def import_from_context(context, num_traces, parameters=None):
                 continue
 
             elif elem.tag.endswith(xes_constants.TAG_TRACE):
-                if len(log) >= max_no_traces_to_import:
+                if n_traces >= max_no_traces_to_import:
                     break
                 if trace is not None:
                     raise SyntaxError(
@@ -266,7 +251,7 @@ def import_from_context(context, num_traces, parameters=None):
                 continue
 
             elif elem.tag.endswith(xes_constants.TAG_EXTENSION):
-                if log is None:
+                if not log_opened:
                     raise SyntaxError("extension found outside of <log> tag")
                 if (
                     elem.get(xes_constants.KEY_NAME) is not None
@@ -282,7 +267,7 @@ def import_from_context(context, num_traces, parameters=None):
                 continue
 
             elif elem.tag.endswith(xes_constants.TAG_GLOBAL):
-                if log is None:
+                if not log_opened:
                     raise SyntaxError("global found outside of <log> tag")
                 if elem.get(xes_constants.KEY_SCOPE) is not None:
                     log.omni_present[elem.get(xes_constants.KEY_SCOPE)] = {}
@@ -292,7 +277,7 @@ def import_from_context(context, num_traces, parameters=None):
                 continue
 
             elif elem.tag.endswith(xes_constants.TAG_CLASSIFIER):
-                if log is None:
+                if not log_opened:
                     raise SyntaxError("classifier found outside of <log> tag")
                 if elem.get(xes_constants.KEY_KEYS) is not None:
                     classifier_value = elem.get(xes_constants.KEY_KEYS)
@@ -307,9 +292,9 @@ def import_from_context(context, num_traces, parameters=None):
                 continue
 
             elif elem.tag.endswith(xes_constants.TAG_LOG):
-                if log is not None:
+                if log_opened:
                     raise SyntaxError("file contains > 1 <log> tags")
-                log = EventLog()
+                log_opened = True
                 tree[elem] = log.attributes
                 continue
 
@@ -330,17 +315,83 @@ def import_from_context(context, num_traces, parameters=None):
                 continue
 
             elif elem.tag.endswith(xes_constants.TAG_TRACE):
-                log.append(trace)
-
-                if progress is not None:
-                    progress.update()
-
+                n_traces += 1
+                yield trace
                 trace = None
                 continue
 
             elif elem.tag.endswith(xes_constants.TAG_LOG):
                 continue
 
+    del context
+
+
+def import_from_context(context, num_traces, parameters=None, position=None):
+    """
+    Import a XES log from an iterparse context
+
+    Parameters
+    --------------
+    context
+        Iterparse context
+    num_traces
+        Number of traces of the XES log (with position: size of the XES
+        file, in bytes)
+    parameters
+        Parameters of the algorithm
+    position
+        (optional) function returning the number of bytes of the XES file
+        read so far, driving the progress bar instead of the traces
+
+    Returns
+    --------------
+    log
+        Event log
+    """
+    if parameters is None:
+        parameters = {}
+
+    timestamp_sort = exec_utils.get_param_value(
+        Parameters.TIMESTAMP_SORT, parameters, False
+    )
+    timestamp_key = exec_utils.get_param_value(
+        Parameters.TIMESTAMP_KEY,
+        parameters,
+        xes_constants.DEFAULT_TIMESTAMP_KEY,
+    )
+    reverse_sort = exec_utils.get_param_value(
+        Parameters.REVERSE_SORT, parameters, False
+    )
+    show_progress_bar = exec_utils.get_param_value(
+        Parameters.SHOW_PROGRESS_BAR, parameters, constants.SHOW_PROGRESS_BAR
+    )
+
+    progress = None
+    if importlib.util.find_spec("tqdm") and show_progress_bar:
+        from tqdm.auto import tqdm
+
+        if position is None:
+            progress = tqdm(
+                total=num_traces, desc="parsing log, completed traces :: "
+            )
+        else:
+            progress = tqdm(
+                total=num_traces,
+                unit="B",
+                unit_scale=True,
+                desc="parsing log :: ",
+            )
+
+    log = EventLog()
+    for trace in iterate_from_context(context, log, parameters=parameters):
+        log.append(trace)
+
+        if progress is not None:
+            if position is None:
+                progress.update()
+            else:
+                progress.update(position() - progress.n)
+
     # gracefully close progress bar
     if progress is not None:
         progress.close()
@@ -433,39 +484,72 @@ def import_log(filename, parameters=None):
     encoding = exec_utils.get_param_value(
         Parameters.ENCODING, parameters, constants.DEFAULT_ENCODING
     )
-    show_progress_bar = exec_utils.get_param_value(
-        Parameters.SHOW_PROGRESS_BAR, parameters, constants.SHOW_PROGRESS_BAR
-    )
     is_compressed = filename.lower().endswith(".gz")
 
-    if importlib.util.find_spec("tqdm") and show_progress_bar:
-        if is_compressed:
-            f = gzip.open(filename, "rb")
-        else:
-            f = open(filename, "rb")
-        context = etree.iterparse(
-            f, events=[_EVENT_START, _EVENT_END], encoding=encoding
-        )
-        num_traces = count_traces(context)
-        f.close()
-    else:
-        # avoid the iteration to calculate the number of traces is "tqdm" is
-        # not used
-        num_traces = 0
-
+    # single pass: the progress is given by the bytes (of the possibly
+    # compressed file) read by the parser
     if is_compressed:
         f = gzip.open(filename, "rb")
+        raw = f.fileobj
     else:
         f = open(filename, "rb")
+        raw = f
     context = etree.iterparse(
         f, events=[_EVENT_START, _EVENT_END], encoding=encoding
     )
 
-    log = import_from_context(context, num_traces, parameters=parameters)
+    log = import_from_context(
+        context,
+        os.path.getsize(filename),
+        parameters=parameters,
+        position=raw.tell,
+    )
     f.close()
     return log
 
 
+def iter_traces(filename, parameters=None) -> Iterator[Trace]:
+    """
+    Streams the traces of a XES file, parsing it once and releasing the XML
+    elements as soon as they are read (the traces are not sorted)
+
+    Parameters
+    ----------
+    filename:
+        Absolute filename
+    parameters
+        Parameters of the algorithm, including
+            Parameters.MAX_TRACES -> Specify the maximum number of traces to import from the log (read in order in the XML file)
+            Parameters.ENCODING -> regulates the encoding (default: utf-8)
+
+    Returns
+    -------
+    traces
+        Iterator over the traces of the XES file
+    """
+    from lxml import etree
+
+    if parameters is None:
+        parameters = {}
+
+    encoding = exec_utils.get_param_value(
+        Parameters.ENCODING, parameters, constants.DEFAULT_ENCODING
+    )
+    if filename.lower().endswith(".gz"):
+        f = gzip.open(filename, "rb")
+    else:
+        f = open(filename, "rb")
+    try:
+        context = etree.iterparse(
+            f, events=[_EVENT_START, _EVENT_END], encoding=encoding
+        )
+        yield from iterate_from_context(
+            context, EventLog(), parameters=parameters
+        )
+    finally:
+        f.close()
+
+
 def import_from_string(log_string, parameters=None):
     """
     Deserialize a text/binary string representing a XES log
@@ -497,9 +581,6 @@ def import_from_string(log_string, parameters=None):
     encoding = exec_utils.get_param_value(
         Parameters.ENCODING, parameters, constants.DEFAULT_ENCODING
     )
-    show_progress_bar = exec_utils.get_param_value(
-        Parameters.SHOW_PROGRESS_BAR, parameters, constants.SHOW_PROGRESS_BAR
-    )
     decompress_serialization = exec_utils.get_param_value(
         Parameters.DECOMPRESS_SERIALIZATION, parameters, False
     )
@@ -507,25 +588,7 @@ def import_from_string(log_string, parameters=None):
     if type(log_string) is str:
         log_string = log_string.encode(constants.DEFAULT_ENCODING)
 
-    if importlib.util.find_spec("tqdm") and show_progress_bar:
-        # first iteration: count the number of traces
-        b = BytesIO(log_string)
-        if decompress_serialization:
-            s = gzip.GzipFile(fileobj=b, mode="rb")
-        else:
-            s = b
-        context = etree.iterparse(
-            s, events=[_EVENT_START, _EVENT_END], encoding=encoding
-        )
-        num_traces = count_traces(context)
-        s.close()
-        b.close()
-    else:
-        # avoid the iteration to calculate the number of traces is "tqdm" is
-        # not used
-        num_traces = 0
-
-    # second iteration: actually read the content
+    # single pass: the progress is given by the bytes read by the parser
     b = BytesIO(log_string)
     if decompress_serialization:
         s = gzip.GzipFile(fileobj=b, mode="rb")
@@ -534,7 +597,9 @@ def import_from_string(log_string, parameters=None):
     context = etree.iterparse(
         s, events=[_EVENT_START, _EVENT_END], encoding=encoding
     )
-    log = import_from_context(context, num_traces, parameters=parameters)
+    log = import_from_context(
+        context, len(log_string), parameters=parameters, position=b.tell
+    )
     s.close()
     b.close()
     return log
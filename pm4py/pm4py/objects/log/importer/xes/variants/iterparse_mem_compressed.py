@@ -22,6 +22,7 @@ Contact: info@processintelligence.solutions
 import gzip
 import logging
 import importlib.util
+import os
 import sys
 from enum import Enum
 from io import BytesIO
@@ -74,7 +75,9 @@ def count_traces(context):
     return num_traces
 
 
-def import_from_context(context, num_traces, log, parameters=None):
+def import_from_context(
+    context, num_traces, log, parameters=None, position=None
+):
     """
     Import a XES log from an iterparse context
 
@@ -83,11 +86,15 @@ def import_from_context(context, num_traces, log, parameters=None):
     context
         Iterparse context
     num_traces
-        Number of traces of the XES log
+        Number of traces of the XES log (with position: size of the XES
+        file, in bytes)
     log
         Event log (empty)
     parameters
         Parameters of the algorithm
+    position
+        (optional) function returning the number of bytes of the XES file
+        read so far, driving the progress bar instead of the traces
 
     Returns
     --------------
@@ -120,9 +127,17 @@ def import_from_context(context, num_traces, log, parameters=None):
     if importlib.util.find_spec("tqdm") and show_progress_bar:
         from tqdm.auto import tqdm
 
-        progress = tqdm(
-            total=num_traces, desc="parsing log, completed traces :: "
-        )
+        if position is None:
+            progress = tqdm(
+                total=num_traces, desc="parsing log, completed traces :: "
+            )
+        else:
+            progress = tqdm(
+                total=num_traces,
+                unit="B",
+                unit_scale=True,
+                desc="parsing log :: ",
+            )
 
     trace = None
     event = None
@@ -335,7 +350,10 @@ def import_from_context(context, num_traces, log, parameters=None):
                 log.append(trace)
 
                 if progress is not None:
-                    progress.update()
+                    if position is None:
+                        progress.update()
+                    else:
+                        progress.update(position() - progress.n)
 
                 trace = None
                 continue
@@ -435,36 +453,28 @@ def import_log(filename, parameters=None):
     encoding = exec_utils.get_param_value(
         Parameters.ENCODING, parameters, constants.DEFAULT_ENCODING
     )
-    show_progress_bar = exec_utils.get_param_value(
-        Parameters.SHOW_PROGRESS_BAR, parameters, constants.SHOW_PROGRESS_BAR
-    )
     is_compressed = filename.lower().endswith(".gz")
 
-    if importlib.util.find_spec("tqdm") and show_progress_bar:
-        if is_compressed:
-            f = gzip.open(filename, "rb")
-        else:
-            f = open(filename, "rb")
-        context = etree.iterparse(
-            f, events=[_EVENT_START, _EVENT_END], encoding=encoding
-        )
-        num_traces = count_traces(context)
-        f.close()
-    else:
-        # avoid the iteration to calculate the number of traces is "tqdm" is
-        # not used
-        num_traces = 0
-
+    # single pass: the progress is given by the bytes (of the possibly
+    # compressed file) read by the parser
     if is_compressed:
         f = gzip.open(filename, "rb")
+        raw = f.fileobj
     else:
         f = open(filename, "rb")
+        raw = f
     context = etree.iterparse(
         f, events=[_EVENT_START, _EVENT_END], encoding=encoding
     )
 
     log = EventLog()
-    log = import_from_context(context, num_traces, log, parameters=parameters)
+    log = import_from_context(
+        context,
+        os.path.getsize(filename),
+        log,
+        parameters=parameters,
+        position=raw.tell,
+    )
     f.close()
     return log
 
@@ -500,9 +510,6 @@ def import_from_string(log_string, parameters=None):
     encoding = exec_utils.get_param_value(
         Parameters.ENCODING, parameters, constants.DEFAULT_ENCODING
     )
-    show_progress_bar = exec_utils.get_param_value(
-        Parameters.SHOW_PROGRESS_BAR, parameters, constants.SHOW_PROGRESS_BAR
-    )
     decompress_serialization = exec_utils.get_param_value(
         Parameters.DECOMPRESS_SERIALIZATION, parameters, False
     )
@@ -510,25 +517,7 @@ def import_from_string(log_string, parameters=None):
     if type(log_string) is str:
         log_string = log_string.encode(constants.DEFAULT_ENCODING)
 
-    if importlib.util.find_spec("tqdm") and show_progress_bar:
-        # first iteration: count the number of traces
-        b = BytesIO(log_string)
-        if decompress_serialization:
-            s = gzip.GzipFile(fileobj=b, mode="rb")
-        else:
-            s = b
-        context = etree.iterparse(
-            s, events=[_EVENT_START, _EVENT_END], encoding=encoding
-        )
-        num_traces = count_traces(context)
-        s.close()
-        b.close()
-    else:
-        # avoid the iteration to calculate the number of traces is "tqdm" is
-        # not used
-        num_traces = 0
-
-    # second iteration: actually read the content
+    # single pass: the progress is given by the bytes read by the parser
     b = BytesIO(log_string)
     if decompress_serialization:
         s = gzip.GzipFile(fileobj=b, mode="rb")
@@ -538,7 +527,13 @@ def import_from_string(log_string, parameters=None):
         s, events=[_EVENT_START, _EVENT_END], encoding=encoding
     )
     log = EventLog()
-    log = import_from_context(context, num_traces, log, parameters=parameters)
+    log = import_from_context(
+        context,
+        len(log_string),
+        log,
+        parameters=parameters,
+        position=b.tell,
+    )
     s.close()
     b.close()
     return log
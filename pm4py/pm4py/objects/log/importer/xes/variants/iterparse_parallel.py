@@ -0,0 +1,390 @@
+'''
+    PM4Py – A Process Mining Library for Python
+Copyright (C) 2024 Process Intelligence Solutions UG (haftungsbeschränkt)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see this software project's root or
+visit <https://www.gnu.org/licenses/>.
+
+Website: https://processintelligence.solutions
+Contact: info@processintelligence.solutions
+'''
+"""
+Parallel variant of the iterparse importer.
+
+The (uncompressed) XES file is split at the beginning of its <trace> tags into byte ranges, which are parsed in
+parallel by a pool of processes: each range is parsed as a XES document of its own, made of the header of the file
+(everything before the first trace: log attributes, extensions, globals and classifiers) and the traces of the range.
+The parsed chunks are merged in the order of the file, either as an EventLog or as a dataframe (built in the workers).
+"""
+import importlib.util
+import os
+import re
+import sys
+from copy import copy
+from enum import Enum
+from io import BytesIO
+
+from pm4py.objects.log.importer.xes.variants import iterparse
+from pm4py.objects.log.obj import EventLog
+from pm4py.objects.log.util import sorting
+from pm4py.util import exec_utils, constants, pandas_utils
+from pm4py.util import xes_constants
+
+
+class Parameters(Enum):
+    TIMESTAMP_SORT = "timestamp_sort"
+    TIMESTAMP_KEY = constants.PARAMETER_CONSTANT_TIMESTAMP_KEY
+    REVERSE_SORT = "reverse_sort"
+    MAX_TRACES = "max_traces"
+    SHOW_PROGRESS_BAR = "show_progress_bar"
+    ENCODING = "encoding"
+    CORES = "cores"
+    CHUNK_SIZE = "chunk_size"
+    RETURN_LEGACY_LOG_OBJECT = "return_legacy_log_object"
+
+
+# number of byte ranges per core (when the chunk size is not given), to
+# balance the load of the workers
+CHUNKS_PER_CORE = 4
+# ranges smaller than this are not worth a task of their own
+MIN_CHUNK_SIZE = 2**16
+# bytes read at once when looking for the beginning of a trace
+SCAN_BLOCK_SIZE = 2**20
+
+_TRACE_START = re.compile(rb"<trace[\s/>]")
+_LOG_END = b"</log>"
+
+
+def __find_trace_start(f, offset):
+    """
+    Finds the first <trace> tag of a file at or after the given offset
+
+    Parameters
+    --------------
+    f
+        File object (binary)
+    offset
+        Offset (bytes)
+
+    Returns
+    --------------
+    position
+        Offset of the tag (None if there is no further trace)
+    """
+    # overlap between consecutive blocks, so that no tag is cut
+    overlap = len(b"<trace ") - 1
+    f.seek(offset)
+    while True:
+        block = f.read(SCAN_BLOCK_SIZE)
+        match = _TRACE_START.search(block)
+        if match is not None:
+            return offset + match.start()
+        if len(block) < SCAN_BLOCK_SIZE:
+            return None
+        offset += len(block) - overlap
+        f.seek(offset)
+
+
+def split_file(filename, chunk_size):
+    """
+    Splits a XES file at the beginning of its traces
+
+    Parameters
+    --------------
+    filename
+        Path of the (uncompressed) XES file
+    chunk_size
+        Approximate size of the byte ranges
+
+    Returns
+    --------------
+    header
+        Content of the file before its first trace (None if the file contains no trace)
+    ranges
+        (start, end) offsets of the byte ranges, each one beginning with a <trace> tag; the last one ends with the
+        file
+    """
+    size = os.path.getsize(filename)
+    with open(filename, "rb") as f:
+        first = __find_trace_start(f, 0)
+        if first is None:
+            return None, []
+        starts = [first]
+        for target in range(first + chunk_size, size, chunk_size):
+            if target <= starts[-1]:
+                continue
+            start = __find_trace_start(f, target)
+            if start is None:
+                break
+            starts.append(start)
+        f.seek(0)
+        header = f.read(first)
+    return header, list(zip(starts, starts[1:] + [size]))
+
+
+def __parse_chunk(
+    filename, header, start, end, last, encoding, as_dataframe
+):
+    """
+    Parses a byte range of a XES file (task of the workers)
+
+    Returns
+    --------------
+    chunk
+        List of traces, or dataframe of their events (with the case attributes)
+    """
+    from lxml import etree
+
+    with open(filename, "rb") as f:
+        f.seek(start)
+        content = f.read(end - start)
+    # the last range already closes the <log> tag
+    if not last:
+        content += _LOG_END
+
+    context = etree.iterparse(
+        BytesIO(header + content),
+        events=[iterparse._EVENT_START, iterparse._EVENT_END],
+        encoding=encoding,
+    )
+    traces = list(iterparse.iterate_from_context(context, EventLog()))
+    if not as_dataframe:
+        return traces
+    return __traces_to_dataframe(traces)
+
+
+def __traces_to_dataframe(traces):
+    # same layout as the conversion of an EventLog to a dataframe
+    rows = []
+    for trace in traces:
+        case_attributes = {
+            constants.CASE_ATTRIBUTE_PREFIX + key: value
+            for key, value in trace.attributes.items()
+        }
+        for event in trace:
+            row = dict(event)
+            row.update(case_attributes)
+            rows.append(row)
+    return pandas_utils.instantiate_dataframe(rows)
+
+
+def __set_properties(log):
+    # sets the activity key as default classifier in the log's properties
+    log.properties[constants.PARAMETER_CONSTANT_ACTIVITY_KEY] = (
+        xes_constants.DEFAULT_NAME_KEY
+    )
+    log.properties[constants.PARAMETER_CONSTANT_ATTRIBUTE_KEY] = (
+        xes_constants.DEFAULT_NAME_KEY
+    )
+    # sets the default timestamp key
+    log.properties[constants.PARAMETER_CONSTANT_TIMESTAMP_KEY] = (
+        xes_constants.DEFAULT_TIMESTAMP_KEY
+    )
+    # sets the default resource key
+    log.properties[constants.PARAMETER_CONSTANT_RESOURCE_KEY] = (
+        xes_constants.DEFAULT_RESOURCE_KEY
+    )
+    # sets the default transition key
+    log.properties[constants.PARAMETER_CONSTANT_TRANSITION_KEY] = (
+        xes_constants.DEFAULT_TRANSITION_KEY
+    )
+    # sets the default group key
+    log.properties[constants.PARAMETER_CONSTANT_GROUP_KEY] = (
+        xes_constants.DEFAULT_GROUP_KEY
+    )
+    return log
+
+
+def __get_progress_bar(total, parameters):
+    show_progress_bar = exec_utils.get_param_value(
+        Parameters.SHOW_PROGRESS_BAR, parameters, constants.SHOW_PROGRESS_BAR
+    )
+    progress = None
+    if importlib.util.find_spec("tqdm") and show_progress_bar:
+        from tqdm.auto import tqdm
+
+        progress = tqdm(
+            total=total, unit="B", unit_scale=True, desc="parsing log :: "
+        )
+    return progress
+
+
+def apply(filename, parameters=None):
+    """
+    Imports a XES file, parsing it in parallel
+
+    Parameters
+    ----------
+    filename:
+        Absolute filename
+    parameters
+        Parameters of the algorithm, including
+            Parameters.TIMESTAMP_SORT -> Specify if we should sort log by timestamp
+            Parameters.TIMESTAMP_KEY -> If sort is enabled, then sort the log by using this key
+            Parameters.REVERSE_SORT -> Specify in which direction the log should be sorted
+            Parameters.MAX_TRACES -> Specify the maximum number of traces to import from the log (read in order in the XML file)
+            Parameters.SHOW_PROGRESS_BAR -> Enables/disables the progress bar (default: True)
+            Parameters.ENCODING -> regulates the encoding (default: utf-8)
+            Parameters.CORES -> number of worker processes (default: number of CPUs - 2)
+            Parameters.CHUNK_SIZE -> approximate size (in bytes) of the byte ranges parsed by the workers
+            Parameters.RETURN_LEGACY_LOG_OBJECT -> returns an EventLog (default: True) or a dataframe
+
+    Returns
+    -------
+    log
+        Event log or dataframe
+    """
+    return import_log(filename, parameters)
+
+
+def import_log(filename, parameters=None):
+    """
+    Imports a XES file, parsing it in parallel.
+    Compressed files cannot be split, and a maximum number of traces only concerns the beginning of the file: they
+    are imported by the (sequential) iterparse importer, as is any file when a single core is available.
+
+    Parameters
+    ----------
+    filename:
+        Absolute filename
+    parameters
+        Parameters of the algorithm (see :func:`apply`)
+
+    Returns
+    -------
+    log
+        Event log or dataframe
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    if parameters is None:
+        parameters = {}
+
+    encoding = exec_utils.get_param_value(
+        Parameters.ENCODING, parameters, constants.DEFAULT_ENCODING
+    )
+    max_no_traces_to_import = exec_utils.get_param_value(
+        Parameters.MAX_TRACES, parameters, sys.maxsize
+    )
+    timestamp_sort = exec_utils.get_param_value(
+        Parameters.TIMESTAMP_SORT, parameters, False
+    )
+    timestamp_key = exec_utils.get_param_value(
+        Parameters.TIMESTAMP_KEY,
+        parameters,
+        xes_constants.DEFAULT_TIMESTAMP_KEY,
+    )
+    reverse_sort = exec_utils.get_param_value(
+        Parameters.REVERSE_SORT, parameters, False
+    )
+    return_legacy_log_object = exec_utils.get_param_value(
+        Parameters.RETURN_LEGACY_LOG_OBJECT, parameters, True
+    )
+    num_cores = exec_utils.get_param_value(
+        Parameters.CORES, parameters, multiprocessing.cpu_count() - 2
+    )
+    num_cores = max(1, num_cores)
+
+    size = os.path.getsize(filename)
+    chunk_size = exec_utils.get_param_value(
+        Parameters.CHUNK_SIZE,
+        parameters,
+        max(MIN_CHUNK_SIZE, -(-size // (num_cores * CHUNKS_PER_CORE))),
+    )
+
+    header = None
+    ranges = []
+    if (
+        num_cores > 1
+        and not filename.lower().endswith(".gz")
+        and max_no_traces_to_import == sys.maxsize
+    ):
+        header, ranges = split_file(filename, chunk_size)
+
+    if header is None:
+        log = iterparse.import_log(filename, parameters=parameters)
+        if not return_legacy_log_object:
+            return __to_dataframe(log)
+        return log
+
+    from lxml import etree
+
+    # log-level information (attributes, extensions, globals, classifiers)
+    log = EventLog()
+    context = etree.iterparse(
+        BytesIO(header + _LOG_END),
+        events=[iterparse._EVENT_START, iterparse._EVENT_END],
+        encoding=encoding,
+    )
+    for _ in iterparse.iterate_from_context(context, log):
+        pass
+    __set_properties(log)
+
+    # the traces are sorted after the merge: the dataframe is then built
+    # from the sorted log
+    as_dataframe = not return_legacy_log_object and not timestamp_sort
+
+    chunks = [None] * len(ranges)
+    progress = __get_progress_bar(size - len(header), parameters)
+    with ProcessPoolExecutor(
+        max_workers=min(num_cores, len(ranges))
+    ) as executor:
+        futures = {
+            executor.submit(
+                __parse_chunk,
+                filename,
+                header,
+                start,
+                end,
+                end == size,
+                encoding,
+                as_dataframe,
+            ): index
+            for index, (start, end) in enumerate(ranges)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            chunks[index] = future.result()
+            if progress is not None:
+                progress.update(ranges[index][1] - ranges[index][0])
+
+    # gracefully close progress bar
+    if progress is not None:
+        progress.close()
+    del progress
+
+    if as_dataframe:
+        df = pandas_utils.concat(chunks, ignore_index=True)
+        df.attrs = copy(log.properties)
+        return df
+
+    for traces in chunks:
+        for trace in traces:
+            log.append(trace)
+
+    if timestamp_sort:
+        log = sorting.sort_timestamp(
+            log, timestamp_key=timestamp_key, reverse_sort=reverse_sort
+        )
+
+    if not return_legacy_log_object:
+        return __to_dataframe(log)
+    return log
+
+
+def __to_dataframe(log):
+    df = __traces_to_dataframe(log)
+    df.attrs = copy(log.properties)
+    return df
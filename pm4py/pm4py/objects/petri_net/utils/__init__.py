@@ -22,6 +22,7 @@ Contact: info@processintelligence.solutions
 from pm4py.objects.petri_net.utils import (
     align_utils,
     check_soundness,
+    compiled_net,
     consumption_matrix,
     decomposition,
     embed_stochastic_map,
@@ -292,6 +292,34 @@ def __compute_exact_heuristic_new_version(
     strict=True,
 ):
     m_vec = incidence_matrix.encode_marking(marking)
+    return __compute_exact_heuristic_marking_vector(
+        sync_net,
+        a_matrix,
+        h_cvx,
+        g_matrix,
+        cost_vec,
+        m_vec,
+        fin_vec,
+        variant,
+        use_cvxopt=use_cvxopt,
+        strict=strict,
+    )
+
+
+def __compute_exact_heuristic_marking_vector(
+    sync_net,
+    a_matrix,
+    h_cvx,
+    g_matrix,
+    cost_vec,
+    m_vec,
+    fin_vec,
+    variant,
+    use_cvxopt=False,
+    strict=True,
+):
+    # same as __compute_exact_heuristic_new_version, but starting from an
+    # already encoded marking (e.g., a marking of a compiled net)
     b_term = [i - j for i, j in zip(fin_vec, m_vec)]
     b_term = np.matrix([x * 1.0 for x in b_term]).transpose()
 
@@ -329,6 +357,34 @@ def __compute_exact_heuristic_new_version(
     return prim_obj, points
 
 
+class IncrementalLpHeuristic(object):
+    """
+    State-equation (LP) heuristic kept alive for a whole synchronous product net.
+    Only the right-hand side (final marking - current marking) changes between two computations,
+    hence the LP is re-solved with a warm start from the previous optimal basis (dual simplex).
+    The time spent in every solve is recorded in solve_times.
+    """
+
+    def __init__(self, a_matrix, cost_vec, fin_vec):
+        from pm4py.util.lp.warm_start import WarmStartLp
+
+        self.fin_vec = np.asarray(fin_vec, dtype=np.float64)
+        self.lp = WarmStartLp(cost_vec, a_matrix)
+
+    def compute(self, m_vec):
+        prim_obj, points = self.lp.solve(
+            self.fin_vec - np.asarray(m_vec, dtype=np.float64)
+        )
+        prim_obj = prim_obj if prim_obj is not None else sys.maxsize
+        points = points if points is not None else [0.0] * self.lp.n
+        return prim_obj, points
+
+    def __get_solve_times(self):
+        return self.lp.solve_times
+
+    solve_times = property(__get_solve_times)
+
+
 def __get_tuple_from_queue(marking, queue):
     for t in queue:
         if t.m == marking:
@@ -541,78 +597,378 @@ def get_visible_transitions_eventually_enabled_by_marking(net, marking):
 
     return visible_transitions
 
-def discountedEditDistance(s1,s2,exponent=2, modeled=True):
+
+def encode_label_sequences(sequences, label_index=None):
+    """
+    Encodes sequences of labels as a padded matrix of integers (the same label gets the same code in all the
+    sequences; the padding is -1)
+
+    Parameters
+    -------------
+    sequences
+        List of sequences of labels
+    label_index
+        Dictionary assigning a code to the labels (extended with the labels that are missing)
+
+    Returns
+    -------------
+    codes
+        Matrix of codes (one row per sequence)
+    lengths
+        Length of each sequence
+    label_index
+        Dictionary assigning a code to the labels
+    """
+    if label_index is None:
+        label_index = {}
+    lengths = np.array([len(seq) for seq in sequences], dtype=np.int64)
+    codes = np.full(
+        (len(sequences), int(lengths.max()) if len(sequences) else 0),
+        -1,
+        dtype=np.int64,
+    )
+    for i, seq in enumerate(sequences):
+        for j, label in enumerate(seq):
+            if label not in label_index:
+                label_index[label] = len(label_index)
+            codes[i, j] = label_index[label]
+    return codes, lengths, label_index
+
+
+def batch_edit_distance(
+    model_codes,
+    model_lengths,
+    trace_codes,
+    trace_lengths,
+    model_free=None,
+    model_counted=None,
+    exponent=None,
+):
+    """
+    Edit distance without substitutions between pairs of integer-encoded sequences (a model sequence, whose
+    positions can be marked as free to skip, and a trace), computed for all the pairs at once.
+    The rows of the model and of the trace side are broadcast against each other (e.g., one model sequence
+    against many traces).
+
+    The distance is the cheapest path of the usual dynamic programming table, where the cell (i, j) is reached
+    from (i-1, j) (skipping the i-th model position, free if model_free), from (i, j-1) (skipping the j-th event)
+    or from (i-1, j-1) if the i-th model position and the j-th event have the same code. Every skip costs 1 or,
+    when an exponent is provided, exponent^-(i+j-1) (discounted distance); the first column counts only the
+    model positions in model_counted. The table is computed one model position at a time, for all the pairs and
+    all the events at once (the dependency along the row is resolved by a cumulative minimum).
+
+    Parameters
+    -------------
+    model_codes
+        Codes of the model sequences (matrix, padded with negative codes)
+    model_lengths
+        Lengths of the model sequences
+    trace_codes
+        Codes of the traces (matrix, padded with negative codes)
+    trace_lengths
+        Lengths of the traces
+    model_free
+        Boolean matrix, the model positions that can be skipped for free (default: none)
+    model_counted
+        Boolean matrix, the model positions counted in the first column of the table (default: all)
+    exponent
+        Base of the discount (default: no discount)
+
+    Returns
+    -------------
+    distances
+        Distance of each pair
+    """
+    model_codes = np.atleast_2d(np.asarray(model_codes, dtype=np.int64))
+    trace_codes = np.atleast_2d(np.asarray(trace_codes, dtype=np.int64))
+    model_lengths = np.atleast_1d(np.asarray(model_lengths, dtype=np.int64))
+    trace_lengths = np.atleast_1d(np.asarray(trace_lengths, dtype=np.int64))
+    n = model_codes.shape[1]
+    m = trace_codes.shape[1]
+    batch = np.broadcast_shapes(
+        (model_codes.shape[0],), (trace_codes.shape[0],)
+    )[0]
+    model_codes = np.broadcast_to(model_codes, (batch, n))
+    trace_codes = np.broadcast_to(trace_codes, (batch, m))
+    model_lengths = np.broadcast_to(model_lengths, (batch,))
+    trace_lengths = np.broadcast_to(trace_lengths, (batch,))
+    if model_free is None:
+        model_free = np.zeros((batch, n), dtype=bool)
+    model_free = np.broadcast_to(
+        np.asarray(model_free, dtype=bool), (batch, n)
+    )
+    if model_counted is None:
+        model_counted = np.ones((batch, n), dtype=bool)
+    model_counted = np.broadcast_to(
+        np.asarray(model_counted, dtype=bool), (batch, n)
+    )
+
+    # weight of a skip in cell (i, j) (1-based): weights[i + j - 1]
+    if exponent is None:
+        weights = np.ones(n + m + 1)
+    else:
+        weights = float(exponent) ** -np.arange(n + m + 1, dtype=np.float64)
+    cell_weights = weights[
+        np.arange(n)[:, None] + np.arange(1, m + 1)[None, :]
+    ]
+    cum = np.zeros((n + 1, m + 1))
+    cum[0, 1:] = np.cumsum(weights[:m])
+    np.cumsum(cell_weights, axis=1, out=cum[1:, 1:])
+    first_col = np.cumsum(np.where(model_counted, weights[:n], 0.0), axis=1)
+    model_steps = np.where(model_free[:, :, None], 0.0, cell_weights[None])
+    matches = (model_codes[:, :, None] == trace_codes[:, None, :]) & (
+        model_codes[:, :, None] >= 0
+    )
+
+    rows = np.arange(batch)
+    distances = np.zeros(batch)
+    prev = np.broadcast_to(cum[0], (batch, m + 1)).copy()
+    done = model_lengths == 0
+    distances[done] = prev[done, trace_lengths[done]]
+
+    cand = np.empty((batch, m + 1))
+    diag = np.empty((batch, m))
+    for i in range(1, n + 1):
+        # skip of the model position (from the previous row) or match
+        cand[:, 0] = first_col[:, i - 1]
+        np.add(prev[:, 1:], model_steps[:, i - 1], out=cand[:, 1:])
+        diag.fill(np.inf)
+        np.copyto(diag, prev[:, :-1], where=matches[:, i - 1])
+        np.minimum(cand[:, 1:], diag, out=cand[:, 1:])
+        # skips of the events along the row:
+        # D[j] = min_k<=j (cand[k] + w[k+1..j])
+        cand -= cum[i]
+        np.minimum.accumulate(cand, axis=1, out=prev)
+        prev += cum[i]
+        done = model_lengths == i
+        if done.any():
+            distances[done] = prev[rows[done], trace_lengths[done]]
+    return distances
+
+
+# below this number of cells, a single pair is cheaper to compute without
+# numpy
+SCALAR_EDIT_DISTANCE_MAX_CELLS = 10000
+# below this total number of cells, a batch of pairs is cheaper to compute
+# one pair at a time
+SCALAR_EDIT_DISTANCE_MAX_BATCH_CELLS = 2000
+# label that does not match any event
+NO_MATCH = object()
+
+
+def __edit_distance_pair(model, trace, free, counted, exponent=None):
+    # same table as batch_edit_distance, for a single pair of sequences
+    n = len(model)
+    m = len(trace)
+    if exponent is None:
+        weights = [1.0] * (n + m + 1)
+    else:
+        weights = [float(exponent) ** -k for k in range(n + m + 1)]
+    prev = [0.0] * (m + 1)
+    for j in range(1, m + 1):
+        prev[j] = prev[j - 1] + weights[j - 1]
+    first = 0.0
+    for i in range(1, n + 1):
+        c1 = model[i - 1]
+        if counted[i - 1]:
+            first += weights[i - 1]
+        cur = [first]
+        is_free = free[i - 1]
+        for j in range(1, m + 1):
+            w = weights[i + j - 1]
+            v = prev[j] if is_free else prev[j] + w
+            d = cur[j - 1] + w
+            if d < v:
+                v = d
+            if c1 == trace[j - 1] and prev[j - 1] < v:
+                v = prev[j - 1]
+            cur.append(v)
+        prev = cur
+    return prev[m]
+
+
+def __is_silent_model_label(label, skip_is_silent=True):
+    return (
+        label is None
+        or label == "tau"
+        or label[0] == "n"
+        or (skip_is_silent and "skip" in label)
+    )
+
+
+def __is_silent_levenshtein_label(label):
+    return (
+        label is None
+        or label[0] == "n"
+        or "skip" in label
+        or "tau" in label
+    )
+
+
+def __levenshtein_pair(seq1, seq2):
+    silent = [__is_silent_levenshtein_label(label) for label in seq1]
+    # silent labels never match an event
+    model = [NO_MATCH if x else label for x, label in zip(silent, seq1)]
+    return __edit_distance_pair(model, seq2, silent, [True] * len(seq1))
+
+
+def levenshtein_batch(seqs1, seqs2):
+    """
+    Vectorised :func:`levenshtein` of many pairs of sequences at once
+
+    Parameters
+    -------------
+    seqs1
+        List of model sequences (with silent labels)
+    seqs2
+        List of traces; if one of the two lists has a single element, it is paired with all the elements of the
+        other one
+
+    Returns
+    -------------
+    distances
+        Distance of each pair
+    """
+    pairs = __scalar_batch(seqs1, seqs2)
+    if pairs is not None:
+        return np.array(
+            [__levenshtein_pair(seq1, seq2) for seq1, seq2 in pairs],
+            dtype=np.float64,
+        )
+    codes1, lengths1, label_index = encode_label_sequences(seqs1)
+    codes2, lengths2, label_index = encode_label_sequences(seqs2, label_index)
+    silent = np.zeros(codes1.shape, dtype=bool)
+    for i, seq in enumerate(seqs1):
+        for j, label in enumerate(seq):
+            silent[i, j] = __is_silent_levenshtein_label(label)
+    # silent labels never match an event
+    codes1 = np.where(silent, -1, codes1)
+    return batch_edit_distance(
+        codes1, lengths1, codes2, lengths2, model_free=silent
+    )
+
+
+def __discounted_edit_distance_masks(model, skip_is_silent):
+    free = [__is_silent_model_label(label, skip_is_silent) for label in model]
+    counted = [not __is_silent_model_label(label, False) for label in model]
+    return free, counted
+
+
+def __pairs(seqs1, seqs2):
+    # pairs of a batch, broadcasting a list with a single element
+    if len(seqs1) == 1:
+        return [(seqs1[0], s) for s in seqs2]
+    if len(seqs2) == 1:
+        return [(s, seqs2[0]) for s in seqs1]
+    if len(seqs1) != len(seqs2):
+        raise Exception(
+            "the two lists of sequences do not have the same length"
+        )
+    return list(zip(seqs1, seqs2))
+
+
+def __scalar_batch(seqs1, seqs2):
+    pairs = __pairs(seqs1, seqs2)
+    cells = sum(len(a) * len(b) for a, b in pairs)
+    if cells <= SCALAR_EDIT_DISTANCE_MAX_BATCH_CELLS:
+        return pairs
+    return None
+
+
+def __discounted_edit_distance(models, traces, exponent, skip_is_silent):
+    pairs = __scalar_batch(models, traces)
+    if pairs is not None:
+        distances = np.zeros(len(pairs))
+        for b, (model, trace) in enumerate(pairs):
+            free, counted = __discounted_edit_distance_masks(
+                model,
+                (
+                    skip_is_silent
+                    if skip_is_silent is not None
+                    else len(model) >= len(trace)
+                ),
+            )
+            distances[b] = __edit_distance_pair(
+                model, trace, free, counted, exponent=exponent
+            )
+        return distances
+    codes1, lengths1, label_index = encode_label_sequences(models)
+    codes2, lengths2, label_index = encode_label_sequences(traces, label_index)
+    batch = max(len(models), len(traces))
+    free = np.zeros((batch, codes1.shape[1]), dtype=bool)
+    counted = np.ones((batch, codes1.shape[1]), dtype=bool)
+    for b in range(batch):
+        model = models[b if len(models) > 1 else 0]
+        trace_length = lengths2[b if len(traces) > 1 else 0]
+        f, c = __discounted_edit_distance_masks(
+            model,
+            (
+                skip_is_silent
+                if skip_is_silent is not None
+                else len(model) >= trace_length
+            ),
+        )
+        free[b, : len(model)] = f
+        counted[b, : len(model)] = c
+    return batch_edit_distance(
+        codes1,
+        lengths1,
+        codes2,
+        lengths2,
+        model_free=free,
+        model_counted=counted,
+        exponent=exponent,
+    )
+
+
+def discounted_edit_distance_batch(models, traces, exponent=2):
+    """
+    Vectorised :func:`discountedEditDistance` (with the first argument being the model sequence) of many pairs
+    of sequences at once
+
+    Parameters
+    -------------
+    models
+        List of model sequences (with silent labels)
+    traces
+        List of traces; if one of the two lists has a single element, it is paired with all the elements of the
+        other one
+    exponent
+        Base of the discount
+
+    Returns
+    -------------
+    distances
+        Distance of each pair
+    """
+    # as in discountedEditDistance, the labels containing "skip" are free
+    # only when the model sequence is not shorter than the trace
+    return __discounted_edit_distance(models, traces, exponent, None)
+
+
+def discountedEditDistance(s1, s2, exponent=2, modeled=True):
     '''
-    Fast implementation of the discounted distance
-    Inspired from the faster version of the edit distance
+    Discounted edit distance between a model sequence and a trace (see :func:`discounted_edit_distance_batch`)
     '''
-    #print(s1,s2)
     if len(s1) < len(s2):
-        return discountedEditDistance(s2, s1,exponent=exponent,modeled=False)
-
-    previous_row = [0]
-    for a in range(len(s2)):
-        if not modeled and (s2[a]=="tau" or s2[a]==None or s2[a][0]=="n"):
-            previous_row.append(previous_row[-1])
-        else :
-            previous_row.append(previous_row[-1]+exponent**(-(a)))
-    for i, c1 in enumerate(s1):
-        if modeled:
-            exp1 = sum(exponent**(-(a))  for a in range(i+1) if s1[a]!="tau" and s1[a]!=None and s1[a][0]!="n")
-        else :
-            exp1 = sum(exponent**(-(a))  for a in range(i+1))
-        current_row =  [exp1]
-        for j, c2 in enumerate(s2):
-
-            exp2 = exponent**(-(i+1 + j))
-            if modeled and  (c1 in ["tau", None] or c1[0]=="n" or "skip" in c1):
-                insertions = previous_row[j +1 ]  # j+1 instead of j since previous_row and current_row are one character longer
-                deletions = current_row[j] + exp2    # than s2
-            elif not modeled and (c2 in ["tau", None] or c2[0]=="n"):
-                insertions = previous_row[j +1 ] + exp2 # j+1 instead of j since previous_row and current_row are one character longer
-                deletions = current_row[j]
-            else :
-                insertions = previous_row[j +1 ] + exp2 # j+1 instead of j since previous_row and current_row are one character longer
-                deletions = current_row[j] + exp2
-            if (c1 != c2):
-                current_row.append(min(insertions, deletions))
-            else :
-                substitutions = previous_row[j]
-                current_row.append(min(insertions, deletions, substitutions))
-
-        previous_row = current_row
-    return len(s1)+len(s2),previous_row[-1]
+        return discountedEditDistance(s2, s1, exponent=exponent, modeled=False)
+    model, trace = (s1, s2) if modeled else (s2, s1)
+    if len(s1) * len(s2) > SCALAR_EDIT_DISTANCE_MAX_CELLS:
+        distance = __discounted_edit_distance(
+            [model], [trace], exponent, modeled
+        )[0]
+    else:
+        free, counted = __discounted_edit_distance_masks(model, modeled)
+        distance = __edit_distance_pair(
+            model, trace, free, counted, exponent=exponent
+        )
+    return len(s1) + len(s2), float(distance)
 
 
 def levenshtein(seq1, seq2):
     '''
-    Edit distance without substitution
+    Edit distance without substitution (see :func:`levenshtein_batch`)
     '''
-    size_x = len(seq1) + 1
-    size_y = len(seq2) + 1
-    matrix = np.zeros ((size_x, size_y))
-    for x in range(size_x):
-        matrix [x, 0] = x
-    for y in range(size_y):
-        matrix [0, y] = y
-
-    for x in range(1, size_x):
-        for y in range(1, size_y):
-            if seq1[x-1] in [None,"tau"] or seq1[x-1][0]=='n' or "skip" in seq1[x-1] or "tau" in seq1[x-1] :
-                matrix [x,y] = min(
-                    matrix[x-1, y],
-                    matrix[x,y-1] + 1
-                )
-            elif seq1[x-1] == seq2[y-1]:
-                matrix [x,y] = min(
-                    matrix[x-1, y] + 1,
-                    matrix[x-1, y-1],
-                    matrix[x, y-1] + 1
-                )
-            else:
-                matrix [x,y] = min(
-                    matrix[x-1,y] + 1,
-                    matrix[x,y-1] + 1
-                )
-    return (matrix[size_x - 1, size_y - 1])
-
+    if len(seq1) * len(seq2) > SCALAR_EDIT_DISTANCE_MAX_CELLS:
+        return float(levenshtein_batch([seq1], [seq2])[0])
+    return __levenshtein_pair(seq1, seq2)
@@ -19,13 +19,24 @@ visit <https://www.gnu.org/licenses/>.
 Website: https://processintelligence.solutions
 Contact: info@processintelligence.solutions
 '''
+import hashlib
+import json
+from collections import Counter, OrderedDict
+
 from pm4py.objects.petri_net.utils.networkx_graph import (
     create_networkx_undirected_graph,
 )
-from pm4py.objects.petri_net.utils import explore_path
+from pm4py.objects.petri_net.utils import compiled_net, explore_path
 from pm4py.objects.petri_net import obj
 from pm4py.util import nx_utils
 
+# markings explored by the token game before falling back to the LP-guided
+# search in check_easy_soundness_net_in_fin_marking
+DEFAULT_PRECHECK_MAX_STATES = 10000
+# number of verdicts kept by check_easy_soundness_net_in_fin_marking_cached
+EASY_SOUNDNESS_CACHE_SIZE = 1024
+__EASY_SOUNDNESS_CACHE = OrderedDict()
+
 
 def check_source_and_sink_reachability(net, unique_source, unique_sink):
     """
@@ -172,10 +183,86 @@ def check_source_sink_place_conditions(net):
     return True
 
 
-def check_easy_soundness_net_in_fin_marking(net, ini, fin):
+def check_final_marking_places_reachability(net, ini, fin):
+    """
+    Checks that every place of the final marking is reachable, in the graph
+    of the Petri net, from a place of the initial marking (a necessary
+    condition for the final marking to be reachable)
+
+    Parameters
+    -------------
+    net
+        Petri net
+    ini
+        Initial marking
+    fin
+        Final marking
+
+    Returns
+    -------------
+    boolean
+        Boolean value that is false when a place of the final marking cannot
+        be reached
+    """
+    visited = set(ini)
+    # transitions with an empty preset can always fire: their output places
+    # are explored as the marked ones
+    for trans in net.transitions:
+        if not trans.in_arcs:
+            for out_arc in trans.out_arcs:
+                visited.add(out_arc.target)
+    stack = list(visited)
+    while stack:
+        place = stack.pop()
+        for arc in place.out_arcs:
+            for out_arc in arc.target.out_arcs:
+                if out_arc.target not in visited:
+                    visited.add(out_arc.target)
+                    stack.append(out_arc.target)
+    return all(place in visited for place in fin)
+
+
+def __token_game_precheck(net, ini, fin, max_states):
+    """
+    Depth-first exploration of the markings reachable from the initial
+    marking, stopped after max_states markings
+
+    Returns
+    -------------
+    verdict
+        True if the final marking is reached, False if it is not reachable
+        (all the reachable markings are explored), None if the exploration
+        was stopped
+    """
+    compiled = compiled_net.construct(net, ini, fin)
+    target = compiled.fin
+    visited = {compiled.ini}
+    stack = [compiled.ini]
+    while stack:
+        marking = stack.pop()
+        if marking == target:
+            return True
+        for t in compiled.enabled_transitions(marking):
+            new_marking = compiled.fire(t, marking)
+            if new_marking not in visited:
+                if len(visited) >= max_states:
+                    return None
+                visited.add(new_marking)
+                stack.append(new_marking)
+    return False
+
+
+def check_easy_soundness_net_in_fin_marking(
+    net, ini, fin, max_states=DEFAULT_PRECHECK_MAX_STATES
+):
     """
     Checks the easy soundness of a Petri net having the initial and the final marking
 
+    The structural precheck (reachability of the places of the final marking
+    in the graph of the net) and an exploration of at most max_states
+    markings decide most nets; the LP-guided search is performed only when
+    they are inconclusive.
+
     Parameters
     -------------
     net
@@ -184,6 +271,9 @@ def check_easy_soundness_net_in_fin_marking(net, ini, fin):
         Initial marking
     fin
         Final marking
+    max_states
+        Maximum number of markings explored before performing the LP-guided
+        search (0 to perform it directly)
 
     Returns
     -------------
@@ -191,6 +281,12 @@ def check_easy_soundness_net_in_fin_marking(net, ini, fin):
         Boolean value
     """
     try:
+        if not check_final_marking_places_reachability(net, ini, fin):
+            return False
+        if max_states > 0:
+            verdict = __token_game_precheck(net, ini, fin, max_states)
+            if verdict is not None:
+                return verdict
         alignment = explore_path.__search(net, ini, fin)
         if alignment is not None:
             return True
@@ -199,6 +295,122 @@ def check_easy_soundness_net_in_fin_marking(net, ini, fin):
         return False
 
 
+def __refine_colors(colors, in_adj, out_adj):
+    # Weisfeiler-Lehman refinement of the colors (integers) of the nodes
+    # until stable; the new colors are the ranks of the signatures, hence
+    # they do not depend on the names of the nodes
+    n_colors = len(set(colors))
+    while True:
+        signatures = [
+            (
+                colors[v],
+                tuple(sorted((w, colors[u]) for u, w in in_adj[v])),
+                tuple(sorted((w, colors[u]) for u, w in out_adj[v])),
+            )
+            for v in range(len(colors))
+        ]
+        ranks = {sig: i for i, sig in enumerate(sorted(set(signatures)))}
+        colors = [ranks[sig] for sig in signatures]
+        if len(ranks) == n_colors:
+            return colors
+        n_colors = len(ranks)
+
+
+def net_content_hash(net, ini, fin):
+    """
+    Hash of the content of an accepting Petri net: its structure, the labels
+    of its transitions and the markings, not the names of its places and
+    transitions (which are not unique, and are drawn at random by some
+    discovery algorithms)
+
+    The nodes are ordered by color refinement, the remaining ties being broken
+    by individualising a node of the first tied class, and the hash encodes
+    the arcs between the ordered nodes: different nets never get the same
+    hash, while isomorphic nets whose tied nodes are not automorphic may get
+    different ones (a missed cache hit)
+
+    Parameters
+    -------------
+    net
+        Petri net
+    ini
+        Initial marking
+    fin
+        Final marking
+
+    Returns
+    -------------
+    hash
+        Hexadecimal digest
+    """
+    places = list(net.places)
+    transitions = list(net.transitions)
+    nodes = places + transitions
+    index = {x: i for i, x in enumerate(nodes)}
+    in_adj = [[] for _ in nodes]
+    out_adj = [[] for _ in nodes]
+    for a in net.arcs:
+        out_adj[index[a.source]].append((index[a.target], a.weight))
+        in_adj[index[a.target]].append((index[a.source], a.weight))
+    initial = [("p", ini.get(p, 0), fin.get(p, 0), "") for p in places] + [
+        ("t", 0, 0, "" if t.label is None else "l" + str(t.label))
+        for t in transitions
+    ]
+    ranks = {c: i for i, c in enumerate(sorted(set(initial)))}
+    colors = __refine_colors([ranks[c] for c in initial], in_adj, out_adj)
+    while len(set(colors)) < len(nodes):
+        counts = Counter(colors)
+        tied = min(c for c, n in counts.items() if n > 1)
+        v = colors.index(tied)
+        # the individualised node gets a color of its own, before its class
+        colors = [2 * c + (0 if u != v else -1) for u, c in enumerate(colors)]
+        colors = __refine_colors(colors, in_adj, out_adj)
+
+    order = sorted(range(len(nodes)), key=lambda v: colors[v])
+    position = {v: i for i, v in enumerate(order)}
+    content = [
+        [initial[v] for v in order],
+        sorted(
+            [position[v], position[u], w]
+            for v in range(len(nodes))
+            for u, w in out_adj[v]
+        ),
+    ]
+    return hashlib.sha1(json.dumps(content).encode("utf-8")).hexdigest()
+
+
+def check_easy_soundness_net_in_fin_marking_cached(net, ini, fin):
+    """
+    Same as check_easy_soundness_net_in_fin_marking, with the verdicts
+    memoised by the content hash of the accepting Petri net (see
+    net_content_hash), so that the check is performed once for a model
+    aligned many times
+
+    Parameters
+    -------------
+    net
+        Petri net
+    ini
+        Initial marking
+    fin
+        Final marking
+
+    Returns
+    -------------
+    boolean
+        Boolean value
+    """
+    key = net_content_hash(net, ini, fin)
+    if key in __EASY_SOUNDNESS_CACHE:
+        __EASY_SOUNDNESS_CACHE.move_to_end(key)
+        return __EASY_SOUNDNESS_CACHE[key]
+    verdict = check_easy_soundness_net_in_fin_marking(net, ini, fin)
+    __EASY_SOUNDNESS_CACHE[key] = verdict
+    if len(__EASY_SOUNDNESS_CACHE) > EASY_SOUNDNESS_CACHE_SIZE:
+        __EASY_SOUNDNESS_CACHE.popitem(last=False)
+    return verdict
+
+
 def check_easy_soundness_of_wfnet(net):
     """
     Checks the easy soundness of a workflow net
@@ -0,0 +1,611 @@
+'''
+    PM4Py – A Process Mining Library for Python
+Copyright (C) 2024 Process Intelligence Solutions UG (haftungsbeschränkt)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see this software project's root or
+visit <https://www.gnu.org/licenses/>.
+
+Website: https://processintelligence.solutions
+Contact: info@processintelligence.solutions
+'''
+"""
+Array-backed representation of a Petri net (typically, the synchronous product net) used as search substrate
+by the alignment variants.
+
+Places and transitions are mapped to integer identifiers (when compiling a Petri net, following the same ordering
+used by :class:`pm4py.objects.petri_net.utils.incidence_matrix.IncidenceMatrix`), so that a compiled marking is
+directly the marking vector consumed by the (I)LP heuristics.
+Pre- and post-sets are stored per transition (and are available in CSR form), while markings are plain tuples of
+token counts (one entry per place), which are cheap to hash, to compare and to copy.
+
+:class:`CompiledModel` keeps the model-side part of the synchronous product, so that the synchronous product of
+the same model with many traces is obtained without rebuilding (and recompiling) the model every time.
+"""
+from typing import Any, Collection, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+
+from pm4py.objects.petri_net.obj import PetriNet, Marking
+from pm4py.objects.petri_net.utils import align_utils
+
+
+class CompiledTransition(object):
+    """
+    Lightweight transition of a compiled net that has no counterpart in a :class:`PetriNet` (e.g. the transitions
+    of a synchronous product stitched by :class:`CompiledModel`). Exposes the same name and label of the transition
+    that the synchronous product construction would create.
+    """
+
+    __slots__ = ("name", "label")
+
+    def __init__(self, name, label):
+        self.name = name
+        self.label = label
+
+    def __repr__(self):
+        return "(" + str(self.name) + ", " + str(self.label) + ")"
+
+
+class CompiledPetriNet(object):
+
+    def __init__(
+        self,
+        places: List[Any],
+        transitions: List[Any],
+        pre: List[Tuple[Tuple[int, int], ...]],
+        post: List[Tuple[Tuple[int, int], ...]],
+        ini: Optional[Tuple[int, ...]] = None,
+        fin: Optional[Tuple[int, ...]] = None,
+        delta: Optional[List[Tuple[Tuple[int, int], ...]]] = None,
+        consumers: Optional[List[Tuple[int, ...]]] = None,
+        a_matrix: Optional[Union[np.ndarray, sparse.spmatrix]] = None,
+    ):
+        """
+        Builds the compiled net from its arrays (see :func:`construct` to compile a :class:`PetriNet`)
+
+        Parameters
+        --------------
+        places
+            Places, ordered by identifier
+        transitions
+            Transitions (objects exposing a name and a label), ordered by identifier
+        pre
+            For each transition, the sorted tuple of (place identifier, weight) of its preset
+        post
+            For each transition, the sorted tuple of (place identifier, weight) of its postset
+        ini
+            Compiled initial marking
+        fin
+            Compiled final marking
+        delta
+            (if already known) for each transition, the token balance on the places changed by its firing
+        consumers
+            (if already known) for each place, the transitions having it in their preset
+        a_matrix
+            (if already known) incidence matrix of the net, either dense or sparse (scipy.sparse)
+        """
+        self.__places = places
+        self.__transitions = transitions
+        self.__place_indices = {p: i for i, p in enumerate(places)}
+        self.__transition_indices = {t: i for i, t in enumerate(transitions)}
+        self.__pre = pre
+        self.__post = post
+
+        if delta is None:
+            # token balance of each transition, restricted to the places that
+            # are actually changed by the firing
+            delta = []
+            for t in range(len(transitions)):
+                balance = {}
+                for p, w in pre[t]:
+                    balance[p] = balance.get(p, 0) - w
+                for p, w in post[t]:
+                    balance[p] = balance.get(p, 0) + w
+                delta.append(
+                    tuple(sorted((p, d) for p, d in balance.items() if d != 0))
+                )
+        self.__delta = delta
+
+        if consumers is None:
+            consumers = [[] for _ in places]
+            for t in range(len(transitions)):
+                for p, w in pre[t]:
+                    consumers[p].append(t)
+            consumers = [tuple(c) for c in consumers]
+        self.__consumers = consumers
+        self.__empty_preset = tuple(
+            t for t in range(len(transitions)) if not pre[t]
+        )
+
+        self.__a_matrix = None
+        self.__sparse_a_matrix = None
+        if sparse.issparse(a_matrix):
+            self.__sparse_a_matrix = a_matrix.tocsc()
+        else:
+            self.__a_matrix = a_matrix
+        self.__pre_csr = None
+        self.__post_csr = None
+
+        self.ini = ini
+        self.fin = fin
+
+    def encode_marking(self, marking: Marking) -> Tuple[int, ...]:
+        """
+        Encodes a marking of the net as a tuple of token counts
+
+        Parameters
+        --------------
+        marking
+            Marking (of the original net)
+
+        Returns
+        --------------
+        m
+            Compiled marking
+        """
+        x = [0] * len(self.__places)
+        for p in marking:
+            x[self.__place_indices[p]] = marking[p]
+        return tuple(x)
+
+    def decode_marking(self, m: Tuple[int, ...]) -> Marking:
+        """
+        Decodes a compiled marking into a marking of the original net
+
+        Parameters
+        --------------
+        m
+            Compiled marking
+
+        Returns
+        --------------
+        marking
+            Marking (of the original net)
+        """
+        marking = Marking()
+        for i, c in enumerate(m):
+            if c:
+                marking[self.__places[i]] = c
+        return marking
+
+    def is_enabled(self, t: int, m: Tuple[int, ...]) -> bool:
+        for p, w in self.__pre[t]:
+            if m[p] < w:
+                return False
+        return True
+
+    def enabled_transitions(self, m: Tuple[int, ...]) -> List[int]:
+        """
+        Gets the identifiers of the transitions enabled in the given compiled marking.
+        Only the transitions consuming from a marked place (plus the ones having an empty preset) are checked.
+
+        Parameters
+        --------------
+        m
+            Compiled marking
+
+        Returns
+        --------------
+        enabled
+            List of transition identifiers
+        """
+        pre = self.__pre
+        consumers = self.__consumers
+        candidates = set()
+        for p, c in enumerate(m):
+            if c:
+                candidates.update(consumers[p])
+        enabled = list(self.__empty_preset)
+        for t in candidates:
+            for p, w in pre[t]:
+                if m[p] < w:
+                    break
+            else:
+                enabled.append(t)
+        return enabled
+
+    def fire(self, t: int, m: Tuple[int, ...]) -> Tuple[int, ...]:
+        """
+        Fires a transition in the given compiled marking (enabledness is not checked)
+
+        Parameters
+        --------------
+        t
+            Transition identifier
+        m
+            Compiled marking
+
+        Returns
+        --------------
+        new_m
+            Compiled marking reached after the firing
+        """
+        new_m = list(m)
+        for p, d in self.__delta[t]:
+            new_m[p] += d
+        return tuple(new_m)
+
+    def cost_vector(self, cost_function: Dict[PetriNet.Transition, float]):
+        """
+        Vectorizes a cost function defined on the transitions of the net
+
+        Parameters
+        --------------
+        cost_function
+            Cost function (transition -> cost)
+
+        Returns
+        --------------
+        cost_vec
+            List of costs, indexed by transition identifier
+        """
+        return [cost_function[t] for t in self.__transitions]
+
+    def incidence_matrix(self) -> np.ndarray:
+        """
+        Returns the (dense) |P|x|T| incidence matrix of the net, taking into account the weights of the arcs
+        """
+        if self.__a_matrix is None:
+            self.__a_matrix = self.sparse_incidence_matrix().toarray()
+        return self.__a_matrix
+
+    def sparse_incidence_matrix(self) -> sparse.csc_matrix:
+        """
+        Returns the |P|x|T| incidence matrix of the net in sparse (CSC) form, taking into account the weights of
+        the arcs
+        """
+        if self.__sparse_a_matrix is None:
+            if self.__a_matrix is not None:
+                self.__sparse_a_matrix = sparse.csc_matrix(self.__a_matrix)
+            else:
+                ptr = [0]
+                idx = []
+                weight = []
+                for delta in self.__delta:
+                    for p, d in delta:
+                        idx.append(p)
+                        weight.append(d)
+                    ptr.append(len(idx))
+                self.__sparse_a_matrix = sparse.csc_matrix(
+                    (
+                        np.asarray(weight, dtype=np.int64),
+                        np.asarray(idx, dtype=np.int64),
+                        np.asarray(ptr, dtype=np.int64),
+                    ),
+                    shape=(len(self.__places), len(self.__transitions)),
+                )
+        return self.__sparse_a_matrix
+
+    @staticmethod
+    def __construct_csr(per_trans):
+        ptr = [0]
+        idx = []
+        weight = []
+        for arcs in per_trans:
+            for p, w in arcs:
+                idx.append(p)
+                weight.append(w)
+            ptr.append(len(idx))
+        return (
+            np.asarray(ptr, dtype=np.int64),
+            np.asarray(idx, dtype=np.int64),
+            np.asarray(weight, dtype=np.int64),
+        )
+
+    def __get_places(self):
+        return self.__place_indices
+
+    def __get_transitions(self):
+        return self.__transition_indices
+
+    def __get_ordered_places(self):
+        return self.__places
+
+    def __get_ordered_transitions(self):
+        return self.__transitions
+
+    def __get_pre(self):
+        return self.__pre
+
+    def __get_post(self):
+        return self.__post
+
+    def __get_delta(self):
+        return self.__delta
+
+    def __get_consumers(self):
+        return self.__consumers
+
+    def __get_pre_csr(self):
+        if self.__pre_csr is None:
+            self.__pre_csr = CompiledPetriNet.__construct_csr(self.__pre)
+        return self.__pre_csr
+
+    def __get_post_csr(self):
+        if self.__post_csr is None:
+            self.__post_csr = CompiledPetriNet.__construct_csr(self.__post)
+        return self.__post_csr
+
+    def __get_empty_preset(self):
+        return self.__empty_preset
+
+    places = property(__get_places)
+    transitions = property(__get_transitions)
+    ordered_places = property(__get_ordered_places)
+    ordered_transitions = property(__get_ordered_transitions)
+    pre = property(__get_pre)
+    post = property(__get_post)
+    delta = property(__get_delta)
+    consumers = property(__get_consumers)
+    pre_csr = property(__get_pre_csr)
+    post_csr = property(__get_post_csr)
+    empty_preset = property(__get_empty_preset)
+
+
+def construct(
+    net: PetriNet,
+    ini: Optional[Marking] = None,
+    fin: Optional[Marking] = None,
+) -> CompiledPetriNet:
+    """
+    Compiles a Petri net. Places and transitions are sorted as in the incidence matrix.
+
+    Parameters
+    --------------
+    net
+        Petri net
+    ini
+        Initial marking
+    fin
+        Final marking
+
+    Returns
+    --------------
+    compiled
+        Compiled Petri net
+    """
+    places = sorted([x for x in net.places], key=lambda x: (str(x.name), id(x)))
+    transitions = sorted(
+        [x for x in net.transitions], key=lambda x: (str(x.name), id(x))
+    )
+    place_indices = {p: i for i, p in enumerate(places)}
+
+    pre = []
+    post = []
+    for t in transitions:
+        arcs = {}
+        for a in t.in_arcs:
+            p = place_indices[a.source]
+            arcs[p] = arcs.get(p, 0) + a.weight
+        pre.append(tuple(sorted(arcs.items())))
+        arcs = {}
+        for a in t.out_arcs:
+            p = place_indices[a.target]
+            arcs[p] = arcs.get(p, 0) + a.weight
+        post.append(tuple(sorted(arcs.items())))
+
+    compiled = CompiledPetriNet(places, transitions, pre, post)
+    if ini is not None:
+        compiled.ini = compiled.encode_marking(ini)
+    if fin is not None:
+        compiled.fin = compiled.encode_marking(fin)
+    return compiled
+
+
+class CompiledModel(object):
+    """
+    Model-side part of the synchronous product of an accepting Petri net with a trace.
+
+    Everything that depends only on the model is computed once: the compiled net, its block of the incidence
+    matrix, the model moves with their costs, the synchronous costs and an index from each label to the model
+    transitions carrying it. :meth:`stitch` then builds the compiled synchronous product with a trace by adding the
+    trace places, the log moves and the synchronous moves, in time proportional to the length of the trace (times
+    the number of model transitions sharing the label of an event).
+
+    The stitched product has the same transitions (names, labels and costs) as the synchronous product built by
+    :func:`pm4py.objects.petri_net.utils.synchronous_product.construct_cost_aware` on the trace net of
+    :func:`pm4py.objects.petri_net.utils.petri_utils.construct_trace_net_cost_aware`; its places are identified by
+    their names in the synchronous product.
+    """
+
+    def __init__(
+        self,
+        net: PetriNet,
+        im: Marking,
+        fm: Marking,
+        model_cost_function: Optional[Dict[PetriNet.Transition, Any]] = None,
+        sync_cost_function: Optional[Dict[PetriNet.Transition, Any]] = None,
+        skip: str = align_utils.SKIP,
+    ):
+        """
+        Parameters
+        --------------
+        net
+            Petri net
+        im
+            Initial marking
+        fm
+            Final marking
+        model_cost_function
+            Cost of the model move of each transition (default: standard costs)
+        sync_cost_function
+            Cost of the synchronous move of each visible transition (default: standard costs)
+        skip
+            Skip symbol
+        """
+        if model_cost_function is None or sync_cost_function is None:
+            model_cost_function = {}
+            sync_cost_function = {}
+            for t in net.transitions:
+                if t.label is not None:
+                    model_cost_function[t] = align_utils.STD_MODEL_LOG_MOVE_COST
+                    sync_cost_function[t] = align_utils.STD_SYNC_COST
+                else:
+                    model_cost_function[t] = align_utils.STD_TAU_COST
+
+        self.skip = skip
+        self.net = construct(net, im, fm)
+        transitions = self.net.ordered_transitions
+
+        self.model_moves = [
+            CompiledTransition((skip, t.name), (skip, t.label))
+            for t in transitions
+        ]
+        self.model_move_costs = self.net.cost_vector(model_cost_function)
+        self.sync_costs = [
+            sync_cost_function[t] if t.label is not None else None
+            for t in transitions
+        ]
+
+        label_index = {}
+        for j, t in enumerate(transitions):
+            if t.label is not None:
+                label_index.setdefault(t.label, []).append(j)
+        self.label_index = {
+            label: tuple(ids) for label, ids in label_index.items()
+        }
+
+        self.places = [(skip, p.name) for p in self.net.ordered_places]
+        self.a_matrix = self.net.sparse_incidence_matrix()
+
+    def stitch(
+        self, labels: List[str], costs: Collection[Any]
+    ) -> Tuple[CompiledPetriNet, List[Any]]:
+        """
+        Builds the compiled synchronous product of the model with a trace
+
+        Parameters
+        --------------
+        labels
+            Activities of the trace
+        costs
+            Cost of the log move of each event of the trace
+
+        Returns
+        --------------
+        sync_prod
+            Compiled synchronous product (with initial and final marking)
+        cost_vec
+            Cost of each transition of the synchronous product, indexed by transition identifier
+        """
+        model = self.net
+        skip = self.skip
+        n_places = len(self.places)
+        n_events = len(labels)
+        model_transitions = model.ordered_transitions
+        model_pre = model.pre
+        model_post = model.post
+        model_delta = model.delta
+
+        places = self.places + [
+            ("p_" + str(i), skip) for i in range(n_events + 1)
+        ]
+        transitions = list(self.model_moves)
+        pre = list(model_pre)
+        post = list(model_post)
+        delta = list(model_delta)
+        cost_vec = list(self.model_move_costs)
+        consumers = list(model.consumers)
+        extra_consumers = {}
+        # columns of the incidence matrix added for the trace: event index
+        # and (for synchronous moves) model transition
+        added = []
+
+        for i, label in enumerate(labels):
+            p_in = n_places + i
+            p_out = p_in + 1
+            trace_arcs_pre = ((p_in, 1),)
+            trace_arcs_post = ((p_out, 1),)
+            trace_delta = ((p_in, -1), (p_out, 1))
+            trace_name = "t_" + label + "_" + str(i)
+            trace_consumers = []
+
+            trace_consumers.append(len(transitions))
+            added.append((i, -1))
+            transitions.append(
+                CompiledTransition((trace_name, skip), (label, skip))
+            )
+            pre.append(trace_arcs_pre)
+            post.append(trace_arcs_post)
+            delta.append(trace_delta)
+            cost_vec.append(costs[i])
+
+            for j in self.label_index.get(label, ()):
+                t_id = len(transitions)
+                trace_consumers.append(t_id)
+                added.append((i, j))
+                transitions.append(
+                    CompiledTransition(
+                        (trace_name, model_transitions[j].name),
+                        (label, model_transitions[j].label),
+                    )
+                )
+                pre.append(model_pre[j] + trace_arcs_pre)
+                post.append(model_post[j] + trace_arcs_post)
+                delta.append(model_delta[j] + trace_delta)
+                cost_vec.append(self.sync_costs[j])
+                for p, w in model_pre[j]:
+                    extra_consumers.setdefault(p, []).append(t_id)
+
+            consumers.append(tuple(trace_consumers))
+        consumers.append(())
+        for p, ts in extra_consumers.items():
+            consumers[p] = consumers[p] + tuple(ts)
+
+        # the sparse incidence matrix is assembled from (row, column, value)
+        # triples: model block, trace arcs, and model arcs of the
+        # synchronous moves
+        n_model = len(self.model_moves)
+        model_block = self.a_matrix.tocoo()
+        rows = [model_block.row]
+        cols = [model_block.col]
+        values = [model_block.data]
+        if added:
+            events, model_ids = np.asarray(added, dtype=np.int64).T
+            columns = np.arange(n_model, len(transitions))
+            rows += [n_places + events, n_places + events + 1]
+            cols += [columns, columns]
+            values += [
+                np.full(len(columns), -1, dtype=model_block.data.dtype),
+                np.full(len(columns), 1, dtype=model_block.data.dtype),
+            ]
+            sync = model_ids >= 0
+            sync_block = self.a_matrix[:, model_ids[sync]].tocoo()
+            rows.append(sync_block.row)
+            cols.append(columns[sync][sync_block.col])
+            values.append(sync_block.data)
+        a_matrix = sparse.csc_matrix(
+            (
+                np.concatenate(values),
+                (np.concatenate(rows), np.concatenate(cols)),
+            ),
+            shape=(len(places), len(transitions)),
+        )
+
+        ini = model.ini + (1,) + (0,) * n_events
+        fin = model.fin + (0,) * n_events + (1,)
+
+        sync_prod = CompiledPetriNet(
+            places,
+            transitions,
+            pre,
+            post,
+            ini=ini,
+            fin=fin,
+            delta=delta,
+            consumers=consumers,
+            a_matrix=a_matrix,
+        )
+        return sync_prod, cost_vec
@@ -19,22 +19,68 @@ visit <https://www.gnu.org/licenses/>.
 Website: https://processintelligence.solutions
 Contact: info@processintelligence.solutions
 '''
+"""
+Incidence matrix of a Petri net, with places and transitions ordered by name.
+
+The matrix is stored in sparse (CSR) form, since the incidence matrices of synchronous product nets are mostly
+zeros (every transition touches a handful of places); the dense list-of-lists view (:attr:`IncidenceMatrix.a_matrix`)
+is built only on request.
+"""
+import numpy as np
+from scipy import sparse
+
+
 class IncidenceMatrix(object):
 
     def __init__(self, net):
-        self.__A, self.__place_indices, self.__transition_indices = (
+        self.__sparse_A, self.__place_indices, self.__transition_indices = (
             self.__construct_matrix(net)
         )
+        self.__A = None
 
     def encode_marking(self, marking):
-        x = [0 for i in range(len(self.places))]
+        x = [0] * len(self.places)
         for p in marking:
             x[self.places[p]] = marking[p]
         return x
 
+    def encode_markings(self, markings):
+        """
+        Encodes a collection of markings at once
+
+        Parameters
+        --------------
+        markings
+            Markings of the net
+
+        Returns
+        --------------
+        vectors
+            Numpy array having a row (marking vector) per marking
+        """
+        place_indices = self.places
+        rows, cols, counts = [], [], []
+        for i, marking in enumerate(markings):
+            for p, c in marking.items():
+                rows.append(i)
+                cols.append(place_indices[p])
+                counts.append(c)
+        vectors = np.zeros(
+            (len(markings), len(place_indices)), dtype=np.int64
+        )
+        vectors[
+            np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+        ] = counts
+        return vectors
+
     def __get_a_matrix(self):
+        if self.__A is None:
+            self.__A = self.__sparse_A.toarray().tolist()
         return self.__A
 
+    def __get_sparse_a_matrix(self):
+        return self.__sparse_A
+
     def __get_transition_indices(self):
         return self.__transition_indices
 
@@ -55,17 +101,32 @@ class IncidenceMatrix(object):
             p_index[p] = len(p_index)
         for t in transitions:
             t_index[t] = len(t_index)
-        a_matrix = [
-            [0 for i in range(len(t_index))] for j in range(len(p_index))
-        ]
+        rows, cols, values = [], [], []
         for p in net.places:
             for a in p.in_arcs:
-                a_matrix[p_index[p]][t_index[a.source]] += 1
+                rows.append(p_index[p])
+                cols.append(t_index[a.source])
+                values.append(1)
             for a in p.out_arcs:
-                a_matrix[p_index[p]][t_index[a.target]] -= 1
+                rows.append(p_index[p])
+                cols.append(t_index[a.target])
+                values.append(-1)
+        # duplicate entries (arcs in both directions) are summed
+        a_matrix = sparse.csr_matrix(
+            (
+                np.asarray(values, dtype=np.int64),
+                (
+                    np.asarray(rows, dtype=np.int64),
+                    np.asarray(cols, dtype=np.int64),
+                ),
+            ),
+            shape=(len(p_index), len(t_index)),
+        )
+        a_matrix.eliminate_zeros()
         return a_matrix, p_index, t_index
 
     a_matrix = property(__get_a_matrix)
+    sparse_a_matrix = property(__get_sparse_a_matrix)
     places = property(__get_place_indices)
     transitions = property(__get_transition_indices)
 
@@ -19,11 +19,15 @@ visit <https://www.gnu.org/licenses/>.
 Website: https://processintelligence.solutions
 Contact: info@processintelligence.solutions
 '''
+import multiprocessing
 import re
+from collections import deque
+from typing import Dict, Iterator, Optional, Tuple
 
 from pm4py.objects import petri_net
+from pm4py.objects.petri_net.obj import Marking, PetriNet
 from pm4py.objects.transition_system.obj import TransitionSystem
-from pm4py.objects.petri_net.utils import align_utils
+from pm4py.objects.petri_net.utils import align_utils, compiled_net
 from pm4py.objects.transition_system import obj as ts
 from pm4py.objects.transition_system import utils
 from pm4py.util import exec_utils
@@ -34,6 +38,14 @@ import time
 class Parameters(Enum):
     MAX_ELAB_TIME = "max_elab_time"
     PETRI_SEMANTICS = "petri_semantics"
+    EXPLORATION_ORDER = "exploration_order"
+    MAX_STATES = "max_states"
+    N_WORKERS = "n_workers"
+    STORE_MARKINGS = "store_markings"
+
+
+BFS = "bfs"
+DFS = "dfs"
 
 
 def staterep(name):
@@ -53,6 +65,297 @@ def staterep(name):
     return re.sub(r"\W+", "", name)
 
 
+class MarkingGraphExplorer(object):
+    """
+    Explores the reachability graph of a Petri net (with the classic
+    semantics) on its compiled form: markings are tuples of token counts, the
+    reached markings are kept in a hash table and the markings to expand in a
+    double-ended queue, so that every successor is looked up in constant time.
+
+    States are identified by integers and the edges are streamed, as triples
+    (source state, transition identifier, target state), while the graph is
+    explored: the marking of a state is known (see :meth:`marking`) as soon as
+    the state appears in an edge.
+
+    With several workers, the states are partitioned by the hash of their
+    marking among as many processes, each one owning the markings of its
+    partition (and expanding them), so that the set of reached markings is
+    spread over the processes. The exploration then proceeds level by level
+    (breadth-first).
+    """
+
+    def __init__(
+        self, net: PetriNet, im: Marking, parameters: Optional[dict] = None
+    ):
+        """
+        Parameters
+        --------------
+        net
+            Petri net
+        im
+            Initial marking
+        parameters
+            Parameters of the exploration, including:
+            - Parameters.EXPLORATION_ORDER => BFS (default) or DFS
+            - Parameters.MAX_STATES => maximum number of states (the markings
+              reached beyond it are not explored, nor are their edges)
+            - Parameters.MAX_ELAB_TIME => maximum exploration time (seconds)
+            - Parameters.N_WORKERS => number of worker processes (1: the
+              exploration happens in the current process)
+            - Parameters.STORE_MARKINGS => keeps the marking of every state
+              (default: True)
+        """
+        if parameters is None:
+            parameters = {}
+
+        self.max_exec_time = exec_utils.get_param_value(
+            Parameters.MAX_ELAB_TIME, parameters, 86400
+        )
+        self.order = exec_utils.get_param_value(
+            Parameters.EXPLORATION_ORDER, parameters, BFS
+        )
+        if self.order not in (BFS, DFS):
+            raise ValueError("unknown exploration order: " + str(self.order))
+        self.max_states = exec_utils.get_param_value(
+            Parameters.MAX_STATES, parameters, None
+        )
+        self.n_workers = exec_utils.get_param_value(
+            Parameters.N_WORKERS, parameters, 1
+        )
+        self.store_markings = exec_utils.get_param_value(
+            Parameters.STORE_MARKINGS, parameters, True
+        )
+
+        self.compiled = compiled_net.construct(net, im)
+        self.markings: Dict[int, Tuple[int, ...]] = {}
+        self.n_states = 0
+        self.initial_state = None
+        # the budget of states was exhausted
+        self.truncated = False
+        # the maximum exploration time was exceeded
+        self.timed_out = False
+
+    def edges(self) -> Iterator[Tuple[int, int, int]]:
+        """
+        Explores the reachability graph, yielding its edges
+
+        Returns
+        --------------
+        edges
+            Iterator over the (source state, transition identifier, target
+            state) triples
+        """
+        self.markings = {}
+        self.n_states = 0
+        self.truncated = False
+        self.timed_out = False
+        if self.n_workers > 1:
+            return self.__explore_partitioned()
+        return self.__explore()
+
+    def transition(self, t: int) -> PetriNet.Transition:
+        """
+        Transition of the net having the given identifier
+        """
+        return self.compiled.ordered_transitions[t]
+
+    def marking(self, state: int) -> Marking:
+        """
+        Marking (of the net) of the given state (requires
+        Parameters.STORE_MARKINGS)
+        """
+        return self.compiled.decode_marking(self.markings[state])
+
+    def __store(self, state, m):
+        self.n_states += 1
+        if self.store_markings:
+            self.markings[state] = m
+
+    def __explore(self):
+        compiled = self.compiled
+        start_time = time.time()
+        ids = {compiled.ini: 0}
+        self.initial_state = 0
+        self.__store(0, compiled.ini)
+        frontier = deque([(0, compiled.ini)])
+        pop = frontier.popleft if self.order == BFS else frontier.pop
+        while frontier:
+            if (time.time() - start_time) >= self.max_exec_time:
+                self.timed_out = True
+                return
+            state, m = pop()
+            for t in compiled.enabled_transitions(m):
+                nm = compiled.fire(t, m)
+                target = ids.get(nm)
+                if target is None:
+                    if (
+                        self.max_states is not None
+                        and len(ids) >= self.max_states
+                    ):
+                        self.truncated = True
+                        continue
+                    target = len(ids)
+                    ids[nm] = target
+                    self.__store(target, nm)
+                    frontier.append((target, nm))
+                yield state, t, target
+
+    def __quotas(self, fresh):
+        # number of new states granted to every worker in this round
+        if self.max_states is None:
+            return fresh
+        remaining = max(0, self.max_states - self.n_states)
+        quotas = []
+        for n in fresh:
+            quotas.append(min(n, remaining))
+            remaining -= quotas[-1]
+        if quotas != fresh:
+            self.truncated = True
+        return quotas
+
+    def __explore_partitioned(self):
+        compiled = self.compiled
+        n_workers = self.n_workers
+        context = multiprocessing.get_context()
+        connections = []
+        workers = []
+        for index in range(n_workers):
+            conn, worker_conn = context.Pipe()
+            worker = context.Process(
+                target=_partition_worker,
+                args=(
+                    worker_conn,
+                    compiled.pre,
+                    compiled.post,
+                    len(compiled.ordered_places),
+                    index,
+                    n_workers,
+                    self.store_markings,
+                ),
+                daemon=True,
+            )
+            worker.start()
+            connections.append(conn)
+            workers.append(worker)
+
+        try:
+            start_time = time.time()
+            # the state identifiers are assigned by the owners of the
+            # markings: the initial marking is the first state of its owner
+            owner = hash(compiled.ini) % n_workers
+            self.initial_state = owner
+            inboxes = [[] for _ in range(n_workers)]
+            inboxes[owner].append((-1, -1, compiled.ini))
+            while any(inboxes):
+                if (time.time() - start_time) >= self.max_exec_time:
+                    self.timed_out = True
+                    return
+                for conn, inbox in zip(connections, inboxes):
+                    conn.send(("dedup", inbox))
+                fresh = [conn.recv() for conn in connections]
+                for conn, quota in zip(connections, self.__quotas(fresh)):
+                    conn.send(("commit", quota))
+                inboxes = [[] for _ in range(n_workers)]
+                for conn in connections:
+                    new_states, edges, outboxes = conn.recv()
+                    for state, m in new_states:
+                        self.__store(state, m)
+                    for index, outbox in enumerate(outboxes):
+                        inboxes[index].extend(outbox)
+                    yield from edges
+        finally:
+            for conn in connections:
+                try:
+                    conn.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+            for worker in workers:
+                worker.join(timeout=5)
+                if worker.is_alive():
+                    worker.terminate()
+
+
+def _partition_worker(
+    conn, pre, post, n_places, index, n_workers, store_markings
+):
+    """
+    Worker of the partitioned exploration, owning the markings whose hash is
+    index modulo n_workers. Every round, it receives the edges (source state,
+    transition, target marking) leading to its markings, counts the markings
+    reached for the first time ("dedup"), then numbers as many of them as
+    granted, expands them and sends back their successors, grouped by owner
+    ("commit").
+    """
+    compiled = compiled_net.CompiledPetriNet(
+        list(range(n_places)), list(range(len(pre))), pre, post
+    )
+    ids = {}
+    arrivals = []
+    fresh = []
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        if message[0] == "dedup":
+            arrivals = message[1]
+            fresh = list(
+                dict.fromkeys(m for _, _, m in arrivals if m not in ids)
+            )
+            conn.send(len(fresh))
+            continue
+
+        admitted = fresh[: message[1]]
+        new_states = []
+        for m in admitted:
+            # unique across the workers without any coordination
+            state = len(ids) * n_workers + index
+            ids[m] = state
+            new_states.append((state, m if store_markings else None))
+        edges = []
+        for source, t, m in arrivals:
+            target = ids.get(m)
+            if source >= 0 and target is not None:
+                edges.append((source, t, target))
+        outboxes = [[] for _ in range(n_workers)]
+        for (state, _), m in zip(new_states, admitted):
+            for t in compiled.enabled_transitions(m):
+                nm = compiled.fire(t, m)
+                outboxes[hash(nm) % n_workers].append((state, t, nm))
+        conn.send((new_states, edges, outboxes))
+
+
+def count_reachable_markings(
+    net: PetriNet, im: Marking, parameters: Optional[dict] = None
+) -> Tuple[int, bool]:
+    """
+    Counts the reachable markings of a Petri net, without keeping them (see
+    :class:`MarkingGraphExplorer` for the parameters)
+
+    Parameters
+    --------------
+    net
+        Petri net
+    im
+        Initial marking
+    parameters
+        Parameters of the exploration
+
+    Returns
+    --------------
+    n_states
+        Number of reachable markings (up to Parameters.MAX_STATES)
+    complete
+        Whether the whole reachability graph was explored
+    """
+    parameters = dict(parameters) if parameters is not None else {}
+    parameters[Parameters.STORE_MARKINGS] = False
+    explorer = MarkingGraphExplorer(net, im, parameters=parameters)
+    for _ in explorer.edges():
+        pass
+    complete = not (explorer.truncated or explorer.timed_out)
+    return explorer.n_states, complete
+
+
 def marking_flow_petri(
     net, im, return_eventually_enabled=False, parameters=None
 ):
@@ -82,13 +385,18 @@ def marking_flow_petri(
         petri_net.semantics.ClassicSemantics(),
     )
 
+    if type(semantics) is petri_net.semantics.ClassicSemantics:
+        return __marking_flow_compiled(
+            net, im, return_eventually_enabled, parameters
+        )
+
     start_time = time.time()
 
     incoming_transitions = {im: set()}
     outgoing_transitions = {}
     eventually_enabled = {}
 
-    active = [im]
+    active = deque([im])
     while active:
         if (time.time() - start_time) >= max_exec_time:
             # interrupt the execution
@@ -107,15 +415,56 @@ def marking_flow_petri(
         for t in enabled_transitions:
             nm = semantics.weak_execute(t, net, m)
             outgoing_transitions[m][t] = nm
+            # every marking in the frontier has already been reached
             if nm not in incoming_transitions:
                 incoming_transitions[nm] = set()
-                if nm not in active:
-                    active.append(nm)
+                active.append(nm)
             incoming_transitions[nm].add(t)
 
     return incoming_transitions, outgoing_transitions, eventually_enabled
 
 
+def __marking_flow_compiled(net, im, return_eventually_enabled, parameters):
+    """
+    Marking flow of a Petri net with the classic semantics, obtained with
+    :class:`MarkingGraphExplorer`
+    """
+    parameters = dict(parameters)
+    parameters[Parameters.STORE_MARKINGS] = True
+    explorer = MarkingGraphExplorer(net, im, parameters=parameters)
+    markings = {}
+
+    def decode(state):
+        m = markings.get(state)
+        if m is None:
+            if state == explorer.initial_state:
+                m = im
+            else:
+                m = explorer.marking(state)
+            markings[state] = m
+            incoming_transitions[m] = set()
+            outgoing_transitions[m] = {}
+            if return_eventually_enabled:
+                eventually_enabled[m] = (
+                    align_utils.get_visible_transitions_eventually_enabled_by_marking(
+                        net, m))
+        return m
+
+    incoming_transitions = {}
+    outgoing_transitions = {}
+    eventually_enabled = {}
+    for source, t, target in explorer.edges():
+        m = decode(source)
+        nm = decode(target)
+        trans = explorer.transition(t)
+        outgoing_transitions[m][trans] = nm
+        incoming_transitions[nm].add(trans)
+    # initial marking without any enabled transition
+    decode(explorer.initial_state)
+
+    return incoming_transitions, outgoing_transitions, eventually_enabled
+
+
 def construct_reachability_graph_from_flow(
     incoming_transitions,
     outgoing_transitions,
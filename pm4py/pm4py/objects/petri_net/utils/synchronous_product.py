@@ -19,11 +19,89 @@ visit <https://www.gnu.org/licenses/>.
 Website: https://processintelligence.solutions
 Contact: info@processintelligence.solutions
 '''
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
 from pm4py.objects.petri_net.obj import PetriNet, Marking
+from pm4py.objects.petri_net.utils import compiled_net
 from pm4py.objects.petri_net.utils.petri_utils import add_arc_from_to
 from pm4py.objects.petri_net import properties
 
 
+def label_index(net: PetriNet) -> Dict[Any, List[PetriNet.Transition]]:
+    """
+    Indexes the transitions of a Petri net by their label (None for the
+    silent ones)
+
+    Parameters
+    --------------
+    net
+        Petri net
+
+    Returns
+    --------------
+    index
+        Dictionary associating to each label the transitions carrying it
+    """
+    index = {}
+    for t in net.transitions:
+        index.setdefault(t.label, []).append(t)
+    return index
+
+
+def matching_pairs(
+    pn1: PetriNet, pn2: PetriNet
+) -> Iterator[Tuple[PetriNet.Transition, PetriNet.Transition]]:
+    """
+    Pairs of transitions of the two Petri nets having the same label (the
+    synchronous moves of their synchronous product), found through a label
+    index of the second net instead of comparing all the pairs.
+
+    Parameters
+    --------------
+    pn1
+        Petri net 1
+    pn2
+        Petri net 2
+
+    Returns
+    --------------
+    pairs
+        Iterator over the pairs (t1, t2) such that t1.label == t2.label
+    """
+    index = label_index(pn2)
+    for t1 in pn1.transitions:
+        for t2 in index.get(t1.label, ()):
+            yield t1, t2
+
+
+def construct_sync_costs(
+    pn1: PetriNet, pn2: PetriNet, sync_cost_function: Dict[Any, Any]
+) -> Dict[Tuple[PetriNet.Transition, PetriNet.Transition], Any]:
+    """
+    Costs of the synchronous moves of the synchronous product of a trace net
+    (pn1) and a model (pn2), as expected by :func:`construct_cost_aware`
+
+    Parameters
+    --------------
+    pn1
+        Petri net 1 (trace net)
+    pn2
+        Petri net 2 (model)
+    sync_cost_function
+        Cost of the synchronous move of each transition of the model
+
+    Returns
+    --------------
+    sync_costs
+        Dictionary associating to each pair of transitions with the same
+        label the cost of the model transition
+    """
+    return {
+        (t1, t2): sync_cost_function[t2]
+        for t1, t2 in matching_pairs(pn1, pn2)
+    }
+
+
 def construct(pn1, im1, fm1, pn2, im2, fm2, skip):
     """
     Constructs the synchronous product net of two given Petri nets.
@@ -47,27 +125,8 @@ def construct(pn1, im1, fm1, pn2, im2, fm2, skip):
     t1_map, p1_map = __copy_into(pn1, sync_net, True, skip)
     t2_map, p2_map = __copy_into(pn2, sync_net, False, skip)
 
-    for t1 in pn1.transitions:
-        for t2 in pn2.transitions:
-            if t1.label == t2.label:
-                sync = PetriNet.Transition(
-                    (t1.name, t2.name), (t1.label, t2.label)
-                )
-                sync_net.transitions.add(sync)
-                # copy the properties of the transitions inside the transition
-                # of the sync net
-                for p1 in t1.properties:
-                    sync.properties[p1] = t1.properties[p1]
-                for p2 in t2.properties:
-                    sync.properties[p2] = t2.properties[p2]
-                for a in t1.in_arcs:
-                    add_arc_from_to(p1_map[a.source], sync, sync_net)
-                for a in t2.in_arcs:
-                    add_arc_from_to(p2_map[a.source], sync, sync_net)
-                for a in t1.out_arcs:
-                    add_arc_from_to(sync, p1_map[a.target], sync_net)
-                for a in t2.out_arcs:
-                    add_arc_from_to(sync, p2_map[a.target], sync_net)
+    for t1, t2 in matching_pairs(pn1, pn2):
+        __add_sync_transition(t1, t2, sync_net, p1_map, p2_map)
 
     sync_im = Marking()
     sync_fm = Marking()
@@ -122,28 +181,9 @@ def construct_cost_aware(
     for t2 in pn2.transitions:
         costs[t2_map[t2]] = pn2_costs[t2]
 
-    for t1 in pn1.transitions:
-        for t2 in pn2.transitions:
-            if t1.label == t2.label:
-                sync = PetriNet.Transition(
-                    (t1.name, t2.name), (t1.label, t2.label)
-                )
-                sync_net.transitions.add(sync)
-                costs[sync] = sync_costs[(t1, t2)]
-                # copy the properties of the transitions inside the transition
-                # of the sync net
-                for p1 in t1.properties:
-                    sync.properties[p1] = t1.properties[p1]
-                for p2 in t2.properties:
-                    sync.properties[p2] = t2.properties[p2]
-                for a in t1.in_arcs:
-                    add_arc_from_to(p1_map[a.source], sync, sync_net)
-                for a in t2.in_arcs:
-                    add_arc_from_to(p2_map[a.source], sync, sync_net)
-                for a in t1.out_arcs:
-                    add_arc_from_to(sync, p1_map[a.target], sync_net)
-                for a in t2.out_arcs:
-                    add_arc_from_to(sync, p2_map[a.target], sync_net)
+    for t1, t2 in matching_pairs(pn1, pn2):
+        sync = __add_sync_transition(t1, t2, sync_net, p1_map, p2_map)
+        costs[sync] = sync_costs[(t1, t2)]
 
     sync_im = Marking()
     sync_fm = Marking()
@@ -163,6 +203,142 @@ def construct_cost_aware(
     return sync_net, sync_im, sync_fm, costs
 
 
+def construct_compiled(
+    pn1: PetriNet,
+    im1: Marking,
+    fm1: Marking,
+    pn2: PetriNet,
+    im2: Marking,
+    fm2: Marking,
+    skip: str,
+    pn1_costs: Optional[Dict[PetriNet.Transition, Any]] = None,
+    pn2_costs: Optional[Dict[PetriNet.Transition, Any]] = None,
+    sync_costs: Optional[Dict[Tuple[Any, Any], Any]] = None,
+) -> Tuple[compiled_net.CompiledPetriNet, Optional[List[Any]]]:
+    """
+    Constructs the synchronous product net of two given Petri nets directly
+    in the integer-indexed form of
+    :class:`pm4py.objects.petri_net.utils.compiled_net.CompiledPetriNet`,
+    without creating the places, transitions and arcs of a :class:`PetriNet`.
+
+    The compiled product has the same places and transitions (names, labels
+    and costs) as the one of :func:`construct_cost_aware`. The places of pn1
+    come first, then the ones of pn2; the transitions are the moves on pn1,
+    the moves on pn2 and the synchronous moves, in this order. For the
+    synchronous product of the same model with many traces,
+    :class:`pm4py.objects.petri_net.utils.compiled_net.CompiledModel` avoids
+    compiling the model every time.
+
+    Parameters
+    --------------
+    pn1
+        Petri net 1
+    im1
+        Initial marking of Petri net 1
+    fm1
+        Final marking of Petri net 1
+    pn2
+        Petri net 2
+    im2
+        Initial marking of Petri net 2
+    fm2
+        Final marking of Petri net 2
+    skip
+        Symbol to be used as skip
+    pn1_costs
+        (optional) dictionary mapping transitions of pn1 to corresponding costs
+    pn2_costs
+        (optional) dictionary mapping transitions of pn2 to corresponding costs
+    sync_costs
+        (optional) dictionary mapping pairs of transitions in pn1 and pn2 to
+        the costs of the sync moves
+
+    Returns
+    -------
+    sync_prod
+        Compiled synchronous product (with initial and final marking)
+    cost_vec
+        Cost of each transition of the synchronous product, indexed by
+        transition identifier (None if the costs are not provided)
+    """
+    net1 = compiled_net.construct(pn1, im1, fm1)
+    net2 = compiled_net.construct(pn2, im2, fm2)
+    offset = len(net1.ordered_places)
+    trans1 = net1.ordered_transitions
+    trans2 = net2.ordered_transitions
+    pre2 = [tuple((p + offset, w) for p, w in arcs) for arcs in net2.pre]
+    post2 = [tuple((p + offset, w) for p, w in arcs) for arcs in net2.post]
+
+    places = [(p.name, skip) for p in net1.ordered_places] + [
+        (skip, p.name) for p in net2.ordered_places
+    ]
+    transitions = [
+        compiled_net.CompiledTransition((t.name, skip), (t.label, skip))
+        for t in trans1
+    ] + [
+        compiled_net.CompiledTransition((skip, t.name), (skip, t.label))
+        for t in trans2
+    ]
+    pre = list(net1.pre) + pre2
+    post = list(net1.post) + post2
+    with_costs = (
+        pn1_costs is not None
+        and pn2_costs is not None
+        and sync_costs is not None
+    )
+    cost_vec = None
+    if with_costs:
+        cost_vec = net1.cost_vector(pn1_costs) + net2.cost_vector(pn2_costs)
+
+    index = {}
+    for j, t in enumerate(trans2):
+        index.setdefault(t.label, []).append(j)
+    for i, t1 in enumerate(trans1):
+        for j in index.get(t1.label, ()):
+            t2 = trans2[j]
+            transitions.append(
+                compiled_net.CompiledTransition(
+                    (t1.name, t2.name), (t1.label, t2.label)
+                )
+            )
+            # the places of the two nets are disjoint: the merged arcs stay
+            # sorted by place identifier
+            pre.append(net1.pre[i] + pre2[j])
+            post.append(net1.post[i] + post2[j])
+            if with_costs:
+                cost_vec.append(sync_costs[(t1, t2)])
+
+    sync_prod = compiled_net.CompiledPetriNet(
+        places,
+        transitions,
+        pre,
+        post,
+        ini=net1.ini + net2.ini,
+        fin=net1.fin + net2.fin,
+    )
+    return sync_prod, cost_vec
+
+
+def __add_sync_transition(t1, t2, sync_net, p1_map, p2_map):
+    sync = PetriNet.Transition((t1.name, t2.name), (t1.label, t2.label))
+    sync_net.transitions.add(sync)
+    # copy the properties of the transitions inside the transition of the
+    # sync net
+    for p1 in t1.properties:
+        sync.properties[p1] = t1.properties[p1]
+    for p2 in t2.properties:
+        sync.properties[p2] = t2.properties[p2]
+    for a in t1.in_arcs:
+        add_arc_from_to(p1_map[a.source], sync, sync_net)
+    for a in t2.in_arcs:
+        add_arc_from_to(p2_map[a.source], sync, sync_net)
+    for a in t1.out_arcs:
+        add_arc_from_to(sync, p1_map[a.target], sync_net)
+    for a in t2.out_arcs:
+        add_arc_from_to(sync, p2_map[a.target], sync_net)
+    return sync
+
+
 def __copy_into(source_net, target_net, upper, skip):
     t_map = {}
     p_map = {}
@@ -89,7 +89,8 @@ def read_xes(
         - "line_by_line" – text-based line-by-line importer,
         - "chunk_regex" – chunk-of-bytes importer (default),
         - "iterparse20" – XES 2.0 importer,
-        - "rustxes" – Rust-based importer.
+        - "rustxes" – Rust-based importer,
+        - "iterparse_parallel" – XML parser splitting the file among several processes.
     :param return_legacy_log_object: Boolean indicating whether to return a legacy `EventLog` object (default: `False`).
     :param encoding: Encoding to be used (default: `utf-8`).
     :param **kwargs: Additional parameters to pass to the importer.
@@ -128,6 +129,8 @@ def read_xes(
         v = xes_importer.Variants.CHUNK_REGEX
     elif variant == "rustxes":
         v = xes_importer.Variants.RUSTXES
+    elif variant == "iterparse_parallel":
+        v = xes_importer.Variants.ITERPARSE_PARALLEL
 
     from copy import copy
 
@@ -0,0 +1,281 @@
+'''
+    PM4Py – A Process Mining Library for Python
+Copyright (C) 2024 Process Intelligence Solutions UG (haftungsbeschränkt)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see this software project's root or
+visit <https://www.gnu.org/licenses/>.
+
+Website: https://processintelligence.solutions
+Contact: info@processintelligence.solutions
+'''
+"""
+Persistent LP of the form
+
+    min c^T x  s.t.  A x = b,  x >= 0
+
+that is solved many times for different right-hand sides b (as it happens for the state-equation heuristic of
+the alignments, where only the marking changes between two solves).
+
+The constraint matrix is reduced to its independent rows once, and the optimal basis of the last solve is kept
+(together with its inverse). Since the dual feasibility of a basis does not depend on b, every new solve starts
+from the previous basis and restores the primal feasibility with dual simplex pivots (often zero or a few).
+The first solve (and any solve in which the warm start fails) is performed "cold" by scipy (HiGHS), and the
+basis is recovered from its solution.
+
+The constraint matrix can be given in sparse form (scipy.sparse): if large enough, it is then kept sparse for the
+products of the pivots, while only the basis inverse (m x m) is dense.
+"""
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.linalg import qr
+from scipy.optimize import linprog
+
+TOLERANCE = 10**-9
+PIVOT_TOLERANCE = 10**-7
+REFACTOR_EVERY = 32
+# sparse constraint matrices with less entries (dense size) are handled as
+# dense ones, since the overhead of the sparse products dominates
+SPARSE_MIN_SIZE = 100000
+
+
+class WarmStartLp(object):
+
+    def __init__(self, c, a_matrix, max_pivots=None):
+        """
+        Parameters
+        --------------
+        c
+            Cost vector (length n)
+        a_matrix
+            Equality constraint matrix (m x n), dense or sparse
+        max_pivots
+            Maximum number of pivots allowed in a warm-started solve, before falling back to a cold solve
+            (default: 10 * number of independent rows)
+        """
+        self.c = np.asarray(c, dtype=np.float64).ravel()
+        self.is_sparse = (
+            sparse.issparse(a_matrix)
+            and a_matrix.shape[0] * a_matrix.shape[1] >= SPARSE_MIN_SIZE
+        )
+        if self.is_sparse:
+            a_sparse = sparse.csr_matrix(a_matrix, dtype=np.float64)
+            a_matrix = a_sparse.toarray()
+        elif sparse.issparse(a_matrix):
+            a_matrix = a_matrix.toarray().astype(np.float64)
+        else:
+            a_matrix = np.asarray(a_matrix, dtype=np.float64)
+        self.n = a_matrix.shape[1]
+
+        # keep only the independent rows of A; the remaining ones are linear combinations that make the system
+        # inconsistent when the same combination of b does not vanish
+        if a_matrix.shape[0] > 0:
+            _, r, piv = qr(a_matrix.T, mode="economic", pivoting=True)
+            diag = np.abs(np.diag(r)) if r.size else np.zeros(0)
+            rank = int(np.sum(diag > PIVOT_TOLERANCE * max(1.0, diag[0] if diag.size else 1.0)))
+        else:
+            piv, rank = np.zeros(0, dtype=np.int64), 0
+        self.rows = np.sort(piv[:rank])
+        if self.is_sparse:
+            self.a = a_sparse[self.rows, :].tocsc()
+        else:
+            self.a = a_matrix[self.rows, :]
+        self.m = self.a.shape[0]
+        left_null = None
+        if a_matrix.shape[0] > rank:
+            # left singular vectors only (the right ones would be n x n)
+            u = np.linalg.svd(
+                a_matrix, full_matrices=a_matrix.shape[0] > a_matrix.shape[1]
+            )[0]
+            left_null = u[:, rank:].T
+        self.left_null = left_null
+
+        self.max_pivots = max_pivots if max_pivots is not None else 10 * max(1, self.m)
+
+        self.basis = None
+        self.b_inv = None
+        self.reduced_costs = None
+        self.pivots_since_refactor = 0
+
+        self.solve_times = []
+        self.pivots = []
+        self.cold_solves = 0
+        self.warm_solves = 0
+
+    def solve(self, b) -> Tuple[Optional[float], Optional[List[float]]]:
+        """
+        Solves the LP for the given right-hand side
+
+        Parameters
+        --------------
+        b
+            Right-hand side (length: number of rows of the original constraint matrix)
+
+        Returns
+        --------------
+        prim_obj
+            Optimal value (None if the problem is infeasible)
+        x
+            Optimal solution (None if the problem is infeasible)
+        """
+        start = time.perf_counter()
+        b = np.asarray(b, dtype=np.float64).ravel()
+        ret = None, None
+        pivots = 0
+
+        if self.left_null is None or np.all(np.abs(self.left_null @ b) < PIVOT_TOLERANCE):
+            b = b[self.rows]
+            warm = None
+            if self.basis is not None:
+                warm = self.__dual_simplex(b)
+            if warm is not None:
+                self.warm_solves += 1
+                ret, pivots = warm
+            else:
+                self.cold_solves += 1
+                ret = self.__cold_solve(b)
+
+        self.solve_times.append(time.perf_counter() - start)
+        self.pivots.append(pivots)
+        return ret
+
+    def __solution(self, x_b):
+        x = np.zeros(self.n)
+        x[self.basis] = np.maximum(x_b, 0.0)
+        return float(self.c @ x), x.tolist()
+
+    def __columns(self, columns):
+        if self.is_sparse:
+            return self.a[:, columns].toarray()
+        return self.a[:, columns]
+
+    def __column(self, q):
+        if self.is_sparse:
+            return self.a[:, [q]].toarray().ravel()
+        return self.a[:, q]
+
+    def __refactor(self):
+        self.b_inv = np.linalg.inv(self.__columns(self.basis))
+        y = self.c[self.basis] @ self.b_inv
+        self.reduced_costs = self.c - self.a.T @ y
+        self.reduced_costs[self.basis] = 0.0
+        self.pivots_since_refactor = 0
+
+    def __pivot(self, r, q, u):
+        # product-form update of the basis inverse: column q enters, the
+        # variable in position r leaves
+        pivot_row = self.b_inv[r, :] / u[r]
+        self.b_inv -= np.outer(u, pivot_row)
+        self.b_inv[r, :] = pivot_row
+        self.basis[r] = q
+        self.pivots_since_refactor += 1
+        if self.pivots_since_refactor >= REFACTOR_EVERY:
+            self.__refactor()
+
+    def __dual_simplex(self, b):
+        try:
+            pivots = 0
+            while True:
+                x_b = self.b_inv @ b
+                r = int(np.argmin(x_b)) if self.m else 0
+                if not self.m or x_b[r] >= -PIVOT_TOLERANCE:
+                    return self.__solution(x_b), pivots
+                if pivots >= self.max_pivots:
+                    return None
+                alpha = self.a.T @ self.b_inv[r, :]
+                alpha[self.basis] = 0.0
+                candidates = np.nonzero(alpha < -PIVOT_TOLERANCE)[0]
+                if candidates.size == 0:
+                    # the dual is unbounded, hence the primal is infeasible
+                    return (None, None), pivots
+                ratios = self.reduced_costs[candidates] / -alpha[candidates]
+                q = int(candidates[np.argmin(ratios)])
+                theta = self.reduced_costs[q] / alpha[q]
+                self.reduced_costs -= theta * alpha
+                self.reduced_costs[self.basis[r]] = -theta
+                self.reduced_costs[q] = 0.0
+                self.__pivot(r, q, self.b_inv @ self.__column(q))
+                pivots += 1
+        except np.linalg.LinAlgError:
+            return None
+
+    def __cold_solve(self, b):
+        sol = linprog(
+            self.c, A_eq=self.a, b_eq=b, bounds=(0, None), method="highs-ds"
+        )
+        if sol.status != 0 or sol.x is None:
+            self.basis = None
+            return None, None
+        x = sol.x
+        if not self.__recover_basis(x, b):
+            self.basis = None
+            return float(sol.fun), x.tolist()
+        return self.__solution(self.b_inv @ b)
+
+    def __recover_basis(self, x, b):
+        """
+        Recovers an optimal basis from a (vertex) optimal solution: the support of the solution is completed to a
+        basis, then primal simplex pivots (Bland's rule) restore the dual feasibility without changing the point.
+        """
+        if self.m == 0:
+            self.basis = np.zeros(0, dtype=np.int64)
+            self.b_inv = np.zeros((0, 0))
+            self.reduced_costs = self.c.copy()
+            return True
+        support = np.nonzero(x > TOLERANCE)[0]
+        if support.size > self.m:
+            return False
+        a = self.a.toarray() if self.is_sparse else self.a
+        if support.size:
+            q_s, r_s = np.linalg.qr(a[:, support])
+            if np.min(np.abs(np.diag(r_s))) < PIVOT_TOLERANCE:
+                return False
+            projected = a - q_s @ (q_s.T @ a)
+        else:
+            projected = a
+        others = np.setdiff1d(np.arange(self.n), support)
+        missing = self.m - support.size
+        if missing:
+            _, r_o, piv = qr(projected[:, others], mode="economic", pivoting=True)
+            if r_o.shape[0] < missing or abs(r_o[missing - 1, missing - 1]) < PIVOT_TOLERANCE:
+                return False
+            completion = others[piv[:missing]]
+        else:
+            completion = np.zeros(0, dtype=np.int64)
+        self.basis = np.concatenate([support, completion]).astype(np.int64)
+        try:
+            self.__refactor()
+            for _ in range(self.max_pivots):
+                nonbasic = self.reduced_costs < -PIVOT_TOLERANCE
+                nonbasic[self.basis] = False
+                entering = np.nonzero(nonbasic)[0]
+                if entering.size == 0:
+                    return True
+                q = int(entering[0])
+                u = self.b_inv @ self.__column(q)
+                x_b = self.b_inv @ b
+                rows = np.nonzero(u > PIVOT_TOLERANCE)[0]
+                if rows.size == 0:
+                    return False
+                ratios = x_b[rows] / u[rows]
+                best = ratios.min()
+                ties = rows[ratios <= best + TOLERANCE]
+                r = int(ties[np.argmin(self.basis[ties])])
+                self.__pivot(r, q, u)
+                self.__refactor()
+        except np.linalg.LinAlgError:
+            return False
+        return False
@@ -111,6 +111,354 @@ class AlignmentTest(unittest.TestCase):
         align_alg.apply(log, net, im, fm, variant=align_alg.Variants.VERSION_DIJKSTRA_LESS_MEMORY)
 
 
+    def test_compiled_net_search(self):
+        import pm4py
+        from pm4py.objects.petri_net import semantics
+        from pm4py.objects.petri_net.utils import compiled_net
+        log = pm4py.read_xes("input_data/running-example.xes", return_legacy_log_object=True)
+        net, im, fm = pm4py.discover_petri_net_inductive(log)
+        compiled = compiled_net.construct(net, im, fm)
+        self.assertEqual(compiled.decode_marking(compiled.ini), im)
+        for t_idx in compiled.enabled_transitions(compiled.ini):
+            t = compiled.ordered_transitions[t_idx]
+            self.assertTrue(semantics.is_enabled(t, net, im))
+            self.assertEqual(compiled.decode_marking(compiled.fire(t_idx, compiled.ini)),
+                             semantics.execute(t, net, im))
+        ali_a_star = align_alg.apply(log, net, im, fm, variant=align_alg.Variants.VERSION_STATE_EQUATION_A_STAR)
+        ali_dijkstra = align_alg.apply(log, net, im, fm, variant=align_alg.Variants.VERSION_DIJKSTRA_NO_HEURISTICS)
+        self.assertEqual([x["cost"] for x in ali_a_star], [x["cost"] for x in ali_dijkstra])
+
+    def test_unreachable_final_marking(self):
+        from pm4py.objects.log.obj import Trace, Event
+        from pm4py.objects.petri_net.obj import PetriNet, Marking
+        from pm4py.objects.petri_net.utils import petri_utils
+        from pm4py.algo.conformance.alignments.petri_net.variants import state_equation_a_star
+        # tb needs a token in q, which only tc produces, but tc needs a token in r that is never marked:
+        # the state equation is feasible while the final marking is unreachable
+        net = PetriNet("unreachable")
+        p0, p1, q, r, pf = [PetriNet.Place(name) for name in ["p0", "p1", "q", "r", "pf"]]
+        ta, ta2 = PetriNet.Transition("ta", "a"), PetriNet.Transition("ta2", "a")
+        tb, tc = PetriNet.Transition("tb", "b"), PetriNet.Transition("tc", None)
+        net.places.update([p0, p1, q, r, pf])
+        net.transitions.update([ta, ta2, tb, tc])
+        for source, target in [(p0, ta), (ta, p1), (p0, ta2), (ta2, p1), (p1, tb), (q, tb), (tb, pf), (r, tc),
+                               (tc, r), (tc, q)]:
+            petri_utils.add_arc_from_to(source, target, net)
+        im, fm = Marking({p0: 1}), Marking({pf: 1})
+        for activities in [[], ["a"], ["a", "b"], ["b", "a", "c"]]:
+            trace = Trace([Event({"concept:name": act}) for act in activities])
+            self.assertIsNone(state_equation_a_star.apply(trace, net, im, fm))
+
+    def test_warm_start_lp_heuristic(self):
+        import pm4py
+        from pm4py.algo.conformance.alignments.petri_net.variants import state_equation_a_star
+        log = pm4py.read_xes("input_data/running-example.xes", return_legacy_log_object=True)
+        net, im, fm = pm4py.discover_petri_net_inductive(log)
+        Parameters = state_equation_a_star.Parameters
+        for trace in log:
+            warm = state_equation_a_star.apply(trace, net, im, fm, parameters={Parameters.RETURN_LP_SOLVE_TIMES: True})
+            cold = state_equation_a_star.apply(trace, net, im, fm, parameters={Parameters.WARM_START_LP: False})
+            self.assertEqual(warm["cost"], cold["cost"])
+            self.assertEqual(len(warm["lp_solve_times"]), warm["lp_solved"])
+
+    def test_compiled_model_stitching(self):
+        import pm4py
+        from pm4py.algo.conformance.alignments.petri_net.variants import state_equation_a_star
+        log = pm4py.read_xes("input_data/running-example.xes", return_legacy_log_object=True)
+        net, im, fm = pm4py.discover_petri_net_inductive(log)
+        compiled_model = state_equation_a_star.compile_model(net, im, fm)
+        parameters = {state_equation_a_star.Parameters.RETURN_SYNC_COST_FUNCTION: True}
+        for trace in log:
+            ali_plain, cf_plain = state_equation_a_star.apply(trace, net, im, fm, parameters=dict(parameters))
+            ali_stitched, cf_stitched = state_equation_a_star.apply(
+                trace, net, im, fm,
+                parameters={**parameters, state_equation_a_star.Parameters.COMPILED_MODEL: compiled_model})
+            self.assertEqual(ali_plain["cost"], ali_stitched["cost"])
+            self.assertEqual(sorted((t.name, t.label, c) for t, c in cf_plain.items()),
+                             sorted((t.name, t.label, c) for t, c in cf_stitched.items()))
+        for variant in [align_alg.Variants.VERSION_DIJKSTRA_NO_HEURISTICS, align_alg.Variants.VERSION_DIJKSTRA_LESS_MEMORY]:
+            ali_log = align_alg.apply_log(log, net, im, fm, variant=variant)
+            ali_traces = [align_alg.apply_trace(trace, net, im, fm, variant=variant) for trace in log]
+            self.assertEqual([x["cost"] for x in ali_log], [x["cost"] for x in ali_traces])
+
+    def test_sparse_incidence_matrix(self):
+        import numpy as np
+        import pm4py
+        from pm4py.objects.petri_net.utils import align_utils, compiled_net, incidence_matrix
+        log = pm4py.read_xes("input_data/running-example.xes", return_legacy_log_object=True)
+        net, im, fm = pm4py.discover_petri_net_inductive(log)
+        inc_mat = incidence_matrix.construct(net)
+        self.assertTrue(np.array_equal(inc_mat.sparse_a_matrix.toarray(), np.array(inc_mat.a_matrix)))
+        self.assertEqual(inc_mat.encode_markings([im, fm]).tolist(),
+                         [inc_mat.encode_marking(im), inc_mat.encode_marking(fm)])
+        trace = [e["concept:name"] for e in log[0]]
+        stitched, _ = compiled_net.CompiledModel(net, im, fm).stitch(
+            trace, [align_utils.STD_MODEL_LOG_MOVE_COST] * len(trace))
+        sparse_a = stitched.sparse_incidence_matrix()
+        self.assertEqual(sparse_a.shape, (len(stitched.ordered_places), len(stitched.ordered_transitions)))
+        dense = np.zeros(sparse_a.shape, dtype=np.int64)
+        for t, delta in enumerate(stitched.delta):
+            for p, d in delta:
+                dense[p, t] = d
+        self.assertTrue(np.array_equal(sparse_a.toarray(), dense))
+
+    def test_multiprocessing_pool(self):
+        import pm4py
+        log = pm4py.read_xes("input_data/running-example.xes", return_legacy_log_object=True)
+        net, im, fm = pm4py.discover_petri_net_inductive(log, noise_threshold=0.5)
+        reference = align_alg.apply_log(log, net, im, fm)
+        ali = align_alg.apply_multiprocessing(log, net, im, fm, parameters={align_alg.Parameters.CORES: 2,
+                                                                            align_alg.Parameters.CHUNK_SIZE: 10})
+        self.assertEqual([x["cost"] for x in ali], [x["cost"] for x in reference])
+        self.assertEqual([x["fitness"] for x in ali], [x["fitness"] for x in reference])
+
+    def test_portfolio_race(self):
+        import pm4py
+        log = pm4py.read_xes("input_data/running-example.xes", return_legacy_log_object=True)
+        net, im, fm = pm4py.discover_petri_net_inductive(log, noise_threshold=0.5)
+        contenders = [(align_alg.Variants.VERSION_STATE_EQUATION_A_STAR, {"heuristic": "lp"}),
+                      align_alg.Variants.VERSION_DIJKSTRA_NO_HEURISTICS]
+        for trace in log:
+            reference = align_alg.apply_trace(trace, net, im, fm)
+            ali = align_alg.apply_trace(trace, net, im, fm,
+                                        parameters={align_alg.Parameters.PORTFOLIO: contenders})
+            self.assertEqual(ali["cost"], reference["cost"])
+            self.assertEqual(ali["fitness"], reference["fitness"])
+            self.assertEqual(len(ali["portfolio"]), len(contenders))
+            self.assertEqual(sum(r["status"] == "winner" for r in ali["portfolio"]), 1)
+
+    def test_dispatcher(self):
+        import numpy as np
+        import pm4py
+        from pm4py.algo.conformance.alignments.petri_net.variants import dispatcher
+        log = pm4py.read_xes("input_data/running-example.xes", return_legacy_log_object=True)
+        # the model of the most frequent variant: the other traces have both log and model moves
+        net, im, fm = pm4py.discover_petri_net_inductive(pm4py.filter_variants_top_k(log, 1))
+        candidates = [align_alg.Variants.VERSION_STATE_EQUATION_A_STAR,
+                      align_alg.Variants.VERSION_DIJKSTRA_NO_HEURISTICS]
+
+        class Classifier(object):
+            # same interface as a scikit-learn classifier
+            classes_ = np.array(["VERSION_DIJKSTRA_NO_HEURISTICS", "VERSION_STATE_EQUATION_A_STAR"])
+
+            def predict_proba(self, x):
+                return np.array([[0.8, 0.2]] * x.shape[0])
+
+        reference = align_alg.apply_log(log, net, im, fm)
+        records = []
+        aligned = align_alg.apply_log(log, net, im, fm, variant=align_alg.Variants.VERSION_DISPATCHER,
+                                      parameters={dispatcher.Parameters.CANDIDATES: candidates,
+                                                  dispatcher.Parameters.CLASSIFIER: Classifier(),
+                                                  dispatcher.Parameters.DISPATCH_LOG: records.append})
+        self.assertEqual([x["cost"] for x in aligned], [x["cost"] for x in reference])
+        self.assertEqual([x["fitness"] for x in aligned], [x["fitness"] for x in reference])
+        self.assertEqual(len(records), len(aligned))
+        for ali in aligned:
+            self.assertEqual(len(ali["dispatch"]["features"]), len(dispatcher.FEATURE_NAMES))
+            self.assertEqual(ali["dispatch"]["chosen"], "VERSION_DIJKSTRA_NO_HEURISTICS")
+            self.assertIsNone(ali["dispatch"]["fallback"])
+        # predicted runtimes, with a fallback timeout that is always exceeded
+        aligned = align_alg.apply_log(log, net, im, fm, variant=align_alg.Variants.VERSION_DISPATCHER,
+                                      parameters={dispatcher.Parameters.CANDIDATES: candidates,
+                                                  dispatcher.Parameters.CLASSIFIER: lambda x: np.array([1.0, 3.0]),
+                                                  dispatcher.Parameters.CLASSIFIER_OUTPUT: "runtimes",
+                                                  dispatcher.Parameters.FALLBACK_TIMEOUT: 0})
+        self.assertEqual([x["cost"] for x in aligned], [x["cost"] for x in reference])
+        self.assertEqual([x["fitness"] for x in aligned], [x["fitness"] for x in reference])
+        for ali in aligned:
+            self.assertEqual(ali["dispatch"]["chosen"], "VERSION_STATE_EQUATION_A_STAR")
+            self.assertEqual(ali["dispatch"]["predicted_runtime"], 1.0)
+            self.assertEqual(ali["dispatch"]["fallback"], "VERSION_DIJKSTRA_NO_HEURISTICS")
+
+    def test_prefix_sharing(self):
+        import pm4py
+        from pm4py.objects.log.obj import EventLog, Trace, Event
+        log = pm4py.read_xes("input_data/running-example.xes", return_legacy_log_object=True)
+        net, im, fm = pm4py.discover_petri_net_inductive(log)
+        # variants sharing prefixes of different length (including the empty trace and traces that are prefixes
+        # of other traces)
+        variants = [[e["concept:name"] for e in trace] for trace in log]
+        variants += [v[:k] for v in variants for k in range(0, len(v), 2)]
+        variants += [v[:3] + ["reinitiate request"] + v[3:] for v in variants if len(v) > 3]
+        batch = EventLog([Trace([Event({"concept:name": a}) for a in v]) for v in variants])
+        ali_shared = align_alg.apply_log(batch, net, im, fm, variant=align_alg.Variants.VERSION_DIJKSTRA_PREFIX_SHARING)
+        ali_a_star = align_alg.apply_log(batch, net, im, fm, variant=align_alg.Variants.VERSION_STATE_EQUATION_A_STAR)
+        self.assertEqual([x["cost"] for x in ali_shared], [x["cost"] for x in ali_a_star])
+        self.assertEqual([x["fitness"] for x in ali_shared], [x["fitness"] for x in ali_a_star])
+
+    def test_search_instrumentation(self):
+        import pm4py
+        log = pm4py.read_xes("input_data/running-example.xes", return_legacy_log_object=True)
+        net, im, fm = pm4py.discover_petri_net_inductive(log)
+        for variant in [align_alg.Variants.VERSION_STATE_EQUATION_A_STAR,
+                        align_alg.Variants.VERSION_DIJKSTRA_NO_HEURISTICS,
+                        align_alg.Variants.VERSION_DIJKSTRA_PREFIX_SHARING]:
+            plain = align_alg.apply_log(log, net, im, fm, variant=variant)
+            instrumented = align_alg.apply_log(log, net, im, fm, variant=variant,
+                                               parameters={"search_statistics": True, "open_set_sampling": 1})
+            self.assertEqual([x["cost"] for x in plain], [x["cost"] for x in instrumented])
+            for ali in instrumented:
+                self.assertNotIn("search_statistics", plain[0])
+                stats = ali["search_statistics"]
+                self.assertGreaterEqual(stats["heuristic_gap"], 0)
+                self.assertGreater(len(stats["open_set_sizes"]), 0)
+                self.assertGreaterEqual(stats["total_time"], stats["heap_time"])
+
+    def test_pluggable_heuristics(self):
+        import pm4py
+        from pm4py.algo.conformance.alignments.petri_net.utils import heuristics
+        log = pm4py.read_xes("input_data/running-example.xes", return_legacy_log_object=True)
+        net, im, fm = pm4py.discover_petri_net_inductive(log)
+        reference = align_alg.apply_log(log, net, im, fm, variant=align_alg.Variants.VERSION_DIJKSTRA_NO_HEURISTICS)
+        for heuristic in list(heuristics.HEURISTICS) + [heuristics.ZeroHeuristic]:
+            ali = align_alg.apply_log(log, net, im, fm, variant=align_alg.Variants.VERSION_STATE_EQUATION_A_STAR,
+                                      parameters={"heuristic": heuristic})
+            self.assertEqual([x["cost"] for x in ali], [x["cost"] for x in reference])
+
+    def test_edit_distance_heuristic_duplicate_names(self):
+        from pm4py.objects.log.obj import Trace, Event
+        from pm4py.objects.petri_net.obj import PetriNet, Marking
+        from pm4py.objects.petri_net.utils import align_utils, compiled_net, petri_utils, synchronous_product
+        from pm4py.algo.conformance.alignments.petri_net.utils import heuristics
+        from pm4py.algo.conformance.alignments.petri_net.variants import state_equation_a_star
+        # two transitions share the name t0; the one labelled B can never fire
+        net = PetriNet("duplicate_names")
+        p0, pf, pd, pe = [PetriNet.Place(name) for name in ["p0", "pf", "pd", "pe"]]
+        t_a, t_b = PetriNet.Transition("t0", "A"), PetriNet.Transition("t0", "B")
+        net.places.update([p0, pf, pd, pe])
+        net.transitions.update([t_a, t_b])
+        for source, target in [(p0, t_a), (t_a, pf), (pd, t_b), (t_b, pe)]:
+            petri_utils.add_arc_from_to(source, target, net)
+        im, fm = Marking({p0: 1}), Marking({pf: 1})
+        for activities in [["A"], ["A", "B"], ["B", "A"], ["B"], []]:
+            trace = Trace([Event({"concept:name": act}) for act in activities])
+            reference = state_equation_a_star.apply(trace, net, im, fm, parameters={"heuristic": "lp"})
+            ali = state_equation_a_star.apply(trace, net, im, fm, parameters={"heuristic": "edit_distance"})
+            self.assertEqual(ali["cost"], reference["cost"])
+            trace_net, trace_im, trace_fm = petri_utils.construct_trace_net(trace)
+            sync_net, sync_im, sync_fm = synchronous_product.construct(trace_net, trace_im, trace_fm, net, im, fm,
+                                                                       align_utils.SKIP)
+            compiled = compiled_net.construct(sync_net, sync_im, sync_fm)
+            cost_vec = compiled.cost_vector(align_utils.construct_standard_cost_function(sync_net, align_utils.SKIP))
+            h, x = heuristics.EditDistanceHeuristic(compiled, cost_vec, compiled.sparse_incidence_matrix()).initial()
+            self.assertLessEqual(h, reference["cost"])
+
+    def test_vectorised_edit_distances(self):
+        import random
+        from pm4py.objects.petri_net.utils import align_utils
+        random.seed(42)
+        model_labels = ["a", "b", "c", "d", None, "tau", "n1", "skip_1"]
+        models = [[random.choice(model_labels) for _ in range(random.randint(0, 25))] for _ in range(40)]
+        traces = [[random.choice("abcde") for _ in range(random.randint(0, 25))] for _ in range(40)]
+        # the batches are large enough to be computed by the vectorised table
+        lev = align_utils.levenshtein_batch(models, traces)
+        disc = align_utils.discounted_edit_distance_batch(models, traces, exponent=2)
+        one_to_many = align_utils.levenshtein_batch([models[0]], traces)
+        for i, (model, trace) in enumerate(zip(models, traces)):
+            self.assertEqual(lev[i], align_utils.levenshtein(model, trace))
+            self.assertAlmostEqual(disc[i], align_utils.discountedEditDistance(model, trace, exponent=2)[1])
+            self.assertEqual(one_to_many[i], align_utils.levenshtein(models[0], trace))
+        self.assertEqual(align_utils.levenshtein(["a", None, "b"], ["a", "b"]), 0)
+        self.assertEqual(align_utils.levenshtein(["a", "b"], ["b", "a"]), 2)
+
+    def test_memory_bounded_and_bidirectional(self):
+        import pm4py
+        log = pm4py.read_xes("input_data/running-example.xes", return_legacy_log_object=True)
+        net, im, fm = pm4py.discover_petri_net_inductive(log, noise_threshold=0.5)
+        reference = align_alg.apply_log(log, net, im, fm, variant=align_alg.Variants.VERSION_DIJKSTRA_NO_HEURISTICS)
+        bounded = align_alg.apply_log(log, net, im, fm, variant=align_alg.Variants.VERSION_MEMORY_BOUNDED_A_STAR,
+                                      parameters={"max_states": 5})
+        bidirectional = align_alg.apply_log(log, net, im, fm,
+                                            variant=align_alg.Variants.VERSION_BIDIRECTIONAL_DIJKSTRA)
+        self.assertEqual([x["cost"] for x in bounded], [x["cost"] for x in reference])
+        self.assertEqual([x["cost"] for x in bidirectional], [x["cost"] for x in reference])
+
+    def test_label_indexed_synchronous_product(self):
+        import pm4py
+        from pm4py.objects.petri_net.utils import align_utils, compiled_net, petri_utils, synchronous_product
+        log = pm4py.read_xes("input_data/running-example.xes", return_legacy_log_object=True)
+        net, im, fm = pm4py.discover_petri_net_inductive(log, noise_threshold=0.2)
+        model_costs = {t: 1 if t.label is not None else 0 for t in net.transitions}
+        sync_cost_function = {t: 0 for t in net.transitions if t.label is not None}
+
+        def structure(c):
+            names = [p.name if hasattr(p, "name") else p for p in c.ordered_places]
+            arcs = sorted((t.name, tuple(sorted((names[p], w) for p, w in pre)),
+                           tuple(sorted((names[p], w) for p, w in post)))
+                          for t, pre, post in zip(c.ordered_transitions, c.pre, c.post))
+            return arcs, sorted(names[p] for p, n in enumerate(c.ini) if n), \
+                sorted(names[p] for p, n in enumerate(c.fin) if n)
+
+        for trace in log:
+            trace_net, trace_im, trace_fm = petri_utils.construct_trace_net(trace)
+            trace_costs = {t: 1 for t in trace_net.transitions}
+            pairs = [(t1, t2) for t1 in trace_net.transitions for t2 in net.transitions if t1.label == t2.label]
+            sync_costs = synchronous_product.construct_sync_costs(trace_net, net, sync_cost_function)
+            self.assertEqual(set(sync_costs), set(pairs))
+            sync_net, sync_im, sync_fm, costs = synchronous_product.construct_cost_aware(
+                trace_net, trace_im, trace_fm, net, im, fm, align_utils.SKIP, trace_costs, model_costs, sync_costs)
+            compiled, cost_vec = synchronous_product.construct_compiled(
+                trace_net, trace_im, trace_fm, net, im, fm, align_utils.SKIP, trace_costs, model_costs, sync_costs)
+            self.assertEqual(sorted((t.name, t.label, costs[t]) for t in sync_net.transitions),
+                             sorted((t.name, t.label, c) for t, c in zip(compiled.ordered_transitions, cost_vec)))
+            self.assertEqual(structure(compiled_net.construct(sync_net, sync_im, sync_fm)), structure(compiled))
+
+    def test_easy_soundness_precheck(self):
+        import copy
+        import pm4py
+        from pm4py.objects.petri_net.obj import Marking
+        from pm4py.objects.petri_net.utils import check_soundness, petri_utils
+        log = pm4py.read_xes("input_data/running-example.xes", return_legacy_log_object=True)
+        nets = [pm4py.discover_petri_net_inductive(log), pm4py.discover_petri_net_alpha(log),
+                pm4py.discover_petri_net_heuristics(log)]
+        trace_net, trace_im, trace_fm = petri_utils.construct_trace_net(log[0])
+        # final marking not reachable from the initial marking
+        nets.append((trace_net, trace_fm, trace_im))
+        # two tokens in the source: the final marking cannot be reached exactly
+        nets.append((trace_net, Marking({p: 2 for p in trace_im}), trace_fm))
+        for net, im, fm in nets:
+            self.assertEqual(check_soundness.check_easy_soundness_net_in_fin_marking(net, im, fm),
+                             check_soundness.check_easy_soundness_net_in_fin_marking(net, im, fm, max_states=0))
+        self.assertFalse(check_soundness.check_easy_soundness_net_in_fin_marking(trace_net, trace_fm, trace_im))
+        self.assertTrue(check_soundness.check_easy_soundness_net_in_fin_marking(trace_net, trace_im, trace_fm))
+        net, im, fm = nets[0]
+        self.assertTrue(check_soundness.check_easy_soundness_net_in_fin_marking_cached(net, im, fm))
+        self.assertEqual(check_soundness.net_content_hash(net, im, fm),
+                         check_soundness.net_content_hash(*copy.deepcopy((net, im, fm))))
+        self.assertNotEqual(check_soundness.net_content_hash(net, im, fm),
+                            check_soundness.net_content_hash(net, fm, im))
+        # nets with the same names of places and transitions, but different arcs
+        from pm4py.objects.petri_net.obj import PetriNet
+        verdicts = []
+        for arcs in [[("p0", 0), (0, "pf"), ("pd", 1), (1, "pe")], [("pd", 0), (0, "pf"), ("p0", 1), (1, "pe")]]:
+            net = PetriNet("duplicate_names")
+            places = {name: PetriNet.Place(name) for name in ["p0", "pf", "pd", "pe"]}
+            transitions = [PetriNet.Transition("t0", "A"), PetriNet.Transition("t0", "B")]
+            net.places.update(places.values())
+            net.transitions.update(transitions)
+            for source, target in arcs:
+                if isinstance(source, int):
+                    petri_utils.add_arc_from_to(transitions[source], places[target], net)
+                else:
+                    petri_utils.add_arc_from_to(places[source], transitions[target], net)
+            im, fm = Marking({places["p0"]: 1}), Marking({places["pf"]: 1})
+            verdicts.append(check_soundness.check_easy_soundness_net_in_fin_marking_cached(net, im, fm))
+            self.assertEqual(verdicts[-1], check_soundness.check_easy_soundness_net_in_fin_marking(net, im, fm))
+        self.assertEqual(verdicts, [True, False])
+        # the places after a transition without input places are reachable from an empty initial marking
+        net = PetriNet("empty_preset")
+        p1, p2 = PetriNet.Place("p1"), PetriNet.Place("p2")
+        t0, t1 = PetriNet.Transition("t0", "a"), PetriNet.Transition("t1", "b")
+        net.places.update([p1, p2])
+        net.transitions.update([t0, t1])
+        for source, target in [(t0, p1), (p1, t1), (t1, p2)]:
+            petri_utils.add_arc_from_to(source, target, net)
+        im, fm = Marking(), Marking({p2: 1})
+        self.assertTrue(check_soundness.check_final_marking_places_reachability(net, im, fm))
+        self.assertTrue(check_soundness.check_easy_soundness_net_in_fin_marking(net, im, fm))
+        self.assertTrue(check_soundness.check_easy_soundness_net_in_fin_marking(net, im, fm, max_states=0))
+        self.assertTrue(check_soundness.check_easy_soundness_net_in_fin_marking_cached(net, im, fm))
+
 
 if __name__ == "__main__":
     unittest.main()
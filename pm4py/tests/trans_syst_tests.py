@@ -20,6 +20,34 @@ class TransitionSystemTest(unittest.TestCase):
         viz = pm4py.visualization.transition_system.util.visualize_graphviz.visualize(ts)
         del viz
 
+    def test_reachability_graph_explorer(self):
+        from pm4py.objects.petri_net import semantics
+        from pm4py.objects.petri_net.utils import reachability_graph
+
+        class UncompiledSemantics(semantics.ClassicSemantics):
+            pass
+
+        log = xes_importer.apply(os.path.join(INPUT_DATA_DIR, "reviewing.xes"))
+        net, im, fm = pm4py.discover_petri_net_inductive(log)
+        # the marking flow on the compiled net is the one of the token game on the Petri net
+        expected = reachability_graph.marking_flow_petri(net, im, parameters={reachability_graph.Parameters.PETRI_SEMANTICS: UncompiledSemantics()})
+        incoming, outgoing, _ = reachability_graph.marking_flow_petri(net, im)
+        self.assertEqual(incoming, expected[0])
+        self.assertEqual(outgoing, expected[1])
+        n_edges = sum(len(v) for v in outgoing.values())
+        for order in [reachability_graph.BFS, reachability_graph.DFS]:
+            for n_workers in [1, 2]:
+                explorer = reachability_graph.MarkingGraphExplorer(net, im, parameters={reachability_graph.Parameters.EXPLORATION_ORDER: order, reachability_graph.Parameters.N_WORKERS: n_workers})
+                edges = list(explorer.edges())
+                self.assertEqual(explorer.n_states, len(incoming))
+                self.assertEqual(len(set(edges)), n_edges)
+                self.assertEqual(explorer.marking(explorer.initial_state), im)
+                for source, t, target in edges:
+                    self.assertEqual(outgoing[explorer.marking(source)][explorer.transition(t)], explorer.marking(target))
+        self.assertEqual(reachability_graph.count_reachable_markings(net, im), (len(incoming), True))
+        self.assertEqual(reachability_graph.count_reachable_markings(net, im, parameters={reachability_graph.Parameters.MAX_STATES: 10}), (10, False))
+        self.assertEqual(reachability_graph.count_reachable_markings(net, im, parameters={reachability_graph.Parameters.MAX_STATES: 10, reachability_graph.Parameters.N_WORKERS: 2}), (10, False))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -52,6 +52,33 @@ class XesImportExportTest(unittest.TestCase):
         log = xes_importer.apply(os.path.join(COMPRESSED_INPUT_DATA, "01_running-example.xes.gz"))
         del log
 
+    def test_iterparse_streaming_import(self):
+        from pm4py.objects.log.importer.xes.variants import iterparse
+        for path in [os.path.join(INPUT_DATA_DIR, "running-example.xes"), os.path.join(COMPRESSED_INPUT_DATA, "01_running-example.xes.gz")]:
+            log = xes_importer.apply(path, variant=xes_importer.Variants.ITERPARSE)
+            traces = list(iterparse.iter_traces(path))
+            self.assertEqual([t.attributes for t in traces], [t.attributes for t in log])
+            self.assertEqual([[dict(e) for e in t] for t in traces], [[dict(e) for e in t] for t in log])
+            self.assertEqual(len(list(iterparse.iter_traces(path, parameters={iterparse.Parameters.MAX_TRACES: 2}))), 2)
+
+    def test_iterparse_parallel_import(self):
+        from pm4py.objects.log.importer.xes.variants import iterparse_parallel
+        from pm4py.objects.conversion.log import converter as log_converter
+        path = os.path.join(INPUT_DATA_DIR, "running-example.xes")
+        log = xes_importer.apply(path, variant=xes_importer.Variants.ITERPARSE)
+        # small byte ranges, so that the traces are spread over several chunks
+        parameters = {iterparse_parallel.Parameters.CORES: 2, iterparse_parallel.Parameters.CHUNK_SIZE: 2000}
+        header, ranges = iterparse_parallel.split_file(path, 2000)
+        self.assertGreater(len(ranges), 1)
+        parallel_log = xes_importer.apply(path, variant=xes_importer.Variants.ITERPARSE_PARALLEL, parameters=parameters)
+        self.assertEqual([t.attributes for t in parallel_log], [t.attributes for t in log])
+        self.assertEqual([[dict(e) for e in t] for t in parallel_log], [[dict(e) for e in t] for t in log])
+        self.assertEqual(parallel_log.extensions, log.extensions)
+        self.assertEqual(parallel_log.classifiers, log.classifiers)
+        parameters[iterparse_parallel.Parameters.RETURN_LEGACY_LOG_OBJECT] = False
+        df = xes_importer.apply(path, variant=xes_importer.Variants.ITERPARSE_PARALLEL, parameters=parameters)
+        self.assertTrue(df.equals(log_converter.apply(log, variant=log_converter.Variants.TO_DATA_FRAME)))
+
     def test_rustxes_xes_import(self):
         if importlib.util.find_spec("rustxes"):
             log = xes_importer.apply(os.path.join(INPUT_DATA_DIR, "receipt.xes"), variant=xes_importer.Variants.RUSTXES)